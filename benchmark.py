@@ -0,0 +1,4 @@
+from payload_benchmark import main
+
+if __name__ == "__main__":
+    main()
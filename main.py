@@ -1,12 +1,13 @@
 import tkinter as tk
 import asyncio
 import logging
-from service_container import ServiceContainer
+from core.service_container import ServiceContainer
 import traceback
 import sys
 from pathlib import Path
 
-# 로깅 설정
+# 로깅 설정 (로그 파일을 열기 전에 디렉토리 생성)
+Path("logs").mkdir(exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -24,6 +25,7 @@ class ChatApplication:
     def __init__(self):
         self.container = ServiceContainer.get_instance()
         self.root = None
+        self.chat_ui = None
         
     async def initialize(self):
         """애플리케이션 초기화"""
@@ -32,8 +34,8 @@ class ChatApplication:
             await self.container.initialize()
             
             # UI 가져오기
-            chat_ui = self.container.get_service('chat_ui')
-            self.root = chat_ui.root
+            self.chat_ui = self.container.get_service('chat_ui')
+            self.root = self.chat_ui.root
             
             logger.info("Chat application initialized successfully")
             
@@ -41,18 +43,18 @@ class ChatApplication:
             logger.error(f"Failed to initialize application: {str(e)}")
             raise
             
-    def run(self):
-        """애플리케이션 실행"""
+    async def run(self):
+        """애플리케이션 실행 (UI와 요청 처리가 같은 이벤트 루프를 공유)"""
         if self.root is None:
             raise RuntimeError("Application not initialized")
             
         try:
-            self.root.mainloop()
+            await self.chat_ui.run_async()
         except Exception as e:
             logger.error(f"Error in main loop: {str(e)}")
             raise
         finally:
-            asyncio.run(self.container.cleanup())
+            await self.container.cleanup()
             
     async def cleanup(self):
         """애플리케이션 정리"""
@@ -64,13 +66,10 @@ class ChatApplication:
 
 async def main():
     """메인 함수"""
-    # 필요한 디렉토리 생성
-    Path("logs").mkdir(exist_ok=True)
-    
     try:
         app = ChatApplication()
         await app.initialize()
-        app.run()
+        await app.run()
     except Exception as e:
         logger.error(f"Application error: {str(e)}\n{traceback.format_exc()}")
         sys.exit(1)
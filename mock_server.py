@@ -0,0 +1,4 @@
+from mock_api_server import main
+
+if __name__ == "__main__":
+    main()
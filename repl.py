@@ -0,0 +1,4 @@
+from chat_repl import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import asyncio
+import importlib.util
+import logging
+from typing import Optional, Dict, Any
+
+import httpx
+from anthropic import AsyncAnthropic
+from utils import decrypt_api_key
+
+logger = logging.getLogger(__name__)
+
+class APIClientPool:
+    """프로세스 전체에서 공유하는 AsyncAnthropic 클라이언트를 관리하는 클래스
+
+    API 키 복호화와 HTTP 연결 풀 생성은 첫 요청 시 한 번만 수행되며,
+    모든 ChatSession이 같은 keep-alive 연결을 재사용합니다. 다른 API 주소(예: 로컬
+    모의 서버)를 사용하는 세션은 주소별 클라이언트를 받지만 연결 풀은 공유합니다.
+    싱글톤 패턴을 사용하여 전역적인 접근을 제공합니다.
+    """
+
+    _instance: Optional['APIClientPool'] = None
+
+    DEFAULT_SETTINGS = {
+        'max_connections': 20,
+        'max_keepalive_connections': 10,
+        'keepalive_expiry': 120.0,
+        'connect_timeout': 10.0,
+        'read_timeout': 600.0,
+        'http2': False,
+        'base_url': None  # None이면 SDK 기본값 (ANTHROPIC_BASE_URL 또는 api.anthropic.com)
+    }
+
+    @classmethod
+    def get_instance(cls) -> 'APIClientPool':
+        """싱글톤 인스턴스 반환"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, **settings):
+        """
+        클라이언트 풀을 초기화합니다. 클라이언트는 처음 필요할 때 생성됩니다.
+
+        Args:
+            **settings: DEFAULT_SETTINGS의 항목을 덮어쓸 연결 설정
+        """
+        self.settings: Dict[str, Any] = {**self.DEFAULT_SETTINGS, **settings}
+        # API 주소 (None은 기본 주소) -> 클라이언트
+        self._clients: Dict[Optional[str], AsyncAnthropic] = {}
+        self._api_key: Optional[str] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    def configure(self, **settings) -> None:
+        """
+        연결 설정을 변경합니다. 클라이언트가 이미 생성된 경우 무시됩니다.
+
+        Args:
+            **settings: 변경할 연결 설정
+        """
+        unknown = set(settings) - set(self.DEFAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+
+        if self._clients:
+            logger.warning("API client already created; new settings are ignored")
+            return
+
+        self.settings.update(settings)
+        logger.debug(f"API client settings updated: {settings}")
+
+    def _http2_available(self) -> bool:
+        """HTTP/2 사용 가능 여부 (h2 패키지 설치 여부) 확인"""
+        if not self.settings['http2']:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            return False
+        return True
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """튜닝된 keep-alive 연결 풀을 가진 HTTP 클라이언트 생성"""
+        limits = httpx.Limits(
+            max_connections=self.settings['max_connections'],
+            max_keepalive_connections=self.settings['max_keepalive_connections'],
+            keepalive_expiry=self.settings['keepalive_expiry']
+        )
+        timeout = httpx.Timeout(
+            self.settings['read_timeout'],
+            connect=self.settings['connect_timeout']
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=timeout,
+            http2=self._http2_available()
+        )
+
+    def get_client(self, base_url: Optional[str] = None) -> AsyncAnthropic:
+        """
+        공유 클라이언트를 반환합니다. 주소별로 처음 호출될 때 생성됩니다.
+
+        Args:
+            base_url: API 주소 (None이면 설정의 base_url 또는 SDK 기본값)
+
+        Returns:
+            AsyncAnthropic: 공유 API 클라이언트
+        """
+        base_url = base_url or self.settings['base_url']
+        client = self._clients.get(base_url)
+        if client is None:
+            try:
+                if self._api_key is None:
+                    self._api_key = decrypt_api_key()
+                if self._http_client is None:
+                    self._http_client = self._create_http_client()
+                options = {"base_url": base_url} if base_url else {}
+                client = AsyncAnthropic(api_key=self._api_key, http_client=self._http_client, **options)
+            except Exception as e:
+                logger.error(f"API 클라이언트 초기화 실패: {str(e)}")
+                raise
+            self._clients[base_url] = client
+            logger.info(f"Shared API client created for {client.base_url}")
+        return client
+
+    async def prewarm(self, connections: int = 1) -> None:
+        """
+        API 엔드포인트로 미리 연결을 맺어 첫 요청의 TCP/TLS 지연을 줄입니다.
+
+        Args:
+            connections: 미리 열어 둘 연결 수
+        """
+        client = self.get_client()
+        connections = min(connections, self.settings['max_keepalive_connections'])
+
+        async def open_connection():
+            try:
+                await self._http_client.head(str(client.base_url))
+            except httpx.HTTPError as e:
+                logger.warning(f"Connection prewarm failed: {str(e)}")
+
+        await asyncio.gather(*(open_connection() for _ in range(connections)))
+        logger.info(f"Prewarmed {connections} API connection(s)")
+
+    async def close(self) -> None:
+        """공유 클라이언트와 연결 풀을 닫습니다."""
+        if self._clients:
+            # 주소별 클라이언트가 모두 같은 연결 풀을 사용하므로 풀만 닫음
+            await self._http_client.aclose()
+            self._clients.clear()
+            self._http_client = None
+            logger.info("Shared API client closed")
@@ -0,0 +1,394 @@
+from typing import List, Dict, Optional, Any, Set
+from dataclasses import dataclass, field, asdict
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from anthropic import AsyncAnthropic
+from api_client import APIClientPool
+from chat_session import ChatSession
+from rate_limiter import RateLimiter
+from controllers.request_scheduler import RequestScheduler
+from usage_ledger import UsageLedger, merge_usage_totals
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BatchItem:
+    """배치 입력 JSONL의 한 줄
+
+    같은 session 값을 가진 항목들은 하나의 대화로 이어지며 입력 순서대로 실행되고,
+    session이 없는 항목은 각각 독립된 세션에서 실행됩니다.
+    """
+    id: str
+    prompt: str
+    session: Optional[str] = None
+    context: Optional[str] = None
+    system: Optional[str] = None
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    image: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def session_key(self) -> str:
+        """실행 순서와 대화 기록을 공유하는 단위"""
+        return f"session:{self.session}" if self.session else f"item:{self.id}"
+
+class BatchRunner:
+    """JSONL 프롬프트 파일을 GUI 없이 ChatSession으로 실행하는 클래스
+
+    결과는 항목이 끝날 때마다 출력 JSONL에 한 줄씩 추가됩니다. 출력 파일이 곧
+    체크포인트이므로, 중단된 실행을 같은 출력 파일로 다시 시작하면 성공한 항목은
+    건너뛰고 이어서 실행합니다.
+    """
+
+    SESSION_FIELDS = ('model', 'max_tokens', 'temperature')
+
+    def __init__(self,
+                 output_path: str,
+                 concurrency: int = 4,
+                 defaults: Optional[Dict[str, Any]] = None,
+                 session_options: Optional[Dict[str, Any]] = None,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 resume: bool = True,
+                 client: Optional[AsyncAnthropic] = None,
+                 window: Optional[int] = None):
+        """
+        BatchRunner 인스턴스를 초기화합니다.
+
+        Args:
+            output_path: 결과 JSONL 파일 경로 (체크포인트로도 사용)
+            concurrency: 동시에 실행할 최대 요청 수
+            defaults: 항목에 값이 없을 때 사용할 기본값 (model, max_tokens, temperature, context)
+            session_options: 모든 세션에 전달할 추가 ChatSession 인자 (예: {"prompt_caching": True})
+            rate_limits: 공유 RateLimiter에 적용할 한도
+                (예: {"requests_per_minute": 50, "output_tokens_per_minute": 8000}).
+                지정하지 않은 한도는 API 응답 헤더로 학습합니다.
+            resume: 출력 파일에 이미 성공으로 기록된 항목을 건너뛸지 여부
+            client: 세션에 주입할 API 클라이언트. None이면 공유 클라이언트 풀 사용
+            window: 스케줄러에 한 번에 넣어 둘 최대 항목 수. 입력이 커도 대기 중인
+                작업이 이 수를 넘지 않음 (None이면 concurrency * 4)
+        """
+        self.output_path = output_path
+        self.defaults = defaults or {}
+        self.session_options = session_options or {}
+        self.resume = resume
+        self.client = client
+        self.window = max(1, window or concurrency * 4)
+
+        self.scheduler = RequestScheduler(max_concurrent=concurrency)
+        self._sessions: Dict[str, ChatSession] = {}
+        self._remaining: Dict[str, int] = {}
+        self._ledgers: List[UsageLedger] = []
+        self._output = None
+        self.stats = {"total": 0, "skipped": 0, "succeeded": 0, "failed": 0}
+
+        if rate_limits:
+            RateLimiter.get_instance().configure(**rate_limits)
+
+    @staticmethod
+    def load_items(input_path: str) -> List[BatchItem]:
+        """
+        입력 JSONL 파일을 읽습니다.
+
+        Args:
+            input_path: 입력 파일 경로. 각 줄은 최소한 "prompt"를 가진 JSON 객체
+
+        Returns:
+            List[BatchItem]: 입력 순서대로 정렬된 항목
+
+        Raises:
+            ValueError: JSON 형식이 잘못되었거나 prompt가 없는 줄이 있는 경우
+        """
+        items = []
+        known = {name for name in BatchItem.__dataclass_fields__ if name != 'metadata'}
+        with open(input_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{input_path}:{line_number}: invalid JSON ({e})") from e
+                if "prompt" not in data:
+                    raise ValueError(f"{input_path}:{line_number}: missing 'prompt'")
+
+                data.setdefault("id", f"line-{line_number}")
+                data["id"] = str(data["id"])
+                extra = {key: value for key, value in data.items() if key not in known}
+                items.append(BatchItem(
+                    **{key: value for key, value in data.items() if key in known},
+                    metadata=extra
+                ))
+        return items
+
+    def load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        """
+        출력 파일에서 성공한 항목의 결과를 읽습니다.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 항목 ID -> 기록된 결과
+        """
+        completed: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.output_path):
+            return completed
+
+        self._drop_partial_line()
+        with open(self.output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Ignoring malformed line in batch checkpoint")
+                    continue
+                if result.get("status") == "ok":
+                    completed[result["id"]] = result
+        return completed
+
+    def _drop_partial_line(self) -> None:
+        """중단 시점에 절반만 기록된 마지막 줄을 잘라내어 이어 쓸 수 있게 합니다."""
+        with open(self.output_path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            # 마지막 줄바꿈 위치를 뒤에서부터 찾음
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                f.seek(position - step)
+                chunk = f.read(step)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    position = position - step + newline + 1
+                    break
+                position -= step
+            if position < size:
+                logger.warning("Dropping incomplete last line of batch checkpoint")
+                f.truncate(position)
+
+    def _get_session(self, item: BatchItem) -> ChatSession:
+        """항목이 속한 세션을 반환합니다. 처음 사용할 때 생성됩니다."""
+        session = self._sessions.get(item.session_key)
+        if session is None:
+            options = {**self.session_options}
+            for name in self.SESSION_FIELDS:
+                value = getattr(item, name) if getattr(item, name) is not None else self.defaults.get(name)
+                if value is not None:
+                    options[name] = value
+            # 배치 작업은 지연 시간보다 처리량이 중요하므로 예비 요청을 보내지 않음
+            options["hedge"] = False
+            session = ChatSession(name=item.session or item.id, client=self.client, **options)
+            self._sessions[item.session_key] = session
+            self._ledgers.append(session.usage_ledger)
+        return session
+
+    def _apply_item_settings(self, session: ChatSession, item: BatchItem) -> None:
+        """항목별 모델/컨텍스트 설정을 세션에 적용합니다."""
+        for name in self.SESSION_FIELDS:
+            value = getattr(item, name)
+            if value is not None:
+                setattr(session, name, value)
+
+        if item.system is not None:
+            session.context_manager.add_custom_context("batch", item.system)
+            session.context_manager.set_context("batch")
+        else:
+            # 같은 세션의 이전 항목이 지정한 컨텍스트가 이어지지 않도록 매번 다시 설정
+            context = item.context or self.defaults.get('context') or "general"
+            if context != session.context_manager.active_context:
+                session.context_manager.set_context(context)
+
+    def _release_session(self, item: BatchItem) -> None:
+        """세션의 마지막 항목이 끝나면 세션을 정리합니다."""
+        self._remaining[item.session_key] -= 1
+        if self._remaining[item.session_key] == 0:
+            self._sessions.pop(item.session_key, None)
+
+    def _write_result(self, result: Dict[str, Any]) -> None:
+        """결과 한 줄을 출력 파일에 추가하고 바로 디스크에 반영합니다."""
+        self._output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._output.flush()
+        os.fsync(self._output.fileno())
+
+    async def _run_item(self, item: BatchItem) -> Dict[str, Any]:
+        """
+        항목 하나를 실행하고 결과를 기록합니다.
+
+        Args:
+            item: 실행할 항목
+
+        Returns:
+            Dict[str, Any]: 출력 파일에 기록된 결과
+        """
+        session = self._get_session(item)
+        started_at = time.monotonic()
+        result: Dict[str, Any] = {"id": item.id, "session": item.session}
+        if item.metadata:
+            result["metadata"] = item.metadata
+
+        try:
+            self._apply_item_settings(session, item)
+
+            if item.image:
+                deltas = session.stream_image_message(item.prompt, item.image)
+            else:
+                deltas = session.stream_response(item.prompt)
+            response = "".join([text async for text in deltas])
+
+            # 응답 캐시에서 재생한 응답은 API 사용량이 없음
+            record = session.last_usage
+            result.update({
+                "status": "ok",
+                "model": record.model if record else session.last_routing.get("model", session.model),
+                "response": response,
+                "usage": {key: value for key, value in asdict(record).items()
+                          if key not in ("timestamp", "model", "purpose")} if record else None,
+                "cached": session.last_cache_hit
+            })
+            self.stats["succeeded"] += 1
+
+        except Exception as e:
+            logger.error(f"Batch item '{item.id}' failed: {str(e)}")
+            result.update({"status": "error", "error": str(e), "error_type": type(e).__name__})
+            self.stats["failed"] += 1
+
+        finally:
+            self._release_session(item)
+
+        result["elapsed"] = round(time.monotonic() - started_at, 3)
+        result["completed_at"] = datetime.now().isoformat()
+        self._write_result(result)
+        return result
+
+    async def _replay_completed(self, item: BatchItem, result: Dict[str, Any]) -> None:
+        """
+        이미 완료된 항목을 세션 기록에 되돌려 놓아, 이어지는 항목이 같은 대화
+        맥락에서 실행되도록 합니다. 앞의 항목이 먼저 실행되도록 같은 세션 큐에서 실행됩니다.
+        """
+        self._remaining[item.session_key] -= 1
+        if not item.session or self._remaining[item.session_key] == 0:
+            self._sessions.pop(item.session_key, None)
+            return
+        session = self._get_session(item)
+        session.add_message("user", item.prompt, {"image_path": item.image} if item.image else None)
+        session.add_message("assistant", result.get("response", ""))
+
+    async def run(self, items: List[BatchItem]) -> Dict[str, Any]:
+        """
+        항목들을 실행합니다.
+
+        Args:
+            items: 실행할 항목 (입력 순서)
+
+        Returns:
+            Dict[str, Any]: 항목 수 통계와 전체 토큰 사용량
+        """
+        completed = self.load_checkpoint() if self.resume else {}
+        self.stats["total"] = len(items)
+        self._remaining = {}
+        for item in items:
+            self._remaining[item.session_key] = self._remaining.get(item.session_key, 0) + 1
+
+        pending: Set[asyncio.Future] = set()
+        seen: Set[str] = set()
+        with open(self.output_path, 'a' if self.resume else 'w', encoding='utf-8') as output:
+            self._output = output
+            try:
+                for item in items:
+                    if item.id in seen:
+                        logger.warning(f"Duplicate batch item id '{item.id}'")
+                    seen.add(item.id)
+
+                    if item.id in completed:
+                        self.stats["skipped"] += 1
+                        job = lambda item=item: self._replay_completed(item, completed[item.id])
+                    else:
+                        job = lambda item=item: self._run_item(item)
+                    if len(pending) >= self.window:
+                        # 큰 입력 파일에서도 대기 작업이 window개를 넘지 않도록 하나가 끝날 때까지 대기
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(self.scheduler.submit(item.session_key, job))
+
+                if self.stats["skipped"]:
+                    logger.info(f"Resuming batch: {self.stats['skipped']} items already completed")
+                await asyncio.gather(*pending)
+            finally:
+                await self.scheduler.shutdown()
+                self._output = None
+
+        return {**self.stats, "usage": merge_usage_totals(self._ledgers)}
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """명령줄 인자를 해석합니다."""
+    parser = argparse.ArgumentParser(description="Run a JSONL file of prompts through Claude without the GUI")
+    parser.add_argument("input", help="input JSONL file (one {\"prompt\": ...} object per line)")
+    parser.add_argument("-o", "--output", help="output JSONL file (default: <input>.out.jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="maximum concurrent requests")
+    parser.add_argument("--model", help="default model")
+    parser.add_argument("--context", help="default context (e.g. translator, code_review)")
+    parser.add_argument("--max-tokens", type=int, help="default max tokens")
+    parser.add_argument("--temperature", type=float, help="default temperature")
+    parser.add_argument("--rpm", type=float, help="requests per minute limit")
+    parser.add_argument("--itpm", type=float, help="input tokens per minute limit")
+    parser.add_argument("--otpm", type=float, help="output tokens per minute limit")
+    parser.add_argument("--prompt-caching", action="store_true", help="enable prompt caching")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="replay identical requests from the local response cache")
+    parser.add_argument("--base-url", help="send requests to this API address (e.g. a local mock server)")
+    parser.add_argument("--no-resume", action="store_true", help="ignore and overwrite an existing output file")
+    return parser.parse_args(argv)
+
+async def run_batch(args: argparse.Namespace) -> Dict[str, Any]:
+    """해석된 인자로 배치를 실행합니다."""
+    output = args.output or f"{os.path.splitext(args.input)[0]}.out.jsonl"
+    defaults = {
+        "model": args.model,
+        "context": args.context,
+        "max_tokens": args.max_tokens,
+        "temperature": args.temperature
+    }
+    session_options = {}
+    if args.prompt_caching:
+        session_options["prompt_caching"] = True
+    if args.response_cache:
+        session_options["response_cache"] = True
+    if args.base_url:
+        session_options["base_url"] = args.base_url
+    runner = BatchRunner(
+        output,
+        concurrency=args.concurrency,
+        defaults={key: value for key, value in defaults.items() if value is not None},
+        session_options=session_options or None,
+        rate_limits={
+            "requests_per_minute": args.rpm,
+            "input_tokens_per_minute": args.itpm,
+            "output_tokens_per_minute": args.otpm
+        },
+        resume=not args.no_resume
+    )
+    try:
+        return await runner.run(BatchRunner.load_items(args.input))
+    finally:
+        await APIClientPool.get_instance().close()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """배치 실행 진입점"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stderr)]
+    )
+    args = parse_args(argv)
+    summary = asyncio.run(run_batch(args))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if summary["failed"] == 0 else 1
@@ -0,0 +1,292 @@
+from typing import Dict, Optional, Any, Callable, List, TextIO
+import asyncio
+import logging
+import shlex
+import sys
+import threading
+
+from config_manager import ConfigManager
+from response_formatter import StreamingFormatter
+
+logger = logging.getLogger(__name__)
+
+DIM = "\033[2m"
+RESET = "\033[0m"
+
+HELP_TEXT = """Commands:
+  /sessions               list sessions
+  /switch <name>          switch to a session
+  /new <name>             create a session and switch to it
+  /context [name]         show contexts or switch the session's context
+  /model [name|auto]      show or pin the model (auto: use routing rules)
+  /image <path> [message] send an image with an optional message
+  /usage                  show token usage of the current session
+  /help                   show this help
+  /quit                   save and exit
+Ctrl-C while an answer is streaming stops it."""
+
+class ChatRepl:
+    """터미널에서 사용하는 대화형 채팅 클라이언트
+
+    tkinter를 불러오지 않으며, 무거운 모듈(anthropic 등)과 저장된 세션은 첫 프롬프트를
+    띄운 뒤 백그라운드 스레드에서 불러오므로 바로 입력을 시작할 수 있습니다.
+    응답은 StreamingFormatter로 줄 단위 구문 강조하여 도착하는 대로 출력합니다.
+    """
+
+    def __init__(self,
+                 manager_factory: Optional[Callable[[], Any]] = None,
+                 output: TextIO = sys.stdout,
+                 input_func: Callable[[str], str] = input):
+        """
+        ChatRepl 인스턴스를 초기화합니다.
+
+        Args:
+            manager_factory: ConversationManager를 만드는 함수 (None이면 설정 파일 기반 기본값)
+            output: 출력 스트림
+            input_func: 한 줄을 입력받는 함수
+        """
+        self.manager_factory = manager_factory or self._default_manager
+        self.output = output
+        self.input_func = input_func
+        self.loop = asyncio.new_event_loop()
+
+        self._manager = None
+        self._load_error: Optional[BaseException] = None
+        self._loader = threading.Thread(target=self._load_manager, daemon=True)
+
+        self.commands: Dict[str, Callable[[List[str]], Optional[bool]]] = {
+            "sessions": self._cmd_sessions,
+            "switch": self._cmd_switch,
+            "new": self._cmd_new,
+            "context": self._cmd_context,
+            "model": self._cmd_model,
+            "image": self._cmd_image,
+            "usage": self._cmd_usage,
+            "help": self._cmd_help,
+            "quit": self._cmd_quit,
+            "exit": self._cmd_quit,
+        }
+
+    @staticmethod
+    def _default_manager():
+        """설정 파일의 세션 옵션으로 ConversationManager 생성"""
+        from api_client import APIClientPool
+        from conversation_manager import ConversationManager
+        from rate_limiter import RateLimiter
+        from concurrency_controller import ConcurrencyController
+        from request_hedger import RequestHedger
+        from retry_handler import CircuitBreaker
+        from response_cache import ResponseCache
+        from storage import create_store
+        from encryption import set_compression_level
+
+        config = ConfigManager.load_config()
+        APIClientPool.get_instance().configure(**config.get('api_client', {}))
+        RateLimiter.get_instance().configure(**config.get('rate_limits', {}))
+        ConcurrencyController.get_instance().configure(**config.get('concurrency', {}))
+        RequestHedger.get_instance().configure(**config.get('hedging', {}))
+        CircuitBreaker.get_instance().configure(**config.get('circuit_breaker', {}))
+        ResponseCache.get_instance().configure(**config.get('response_cache', {}))
+        if 'compression_level' in config:
+            set_compression_level(config['compression_level'])
+        storage_dir = config.get('storage_dir', 'conversations')
+        return ConversationManager(
+            storage_dir=storage_dir,
+            session_options=config.get('session', {}),
+            store=create_store(config.get('storage_backend', 'file'), storage_dir)
+        )
+
+    def _load_manager(self) -> None:
+        """백그라운드 스레드에서 세션 관리자를 불러옵니다."""
+        try:
+            self._manager = self.manager_factory()
+        except BaseException as e:
+            self._load_error = e
+
+    @property
+    def manager(self):
+        """세션 관리자 (불러오는 중이면 완료될 때까지 대기)"""
+        if self._manager is None:
+            if self._loader.is_alive():
+                self._loader.join()
+            elif self._load_error is None:
+                self._load_manager()
+            if self._load_error is not None:
+                raise RuntimeError(f"Failed to load sessions: {self._load_error}")
+        return self._manager
+
+    def write(self, text: str) -> None:
+        """출력 스트림에 바로 씁니다."""
+        self.output.write(text)
+        self.output.flush()
+
+    def _prompt(self) -> str:
+        """입력 프롬프트 (세션을 불러오기 전에는 세션 이름 없이 표시)"""
+        if self._manager is None:
+            return "> "
+        return f"[{self._manager.current_session}]> "
+
+    def _cmd_sessions(self, args: List[str]) -> None:
+        for name in self.manager.list_sessions():
+            info = self.manager.get_session_info(name)
+            marker = "*" if info['is_current'] else " "
+            self.write(f"{marker} {name} ({info['message_count']} messages, context: {info['context']})\n")
+
+    def _cmd_switch(self, args: List[str]) -> None:
+        if not args:
+            self.write("Usage: /switch <name>\n")
+            return
+        self.manager.switch_session(" ".join(args))
+        self.write(f"Switched to '{self.manager.current_session}'\n")
+
+    def _cmd_new(self, args: List[str]) -> None:
+        if not args:
+            self.write("Usage: /new <name>\n")
+            return
+        name = " ".join(args)
+        self.manager.create_new_session(name)
+        self.manager.switch_session(name)
+        self.write(f"Created and switched to '{name}'\n")
+
+    def _cmd_context(self, args: List[str]) -> None:
+        context_manager = self.manager.get_current_session().context_manager
+        if not args:
+            for name in context_manager.get_available_contexts():
+                marker = "*" if name == context_manager.active_context else " "
+                self.write(f"{marker} {name}\n")
+            return
+        context_manager.set_context(args[0])
+        self.write(f"Context set to '{args[0]}'\n")
+
+    def _cmd_model(self, args: List[str]) -> None:
+        session = self.manager.get_current_session()
+        if args:
+            session.model_override = None if args[0] == "auto" else args[0]
+        pinned = session.model_override or "auto"
+        last = session.last_routing.get("model", "-")
+        self.write(f"Model: {pinned} (default: {session.model}, last used: {last})\n")
+
+    def _cmd_image(self, args: List[str]) -> None:
+        if not args:
+            self.write("Usage: /image <path> [message]\n")
+            return
+        session = self.manager.get_current_session()
+        self._run_stream(session, session.stream_image_message(" ".join(args[1:]), args[0]))
+
+    def _cmd_usage(self, args: List[str]) -> None:
+        usage = self.manager.get_current_session().get_token_usage()
+        self.write(" ".join(f"{key}={value}" for key, value in usage.items()) + "\n")
+
+    def _cmd_help(self, args: List[str]) -> None:
+        self.write(HELP_TEXT + "\n")
+
+    def _cmd_quit(self, args: List[str]) -> bool:
+        return True
+
+    async def _print_stream(self, deltas) -> None:
+        """응답 조각을 포맷팅하여 출력합니다."""
+        formatter = StreamingFormatter()
+        try:
+            async for delta in deltas:
+                self.write(formatter.feed(delta))
+        finally:
+            await deltas.aclose()
+            self.write(formatter.flush() + "\n")
+
+    def _run_stream(self, session, deltas) -> None:
+        """
+        응답을 스트리밍하고 세션을 저장합니다. Ctrl-C를 누르면 응답 생성을 중지합니다.
+
+        Args:
+            session: 응답을 생성하는 세션
+            deltas: 세션이 반환한 응답 조각 스트림
+        """
+        task = self.loop.create_task(self._print_stream(deltas))
+        try:
+            self.loop.run_until_complete(task)
+        except KeyboardInterrupt:
+            task.cancel()
+            try:
+                self.loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+            self.write(f"{DIM}[stopped]{RESET}\n")
+        except Exception as e:
+            self.write(f"Error: {str(e)}\n")
+            return
+        finally:
+            self.manager.save_session(session.name)
+
+        if task.cancelled():
+            return
+        record = session.last_usage
+        if record is not None:
+            self.write(f"{DIM}[{record.model}: in {record.input_tokens} / out {record.output_tokens}]{RESET}\n")
+        elif session.last_cache_hit:
+            self.write(f"{DIM}[{session.last_routing.get('model', session.model)}: cached]{RESET}\n")
+
+    def handle_line(self, line: str) -> bool:
+        """
+        입력 한 줄을 처리합니다.
+
+        Args:
+            line: 사용자 입력
+
+        Returns:
+            bool: REPL을 종료해야 하면 True
+        """
+        line = line.strip()
+        if not line:
+            return False
+
+        if line.startswith("/"):
+            try:
+                name, *args = shlex.split(line[1:]) or [""]
+            except ValueError as e:
+                self.write(f"Error: {str(e)}\n")
+                return False
+            command = self.commands.get(name)
+            if command is None:
+                self.write(f"Unknown command: /{name} (try /help)\n")
+                return False
+            try:
+                return bool(command(args))
+            except (ValueError, RuntimeError) as e:
+                self.write(f"Error: {str(e)}\n")
+                return False
+
+        session = self.manager.get_current_session()
+        self._run_stream(session, session.stream_response(line))
+        return False
+
+    def close(self) -> None:
+        """바뀐 세션을 저장하고 API 연결을 닫습니다."""
+        if self._manager is not None:
+            self._manager.close()
+        if "api_client" in sys.modules:
+            self.loop.run_until_complete(sys.modules["api_client"].APIClientPool.get_instance().close())
+        self.loop.close()
+
+    def run(self) -> None:
+        """입력을 받아 처리하는 반복을 실행합니다."""
+        self._loader.start()
+        self.write("Claude chat REPL - /help for commands\n")
+        try:
+            while True:
+                try:
+                    line = self.input_func(self._prompt())
+                except EOFError:
+                    self.write("\n")
+                    break
+                except KeyboardInterrupt:
+                    self.write("\n")
+                    continue
+                if self.handle_line(line):
+                    break
+        finally:
+            self.close()
+
+def main() -> None:
+    """REPL 실행 진입점"""
+    logging.basicConfig(level=logging.WARNING)
+    ChatRepl().run()
@@ -0,0 +1,394 @@
+from typing import Dict, Optional, Any, List, Set
+import argparse
+import asyncio
+import hmac
+import json
+import logging
+import os
+import sys
+
+from aiohttp import web
+from api_client import APIClientPool
+from config_manager import ConfigManager
+from controllers.request_scheduler import RequestScheduler
+from rate_limiter import RateLimiter
+from concurrency_controller import ConcurrencyController
+from request_hedger import RequestHedger
+from response_cache import ResponseCache
+from retry_handler import CircuitBreaker
+from conversation_manager import ConversationManager
+from storage import create_store
+from encryption import set_compression_level
+
+logger = logging.getLogger(__name__)
+
+class ChatServer:
+    """ConversationManager의 세션을 HTTP로 제공하는 헤드리스 서버
+
+    세션 관리는 REST 엔드포인트로, 응답은 server-sent events(SSE)로 스트리밍합니다.
+    모든 클라이언트가 하나의 이벤트 루프와 공유 API 클라이언트를 사용하며,
+    같은 세션의 메시지는 순서대로, 다른 세션의 메시지는 동시에 처리됩니다.
+
+    엔드포인트:
+        GET    /sessions                  세션 목록
+        POST   /sessions                  세션 생성 {"name": ...}
+        GET    /sessions/current          현재 세션 정보
+        GET    /sessions/{name}           세션 정보와 메시지
+        DELETE /sessions/{name}           세션 삭제
+        POST   /sessions/{name}/switch    현재 세션 변경
+        POST   /sessions/{name}/messages  메시지 전송 {"content": ...} (SSE 응답)
+        POST   /sessions/{name}/stop      실행 중인 응답 생성 중지
+        PUT    /sessions/{name}/model     모델 고정 {"model": ...} (null이면 라우팅 규칙 사용)
+        GET    /usage                     전체 토큰 사용량, 속도 제한, 동시 요청 한도, 예비 요청, 회로 상태
+    """
+
+    def __init__(self,
+                 conversation_manager: ConversationManager,
+                 max_concurrent: int = 8,
+                 auth_token: Optional[str] = None):
+        """
+        ChatServer 인스턴스를 초기화합니다.
+
+        Args:
+            conversation_manager: 세션을 보관하는 대화 관리자
+            max_concurrent: 모든 세션을 합친 최대 동시 API 요청 수
+            auth_token: 설정하면 모든 요청에 "Authorization: Bearer <token>" 헤더 필요
+        """
+        self.conversation_manager = conversation_manager
+        self.scheduler = RequestScheduler(max_concurrent=max_concurrent)
+        self.auth_token = auth_token
+        # 세션 이름 -> 실행 중인 응답 생성 태스크
+        self._running: Dict[str, asyncio.Task] = {}
+        # 중지가 요청된 세션 이름
+        self._stopping: Set[str] = set()
+
+    def create_app(self) -> web.Application:
+        """라우트가 등록된 aiohttp 애플리케이션을 만듭니다."""
+        app = web.Application(middlewares=[self._auth_middleware, self._error_middleware])
+        app.add_routes([
+            web.get('/sessions', self.list_sessions),
+            web.post('/sessions', self.create_session),
+            web.get('/sessions/current', self.current_session),
+            web.get('/sessions/{name}', self.get_session),
+            web.delete('/sessions/{name}', self.delete_session),
+            web.post('/sessions/{name}/switch', self.switch_session),
+            web.post('/sessions/{name}/messages', self.send_message),
+            web.post('/sessions/{name}/stop', self.stop_generation),
+            web.put('/sessions/{name}/model', self.set_model),
+            web.get('/usage', self.usage),
+        ])
+        app.on_shutdown.append(self._on_shutdown)
+        return app
+
+    @web.middleware
+    async def _auth_middleware(self, request: web.Request, handler):
+        """토큰이 설정된 경우 Bearer 인증 확인"""
+        if self.auth_token:
+            header = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(header, f"Bearer {self.auth_token}"):
+                raise web.HTTPUnauthorized(
+                    text=json.dumps({"error": "unauthorized"}),
+                    content_type='application/json'
+                )
+        return await handler(request)
+
+    @web.middleware
+    async def _error_middleware(self, request: web.Request, handler):
+        """ValueError를 JSON 오류 응답으로 변환"""
+        try:
+            return await handler(request)
+        except ValueError as e:
+            status = 404 if "not found" in str(e) else 400
+            return web.json_response({"error": str(e)}, status=status)
+
+    def _session_or_404(self, name: str):
+        """이름으로 세션을 찾습니다."""
+        return self.conversation_manager.get_session(name)
+
+    def _session_info(self, name: str) -> Dict[str, Any]:
+        """JSON으로 변환 가능한 세션 정보"""
+        info = self.conversation_manager.get_session_info(name)
+        info['last_active'] = info['last_active'].isoformat()
+        info['busy'] = name in self._running
+        info['queue_depth'] = self.scheduler.queue_depth(name)
+        return info
+
+    @staticmethod
+    def _render_messages(session) -> List[Dict[str, Any]]:
+        """메시지 기록을 JSON으로 변환 (이미지 데이터는 제외)"""
+        messages = []
+        for message in session.messages:
+            content = message.content
+            if not isinstance(content, str):
+                content = [
+                    block if block.get('type') != 'image' else {"type": "image"}
+                    for block in content
+                ]
+            messages.append({"role": message.role, "content": content, "metadata": message.metadata})
+        return messages
+
+    @staticmethod
+    async def _read_json(request: web.Request) -> Dict[str, Any]:
+        """요청 본문을 JSON 객체로 읽습니다."""
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            raise ValueError("Request body must be JSON")
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        return data
+
+    async def list_sessions(self, request: web.Request) -> web.Response:
+        """세션 목록"""
+        return web.json_response({
+            "sessions": [self._session_info(name) for name in self.conversation_manager.list_sessions()],
+            "current": self.conversation_manager.current_session
+        })
+
+    async def create_session(self, request: web.Request) -> web.Response:
+        """세션 생성"""
+        data = await self._read_json(request)
+        name = data.get("name")
+        if not name:
+            raise ValueError("Missing 'name'")
+        if self.conversation_manager.has_session(name):
+            return web.json_response({"error": f"Session '{name}' already exists"}, status=409)
+
+        session = self.conversation_manager.create_new_session(name)
+        if data.get("context"):
+            session.context_manager.set_context(data["context"])
+        return web.json_response(self._session_info(name), status=201)
+
+    async def current_session(self, request: web.Request) -> web.Response:
+        """현재 세션 정보"""
+        session = self.conversation_manager.get_current_session()
+        return web.json_response(self._session_info(session.name))
+
+    async def get_session(self, request: web.Request) -> web.Response:
+        """세션 정보와 메시지"""
+        name = request.match_info['name']
+        session = self._session_or_404(name)
+        return web.json_response({**self._session_info(name), "messages": self._render_messages(session)})
+
+    async def delete_session(self, request: web.Request) -> web.Response:
+        """세션 삭제 (대기 중이거나 실행 중인 요청은 취소)"""
+        name = request.match_info['name']
+        if not self.conversation_manager.has_session(name):
+            raise ValueError(f"Session '{name}' not found")
+        self.conversation_manager.delete_session(name)
+        self.scheduler.cancel_session(name)
+        self._cancel_running(name)
+        return web.json_response({"deleted": name})
+
+    async def switch_session(self, request: web.Request) -> web.Response:
+        """현재 세션 변경"""
+        name = request.match_info['name']
+        self.conversation_manager.switch_session(name)
+        return web.json_response(self._session_info(name))
+
+    async def stop_generation(self, request: web.Request) -> web.Response:
+        """실행 중인 응답 생성 중지"""
+        name = request.match_info['name']
+        self._session_or_404(name)
+        return web.json_response({"stopped": self._cancel_running(name)})
+
+    async def set_model(self, request: web.Request) -> web.Response:
+        """세션 모델 고정 또는 해제"""
+        name = request.match_info['name']
+        session = self._session_or_404(name)
+        data = await self._read_json(request)
+        if "model" not in data:
+            raise ValueError("Missing 'model'")
+        session.model_override = data["model"] or None
+        return web.json_response({"model": session.model_override, "default": session.model})
+
+    def _cancel_running(self, name: str) -> bool:
+        """세션에서 실행 중인 응답 생성을 중지합니다."""
+        task = self._running.get(name)
+        if task is None or task.done():
+            return False
+        self._stopping.add(name)
+        task.cancel()
+        return True
+
+    async def usage(self, request: web.Request) -> web.Response:
+        """전체 토큰 사용량, 속도 제한, 동시 요청 한도, 예비 요청, 회로 상태, 응답 캐시 통계"""
+        return web.json_response({
+            **self.conversation_manager.get_usage_totals(),
+            "rate_limits": RateLimiter.get_instance().snapshot(),
+            "concurrency": ConcurrencyController.get_instance().snapshot(),
+            "hedging": RequestHedger.get_instance().snapshot(),
+            "circuits": CircuitBreaker.snapshots(),
+            "response_cache": ResponseCache.get_instance().snapshot()
+        })
+
+    @staticmethod
+    async def _send_event(response: web.StreamResponse, event: str, data: Dict[str, Any]) -> None:
+        """SSE 이벤트 하나를 전송합니다."""
+        payload = json.dumps(data, ensure_ascii=False)
+        await response.write(f"event: {event}\ndata: {payload}\n\n".encode('utf-8'))
+
+    async def send_message(self, request: web.Request) -> web.StreamResponse:
+        """
+        메시지를 세션 큐에 넣고 응답을 SSE로 스트리밍합니다.
+
+        이벤트: queued, start, retry {"attempt", "delay", "status_code", ...},
+        delta {"text"}, done {"model", "cached", "usage"}, cancelled {"truncated"}, error {"message", "type"}
+        """
+        name = request.match_info['name']
+        session = self._session_or_404(name)
+        # 큐에서 기다리는 동안 세션이 메모리에서 내려가지 않도록 응답이 끝날 때까지 고정
+        with self.conversation_manager.pinned(session):
+            data = await self._read_json(request)
+            content = data.get("content")
+            if not content:
+                raise ValueError("Missing 'content'")
+
+            response = web.StreamResponse(headers={
+                'Content-Type': 'text/event-stream',
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            })
+            await response.prepare(request)
+
+            future = self.scheduler.submit(name, lambda: self._run_tracked(name, session, content, response))
+            await self._send_event(response, "queued", {"queue_depth": self.scheduler.queue_depth(name)})
+
+            try:
+                await future
+            except asyncio.CancelledError:
+                # 대기 중에 세션이 삭제되었거나 클라이언트 연결이 끊어진 경우
+                await self._try_send(response, "cancelled", {"truncated": False})
+            except Exception as e:
+                logger.error(f"Error streaming message for '{name}': {str(e)}")
+                await self._try_send(response, "error", {"message": str(e), "type": type(e).__name__})
+
+            await self._try_close(response)
+            return response
+
+    async def _try_send(self, response: web.StreamResponse, event: str, data: Dict[str, Any]) -> None:
+        """연결이 끊어졌으면 무시하고 이벤트를 전송합니다."""
+        try:
+            await self._send_event(response, event, data)
+        except ConnectionError:
+            pass
+
+    @staticmethod
+    async def _try_close(response: web.StreamResponse) -> None:
+        """연결이 끊어졌으면 무시하고 응답을 마칩니다."""
+        try:
+            await response.write_eof()
+        except ConnectionError:
+            pass
+
+    async def _run_tracked(self, name: str, session, content: str, response: web.StreamResponse) -> None:
+        """응답 생성을 중지 가능한 태스크로 실행합니다."""
+        task = asyncio.get_running_loop().create_task(self._stream_reply(session, content, response))
+        self._running[name] = task
+        try:
+            await task
+        except asyncio.CancelledError:
+            # 서버 종료 등 중지 요청이 아닌 취소는 그대로 전파
+            if name not in self._stopping:
+                raise
+            last = session.messages[-1] if session.messages else None
+            truncated = last is not None and last.role == "assistant" and \
+                bool(last.metadata and last.metadata.get("truncated"))
+            await self._try_send(response, "cancelled", {"truncated": truncated})
+        finally:
+            self._stopping.discard(name)
+            if self._running.get(name) is task:
+                del self._running[name]
+        await self._save(name)
+
+    async def _stream_reply(self, session, content: str, response: web.StreamResponse) -> None:
+        """세션 응답을 SSE delta 이벤트로 전달합니다."""
+        await self._send_event(response, "start", {"session": session.name})
+        loop = asyncio.get_running_loop()
+
+        def on_attempt(attempt):
+            if attempt.outcome == "retry":
+                loop.create_task(self._try_send(response, "retry", attempt.to_dict()))
+
+        session.retry_handler.add_listener(on_attempt)
+        deltas = session.stream_response(content)
+        try:
+            async for text in deltas:
+                await self._send_event(response, "delta", {"text": text})
+        finally:
+            session.retry_handler.remove_listener(on_attempt)
+            # 클라이언트 연결이 끊어진 경우에도 API 스트림을 즉시 닫음
+            await deltas.aclose()
+
+        # 응답 캐시에서 재생한 응답은 API 사용량이 없음
+        record = session.last_usage
+        await self._send_event(response, "done", {
+            "model": record.model if record else session.last_routing.get("model", session.model),
+            "cached": session.last_cache_hit,
+            "usage": {
+                "input_tokens": record.input_tokens,
+                "output_tokens": record.output_tokens,
+                "cache_creation_input_tokens": record.cache_creation_input_tokens,
+                "cache_read_input_tokens": record.cache_read_input_tokens
+            } if record else None
+        })
+
+    async def _save(self, name: str) -> None:
+        """세션을 이벤트 루프를 막지 않고 저장합니다 (메모리에 없는 세션은 저장할 것이 없음)."""
+        if name not in self.conversation_manager.sessions:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.conversation_manager.save_session, name
+            )
+        except Exception as e:
+            logger.error(f"Failed to save session '{name}': {str(e)}")
+
+    async def _on_shutdown(self, app: web.Application) -> None:
+        """서버 종료 시 요청을 취소하고 세션과 API 클라이언트를 정리합니다."""
+        for task in list(self._running.values()):
+            task.cancel()
+        await self.scheduler.shutdown()
+        self.conversation_manager.close()
+        await APIClientPool.get_instance().close()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """명령줄 인자를 해석합니다."""
+    parser = argparse.ArgumentParser(description="Serve chat sessions over HTTP with SSE streaming")
+    parser.add_argument("--host", default="127.0.0.1", help="bind address")
+    parser.add_argument("--port", type=int, default=8080, help="bind port")
+    parser.add_argument("--storage-dir", default="conversations", help="session storage directory")
+    parser.add_argument("--max-concurrent", type=int, default=8, help="maximum concurrent API requests")
+    parser.add_argument("--storage-backend", choices=["file", "sqlite"],
+                        help="session storage backend (default: storage_backend in config, else file)")
+    parser.add_argument("--token", default=os.getenv("CHAT_SERVER_TOKEN"),
+                        help="require this bearer token (default: $CHAT_SERVER_TOKEN)")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """서버 실행 진입점"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    args = parse_args(argv)
+    config = ConfigManager.load_config()
+    APIClientPool.get_instance().configure(**config.get('api_client', {}))
+    RateLimiter.get_instance().configure(**config.get('rate_limits', {}))
+    ConcurrencyController.get_instance().configure(**config.get('concurrency', {}))
+    RequestHedger.get_instance().configure(**config.get('hedging', {}))
+    CircuitBreaker.get_instance().configure(**config.get('circuit_breaker', {}))
+    ResponseCache.get_instance().configure(**config.get('response_cache', {}))
+    if 'compression_level' in config:
+        set_compression_level(config['compression_level'])
+
+    conversation_manager = ConversationManager(
+        storage_dir=args.storage_dir,
+        session_options=config.get('session', {}),
+        store=create_store(args.storage_backend or config.get('storage_backend', 'file'), args.storage_dir)
+    )
+    server = ChatServer(conversation_manager, max_concurrent=args.max_concurrent, auth_token=args.token)
+    if not args.token and args.host not in ("127.0.0.1", "localhost"):
+        logger.warning("Serving without an auth token on a non-local address")
+    web.run_app(server.create_app(), host=args.host, port=args.port)
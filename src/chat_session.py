@@ -1,16 +1,28 @@
 import anthropic
-from anthropic import Anthropic
-from typing import List, Dict, Optional, Any, Union
+from anthropic import AsyncAnthropic
+from typing import List, Dict, Optional, Any, Union, AsyncIterator, Callable
 import json
+import time
 import asyncio
 from dataclasses import dataclass
+from datetime import datetime
 import logging
-from encryption import encrypt_data, decrypt_data
+from types import SimpleNamespace
+from encryption import encrypt_payload, decrypt_payload
 from response_formatter import format_response
-from utils import count_tokens, decrypt_api_key
 from vision_handler import VisionHandler
 from context_manager import ContextManager
-from retry_handler import RetryHandler
+from retry_handler import RetryHandler, RetryAttempt, CircuitBreaker
+from concurrency_controller import ConcurrencyController, Slot
+from context_budget import ContextBudgeter
+from conversation_compactor import ConversationCompactor
+from usage_ledger import UsageLedger, UsageRecord, USAGE_FIELDS
+from token_estimator import TokenEstimator
+from api_client import APIClientPool
+from rate_limiter import RateLimiter, Reservation, retry_after_seconds
+from request_hedger import RequestHedger
+from model_router import ModelRouter
+from response_cache import ResponseCache
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -26,11 +38,26 @@ class MessageContent:
 class ChatSession:
     """Claude API와의 대화 세션을 관리하는 클래스"""
     
+    CACHE_CONTROL = {"type": "ephemeral"}
+    # 재시도 기본 설정 (전체 60초 안에서, 요청 5개당 재시도 1번까지)
+    DEFAULT_RETRY = {"max_retries": 3, "base_delay": 1.0, "deadline": 60.0, "budget_ratio": 0.2}
+    
     def __init__(self, 
                  model: str = "claude-3-5-sonnet-20241022", 
                  max_tokens: int = 8000, 
                  temperature: float = 0.1,
-                 name: str = "Default Session"):
+                 name: str = "Default Session",
+                 client: Optional[AsyncAnthropic] = None,
+                 prompt_caching: bool = False,
+                 context_budget: Optional[Dict[str, Any]] = None,
+                 compaction: Optional[Dict[str, Any]] = None,
+                 keep_partial_on_cancel: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry: Optional[Dict[str, Any]] = None,
+                 hedge: bool = False,
+                 routing: Optional[Dict[str, Any]] = None,
+                 response_cache: bool = False,
+                 base_url: Optional[str] = None):
         """
         ChatSession 인스턴스를 초기화합니다.
 
@@ -39,50 +66,204 @@ class ChatSession:
             max_tokens (int): 최대 토큰 수
             temperature (float): 응답의 무작위성 정도 (0.0 ~ 1.0)
             name (str): 세션 이름
+            client (Optional[AsyncAnthropic]): 사용할 API 클라이언트.
+                None이면 첫 요청 시 공유 클라이언트 풀에서 가져옵니다.
+            prompt_caching (bool): 시스템 프롬프트와 이전 대화에 캐시 브레이크포인트 사용 여부
+            context_budget (Optional[Dict[str, Any]]): ContextBudgeter 설정
+                (예: {"max_input_tokens": 100000, "image_policy": "shrink"})
+            compaction (Optional[Dict[str, Any]]): ConversationCompactor 설정.
+                None이면 오래된 턴을 요약하지 않습니다.
+            keep_partial_on_cancel (bool): 응답 생성이 취소되었을 때 이미 받은 텍스트를
+                잘린 응답(metadata truncated=True)으로 보존할지 여부. False이면 해당 턴을 버립니다.
+            rate_limiter (Optional[RateLimiter]): 사용할 속도 제한기.
+                None이면 모든 세션이 공유하는 속도 제한기를 사용합니다.
+            retry (Optional[Dict[str, Any]]): DEFAULT_RETRY를 덮어쓸 RetryHandler 설정
+                (예: {"deadline": 30.0, "budget_ratio": 0.1})
+            hedge (bool): 첫 토큰이 늦으면 같은 요청을 한 번 더 보내 먼저 응답하는 쪽을
+                사용할지 여부 (대화형 세션용, 공유 RequestHedger의 예산 안에서 동작)
+            routing (Optional[Dict[str, Any]]): ModelRouter 설정 (규칙과 대체 모델).
+                None이면 항상 model을 사용합니다.
+            response_cache (bool): 같은 요청의 응답을 공유 ResponseCache에서 재생할지 여부.
+                캐시된 응답도 API 응답과 같은 조각 단위로 스트리밍됩니다.
+            base_url (Optional[str]): 공유 클라이언트 대신 사용할 API 주소
+                (예: 로컬 모의 서버 "http://127.0.0.1:8787"). client를 주입하면 무시됩니다.
         """
-        try:
-            api_key = decrypt_api_key()
-            self.client = Anthropic(api_key=api_key)
-        except Exception as e:
-            logger.error(f"API 클라이언트 초기화 실패: {str(e)}")
-            raise
+        self._client = client
+        self._rate_limiter = rate_limiter
+        self.base_url = base_url
 
         # 기본 설정
         self.name = name
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
+        self.prompt_caching = prompt_caching
+        self.keep_partial_on_cancel = keep_partial_on_cancel
+        self.hedge = hedge
+        self.routing = routing
+        self.router = ModelRouter(**routing) if routing is not None else None
+        # 사용자가 지정한 모델 (라우팅 규칙보다 우선)
+        self.model_override: Optional[str] = None
+        self.response_cache = response_cache
         
         # 대화 관련 속성
         self.messages: List[MessageContent] = []
-        self.total_tokens_used = 0
+        self.usage_ledger = UsageLedger()
+        self.last_response: Optional[anthropic.types.Message] = None
+        # 마지막 응답에 실제로 사용된 모델: {"model", "failover_from"}
+        # (캐시에서 재생한 응답은 {"model", "response_cache": "hit"})
+        self.last_routing: Dict[str, str] = {}
+        # 마지막 응답의 사용량 기록 (캐시에서 재생했거나 응답을 끝까지 받지 못했으면 None)
+        self.last_usage: Optional[UsageRecord] = None
+        # 마지막 응답을 응답 캐시에서 재생했는지
+        self.last_cache_hit = False
+        # 오래된 턴의 요약: {"text", "covers": [0, end), "model", "created_at"}
+        self.summary: Optional[Dict[str, Any]] = None
+        self.last_activity = time.monotonic()
+        self._active_requests = 0
+        # 요청 큐에서 이 세션 객체를 잡고 기다리는 작업 수 (ConversationManager.pinned)
+        self._pins = 0
+        # 저장할 내용(메시지, 요약, 사용량, 컨텍스트)이 바뀔 때 호출 (ConversationManager가 설정)
+        self.on_change: Optional[Callable[[], None]] = None
+        self._compaction_task: Optional[asyncio.Task] = None
         
         # 컴포넌트 초기화
         self.vision_handler = VisionHandler()
         self.context_manager = ContextManager()
-        self.retry_handler = RetryHandler(max_retries=3, base_delay=1.0)
+        self.retry = retry
+        self.retry_handler = RetryHandler(
+            **{**self.DEFAULT_RETRY, **(retry or {})},
+            concurrency_controller=ConcurrencyController.get_instance()
+        )
+        self.token_estimator = TokenEstimator(
+            dimension_lookup=self.vision_handler.get_image_dimensions
+        )
+        self._request_estimate = 0.0
+        self._system_text: Optional[tuple] = None
+        self.context_budget = context_budget or {}
+        self.context_budgeter = ContextBudgeter(
+            vision_handler=self.vision_handler,
+            token_counter=self.token_estimator.estimate,
+            **self.context_budget
+        )
+        self.compaction = compaction
+        self.compactor = ConversationCompactor(**compaction) if compaction is not None else None
         
-        # 기본 에러 핸들러 등록
-        self._register_default_error_handlers()
+        # 재시도 결과 기록
+        self.retry_handler.add_listener(self._log_retry_attempt)
         
         logger.info(f"ChatSession '{name}' initialized with model {model}")
 
-    def _register_default_error_handlers(self):
-        """기본 에러 핸들러를 등록합니다."""
-        def handle_api_error(error: anthropic.APIError, attempt: int):
-            logger.warning(f"API 오류 발생 (시도 {attempt + 1}/{self.retry_handler.max_retries}): {str(error)}")
-            if error.status_code == 401:
-                logger.error("인증 오류: API 키를 확인하세요.")
-            elif error.status_code == 429:
-                logger.warning("요청 한도 초과: 잠시 후 다시 시도합니다.")
-            elif error.status_code == 500:
-                logger.error("서버 오류: Anthropic 서버에 문제가 발생했습니다.")
+    @property
+    def client(self) -> AsyncAnthropic:
+        """API 클라이언트. 주입되지 않은 경우 공유 클라이언트를 사용합니다."""
+        if self._client is None:
+            self._client = APIClientPool.get_instance().get_client(self.base_url)
+        return self._client
+
+    @client.setter
+    def client(self, client: AsyncAnthropic) -> None:
+        self._client = client
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """속도 제한기. 주입되지 않은 경우 공유 속도 제한기를 사용합니다."""
+        if self._rate_limiter is None:
+            self._rate_limiter = RateLimiter.get_instance()
+        return self._rate_limiter
+
+    async def _acquire_rate_limit(self, input_tokens: int, output_tokens: int, call):
+        """
+        속도 제한 안에서 API를 호출합니다. 서버가 처리하지 못한 요청의 예약은 되돌리고,
+        429 응답의 retry-after 동안 공유 속도 제한기의 모든 요청을 멈춥니다.
+
+        Args:
+            input_tokens: 예상 입력 토큰 수
+            output_tokens: 예약할 출력 토큰 수
+            call: 호출할 코루틴 함수
+
+        Returns:
+            Tuple[Any, Reservation]: 호출 결과와 예약
+        """
+        reservation = await self.rate_limiter.acquire(input_tokens, output_tokens)
+        try:
+            result = await call()
+        except BaseException as e:
+            self.rate_limiter.release(reservation)
+            response = getattr(e, 'response', None)
+            self.rate_limiter.update_from_headers(getattr(response, 'headers', None))
+            retry_after = retry_after_seconds(e)
+            if retry_after and getattr(e, 'status_code', None) == 429:
+                self.rate_limiter.pause(retry_after)
+            raise
+        return result, reservation
+
+    def _settle_rate_limit(self, reservation: Reservation, usage: Any) -> None:
+        """실제 사용량으로 속도 제한 예약을 정산합니다."""
+        self.rate_limiter.settle(
+            reservation,
+            (getattr(usage, "input_tokens", None) or 0) +
+            (getattr(usage, "cache_creation_input_tokens", None) or 0),
+            getattr(usage, "output_tokens", None) or 0
+        )
+
+    def _settle_interrupted_stream(self, reservation: Reservation, stream: Any, received: List[str],
+                                   model: str, purpose: str = "cancelled") -> None:
+        """
+        끝까지 받지 못한 스트림의 예약을 정산합니다. 받은 조각이 없으면 예약을 되돌리고,
+        있으면 스트림이 지금까지 보고한 사용량과 받은 텍스트의 추정 토큰 수로 정산합니다.
+        서버가 사용량을 보고했다면 그만큼 과금되므로 사용량 장부에도 기록합니다.
+
+        Args:
+            reservation: 스트림을 열 때 받은 예약
+            stream: 중단된 메시지 스트림
+            received: 지금까지 받은 텍스트 조각
+            model: 스트림에 사용된 모델
+            purpose: 장부에 남길 용도 (예: "cancelled", "error", "hedge")
+        """
+        try:
+            usage = stream.current_message_snapshot.usage
+        except Exception:
+            usage = None
 
-        def handle_general_error(error: Exception, attempt: int):
-            logger.warning(f"일반 오류 발생 (시도 {attempt + 1}/{self.retry_handler.max_retries}): {str(error)}")
+        def tokens(name: str) -> int:
+            value = getattr(usage, name, None)
+            return value if isinstance(value, int) else 0
 
-        self.retry_handler.register_error_handler(anthropic.APIError, handle_api_error)
-        self.retry_handler.register_error_handler(Exception, handle_general_error)
+        output_tokens = max(tokens("output_tokens"), self.token_estimator.estimate_text("".join(received)))
+        if any(tokens(key) for key in USAGE_FIELDS):
+            reported = {key: tokens(key) for key in USAGE_FIELDS}
+            reported["output_tokens"] = output_tokens
+            self.usage_ledger.record(SimpleNamespace(**reported), model, purpose=purpose)
+            self._notify_change()
+
+        if not received:
+            self.rate_limiter.release(reservation)
+            return
+        input_tokens = reservation.input_tokens if usage is None else \
+            tokens("input_tokens") + tokens("cache_creation_input_tokens")
+        self.rate_limiter.settle(reservation, input_tokens, output_tokens)
+
+    def _release_slot(self, slot: Optional[Slot], error: Optional[BaseException] = None) -> None:
+        """스트림이 끝나면 hold()로 붙잡은 동시 요청 슬롯을 반환합니다."""
+        if slot is not None:
+            self.retry_handler.concurrency_controller.release(slot, error=error)
+
+    def _log_retry_attempt(self, attempt: RetryAttempt) -> None:
+        """실패한 시도를 구조화된 로그로 남깁니다."""
+        if attempt.outcome == "success":
+            if attempt.attempt > 1:
+                logger.info(f"'{self.name}' 요청이 {attempt.attempt}번째 시도에서 성공했습니다.")
+            return
+
+        extra = {"session": self.name, "retry": attempt.to_dict()}
+        if attempt.outcome == "retry":
+            logger.warning(f"API 오류 발생 (시도 {attempt.attempt}, {attempt.status_code or attempt.error_type}), "
+                           f"{attempt.delay:.1f}초 후 재시도: {attempt.message}", extra=extra)
+        elif attempt.status_code == 401:
+            logger.error("인증 오류: API 키를 확인하세요.", extra=extra)
+        else:
+            logger.error(f"API 요청 실패 (시도 {attempt.attempt}, {attempt.reason}): {attempt.message}", extra=extra)
 
     def add_message(self, role: str, content: Union[str, List[Dict]], metadata: Optional[Dict] = None):
         """
@@ -91,11 +272,474 @@ class ChatSession:
         Args:
             role (str): 메시지 작성자의 역할 ('user' 또는 'assistant')
             content (Union[str, List[Dict]]): 메시지 내용
-            metadata (Optional[Dict]): 메시지 관련 메타데이터
+            metadata (Optional[Dict]): 메시지 관련 메타데이터. 메시지를 만든 시각이
+                created_at(ISO 형식)으로 추가됩니다.
         """
+        metadata = {"created_at": datetime.now().isoformat(), **(metadata or {})}
         message = MessageContent(role=role, content=content, metadata=metadata)
         self.messages.append(message)
         logger.debug(f"Added message from {role} with content length {len(str(content))}")
+        self._notify_change()
+
+    def restore_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        저장된 메시지를 복원합니다. add_message와 달리 생성 시각을 새로 기록하지 않고
+        변경 알림도 보내지 않습니다.
+
+        Args:
+            messages (List[Dict[str, Any]]): {"role", "content", "metadata"} 목록
+        """
+        self.messages.extend(
+            MessageContent(role=msg["role"], content=msg["content"], metadata=msg.get("metadata"))
+            for msg in messages
+        )
+
+    def _notify_change(self) -> None:
+        """저장할 내용이 바뀌었음을 알립니다."""
+        if self.on_change is not None:
+            self.on_change()
+
+    def _build_request(self) -> Dict[str, Any]:
+        """
+        현재 대화 기록으로 API 요청 인자를 구성합니다.
+
+        Returns:
+            Dict[str, Any]: messages API에 전달할 키워드 인자
+        """
+        system_blocks = [{"type": "text", "text": self.context_manager.get_current_system_prompt()}]
+        covered_end = 0
+        if self.summary:
+            covered_end = self.summary["covers"][1]
+            system_blocks.append({
+                "type": "text",
+                "text": f"<conversation_summary>\n{self.summary['text']}\n</conversation_summary>"
+            })
+
+        system: Union[str, List[Dict]] = self._join_system_blocks(system_blocks)
+        messages = self.context_budgeter.select(
+            [{"role": msg.role, "content": msg.content} for msg in self.messages[covered_end:]],
+            system
+        )
+        # 응답의 실제 입력 토큰 수로 추정기를 보정하기 위해 기록
+        self._request_estimate = self.token_estimator.estimate_raw(system) + sum(
+            self.token_estimator.estimate_raw(message["content"]) for message in messages
+        )
+
+        if self.prompt_caching:
+            system_blocks[-1]["cache_control"] = self.CACHE_CONTROL
+            system = system_blocks
+            messages = self._apply_cache_breakpoint(messages)
+
+        return {
+            "model": self._select_model(messages),
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "messages": messages,
+            "system": system
+        }
+
+    def _select_model(self, messages: List[Dict]) -> str:
+        """
+        요청에 사용할 모델을 고릅니다.
+
+        Args:
+            messages: 요청에 포함될 메시지 목록
+
+        Returns:
+            str: 라우터가 고른 모델 (라우팅이 없으면 사용자 지정 모델 또는 기본 모델)
+        """
+        if self.router is None:
+            return self.model_override or self.model
+        has_images = any(
+            block.get("type") == "image"
+            for message in messages if isinstance(message["content"], list)
+            for block in message["content"]
+        )
+        return self.router.select(
+            self.model,
+            input_tokens=int(self._request_estimate * self.token_estimator.factor),
+            has_images=has_images,
+            context=self.context_manager.active_context,
+            override=self.model_override
+        )
+
+    def _join_system_blocks(self, system_blocks: List[Dict]) -> str:
+        """
+        시스템 블록을 하나의 문자열로 합칩니다. 내용이 같으면 이전과 같은 문자열
+        객체를 재사용하여 토큰 추정 캐시가 요청마다 늘어나지 않도록 합니다.
+        """
+        texts = tuple(block["text"] for block in system_blocks)
+        if self._system_text is None or self._system_text[0] != texts:
+            if self._system_text is not None:
+                self.token_estimator.forget(self._system_text[1])
+            self._system_text = (texts, "\n\n".join(texts))
+        return self._system_text[1]
+
+    def _apply_cache_breakpoint(self, messages: List[Dict]) -> List[Dict]:
+        """
+        이전 턴의 마지막 블록에 캐시 브레이크포인트를 표시합니다.
+
+        문자열 내용은 항상 텍스트 블록 리스트로 바꿔 보내므로, 브레이크포인트가
+        다음 턴으로 옮겨가도 앞선 메시지들의 직렬화 결과는 바뀌지 않습니다.
+        저장된 메시지는 수정하지 않고 복사본에만 표시합니다.
+
+        Args:
+            messages (List[Dict]): API 형식의 메시지 목록
+
+        Returns:
+            List[Dict]: 블록 형식으로 정규화되고 브레이크포인트가 표시된 메시지 목록
+        """
+        normalized = []
+        for message in messages:
+            content = message["content"]
+            if isinstance(content, str):
+                content = [{"type": "text", "text": content}]
+            normalized.append({"role": message["role"], "content": list(content)})
+
+        # 마지막 메시지는 새 사용자 입력이므로 그 직전 턴까지를 캐시 접두사로 사용
+        if len(normalized) >= 2:
+            stable_turn = normalized[-2]["content"]
+            stable_turn[-1] = {**stable_turn[-1], "cache_control": self.CACHE_CONTROL}
+
+        return normalized
+
+    def _cache_usage(self) -> Optional[Dict[str, int]]:
+        """
+        마지막 응답의 캐시 생성/읽기 토큰 수를 반환합니다.
+
+        Returns:
+            Optional[Dict[str, int]]: 캐시 토큰 정보 (프롬프트 캐시 미사용 시 None)
+        """
+        if not self.prompt_caching or self.last_response is None:
+            return None
+
+        usage = self.last_response.usage
+        return {
+            "creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+            "read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0
+        }
+
+    async def _stream_completion(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        messages.stream으로 응답을 요청하고 텍스트 델타를 순서대로 반환합니다.
+
+        스트림 연결(응답 헤더 수신)까지만 재시도하며, 첫 델타가 전달된 이후의
+        오류는 호출자에게 그대로 전파됩니다. hedge가 켜져 있으면 첫 델타가 늦을 때
+        예비 요청을 보내고, 먼저 첫 델타를 받은 스트림을 사용합니다.
+        모델이 과부하이거나 모델의 회로 차단기가 열려 있으면 라우터의 대체 모델로 연결합니다.
+        response_cache가 켜져 있으면 캐시된 응답을 API 없이 같은 조각 단위로 반환하고,
+        캐시에 없던 응답은 끝까지 받은 뒤 저장합니다.
+
+        Args:
+            request (Dict[str, Any]): messages API 요청 인자
+
+        Yields:
+            str: 도착한 텍스트 조각
+        """
+        async def connect(model_request):
+            manager = self.client.messages.stream(**model_request)
+            return manager, await manager.__aenter__()
+
+        async def open_stream(model_request):
+            (manager, stream), reservation = await self._acquire_rate_limit(
+                int(self._request_estimate * self.token_estimator.factor),
+                model_request["max_tokens"],
+                lambda: connect(model_request)
+            )
+            response = getattr(stream, 'response', None)
+            self.rate_limiter.update_from_headers(getattr(response, 'headers', None))
+            # 스트림이 끝날 때까지 동시 요청 한도의 자리를 차지함
+            controller = self.retry_handler.concurrency_controller
+            slot = controller.hold() if controller is not None else None
+            return manager, stream, reservation, slot
+
+        async def start():
+            manager, stream, reservation, slot, model = await self._open_with_failover(open_stream, request)
+            try:
+                chunks = aiter(stream.text_stream)
+                first = await anext(chunks, None)
+            except BaseException as e:
+                # 첫 조각을 받기 전에 실패하거나 취소되면 예약을 모두 되돌림
+                self.rate_limiter.release(reservation)
+                self._release_slot(slot, e)
+                await manager.__aexit__(None, None, None)
+                raise
+            return manager, stream, reservation, slot, chunks, first, model
+
+        async def discard(started):
+            # 진 쪽 스트림의 예약은 받은 첫 조각만큼만 남기고 되돌림
+            self._settle_interrupted_stream(started[2], started[1], [started[5]] if started[5] else [],
+                                            started[6], purpose="hedge")
+            self._release_slot(started[3], asyncio.CancelledError())
+            await started[0].__aexit__(None, None, None)
+
+        self.last_response = None
+        self.last_routing = {}
+        cache = ResponseCache.get_instance() if self.response_cache else None
+        cache_key = ResponseCache.fingerprint(request) if cache is not None else None
+        loop = asyncio.get_running_loop()
+        if cache is not None:
+            # 복호화와 파일 접근이 이벤트 루프를 막지 않도록 스레드에서 실행
+            cached = await loop.run_in_executor(None, cache.get, cache_key)
+            if cached is not None:
+                self.last_routing = {"model": cached["model"], "response_cache": "hit"}
+                for text in cached["chunks"]:
+                    # 실제 스트림처럼 조각마다 이벤트 루프에 양보하여 취소가 가능하도록 함
+                    await asyncio.sleep(0)
+                    yield text
+                return
+
+        if self.hedge:
+            started = await RequestHedger.get_instance().race(start, discard)
+        else:
+            started = await start()
+        manager, stream, reservation, slot, chunks, first, model = started
+        self.last_routing = {"model": model}
+        if model != request["model"]:
+            self.last_routing["failover_from"] = request["model"]
+        received: List[str] = []
+        error: Optional[BaseException] = None
+        try:
+            if first is not None:
+                received.append(first)
+                yield first
+            async for text in chunks:
+                received.append(text)
+                yield text
+            self.last_response = await stream.get_final_message()
+            self._settle_rate_limit(reservation, self.last_response.usage)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if not reservation.settled:
+                # 오류, 취소, 제너레이터 종료: max_tokens 전체가 남아 있지 않도록 정산
+                self._settle_interrupted_stream(reservation, stream, received, model,
+                                                purpose="error" if isinstance(error, Exception) else "cancelled")
+            # 스트림 중간의 과부하 오류도 동시 요청 한도에 반영
+            self._release_slot(slot, error)
+            await manager.__aexit__(None, None, None)
+
+        # 대체 모델의 응답은 요청한 모델의 키로 저장하지 않음
+        if cache is not None and model == request["model"]:
+            try:
+                await loop.run_in_executor(None, cache.put, cache_key, received, model)
+            except OSError as e:
+                logger.warning(f"응답 캐시 저장 실패: {str(e)}")
+
+    async def _open_with_failover(self, open_stream, request: Dict[str, Any]):
+        """
+        모델별 회로 차단기 안에서 스트림을 엽니다. 모델이 과부하이면 재시도하지 않고
+        라우터의 대체 모델로 넘깁니다.
+
+        Args:
+            open_stream: 요청 인자를 받아 (manager, stream, reservation, slot)을 반환하는 코루틴 함수
+            request: messages API 요청 인자
+
+        Returns:
+            Tuple: (manager, stream, reservation, slot, 실제 사용된 모델)
+        """
+        model = request["model"]
+        tried = {model}
+        while True:
+            fallback = self.router.fallback_for(model) if self.router is not None else None
+            if fallback in tried:
+                fallback = None
+            try:
+                manager, stream, reservation, slot = await self.retry_handler.async_retry(
+                    open_stream,
+                    {**request, "model": model},
+                    circuit_breaker=CircuitBreaker.for_model(model),
+                    fail_fast=ModelRouter.should_fail_over if fallback else None
+                )
+                return manager, stream, reservation, slot, model
+            except Exception as e:
+                if fallback is None or not ModelRouter.should_fail_over(e):
+                    raise
+                logger.warning(f"'{model}' 모델을 사용할 수 없어 '{fallback}' 모델로 전환합니다: {str(e)}")
+                model = fallback
+                tried.add(model)
+
+    async def _stream_reply(self) -> AsyncIterator[str]:
+        """
+        마지막 사용자 메시지에 대한 응답을 스트리밍하고, 완료되면 대화 기록에 추가합니다.
+
+        요청이 실패하면 대화 순서가 깨지지 않도록 마지막 사용자 메시지를 제거합니다.
+        요청이 취소되면 스트림은 즉시 닫히고, keep_partial_on_cancel 설정에 따라
+        이미 받은 텍스트를 잘린 응답으로 보존하거나 해당 턴을 버립니다.
+
+        Yields:
+            str: 도착한 텍스트 조각
+        """
+        chunks: List[str] = []
+        self.last_usage = None
+        self.last_cache_hit = False
+        self._active_requests += 1
+        try:
+            async for text in self._stream_completion(self._build_request()):
+                chunks.append(text)
+                yield text
+        except (asyncio.CancelledError, GeneratorExit):
+            if self.keep_partial_on_cancel and chunks:
+                self.add_message("assistant", "".join(chunks), {**self.last_routing, "truncated": True})
+                logger.info(f"Generation cancelled in '{self.name}'; kept {len(chunks)} partial chunks")
+            elif self._discard_user_turn():
+                logger.info(f"Generation cancelled in '{self.name}'; discarded the turn")
+            raise
+        except Exception:
+            self._discard_user_turn()
+            raise
+        finally:
+            self._active_requests -= 1
+            self.last_activity = time.monotonic()
+
+        assistant_message = "".join(chunks)
+        self.last_cache_hit = self.last_routing.get("response_cache") == "hit"
+        cache_usage = self._cache_usage()
+        if cache_usage is not None:
+            logger.info(f"Prompt cache for '{self.name}': "
+                        f"created={cache_usage['creation_input_tokens']}, "
+                        f"read={cache_usage['read_input_tokens']}")
+            self.add_message("assistant", assistant_message, {**self.last_routing, "cache": cache_usage})
+        else:
+            self.add_message("assistant", assistant_message, dict(self.last_routing) or None)
+
+        # 실제 API 사용량 기록 및 토큰 추정기 보정
+        if self.last_response is not None:
+            record = self.usage_ledger.record(self.last_response.usage, self.last_response.model)
+            self.last_usage = record
+            self.token_estimator.calibrate(
+                self._request_estimate,
+                record.input_tokens + record.cache_creation_input_tokens + record.cache_read_input_tokens
+            )
+            self._notify_change()
+
+        self._schedule_compaction()
+
+    def _discard_user_turn(self) -> bool:
+        """
+        응답을 받지 못한 마지막 사용자 메시지를 제거하고 그 토큰 추정값도 캐시에서 지웁니다.
+
+        Returns:
+            bool: 제거했으면 True
+        """
+        if not self.messages or self.messages[-1].role != "user":
+            return False
+        message = self.messages.pop()
+        self.token_estimator.forget(message.content)
+        self._notify_change()
+        return True
+
+    def _schedule_compaction(self) -> None:
+        """압축이 필요하면 유휴 상태에서 실행될 백그라운드 작업을 등록합니다."""
+        if self.compactor is None:
+            return
+        if self._compaction_task is not None and not self._compaction_task.done():
+            return
+        if not self.compactor.needs_compaction(len(self.messages), self.summary):
+            return
+
+        self._compaction_task = asyncio.get_running_loop().create_task(self._compact_when_idle())
+
+    async def _compact_when_idle(self) -> None:
+        """세션이 유휴 상태가 될 때까지 기다린 뒤 오래된 턴을 요약합니다."""
+        try:
+            while True:
+                idle_for = time.monotonic() - self.last_activity
+                if self._active_requests == 0 and idle_for >= self.compactor.idle_delay:
+                    break
+                await asyncio.sleep(max(self.compactor.idle_delay - idle_for, 1.0))
+
+            await self.compact()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"대화 압축 중 오류 발생: {str(e)}")
+
+    async def compact(self) -> bool:
+        """
+        요약되지 않은 오래된 턴을 요약하여 기존 요약과 합칩니다.
+
+        Returns:
+            bool: 새 요약이 적용되었으면 True
+        """
+        if self.compactor is None:
+            return False
+
+        start = self.summary["covers"][1] if self.summary else 0
+        end = self.compactor.find_compaction_end(self.messages, start)
+        if end is None:
+            return False
+
+        request = self.compactor.build_request(
+            self.summary["text"] if self.summary else None,
+            self.messages[start:end]
+        )
+
+        async def make_request():
+            return await self._acquire_rate_limit(
+                self.token_estimator.estimate_text(request["messages"][0]["content"]),
+                request["max_tokens"],
+                lambda: self.client.messages.create(**request)
+            )
+
+        response, reservation = await self.retry_handler.async_retry(
+            make_request,
+            circuit_breaker=CircuitBreaker.for_model(self.compactor.model)
+        )
+        self._settle_rate_limit(reservation, response.usage)
+        self.usage_ledger.record(response.usage, self.compactor.model, purpose="compaction")
+        summary_text = "".join(block.text for block in response.content if block.type == "text")
+
+        self.summary = self.compactor.make_summary(summary_text, end)
+        self.context_budgeter.reset()
+        # 요약된 메시지와 이전 요약의 추정값을 더 이상 붙잡아 두지 않음
+        self.token_estimator.forget()
+        self._notify_change()
+        logger.info(f"Compacted messages [0, {end}) of session '{self.name}' into a summary")
+        return True
+
+    def cancel_compaction(self) -> None:
+        """대기 중이거나 실행 중인 압축 작업을 취소합니다."""
+        if self._compaction_task is not None and not self._compaction_task.done():
+            self._compaction_task.cancel()
+        self._compaction_task = None
+
+    async def stream_response(self, user_input: str) -> AsyncIterator[str]:
+        """
+        사용자 입력에 대한 Claude의 응답을 도착하는 대로 반환합니다.
+
+        Args:
+            user_input (str): 사용자 입력 메시지
+
+        Yields:
+            str: 응답 텍스트 조각
+        """
+        self.add_message("user", user_input)
+        async for text in self._stream_reply():
+            yield text
+
+    async def stream_image_message(self, message: str, image_path: str) -> AsyncIterator[str]:
+        """
+        이미지와 텍스트를 함께 전송하고 응답을 도착하는 대로 반환합니다.
+
+        Args:
+            message (str): 이미지와 함께 전송할 텍스트 메시지
+            image_path (str): 이미지 파일 경로
+
+        Yields:
+            str: 응답 텍스트 조각
+        """
+        image_content = await self.vision_handler.prepare_image_content(image_path)
+
+        content = [
+            {'type': 'text', 'text': message},
+            image_content
+        ]
+
+        self.add_message("user", content, {"image_path": image_path})
+        async for text in self._stream_reply():
+            yield text
 
     async def get_response(self, user_input: str) -> str:
         """
@@ -107,28 +751,9 @@ class ChatSession:
         Returns:
             str: Claude의 응답 메시지
         """
-        self.add_message("user", user_input)
-        
         try:
-            async def make_request():
-                messages = [{"role": msg.role, "content": msg.content} for msg in self.messages]
-                response = await self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    messages=messages,
-                    system=self.context_manager.get_current_system_prompt()
-                )
-                return response.content[0].text
-
-            assistant_message = await self.retry_handler.async_retry(make_request)
-            self.add_message("assistant", assistant_message)
-            
-            # 토큰 사용량 업데이트 (근사값 사용)
-            self.total_tokens_used += count_tokens([{"role": "user", "content": user_input}])
-            self.total_tokens_used += count_tokens([{"role": "assistant", "content": assistant_message}])
-            
-            return format_response(assistant_message)
+            chunks = [text async for text in self.stream_response(user_input)]
+            return format_response("".join(chunks))
             
         except Exception as e:
             error_message = f"응답 생성 중 오류 발생: {str(e)}"
@@ -147,29 +772,8 @@ class ChatSession:
             str: Claude의 응답 메시지
         """
         try:
-            image_content = self.vision_handler.prepare_image_content(image_path)
-            
-            content = [
-                {'type': 'text', 'text': message},
-                image_content
-            ]
-            
-            self.add_message("user", content, {"image_path": image_path})
-            
-            async def make_request():
-                messages = [{"role": msg.role, "content": msg.content} for msg in self.messages]
-                response = await self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    messages=messages,
-                    system=self.context_manager.get_current_system_prompt()
-                )
-                return response.content[0].text
-
-            assistant_message = await self.retry_handler.async_retry(make_request)
-            self.add_message("assistant", assistant_message)
-            
-            return format_response(assistant_message)
+            chunks = [text async for text in self.stream_image_message(message, image_path)]
+            return format_response("".join(chunks))
             
         except Exception as e:
             error_message = f"이미지 처리 중 오류 발생: {str(e)}"
@@ -189,16 +793,27 @@ class ChatSession:
                 "model": self.model,
                 "max_tokens": self.max_tokens,
                 "temperature": self.temperature,
+                "prompt_caching": self.prompt_caching,
+                "keep_partial_on_cancel": self.keep_partial_on_cancel,
+                "hedge": self.hedge,
+                "routing": self.routing,
+                "response_cache": self.response_cache,
+                "model_override": self.model_override,
+                "context_budget": self.context_budget,
+                "compaction": self.compaction,
+                "retry": self.retry,
+                "base_url": self.base_url,
+                "summary": self.summary,
                 "messages": [{"role": msg.role, "content": msg.content, "metadata": msg.metadata} 
                            for msg in self.messages],
-                "total_tokens_used": self.total_tokens_used,
+                "usage": self.usage_ledger.to_dict(),
                 "active_context": self.context_manager.active_context,
                 "context_history": self.context_manager.get_context_history(),
                 "custom_contexts": {k: v for k, v in self.context_manager.system_prompts.items() 
                                  if k not in ContextManager.DEFAULT_CONTEXTS}
             }
             
-            encrypted_data = encrypt_data(json.dumps(data))
+            encrypted_data = encrypt_payload(json.dumps(data))
             with open(filename, 'wb') as f:
                 f.write(encrypted_data)
                 
@@ -210,12 +825,13 @@ class ChatSession:
             raise
 
     @classmethod
-    def load_session(cls, filename: str) -> 'ChatSession':
+    def load_session(cls, filename: str, client: Optional[AsyncAnthropic] = None) -> 'ChatSession':
         """
         저장된 세션을 로드하여 새 ChatSession 인스턴스를 생성합니다.
 
         Args:
             filename (str): 로드할 파일 경로
+            client (Optional[AsyncAnthropic]): 세션에 주입할 API 클라이언트
 
         Returns:
             ChatSession: 로드된 세션 인스턴스
@@ -224,7 +840,7 @@ class ChatSession:
             with open(filename, 'rb') as f:
                 encrypted_data = f.read()
                 
-            decrypted_data = decrypt_data(encrypted_data)
+            decrypted_data = decrypt_payload(encrypted_data)
             data = json.loads(decrypted_data)
             
             # 새 인스턴스 생성
@@ -232,18 +848,25 @@ class ChatSession:
                 model=data["model"],
                 max_tokens=data["max_tokens"],
                 temperature=data["temperature"],
-                name=data["name"]
+                name=data["name"],
+                client=client,
+                prompt_caching=data.get("prompt_caching", False),
+                context_budget=data.get("context_budget"),
+                compaction=data.get("compaction"),
+                keep_partial_on_cancel=data.get("keep_partial_on_cancel", True),
+                retry=data.get("retry"),
+                hedge=data.get("hedge", False),
+                routing=data.get("routing"),
+                response_cache=data.get("response_cache", False),
+                base_url=data.get("base_url")
             )
+            session.model_override = data.get("model_override")
             
             # 상태 복원
-            for msg_data in data["messages"]:
-                session.add_message(
-                    role=msg_data["role"],
-                    content=msg_data["content"],
-                    metadata=msg_data.get("metadata")
-                )
+            session.restore_messages(data["messages"])
             
-            session.total_tokens_used = data["total_tokens_used"]
+            session.usage_ledger = UsageLedger.from_dict(data.get("usage"))
+            session.summary = data.get("summary")
             
             # 컨텍스트 복원
             if "custom_contexts" in data:
@@ -261,21 +884,44 @@ class ChatSession:
             logger.error(error_message)
             raise
 
+    def estimate_input_tokens(self, draft: str = "") -> int:
+        """
+        다음 요청의 입력 토큰 수를 로컬에서 추정합니다 (UI 토큰 카운터용).
+        기록은 증분으로 계산되므로 입력할 때마다 호출해도 됩니다.
+
+        Args:
+            draft: 아직 보내지 않은 입력 내용
+
+        Returns:
+            int: 추정 입력 토큰 수 (컨텍스트 예산 적용 전)
+        """
+        covered_end = self.summary["covers"][1] if self.summary else 0
+        tokens = self.token_estimator.estimate_messages(self.messages, covered_end)
+        tokens += self.token_estimator.estimate(self.context_manager.get_current_system_prompt())
+        if self.summary:
+            tokens += self.token_estimator.estimate(self.summary["text"])
+        if draft:
+            tokens += self.token_estimator.estimate_text(draft)
+        return tokens
+
+    @property
+    def total_tokens_used(self) -> int:
+        """API가 보고한 이 세션의 누적 토큰 사용량"""
+        return self.usage_ledger.total_tokens
+
     def get_token_usage(self) -> Dict[str, int]:
         """
         토큰 사용량 통계를 반환합니다.
 
         Returns:
-            Dict[str, int]: 토큰 사용량 정보
+            Dict[str, int]: 요청 수, 입력/출력/캐시 토큰 수와 전체 합계
         """
-        return {
-            "total_tokens": self.total_tokens_used,
-            "available_tokens": self.max_tokens - self.total_tokens_used
-        }
+        return self.usage_ledger.summary()
 
     def clear_context(self):
         """현재 컨텍스트를 초기화합니다."""
         self.context_manager.set_context("general")
+        self._notify_change()
         logger.info("Context reset to general")
 
     def __str__(self) -> str:
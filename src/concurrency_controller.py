@@ -0,0 +1,299 @@
+from typing import Dict, Optional, Any, Callable, Deque
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import asyncio
+import logging
+import time
+
+from anthropic import APIError, APIConnectionError
+from rate_limiter import rate_limit_wait
+
+logger = logging.getLogger(__name__)
+
+# 서버 과부하로 보고 동시 요청 한도를 줄이는 상태 코드
+OVERLOAD_STATUS_CODES = frozenset({429, 529})
+# 스트림 중간의 error 이벤트는 상태 코드 200으로 전달되므로 오류 종류로 판단
+OVERLOAD_ERROR_TYPES = frozenset({"rate_limit_error", "overloaded_error", "api_error"})
+
+@dataclass
+class Slot:
+    """동시 요청 한도 안에서 실행 중인 요청 하나"""
+    started: float = field(default_factory=time.monotonic)
+    # 요청 시작 시 한도를 절반 이상 쓰고 있었는지 (한도를 늘릴 근거가 되는지)
+    saturated: bool = False
+    released: bool = False
+    # 함수가 반환된 뒤에도 호출자가 요청이 끝날 때까지 붙잡고 있는지 (hold 참조)
+    held: bool = False
+    # 붙잡은 슬롯의 첫 바이트까지 지연 시간 (release에서 사용)
+    latency: Optional[float] = None
+
+# 현재 컨텍스트(태스크)에서 run()이 실행 중인 요청의 슬롯
+_current_slot: ContextVar[Optional[Slot]] = ContextVar('current_slot', default=None)
+
+class ConcurrencyController:
+    """AIMD 방식으로 API 동시 요청 수를 조절하는 제어기
+
+    응답이 정상이고 지연 시간이 기준선 안에 있는 동안에는 한도를 한 창(window)의
+    요청이 끝날 때마다 1씩 늘리고(additive increase), 429/529/5xx, 연결 오류,
+    지연 시간 급증이 나타나면 한도를 backoff 배로 줄입니다(multiplicative decrease).
+    한 번 줄인 뒤에는 그 이전에 시작된 요청의 신호를 무시하여, 같은 과부하로
+    한도가 연달아 줄어들지 않도록 합니다.
+
+    지연 시간은 슬롯을 얻은 뒤 호출이 반환될 때까지의 시간이며, 스트리밍 요청에서는
+    응답 헤더를 받을 때까지(첫 바이트까지)의 시간입니다. 속도 제한기에서 기다린
+    시간은 지연 시간에서 뺍니다. 스트리밍 요청은 hold()로 슬롯을 붙잡아 스트림을
+    모두 읽거나 닫을 때까지 한도 안에 남고, 스트림 중간의 과부하 오류도 한도에 반영됩니다.
+    싱글톤 패턴을 사용하여 전역적인 접근을 제공합니다.
+    """
+
+    _instance: Optional['ConcurrencyController'] = None
+
+    @classmethod
+    def get_instance(cls) -> 'ConcurrencyController':
+        """싱글톤 인스턴스 반환"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self,
+                 initial_limit: float = 4,
+                 min_limit: float = 1,
+                 max_limit: float = 32,
+                 backoff: float = 0.5,
+                 latency_tolerance: float = 2.0,
+                 smoothing: float = 0.1,
+                 warmup_samples: int = 5,
+                 min_spike: float = 0.1):
+        """
+        ConcurrencyController 인스턴스를 초기화합니다.
+
+        Args:
+            initial_limit: 시작 동시 요청 한도
+            min_limit: 최소 동시 요청 한도
+            max_limit: 최대 동시 요청 한도
+            backoff: 과부하 시 한도에 곱할 값 (0~1)
+            latency_tolerance: 기준 지연 시간의 몇 배를 넘으면 급증으로 볼지
+            smoothing: 기준 지연 시간 지수 이동 평균의 가중치
+            warmup_samples: 지연 시간 급증 판단을 시작하기 전에 모을 표본 수
+            min_spike: 급증으로 보기 위해 기준선보다 늘어나야 하는 최소 시간(초).
+                아주 짧은 지연 시간의 흔들림으로 한도가 줄지 않도록 함
+        """
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.limit = min(max(float(initial_limit), self.min_limit), self.max_limit)
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.warmup_samples = warmup_samples
+        self.min_spike = min_spike
+
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.stats = {"completed": 0, "increases": 0, "decreases": 0, "overloads": 0, "latency_spikes": 0}
+
+    def configure(self,
+                  initial_limit: Optional[float] = None,
+                  min_limit: Optional[float] = None,
+                  max_limit: Optional[float] = None,
+                  backoff: Optional[float] = None,
+                  latency_tolerance: Optional[float] = None) -> None:
+        """
+        설정을 변경합니다. 지정하지 않은 항목은 유지됩니다.
+
+        Args:
+            initial_limit: 현재 동시 요청 한도
+            min_limit: 최소 동시 요청 한도
+            max_limit: 최대 동시 요청 한도
+            backoff: 과부하 시 한도에 곱할 값
+            latency_tolerance: 지연 시간 급증 기준 배수
+        """
+        if min_limit is not None:
+            self.min_limit = float(min_limit)
+        if max_limit is not None:
+            self.max_limit = float(max_limit)
+        if initial_limit is not None:
+            self.limit = float(initial_limit)
+        if backoff is not None:
+            self.backoff = backoff
+        if latency_tolerance is not None:
+            self.latency_tolerance = latency_tolerance
+        self.limit = min(max(self.limit, self.min_limit), self.max_limit)
+        self._wake()
+        logger.debug(f"Concurrency limits configured: window={self.window}, "
+                     f"min={self.min_limit}, max={self.max_limit}")
+
+    @property
+    def window(self) -> int:
+        """현재 동시에 보낼 수 있는 요청 수"""
+        return max(1, int(self.limit))
+
+    def _wake(self) -> None:
+        """한도 안에 들어가는 대기 요청을 순서대로 깨웁니다."""
+        while self._waiters and self.in_flight < self.window:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    async def acquire(self) -> Slot:
+        """
+        동시 요청 한도 안에 자리가 날 때까지 기다립니다.
+
+        Returns:
+            Slot: 요청이 끝나면 release()에 전달할 슬롯
+        """
+        if self.in_flight < self.window and not self._waiters:
+            self.in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # 자리를 받은 직후 취소된 경우 다음 요청에 넘김
+                    self.in_flight -= 1
+                    self._wake()
+                elif future in self._waiters:
+                    self._waiters.remove(future)
+                raise
+        return Slot(saturated=self.in_flight * 2 >= self.window)
+
+    def release(self, slot: Slot, error: Optional[BaseException] = None,
+                latency: Optional[float] = None) -> None:
+        """
+        요청이 끝난 슬롯을 반환하고 결과에 따라 한도를 조절합니다.
+
+        Args:
+            slot: acquire()가 반환한 슬롯
+            error: 요청에서 발생한 예외 (성공했으면 None)
+            latency: 요청 지연 시간(초). None이면 슬롯을 얻은 뒤 지난 시간
+        """
+        if slot.released:
+            return
+        slot.released = True
+        self.in_flight -= 1
+        if latency is None:
+            latency = slot.latency if slot.latency is not None else time.monotonic() - slot.started
+
+        if error is None:
+            self._on_success(slot, latency)
+        elif is_overload_error(error):
+            self.stats["overloads"] += 1
+            self._decrease(slot, f"{type(error).__name__} ({getattr(error, 'status_code', 'no status')})")
+        self._wake()
+
+    def _on_success(self, slot: Slot, latency: float) -> None:
+        """정상 응답의 지연 시간으로 기준선을 갱신하고 한도를 늘리거나 줄입니다."""
+        self.stats["completed"] += 1
+        baseline = self.baseline_latency
+        self._samples += 1
+        self.baseline_latency = latency if baseline is None else \
+            baseline + self.smoothing * (latency - baseline)
+
+        if baseline is not None and self._samples > self.warmup_samples and \
+                latency > max(baseline * self.latency_tolerance, baseline + self.min_spike):
+            self.stats["latency_spikes"] += 1
+            self._decrease(slot, f"latency spike ({latency:.2f}s vs {baseline:.2f}s)")
+        elif slot.saturated and self.limit < self.max_limit:
+            # 한 창만큼의 요청이 끝날 때마다 한도가 1 늘어남
+            previous = self.window
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            if self.window > previous:
+                self.stats["increases"] += 1
+                logger.debug(f"Concurrency window raised to {self.window}")
+
+    def _decrease(self, slot: Slot, reason: str) -> None:
+        """한도를 줄입니다. 마지막으로 줄인 뒤에 시작된 요청의 신호만 반영합니다."""
+        if slot.started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self.stats["decreases"] += 1
+        logger.warning(f"Concurrency window cut to {self.window} after {reason}")
+
+    def hold(self) -> Optional[Slot]:
+        """
+        run()으로 실행 중인 함수 안에서 호출하면, 함수가 반환된 뒤에도 슬롯을 반환하지
+        않습니다. 함수가 반환한 스트림처럼 요청이 계속되는 경우에 사용하며, 호출자는
+        요청이 끝나면 release()로 슬롯을 반환해야 합니다. 지연 시간은 함수가 반환될
+        때까지로 측정됩니다.
+
+        Returns:
+            Optional[Slot]: 붙잡은 슬롯 (run() 밖에서 호출하면 None)
+        """
+        slot = _current_slot.get()
+        if slot is not None:
+            slot.held = True
+        return slot
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        동시 요청 한도 안에서 비동기 함수를 실행하고 결과를 한도 조절에 반영합니다.
+        함수 안에서 hold()를 호출했으면 성공해도 슬롯을 반환하지 않습니다.
+
+        Args:
+            func: 실행할 비동기 함수
+            *args: 함수에 전달할 위치 인자
+            **kwargs: 함수에 전달할 키워드 인자
+
+        Returns:
+            Any: 함수의 실행 결과
+        """
+        slot = await self.acquire()
+        wait_token = rate_limit_wait.set(0.0)
+        slot_token = _current_slot.set(slot)
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            # 과부하가 아닌 오류와 취소는 한도에 반영하지 않음
+            self.release(slot, error=e)
+            raise
+        finally:
+            waited = rate_limit_wait.get()
+            rate_limit_wait.reset(wait_token)
+            _current_slot.reset(slot_token)
+        latency = time.monotonic() - slot.started - waited
+        if slot.held:
+            slot.latency = latency
+        else:
+            self.release(slot, latency=latency)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 동시 요청 한도와 사용 상태"""
+        return {
+            "window": self.window,
+            "limit": round(self.limit, 3),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "baseline_latency": self.baseline_latency,
+            **self.stats
+        }
+
+def is_overload_error(error: BaseException) -> bool:
+    """
+    서버 과부하를 나타내는 오류인지 확인합니다.
+
+    Args:
+        error: API 호출에서 발생한 예외
+
+    Returns:
+        bool: 429/529/5xx 응답, 스트림 중간의 과부하/서버 오류 이벤트, 연결 오류, 타임아웃이면 True
+    """
+    if isinstance(error, (APIConnectionError, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, APIError):
+        status = getattr(error, 'status_code', None)
+        if status in OVERLOAD_STATUS_CODES or (isinstance(status, int) and status >= 500):
+            return True
+        body = getattr(error, 'body', None)
+        if isinstance(body, dict):
+            details = body.get("error")
+            error_type = details.get("type") if isinstance(details, dict) else body.get("type")
+            return error_type in OVERLOAD_ERROR_TYPES
+    return False
@@ -1,6 +1,23 @@
 import os
 import json
-from tkinter import messagebox
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+def _show_error(message: str) -> None:
+    """
+    오류를 사용자에게 알립니다. GUI가 이미 실행 중일 때만 대화상자를 띄우고,
+    GUI가 없는 환경(서버, 배치)에서는 로그로만 남깁니다.
+    """
+    logger.error(message)
+    if "tkinter" not in sys.modules:
+        return
+    try:
+        from tkinter import messagebox
+        messagebox.showerror("Error", message)
+    except Exception as e:
+        logger.debug(f"Could not show error dialog: {str(e)}")
 
 class ConfigManager:
     """설정을 관리하는 클래스입니다."""
@@ -27,9 +44,9 @@ class ConfigManager:
                 with open(cls.CONFIG_FILE, 'r', encoding='utf-8') as f:
                     return json.load(f)
         except json.JSONDecodeError:
-            messagebox.showerror("Error", "설정 파일 형식이 올바르지 않습니다. 기본 설정을 사용합니다.")
+            _show_error("설정 파일 형식이 올바르지 않습니다. 기본 설정을 사용합니다.")
         except IOError as e:
-            messagebox.showerror("Error", f"설정 파일을 읽는 중 오류가 발생했습니다: {e}")
+            _show_error(f"설정 파일을 읽는 중 오류가 발생했습니다: {e}")
         return cls.DEFAULT_CONFIG.copy()
 
     @classmethod
@@ -44,4 +61,4 @@ class ConfigManager:
             with open(cls.CONFIG_FILE, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
         except IOError as e:
-            messagebox.showerror("Error", f"설정 파일을 저장하는 중 오류가 발생했습니다: {e}")
\ No newline at end of file
+            _show_error(f"설정 파일을 저장하는 중 오류가 발생했습니다: {e}")
\ No newline at end of file
@@ -0,0 +1,188 @@
+from typing import List, Dict, Optional, Callable, Union, Tuple
+import logging
+from utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+class ContextBudgeter:
+    """요청마다 입력 토큰 예산에 맞게 전송할 대화 기록을 고르는 클래스
+
+    오래된 기록은 턴 단위가 아니라 epoch_turns 개의 턴을 묶은 "에포크" 단위로
+    잘라냅니다. 잘라내는 지점은 한 번 정해지면 뒤로 돌아가지 않으므로, 남은
+    접두사가 여러 요청에 걸쳐 동일하게 유지되어 프롬프트 캐시에 유리합니다.
+    """
+
+    IMAGE_POLICIES = ('keep', 'shrink', 'drop', 'auto')
+    OMITTED_IMAGE_TEXT = "[An image from earlier in the conversation was omitted]"
+
+    def __init__(self,
+                 max_input_tokens: int = 150000,
+                 epoch_turns: int = 8,
+                 image_policy: str = 'auto',
+                 recent_image_turns: int = 2,
+                 shrink_dimension: int = 512,
+                 token_counter: Optional[Callable[[Union[str, List[Dict]]], int]] = None,
+                 vision_handler=None):
+        """
+        ContextBudgeter 인스턴스를 초기화합니다.
+
+        Args:
+            max_input_tokens: 요청 하나의 입력 토큰 예산 (시스템 프롬프트 포함)
+            epoch_turns: 한 번에 잘라낼 턴 수
+            image_policy: 오래된 턴의 이미지 처리 방식
+                ('keep', 'shrink', 'drop', 또는 예산에 따라 단계적으로 적용하는 'auto')
+            recent_image_turns: 이미지를 항상 원본 그대로 유지할 최근 턴 수
+            shrink_dimension: 'shrink' 적용 시 이미지의 최대 변 길이
+            token_counter: 메시지 내용의 토큰 수를 추정하는 함수
+            vision_handler: 이미지 축소에 사용할 VisionHandler
+
+        Raises:
+            ValueError: 지원하지 않는 이미지 정책이거나 'shrink'에 VisionHandler가 없는 경우
+        """
+        if image_policy not in self.IMAGE_POLICIES:
+            raise ValueError(f"Unknown image policy: {image_policy}")
+        if image_policy in ('shrink', 'auto') and vision_handler is None:
+            raise ValueError(f"Image policy '{image_policy}' requires a vision handler")
+
+        self.max_input_tokens = max_input_tokens
+        self.epoch_turns = max(1, epoch_turns)
+        self.image_policy = image_policy
+        self.recent_image_turns = recent_image_turns
+        self.shrink_dimension = shrink_dimension
+        self.token_counter = token_counter or estimate_tokens
+        self.vision_handler = vision_handler
+
+        # 이미 잘라낸 앞부분의 턴 수 (항상 epoch_turns의 배수)
+        self._start_turn = 0
+        # id(원본 블록) -> (원본 블록, 축소된 블록)
+        self._shrunk_images: Dict[int, Tuple[Dict, Dict]] = {}
+        # (id(원본 내용), 단계) -> (원본 내용, 변환된 메시지)
+        self._transformed: Dict[Tuple[int, str], Tuple[List[Dict], Dict]] = {}
+        self.last_stats: Dict = {}
+
+    def reset(self) -> None:
+        """잘라내기 위치를 초기화합니다. 대화 기록이 재구성된 경우 호출합니다."""
+        self._start_turn = 0
+        self._shrunk_images.clear()
+        self._transformed.clear()
+
+    @staticmethod
+    def _turn_starts(messages: List[Dict]) -> List[int]:
+        """각 턴이 시작되는 사용자 메시지의 인덱스 목록을 반환합니다."""
+        return [
+            index for index, message in enumerate(messages)
+            if message['role'] == 'user' and (index == 0 or messages[index - 1]['role'] != 'user')
+        ]
+
+    def _image_stages(self) -> List[str]:
+        """적용을 시도할 이미지 처리 단계 목록"""
+        if self.image_policy == 'auto':
+            return ['keep', 'shrink', 'drop']
+        return [self.image_policy]
+
+    def _shrink(self, block: Dict) -> Dict:
+        """이미지 블록을 축소합니다. 결과는 원본 블록별로 캐시됩니다."""
+        cached = self._shrunk_images.get(id(block))
+        if cached is not None and cached[0] is block:
+            return cached[1]
+
+        try:
+            shrunk = self.vision_handler.shrink_image_content(block, self.shrink_dimension)
+        except Exception as e:
+            logger.warning(f"Failed to shrink image, dropping it instead: {str(e)}")
+            shrunk = {"type": "text", "text": self.OMITTED_IMAGE_TEXT}
+
+        self._shrunk_images[id(block)] = (block, shrunk)
+        return shrunk
+
+    def _apply_image_stage(self, message: Dict, stage: str) -> Dict:
+        """
+        메시지의 이미지 블록에 처리 단계를 적용합니다.
+        변환 결과는 캐시되어 요청마다 같은 객체를 반환합니다.
+        """
+        content = message['content']
+        if stage == 'keep' or isinstance(content, str):
+            return message
+        if not any(block.get('type') == 'image' for block in content):
+            return message
+
+        cached = self._transformed.get((id(content), stage))
+        if cached is not None and cached[0] is content:
+            return cached[1]
+
+        new_content = []
+        for block in content:
+            if block.get('type') != 'image':
+                new_content.append(block)
+            elif stage == 'shrink':
+                new_content.append(self._shrink(block))
+            else:
+                new_content.append({"type": "text", "text": self.OMITTED_IMAGE_TEXT})
+
+        transformed = {"role": message['role'], "content": new_content}
+        self._transformed[(id(content), stage)] = (content, transformed)
+        return transformed
+
+    def select(self, messages: List[Dict], system: Union[str, List[Dict]] = "") -> List[Dict]:
+        """
+        입력 토큰 예산 안에 들어가도록 전송할 메시지를 고릅니다.
+
+        Args:
+            messages: API 형식의 전체 대화 기록 (마지막은 새 사용자 메시지)
+            system: 함께 전송할 시스템 프롬프트
+
+        Returns:
+            List[Dict]: 사용자 메시지로 시작하는 예산 내 메시지 목록
+        """
+        turn_starts = self._turn_starts(messages)
+        if not turn_starts:
+            return messages
+
+        # 기록이 줄어든 경우 (세션 초기화 등) 잘라내기 위치 재조정
+        if self._start_turn >= len(turn_starts):
+            self.reset()
+
+        budget = self.max_input_tokens - self.token_counter(system)
+        turn_count = len(turn_starts)
+        # 이미지 처리 대상: 최근 턴을 제외한 완료된 에포크에 속한 턴
+        old_turns = max(0, turn_count - self.recent_image_turns) // self.epoch_turns * self.epoch_turns
+        old_boundary = turn_starts[old_turns] if old_turns < turn_count else len(messages)
+        first_kept = turn_starts[self._start_turn]
+
+        for stage_index, stage in enumerate(self._image_stages()):
+            is_last_stage = stage_index == len(self._image_stages()) - 1
+            candidate = [
+                self._apply_image_stage(message, stage) if first_kept <= index < old_boundary else message
+                for index, message in enumerate(messages)
+            ]
+
+            # 뒤에서부터 누적한 토큰 수 (이미 잘라낸 앞부분은 계산하지 않음)
+            suffix = [0] * (len(candidate) + 1)
+            for index in range(len(candidate) - 1, first_kept - 1, -1):
+                suffix[index] = suffix[index + 1] + self.token_counter(candidate[index]['content'])
+
+            start_turn = self._start_turn
+            if suffix[turn_starts[start_turn]] > budget:
+                if not is_last_stage:
+                    continue
+                # 에포크 단위로 앞부분을 잘라냄 (마지막 턴은 항상 유지)
+                while start_turn + self.epoch_turns < turn_count and \
+                        suffix[turn_starts[start_turn]] > budget:
+                    start_turn += self.epoch_turns
+                if suffix[turn_starts[start_turn]] > budget:
+                    start_turn = turn_count - 1
+                    logger.warning("Latest turn alone exceeds the input token budget")
+                self._start_turn = start_turn - start_turn % self.epoch_turns
+
+            start_index = turn_starts[start_turn]
+            self.last_stats = {
+                'estimated_input_tokens': suffix[start_index] + self.max_input_tokens - budget,
+                'dropped_messages': start_index,
+                'image_stage': stage
+            }
+            if start_index:
+                logger.info(f"Context budget: dropped {start_index} old messages "
+                            f"(image stage: {stage})")
+            return candidate[start_index:]
+
+        return messages
@@ -1,6 +1,8 @@
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, AsyncIterator, Awaitable, Set
 from events import EventEmitter, Event, UIEventType, UIEventData
 from conversation_manager import ConversationManager
+from controllers.request_scheduler import RequestScheduler
+from retry_handler import CircuitOpenError
 import asyncio
 import logging
 from datetime import datetime
@@ -10,11 +12,17 @@ logger = logging.getLogger(__name__)
 class ChatController:
     """채팅 애플리케이션의 비즈니스 로직을 처리하는 컨트롤러"""
     
-    def __init__(self, event_emitter: EventEmitter, conversation_manager: ConversationManager):
+    def __init__(self, event_emitter: EventEmitter, conversation_manager: ConversationManager,
+                 scheduler: Optional[RequestScheduler] = None):
         self.event_emitter = event_emitter
         self.conversation_manager = conversation_manager
         self.current_session = None
-        self.is_processing = False
+        # 세션별 요청 큐 (같은 세션은 순서대로, 다른 세션은 동시에 처리)
+        self.scheduler = scheduler or RequestScheduler(event_emitter)
+        # 세션 ID -> 실행 중인 요청 태스크
+        self._running: Dict[str, asyncio.Task] = {}
+        # 사용자가 중지를 요청한 세션 ID
+        self._stopping: Set[str] = set()
         
         # 이벤트 핸들러 등록
         self._setup_event_handlers()
@@ -24,6 +32,7 @@ class ChatController:
         """이벤트 핸들러 설정"""
         # 메시지 관련 이벤트
         self.event_emitter.on(UIEventType.SEND_MESSAGE.value, self._handle_send_message)
+        self.event_emitter.on(UIEventType.STOP_GENERATION.value, self._handle_stop_generation)
         self.event_emitter.on(UIEventType.SESSION_SWITCH.value, self._handle_session_switch)
         
         # 파일 관련 이벤트
@@ -32,29 +41,148 @@ class ChatController:
         # 세션 관리 이벤트
         self.event_emitter.on(UIEventType.SESSION_CREATED.value, self._handle_session_created)
         self.event_emitter.on(UIEventType.SESSION_DELETED.value, self._handle_session_deleted)
+        self.event_emitter.on(UIEventType.SESSION_RENAMED.value, self._handle_session_renamed)
         
     async def _handle_send_message(self, data: Dict[str, Any]):
-        """메시지 전송 처리"""
-        if self.is_processing:
-            logger.warning("Message processing in progress, ignoring new message")
+        """메시지 전송 처리 (전송 시점의 세션 큐에 추가)"""
+        try:
+            # 현재 세션 가져오기
+            session = self.conversation_manager.get_current_session()
+            if not session:
+                raise ValueError("No active session")
+                
+            # 큐에서 기다리는 동안 세션이 메모리에서 내려가지 않도록 고정
+            with self.conversation_manager.pinned(session):
+                await self.scheduler.submit(
+                    session.name,
+                    lambda: self._run_tracked(session, self._process_message(session, data["content"]))
+                )
+            
+        except asyncio.CancelledError:
+            logger.info("Queued message was cancelled")
+            
+        except Exception as e:
+            logger.error(f"Error processing message: {str(e)}")
+            self._emit_error(e)
+            
+    def _emit_error(self, error: Exception) -> None:
+        """요청 실패를 ERROR_OCCURRED 이벤트로 알립니다."""
+        extra = {}
+        if isinstance(error, CircuitOpenError):
+            # API 장애로 요청을 보내지 않은 경우 언제 다시 시도할 수 있는지 함께 전달
+            extra["retry_in"] = error.retry_in
+        self.event_emitter.emit(Event(
+            UIEventType.ERROR_OCCURRED.value,
+            UIEventData.error(str(error), type(error).__name__, **extra)
+        ))
+            
+    async def _run_tracked(self, session, coroutine: Awaitable[Any]) -> None:
+        """
+        요청을 추적되는 태스크로 실행합니다. cancel_request()로 중지할 수 있습니다.
+        
+        Args:
+            session: 요청을 처리하는 세션
+            coroutine: 실행할 요청 코루틴
+        """
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._running[session.name] = task
+        listener = lambda attempt: self._emit_retry_status(session, attempt)
+        session.retry_handler.add_listener(listener)
+        try:
+            await task
+        except asyncio.CancelledError:
+            # 컨트롤러 종료 등 사용자 중지가 아닌 취소는 그대로 전파
+            if session.name not in self._stopping:
+                raise
+            self._emit_cancelled(session)
+        finally:
+            session.retry_handler.remove_listener(listener)
+            self._stopping.discard(session.name)
+            if self._running.get(session.name) is task:
+                del self._running[session.name]
+                
+    def _emit_retry_status(self, session, attempt) -> None:
+        """실패한 API 시도를 RETRY_STATUS 이벤트로 알립니다."""
+        if attempt.outcome == "success" and attempt.attempt == 1:
             return
+        data = attempt.to_dict()
+        self.event_emitter.emit(Event(
+            UIEventType.RETRY_STATUS.value,
+            UIEventData.retry_status(session.name, data.pop("attempt"), data.pop("outcome"), **data)
+        ))
+        
+    def _emit_cancelled(self, session):
+        """중지된 응답을 RECEIVE_MESSAGE 이벤트로 알립니다."""
+        last = session.messages[-1] if session.messages else None
+        truncated = last is not None and last.role == "assistant" and \
+            bool(last.metadata and last.metadata.get("truncated"))
+        self.event_emitter.emit(Event(
+            UIEventType.RECEIVE_MESSAGE.value,
+            {
+                "content": last.content if truncated else "",
+                "timestamp": datetime.now().isoformat(),
+                "session_id": session.name,
+                "streamed": True,
+                "cancelled": True,
+                "truncated": truncated
+            }
+        ))
+        logger.info(f"Generation stopped in session '{session.name}'")
+        
+    def cancel_request(self, session_id: Optional[str] = None, include_queued: bool = False) -> bool:
+        """
+        실행 중인 요청을 중지합니다. 응답 스트림은 즉시 닫힙니다.
+        
+        Args:
+            session_id: 대상 세션 (None이면 현재 세션)
+            include_queued: 대기 중인 요청도 함께 취소할지 여부
+            
+        Returns:
+            bool: 실행 중인 요청을 중지했으면 True
+        """
+        if session_id is None:
+            session = self.conversation_manager.get_current_session()
+            if not session:
+                return False
+            session_id = session.name
+            
+        if include_queued:
+            self.scheduler.cancel_session(session_id)
+            
+        task = self._running.get(session_id)
+        if task is None or task.done():
+            return False
             
-        self.is_processing = True
+        self._stopping.add(session_id)
+        task.cancel()
+        return True
         
+    def _handle_stop_generation(self, data: Optional[Dict[str, Any]]):
+        """응답 생성 중지 처리"""
+        data = data or {}
+        if not self.cancel_request(data.get("session_id"), data.get("include_queued", False)):
+            logger.debug("Stop requested but no generation is running")
+            
+    async def _process_message(self, session, content: str):
+        """
+        큐에서 꺼낸 메시지를 처리합니다.
+        
+        Args:
+            session: 메시지를 보낸 세션
+            content: 사용자 메시지
+        """
         try:
             # 상태 업데이트
             self.event_emitter.emit(Event(
                 UIEventType.MESSAGE_SENDING.value,
-                {"timestamp": datetime.now().isoformat()}
+                {"timestamp": datetime.now().isoformat(), "session_id": session.name}
             ))
             
-            # 현재 세션 가져오기
-            session = self.conversation_manager.get_current_session()
-            if not session:
-                raise ValueError("No active session")
-                
-            # 메시지 전송
-            response = await session.get_response(data["content"])
+            # 메시지 전송 (응답은 도착하는 대로 UI에 전달)
+            response = await self._stream_to_ui(
+                session,
+                session.stream_response(content)
+            )
             
             # 응답 처리
             self.event_emitter.emit(Event(
@@ -62,60 +190,92 @@ class ChatController:
                 {
                     "content": response,
                     "timestamp": datetime.now().isoformat(),
-                    "session_id": session.id
+                    "session_id": session.name,
+                    "streamed": True
                 }
             ))
             
-        except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
+        finally:
             self.event_emitter.emit(Event(
-                UIEventType.ERROR_OCCURRED.value,
-                UIEventData.error(str(e), type(e).__name__)
+                UIEventType.MESSAGE_SENT.value,
+                {"success": True, "session_id": session.name}
             ))
             
-        finally:
-            self.is_processing = False
+    async def _stream_to_ui(self, session, deltas: AsyncIterator[str]) -> str:
+        """
+        응답 델타를 STREAM_DELTA 이벤트로 전달하고 전체 응답을 반환합니다.
+        
+        Args:
+            session: 응답을 생성하는 세션
+            deltas: 세션이 반환하는 텍스트 델타 스트림
+            
+        Returns:
+            str: 조립된 전체 응답
+        """
+        chunks = []
+        async for delta in deltas:
+            chunks.append(delta)
             self.event_emitter.emit(Event(
-                UIEventType.MESSAGE_SENT.value,
-                {"success": True}
+                UIEventType.STREAM_DELTA.value,
+                UIEventData.stream_delta(delta, session.name)
             ))
+        return "".join(chunks)
             
     async def _handle_file_attach(self, data: Dict[str, Any]):
-        """파일 첨부 처리"""
+        """파일 첨부 처리 (전송 시점의 세션 큐에 추가)"""
         try:
             session = self.conversation_manager.get_current_session()
             if not session:
                 raise ValueError("No active session")
                 
-            # 파일 처리 상태 업데이트
-            self.event_emitter.emit(Event(
-                UIEventType.FILE_PROCESS.value,
-                {"status": "processing", "filename": data["filename"]}
-            ))
+            # 큐에서 기다리는 동안 세션이 메모리에서 내려가지 않도록 고정
+            with self.conversation_manager.pinned(session):
+                await self.scheduler.submit(
+                    session.name,
+                    lambda: self._run_tracked(session, self._process_file(session, data))
+                )
             
-            # 이미지 처리 및 응답 생성
-            response = await session.process_image_message(
-                data.get("message", ""),
-                data["file_path"]
-            )
-            
-            # 응답 전송
-            self.event_emitter.emit(Event(
-                UIEventType.RECEIVE_MESSAGE.value,
-                {
-                    "content": response,
-                    "timestamp": datetime.now().isoformat(),
-                    "session_id": session.id,
-                    "has_image": True
-                }
-            ))
+        except asyncio.CancelledError:
+            logger.info("Queued file message was cancelled")
             
         except Exception as e:
             logger.error(f"Error processing file: {str(e)}")
-            self.event_emitter.emit(Event(
-                UIEventType.ERROR_OCCURRED.value,
-                UIEventData.error(str(e), type(e).__name__)
-            ))
+            self._emit_error(e)
+            
+    async def _process_file(self, session, data: Dict[str, Any]):
+        """
+        큐에서 꺼낸 파일 첨부 메시지를 처리합니다.
+        
+        Args:
+            session: 메시지를 보낸 세션
+            data: FILE_ATTACH 이벤트 데이터
+        """
+        # 파일 처리 상태 업데이트
+        self.event_emitter.emit(Event(
+            UIEventType.FILE_PROCESS.value,
+            {"status": "processing", "filename": data["filename"], "session_id": session.name}
+        ))
+        
+        # 이미지 처리 및 응답 생성
+        response = await self._stream_to_ui(
+            session,
+            session.stream_image_message(
+                data.get("message", ""),
+                data["file_path"]
+            )
+        )
+        
+        # 응답 전송
+        self.event_emitter.emit(Event(
+            UIEventType.RECEIVE_MESSAGE.value,
+            {
+                "content": response,
+                "timestamp": datetime.now().isoformat(),
+                "session_id": session.name,
+                "has_image": True,
+                "streamed": True
+            }
+        ))
             
     def _handle_session_switch(self, data: Dict[str, Any]):
         """세션 전환 처리"""
@@ -127,7 +287,7 @@ class ChatController:
             self.event_emitter.emit(Event(
                 UIEventType.STATE_CHANGE.value,
                 UIEventData.state("session_changed", {
-                    "session_id": session.id,
+                    "session_id": session.name,
                     "message_count": len(session.messages)
                 })
             ))
@@ -162,6 +322,7 @@ class ChatController:
     def _handle_session_deleted(self, data: Dict[str, Any]):
         """세션 삭제 처리"""
         try:
+            self.cancel_request(data["session_id"], include_queued=True)
             self.conversation_manager.delete_session(data["session_id"])
             
             # 세션 목록 업데이트
@@ -179,6 +340,27 @@ class ChatController:
                 UIEventData.error(str(e), type(e).__name__)
             ))
             
+    def _handle_session_renamed(self, data: Dict[str, Any]):
+        """세션 이름 변경 처리"""
+        try:
+            self.conversation_manager.rename_session(data["session_id"], data["new_name"])
+            
+            # 세션 목록 업데이트
+            self.event_emitter.emit(Event(
+                UIEventType.STATE_CHANGE.value,
+                UIEventData.state("sessions_updated", {
+                    "sessions": self.conversation_manager.list_sessions(),
+                    "current_session": self.conversation_manager.current_session
+                })
+            ))
+            
+        except Exception as e:
+            logger.error(f"Error renaming session: {str(e)}")
+            self.event_emitter.emit(Event(
+                UIEventType.ERROR_OCCURRED.value,
+                UIEventData.error(str(e), type(e).__name__)
+            ))
+            
     def initialize(self):
         """컨트롤러 초기화"""
         try:
@@ -195,7 +377,7 @@ class ChatController:
                 UIEventType.STATE_CHANGE.value,
                 UIEventData.state("initialized", {
                     "sessions": self.conversation_manager.list_sessions(),
-                    "current_session": current_session.id if current_session else None
+                    "current_session": current_session.name if current_session else None
                 })
             ))
             
@@ -208,10 +390,13 @@ class ChatController:
                 UIEventData.error(str(e), type(e).__name__)
             ))
     
-    def cleanup(self):
+    async def cleanup(self):
         """컨트롤러 정리"""
         try:
-            # 모든 세션 저장
+            # 대기 중인 요청 취소
+            await self.scheduler.shutdown()
+            
+            # 바뀐 세션만 저장
             self.conversation_manager.save_all_sessions()
             logger.info("ChatController cleanup complete")
             
@@ -0,0 +1,167 @@
+from typing import Dict, Optional, Any, Callable, Awaitable, Deque, Tuple
+from collections import deque
+from events import EventEmitter, Event, UIEventType, UIEventData
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class RequestScheduler:
+    """세션별 요청 큐와 전역 동시 실행 제한을 관리하는 스케줄러
+
+    같은 세션의 요청은 도착 순서(FIFO)대로 하나씩 실행되어 대화 기록이 섞이지
+    않고, 서로 다른 세션의 요청은 max_concurrent 개까지 동시에 실행됩니다.
+    큐 길이와 대기 시간은 QUEUE_STATUS 이벤트로 전달됩니다.
+    """
+
+    def __init__(self, event_emitter: Optional[EventEmitter] = None, max_concurrent: int = 4):
+        """
+        RequestScheduler 인스턴스를 초기화합니다.
+
+        Args:
+            event_emitter: 큐 상태 이벤트를 발생시킬 이벤트 이미터
+            max_concurrent: 모든 세션을 합친 최대 동시 요청 수
+        """
+        self.event_emitter = event_emitter
+        self.max_concurrent = max(1, max_concurrent)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # 세션 ID -> 대기 중인 (작업, 결과 Future, 등록 시각)
+        self._queues: Dict[str, Deque[Tuple[Callable[[], Awaitable[Any]], asyncio.Future, float]]] = {}
+        # 세션 ID -> 큐를 처리하는 작업자 태스크
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._active = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """전역 동시 실행 제한 (실행 중인 이벤트 루프에서 처음 사용할 때 생성)"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    def queue_depth(self, session_id: str) -> int:
+        """세션에서 실행을 기다리는 요청 수"""
+        return len(self._queues.get(session_id, ()))
+
+    @property
+    def active_requests(self) -> int:
+        """현재 실행 중인 요청 수"""
+        return self._active
+
+    def _emit_status(self, session_id: str, status: str, **kwargs) -> None:
+        """큐 상태 이벤트 발생"""
+        if self.event_emitter is None:
+            return
+        self.event_emitter.emit(Event(
+            UIEventType.QUEUE_STATUS.value,
+            UIEventData.queue_status(
+                session_id,
+                self.queue_depth(session_id),
+                status=status,
+                active_requests=self._active,
+                **kwargs
+            )
+        ))
+
+    def submit(self, session_id: str, job: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """
+        세션 큐에 요청을 추가합니다.
+
+        Args:
+            session_id: 요청이 속한 세션
+            job: 실행할 코루틴을 반환하는 함수
+
+        Returns:
+            asyncio.Future: 작업의 결과 또는 예외가 설정되는 Future
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        queue = self._queues.setdefault(session_id, deque())
+        queue.append((job, future, time.monotonic()))
+        self._emit_status(session_id, "queued")
+        logger.debug(f"Queued request for session '{session_id}' (depth {len(queue)})")
+
+        worker = self._workers.get(session_id)
+        if worker is None or worker.done():
+            self._workers[session_id] = loop.create_task(self._run_session(session_id))
+        return future
+
+    async def _run_session(self, session_id: str) -> None:
+        """세션 큐가 빌 때까지 요청을 순서대로 실행합니다."""
+        queue = self._queues[session_id]
+        try:
+            while queue:
+                if queue[0][1].cancelled():
+                    queue.popleft()
+                    continue
+
+                async with self.semaphore:
+                    # 기다리는 동안 큐가 취소로 비워지거나 새 요청으로 바뀌었을 수 있으므로
+                    # 자리를 얻은 뒤에 요청을 꺼냄
+                    if not queue:
+                        break
+                    job, future, queued_at = queue.popleft()
+                    if future.cancelled():
+                        continue
+                    wait_time = time.monotonic() - queued_at
+                    self._active += 1
+                    self._emit_status(session_id, "started", wait_time=wait_time)
+                    started_at = time.monotonic()
+                    try:
+                        result = await job()
+                    except asyncio.CancelledError:
+                        future.cancel()
+                        raise
+                    except Exception as e:
+                        if not future.cancelled():
+                            future.set_exception(e)
+                    else:
+                        if not future.cancelled():
+                            future.set_result(result)
+                    finally:
+                        self._active -= 1
+                        self._emit_status(
+                            session_id, "finished",
+                            wait_time=wait_time,
+                            run_time=time.monotonic() - started_at
+                        )
+        finally:
+            if not queue:
+                self._queues.pop(session_id, None)
+            if self._workers.get(session_id) is asyncio.current_task():
+                del self._workers[session_id]
+
+    def cancel_session(self, session_id: str) -> int:
+        """
+        세션에서 대기 중인 요청을 모두 취소합니다. 실행 중인 요청은 유지됩니다.
+
+        Args:
+            session_id: 대상 세션
+
+        Returns:
+            int: 취소된 요청 수
+        """
+        queue = self._queues.get(session_id)
+        if not queue:
+            return 0
+
+        cancelled = 0
+        for _, future, _ in queue:
+            if future.cancel():
+                cancelled += 1
+        queue.clear()
+        self._emit_status(session_id, "cancelled", cancelled=cancelled)
+        return cancelled
+
+    async def shutdown(self) -> None:
+        """대기 중인 요청을 취소하고 작업자 태스크를 종료합니다."""
+        for session_id in list(self._queues):
+            self.cancel_session(session_id)
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        logger.info("RequestScheduler shut down")
@@ -0,0 +1,132 @@
+from typing import List, Dict, Optional, Any, Union
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class ConversationCompactor:
+    """오래된 대화 턴을 요약 메시지로 대체(압축)하는 클래스
+
+    요약은 더 저렴하고 빠른 모델로 생성하며, 이전 요약이 있으면 새로 압축할
+    구간과 합쳐 누적 요약을 만듭니다. 요약 결과와 요약이 대신하는 메시지 범위는
+    세션과 함께 저장되므로 재시작 후에도 다시 요약하지 않습니다.
+    """
+
+    SUMMARY_PROMPT = """You maintain a running summary of a long conversation between a user and an AI assistant.
+Merge the previous summary (if any) with the new conversation excerpt into one updated summary.
+Preserve facts, decisions, user preferences, code snippets and file names that later turns may rely on,
+and any open questions or unfinished tasks. Omit pleasantries. Write in the conversation's language."""
+
+    def __init__(self,
+                 model: str = "claude-3-5-haiku-20241022",
+                 threshold_messages: int = 60,
+                 keep_recent_messages: int = 20,
+                 idle_delay: float = 20.0,
+                 max_summary_tokens: int = 2048):
+        """
+        ConversationCompactor 인스턴스를 초기화합니다.
+
+        Args:
+            model: 요약에 사용할 모델
+            threshold_messages: 요약되지 않은 메시지가 이 수를 넘으면 압축
+            keep_recent_messages: 압축하지 않고 원본으로 유지할 최근 메시지 수
+            idle_delay: 세션이 이 시간(초) 동안 유휴 상태일 때 압축 실행
+            max_summary_tokens: 요약 응답의 최대 토큰 수
+        """
+        self.model = model
+        self.threshold_messages = threshold_messages
+        self.keep_recent_messages = keep_recent_messages
+        self.idle_delay = idle_delay
+        self.max_summary_tokens = max_summary_tokens
+
+    def needs_compaction(self, message_count: int, summary: Optional[Dict]) -> bool:
+        """
+        압축이 필요한지 확인합니다.
+
+        Args:
+            message_count: 세션의 전체 메시지 수
+            summary: 현재 요약 정보 (없으면 None)
+
+        Returns:
+            bool: 요약되지 않은 메시지가 임계값을 넘으면 True
+        """
+        covered_end = summary["covers"][1] if summary else 0
+        return message_count - covered_end > self.threshold_messages
+
+    def find_compaction_end(self, messages: List[Any], start: int) -> Optional[int]:
+        """
+        압축 구간의 끝 인덱스를 고릅니다. 남은 기록이 사용자 메시지로 시작하도록
+        턴 경계에서만 자릅니다.
+
+        Args:
+            messages: 세션의 전체 메시지 (role 속성을 가진 객체)
+            start: 이미 요약된 구간의 끝
+
+        Returns:
+            Optional[int]: 압축 구간의 끝 (해당 인덱스는 포함하지 않음). 자를 곳이 없으면 None
+        """
+        # 남길 메시지가 0개로 설정되어도 마지막 메시지 뒤에서는 자를 수 없음
+        limit = min(len(messages) - 1, len(messages) - self.keep_recent_messages)
+        for index in range(limit, start, -1):
+            if messages[index].role == "user" and messages[index - 1].role == "assistant":
+                return index
+        return None
+
+    @staticmethod
+    def _render_content(content: Union[str, List[Dict]]) -> str:
+        """메시지 내용을 요약용 텍스트로 변환합니다."""
+        if isinstance(content, str):
+            return content
+        parts = []
+        for block in content:
+            if block.get("type") == "text":
+                parts.append(block.get("text", ""))
+            elif block.get("type") == "image":
+                parts.append("[image]")
+        return "\n".join(parts)
+
+    def build_request(self, previous_summary: Optional[str], messages: List[Any]) -> Dict[str, Any]:
+        """
+        요약 요청 인자를 구성합니다.
+
+        Args:
+            previous_summary: 이전 요약 텍스트
+            messages: 새로 요약할 메시지들
+
+        Returns:
+            Dict[str, Any]: messages API에 전달할 키워드 인자
+        """
+        transcript = "\n\n".join(
+            f"{message.role.upper()}: {self._render_content(message.content)}"
+            for message in messages
+        )
+        prompt = (
+            f"<previous_summary>\n{previous_summary or '(none)'}\n</previous_summary>\n\n"
+            f"<conversation_excerpt>\n{transcript}\n</conversation_excerpt>\n\n"
+            "Write the updated summary."
+        )
+        return {
+            "model": self.model,
+            "max_tokens": self.max_summary_tokens,
+            "temperature": 0.0,
+            "system": self.SUMMARY_PROMPT,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+
+    def make_summary(self, text: str, end: int) -> Dict[str, Any]:
+        """
+        저장할 요약 정보를 만듭니다.
+
+        Args:
+            text: 요약 텍스트
+            end: 요약이 대신하는 메시지 범위의 끝
+
+        Returns:
+            Dict[str, Any]: 요약 텍스트, 범위 [0, end), 모델, 생성 시각
+        """
+        return {
+            "text": text,
+            "covers": [0, end],
+            "model": self.model,
+            "created_at": datetime.now().isoformat()
+        }
@@ -1,27 +1,89 @@
 import os
-import json
-from typing import Dict, Optional, List
+import threading
+import time
+from typing import Dict, Optional, List, Any, Callable, Iterator
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from anthropic import AsyncAnthropic
 from chat_session import ChatSession
-from encryption import encrypt_data, decrypt_data
+from usage_ledger import UsageLedger, merge_usage_totals
+from session_manifest import ManifestEntry
+from storage import SessionStore, FileSessionStore
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 class ConversationManager:
-    """대화 세션들을 관리하는 클래스"""
+    """대화 세션들을 관리하는 클래스
+
+    세션은 SessionStore 구현에 저장됩니다. 기본 저장소(FileSessionStore)는 세션마다
+    스냅샷(<이름>.enc)과 추가 전용 저널(<이름>.journal)을 두고, SQLiteSessionStore는
+    세션과 메시지를 행으로 저장합니다. save_session은 바뀐 부분만 씁니다.
+
+    시작할 때는 저장소의 세션 요약만 읽으며, 세션은 get_session 등으로 처음
+    접근할 때 불러옵니다. sessions에는 메모리에 올라온 세션만 최근 사용 순서로
+    들어 있고, max_resident개를 넘으면 가장 오래 사용하지 않은 세션부터 메모리에서
+    내립니다 (현재 세션, 응답 생성 중인 세션, pinned로 고정한 세션은 제외). 저장된
+    세션은 바로 내리고, dirty 세션은 자동 저장 스레드가 commit한 뒤에 내립니다.
+
+    세션 내용이 바뀌면 dirty로 표시되고, 마지막 변경 후 autosave_delay초가 지나면
+    자동 저장 스레드가 dirty 세션만 저장하므로 UI 스레드는 암호화나 디스크 쓰기를
+    기다리지 않습니다. 종료할 때(close)는 dirty 세션만 스레드 풀에서 병렬로 저장합니다.
+    """
+
+    # 변경이 계속되어도 처음 변경 후 autosave_delay * 이 값이 지나면 저장
+    AUTOSAVE_MAX_DELAY_FACTOR = 5
     
-    def __init__(self, storage_dir: str = "conversations"):
+    def __init__(self, 
+                 storage_dir: str = "conversations", 
+                 client: Optional[AsyncAnthropic] = None,
+                 session_options: Optional[Dict[str, Any]] = None,
+                 max_resident: int = 32,
+                 autosave_delay: Optional[float] = 2.0,
+                 flush_workers: int = 4,
+                 store: Optional[SessionStore] = None):
         """
         대화 관리자를 초기화합니다.
         
         Args:
             storage_dir: 대화 저장 디렉토리 경로
+            client: 모든 세션에 주입할 API 클라이언트. None이면 공유 클라이언트 풀 사용
+            session_options: 새로 만들거나 로드하는 세션에 전달할 ChatSession 인자
+                (예: {"prompt_caching": True})
+            max_resident: 메모리에 유지할 최대 세션 수
+            autosave_delay: 마지막 변경 후 자동 저장까지 기다릴 시간(초).
+                None이면 자동 저장하지 않음 (save_session이나 close로만 저장하며,
+                max_resident를 넘은 dirty 세션은 flush_dirty_sessions까지 메모리에 남음)
+            flush_workers: 종료할 때 dirty 세션을 병렬로 저장할 스레드 수
+            store: 세션 저장소. None이면 storage_dir의 FileSessionStore
         """
         self.storage_dir = storage_dir
-        self.sessions: Dict[str, ChatSession] = {}
+        self.client = client
+        self.session_options: Dict[str, Any] = session_options or {}
+        self.max_resident = max_resident
+        # 메모리에 올라온 세션 (가장 오래 사용하지 않은 세션이 앞)
+        self.sessions: 'OrderedDict[str, ChatSession]' = OrderedDict()
         self.current_session: Optional[str] = None
         self.last_active: Dict[str, datetime] = {}
+        self.store = store or FileSessionStore(storage_dir)
+        self.autosave_delay = autosave_delay
+        self.flush_workers = flush_workers
+        # sessions 변경과 저장 스레드의 조회를 보호
+        self._lock = threading.RLock()
+        # 같은 세션의 저장/이름 변경/삭제를 직렬화 (항상 _lock 다음에 잡음)
+        self._session_locks: Dict[str, threading.Lock] = {}
+        # 마지막 저장 이후 바뀐 세션 -> 마지막 변경 번호 (_autosave_cond로 보호).
+        # 저장을 시작할 때의 번호가 commit 후에도 그대로일 때만 지워서, 저장 중에
+        # 바뀐 세션은 dirty로 남음
+        self._dirty: Dict[str, int] = {}
+        self._change_count = 0
+        self._dirty_since = 0.0
+        self._last_change = 0.0
+        self._autosave_cond = threading.Condition()
+        self._autosave_thread: Optional[threading.Thread] = None
+        self._closed = False
 
         # 스토리지 디렉토리 생성
         if not os.path.exists(storage_dir):
@@ -32,10 +94,158 @@ class ConversationManager:
         self.load_all_sessions()
         
         # 기본 세션이 없으면 생성
-        if not self.sessions:
+        if not self.list_sessions():
             self.create_new_session("Default Session")
             logger.info("Created default session")
 
+    def _create_session(self, session_name: str) -> ChatSession:
+        """공통 세션 옵션을 적용하여 ChatSession 객체를 만듭니다."""
+        return ChatSession(name=session_name, client=self.client, **self.session_options)
+
+    def _track_changes(self, session_name: str, session: ChatSession) -> None:
+        """세션 내용이 바뀌면 dirty로 표시되도록 연결합니다."""
+        session.on_change = lambda: self.mark_dirty(session_name)
+
+    def mark_dirty(self, session_name: str) -> None:
+        """
+        세션을 저장이 필요한 상태로 표시하고 자동 저장을 예약합니다.
+
+        Args:
+            session_name: 바뀐 세션 이름
+        """
+        with self._autosave_cond:
+            now = time.monotonic()
+            if not self._dirty:
+                self._dirty_since = now
+            self._change_count += 1
+            self._dirty[session_name] = self._change_count
+            self._last_change = now
+            if self.autosave_delay is None or self._closed:
+                return
+            if self._autosave_thread is None:
+                self._autosave_thread = threading.Thread(
+                    target=self._autosave_loop, name="session-autosave", daemon=True
+                )
+                self._autosave_thread.start()
+            self._autosave_cond.notify()
+
+    def is_dirty(self, session_name: str) -> bool:
+        """마지막 저장 이후 바뀐 세션인지 여부 (False이면 바뀐 내용이 저장소에 commit됨)"""
+        with self._autosave_cond:
+            return session_name in self._dirty
+
+    def _mark_clean(self, saved: Dict[str, int]) -> None:
+        """
+        commit이 끝난 세션의 dirty 표시를 지웁니다. 저장을 시작한 뒤 다시 바뀐 세션은 남깁니다.
+
+        Args:
+            saved: 세션 이름 -> _save가 반환한 변경 번호
+        """
+        with self._autosave_cond:
+            for session_name, change in saved.items():
+                if self._dirty.get(session_name) == change:
+                    del self._dirty[session_name]
+
+    def _autosave_loop(self) -> None:
+        """변경이 멈추면 dirty 세션을 저장하는 자동 저장 스레드"""
+        while True:
+            with self._autosave_cond:
+                while not self._dirty and not self._closed:
+                    self._autosave_cond.wait()
+                while not self._closed:
+                    now = time.monotonic()
+                    remaining = min(
+                        self._last_change + self.autosave_delay,
+                        self._dirty_since + self.autosave_delay * self.AUTOSAVE_MAX_DELAY_FACTOR
+                    ) - now
+                    if remaining <= 0:
+                        break
+                    self._autosave_cond.wait(remaining)
+                if self._closed:
+                    return
+            try:
+                self.flush_dirty_sessions(max_workers=1)
+            except Exception as e:
+                logger.error(f"Autosave failed: {str(e)}")
+
+    def has_session(self, session_name: str) -> bool:
+        """세션이 있는지 확인합니다 (메모리에 올라오지 않은 세션 포함)."""
+        return session_name in self.sessions or session_name in self.store.entries
+
+    def _session_lock(self, session_name: str) -> threading.Lock:
+        """세션 이름별 저장 잠금"""
+        with self._lock:
+            return self._session_locks.setdefault(session_name, threading.Lock())
+
+    def get_session(self, session_name: str) -> ChatSession:
+        """
+        세션을 반환합니다. 메모리에 없으면 불러오고, 최근 사용한 세션으로 표시합니다.
+
+        Args:
+            session_name: 세션 이름
+
+        Returns:
+            ChatSession: 세션 객체
+
+        Raises:
+            ValueError: 존재하지 않는 세션인 경우
+        """
+        with self._lock:
+            session = self.sessions.get(session_name)
+            if session is not None:
+                self.sessions.move_to_end(session_name)
+                return session
+        if session_name not in self.store.entries:
+            raise ValueError(f"Session '{session_name}' not found")
+        session = self.load_session(session_name)
+        self._evict_idle_sessions(keep=session_name)
+        return session
+
+    def _evict_idle_sessions(self, keep: Optional[str] = None) -> None:
+        """
+        메모리의 세션이 max_resident개를 넘으면 오래 사용하지 않은 세션부터 내립니다.
+        여기서는 저장하지 않으므로 바뀐 내용이 commit된 세션만 내리고, dirty 세션은
+        flush_dirty_sessions(자동 저장 스레드)가 commit한 뒤 다시 호출하여 내립니다.
+
+        Args:
+            keep: 방금 사용하여 내리지 않을 세션 이름
+        """
+        with self._lock:
+            for session_name in list(self.sessions):
+                if len(self.sessions) <= self.max_resident:
+                    break
+                session = self.sessions[session_name]
+                if session_name in (keep, self.current_session) or session._active_requests or session._pins:
+                    continue
+                if self.is_dirty(session_name):
+                    continue
+                session.cancel_compaction()
+                session.on_change = None
+                del self.sessions[session_name]
+                self.store.release(session_name)
+                logger.debug(f"Evicted idle session from memory: {session_name}")
+
+    @contextmanager
+    def pinned(self, session: ChatSession) -> Iterator[ChatSession]:
+        """
+        블록이 끝날 때까지 세션을 메모리에서 내리지 않습니다. 요청 큐에 넣은 작업은
+        세션 객체를 이미 잡고 있으므로, 기다리는 동안 세션이 내려가면 응답이
+        저장되지 않는 분리된 객체에 기록됩니다.
+
+        Args:
+            session: 고정할 세션
+
+        Yields:
+            ChatSession: 고정된 세션
+        """
+        with self._lock:
+            session._pins += 1
+        try:
+            yield session
+        finally:
+            with self._lock:
+                session._pins -= 1
+
     def create_new_session(self, session_name: str) -> ChatSession:
         """
         새로운 세션을 생성합니다.
@@ -49,18 +259,22 @@ class ConversationManager:
         Raises:
             ValueError: 동일한 이름의 세션이 이미 존재할 경우
         """
-        if session_name in self.sessions:
+        if self.has_session(session_name):
             raise ValueError(f"Session '{session_name}' already exists")
         
-        new_session = ChatSession(name=session_name)
-        self.sessions[session_name] = new_session
-        self.last_active[session_name] = datetime.now()
+        new_session = self._create_session(session_name)
+        with self._lock:
+            self.sessions[session_name] = new_session
+            self.last_active[session_name] = datetime.now()
+        self._track_changes(session_name, new_session)
+        self.mark_dirty(session_name)
         
         # 첫 세션이거나 현재 세션이 없는 경우 현재 세션으로 설정
         if self.current_session is None:
             self.current_session = session_name
             
         logger.info(f"Created new session: {session_name}")
+        self._evict_idle_sessions(keep=session_name)
         return new_session
 
     def get_current_session(self) -> ChatSession:
@@ -71,11 +285,11 @@ class ConversationManager:
         Returns:
             ChatSession: 현재 활성화된 세션
         """
-        if self.current_session is None or self.current_session not in self.sessions:
+        if self.current_session is None or not self.has_session(self.current_session):
             self.create_new_session("Default Session")
             logger.info("Created new default session as current session was invalid")
             
-        session = self.sessions[self.current_session]
+        session = self.get_session(self.current_session)
         self.last_active[self.current_session] = datetime.now()
         return session
 
@@ -92,13 +306,12 @@ class ConversationManager:
         Raises:
             ValueError: 존재하지 않는 세션인 경우
         """
-        if session_name not in self.sessions:
-            raise ValueError(f"Session '{session_name}' not found")
-        
+        session = self.get_session(session_name)
         self.current_session = session_name
         self.last_active[session_name] = datetime.now()
+        self.mark_dirty(session_name)
         logger.info(f"Switched to session: {session_name}")
-        return self.sessions[session_name]
+        return session
 
     def list_sessions(self) -> List[str]:
         """
@@ -107,7 +320,7 @@ class ConversationManager:
         Returns:
             List[str]: 세션 이름 목록
         """
-        return sorted(self.sessions.keys())
+        return sorted(set(self.sessions) | set(self.store.entries))
 
     def get_session_info(self, session_name: str) -> dict:
         """
@@ -117,23 +330,55 @@ class ConversationManager:
             session_name: 정보를 조회할 세션 이름
             
         Returns:
-            dict: 세션 정보 (이름, 메시지 수, 마지막 활성 시간 등)
+            dict: 세션 정보 (이름, 메시지 수, 마지막 활성 시간, 토큰 사용량 등).
+                메모리에 없는 세션은 세션을 불러오지 않고 저장소의 요약에서 가져옵니다.
             
         Raises:
             ValueError: 존재하지 않는 세션인 경우
         """
-        if session_name not in self.sessions:
+        if not self.has_session(session_name):
             raise ValueError(f"Session '{session_name}' not found")
             
-        session = self.sessions[session_name]
+        session = self.sessions.get(session_name)
+        if session is None:
+            entry = self.store.entries[session_name]
+            ledger = self._ledger_of(entry)
+            return {
+                'name': session_name,
+                'message_count': entry.message_count,
+                'last_active': self.last_active[session_name],
+                'is_current': session_name == self.current_session,
+                'context': entry.context,
+                'usage': ledger.summary()
+            }
         return {
             'name': session_name,
             'message_count': len(session.messages),
             'last_active': self.last_active[session_name],
             'is_current': session_name == self.current_session,
-            'context': session.context_manager.active_context
+            'context': session.context_manager.active_context,
+            'usage': session.get_token_usage()
         }
 
+    def get_usage_totals(self) -> dict:
+        """
+        모든 세션의 API 토큰 사용량 합계를 반환합니다.
+        각 세션의 누적 합계만 더하므로 대화 기록을 다시 읽지 않으며, 메모리에 없는
+        세션은 저장소 요약의 합계를 사용합니다.
+        
+        Returns:
+            dict: 전체 합계('totals')와 모델별 합계('by_model')
+        """
+        ledgers = [session.usage_ledger for session in self.sessions.values()]
+        ledgers += [self._ledger_of(entry) for name, entry in list(self.store.entries.items())
+                    if name not in self.sessions]
+        return merge_usage_totals(ledgers)
+
+    @staticmethod
+    def _ledger_of(entry: ManifestEntry) -> UsageLedger:
+        """요약 항목의 사용량 합계로 만든 장부 (개별 기록 없음)"""
+        return UsageLedger.from_dict(entry.usage)
+
     def rename_session(self, old_name: str, new_name: str) -> None:
         """
         세션의 이름을 변경합니다.
@@ -145,22 +390,25 @@ class ConversationManager:
         Raises:
             ValueError: 원래 세션이 없거나 새 이름의 세션이 이미 존재하는 경우
         """
-        if old_name not in self.sessions:
+        if not self.has_session(old_name):
             raise ValueError(f"Session '{old_name}' not found")
-        if new_name in self.sessions:
+        if self.has_session(new_name):
             raise ValueError(f"Session '{new_name}' already exists")
             
-        self.sessions[new_name] = self.sessions.pop(old_name)
-        self.last_active[new_name] = self.last_active.pop(old_name)
-        
-        if self.current_session == old_name:
-            self.current_session = new_name
-            
-        # 파일 이름도 변경
-        old_path = os.path.join(self.storage_dir, f"{old_name}.enc")
-        new_path = os.path.join(self.storage_dir, f"{new_name}.enc")
-        if os.path.exists(old_path):
-            os.rename(old_path, new_path)
+        with self._lock, self._session_lock(old_name):
+            if old_name in self.sessions:
+                self.sessions[new_name] = self.sessions.pop(old_name)
+                self._track_changes(new_name, self.sessions[new_name])
+            self.last_active[new_name] = self.last_active.pop(old_name)
+
+            if self.current_session == old_name:
+                self.current_session = new_name
+
+            # 저장된 세션 이름도 변경
+            self.store.rename(old_name, new_name)
+        with self._autosave_cond:
+            if old_name in self._dirty:
+                self._dirty[new_name] = self._dirty.pop(old_name)
             
         logger.info(f"Renamed session from '{old_name}' to '{new_name}'")
 
@@ -177,31 +425,36 @@ class ConversationManager:
         if session_name is None:
             session_name = self.current_session
             
-        if session_name not in self.sessions:
+        if not self.has_session(session_name):
             raise ValueError(f"Session '{session_name}' not found")
             
         # 마지막 세션은 삭제할 수 없음
-        if len(self.sessions) == 1:
+        if len(self.list_sessions()) == 1:
             raise ValueError("Cannot delete the last session")
             
-        # 파일 삭제
-        file_path = os.path.join(self.storage_dir, f"{session_name}.enc")
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            
-        # 세션 객체 삭제
-        del self.sessions[session_name]
-        del self.last_active[session_name]
+        with self._lock, self._session_lock(session_name):
+            # 저장된 세션 삭제
+            self.store.delete(session_name)
+
+            # 세션 객체 삭제
+            session = self.sessions.pop(session_name, None)
+            if session is not None:
+                session.cancel_compaction()
+                session.on_change = None
+            del self.last_active[session_name]
+        with self._autosave_cond:
+            self._dirty.pop(session_name, None)
         
         # 현재 세션이 삭제된 경우 다른 세션으로 전환
         if self.current_session == session_name:
-            self.current_session = next(iter(self.sessions))
+            self.current_session = self.list_sessions()[0]
             
         logger.info(f"Deleted session: {session_name}")
 
     def save_session(self, session_name: str) -> None:
         """
-        세션을 파일에 저장합니다.
+        마지막 저장 이후 바뀐 부분을 저장소에 씁니다.
+        메모리에 없는 세션은 바뀐 것이 없으므로 아무것도 하지 않습니다.
         
         Args:
             session_name: 저장할 세션의 이름
@@ -209,31 +462,153 @@ class ConversationManager:
         Raises:
             ValueError: 존재하지 않는 세션인 경우
         """
-        if session_name not in self.sessions:
+        if not self.has_session(session_name):
             raise ValueError(f"Session '{session_name}' not found")
-            
-        session = self.sessions[session_name]
-        file_path = os.path.join(self.storage_dir, f"{session_name}.enc")
-        
+        change = self._save(session_name)
         try:
-            # 세션 데이터 준비
-            session_data = {
-                "name": session_name,
-                "messages": [msg.__dict__ for msg in session.messages],
-                "context": session.context_manager.active_context,
-                "last_active": self.last_active[session_name].isoformat()
-            }
-            
-            # 데이터 암호화 및 저장
-            encrypted_data = encrypt_data(json.dumps(session_data))
-            with open(file_path, 'wb') as f:
-                f.write(encrypted_data)
-                
-            logger.info(f"Saved session: {session_name}")
-                
+            self.store.commit()
+        except Exception as e:
+            # 다시 저장하도록 자동 저장을 예약
+            self.mark_dirty(session_name)
+            logger.error(f"Failed to commit session '{session_name}': {str(e)}")
+            raise
+        self._mark_clean({session_name: change})
+
+    def _save(self, session_name: str) -> int:
+        """
+        세션 하나를 저장소에 쓰고 요약 항목을 갱신합니다. commit과 dirty 표시 해제는
+        호출자가 합니다 (commit 후 반환값을 _mark_clean에 전달).
+
+        Returns:
+            int: 저장을 시작할 때의 변경 번호 (dirty가 아니었으면 0)
+        """
+        with self._autosave_cond:
+            # 이 번호 이후의 변경은 이번 저장에 포함되지 않았을 수 있음
+            change = self._dirty.get(session_name, 0)
+        with self._lock:
+            session = self.sessions.get(session_name)
+            if session is None:
+                return change
+            last_active = self.last_active[session_name].isoformat()
+            lock = self._session_lock(session_name)
+
+        with lock:
+            # 잠금을 기다리는 동안 이름이 바뀌거나 삭제된 세션은 저장하지 않음
+            if self.sessions.get(session_name) is not session:
+                return change
+            try:
+                records = self.store.save(session_name, session, last_active)
+                if records:
+                    logger.info(f"Saved session: {session_name} ({records} record(s))")
+                self.store.update_entry(session_name, session, last_active)
+            except Exception as e:
+                # 다시 저장하도록 자동 저장을 예약
+                self.mark_dirty(session_name)
+                logger.error(f"Failed to save session '{session_name}': {str(e)}")
+                raise
+        return change
+
+    def flush_dirty_sessions(self,
+                             max_workers: Optional[int] = None,
+                             progress: Optional[Callable[[int, int, str], None]] = None) -> int:
+        """
+        dirty 세션만 저장합니다. 여러 세션은 스레드 풀에서 병렬로 저장합니다.
+
+        Args:
+            max_workers: 동시에 저장할 스레드 수 (None이면 flush_workers)
+            progress: 세션 하나를 저장할 때마다 (완료 수, 전체 수, 세션 이름)으로 호출
+
+        Returns:
+            int: 저장에 성공한 세션 수
+        """
+        with self._autosave_cond:
+            names = sorted(self._dirty)
+        if not names:
+            return 0
+
+        started = time.monotonic()
+        workers = min(max_workers or self.flush_workers, len(names))
+        # 저장에 성공한 세션 -> 저장을 시작할 때의 변경 번호
+        changes: Dict[str, int] = {}
+
+        def finished(session_name: str, change: Optional[int]) -> None:
+            if change is not None:
+                changes[session_name] = change
+            if progress is not None:
+                progress(len(changes), len(names), session_name)
+
+        if workers <= 1:
+            for session_name in names:
+                try:
+                    change = self._save(session_name)
+                except Exception:
+                    change = None
+                finished(session_name, change)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="session-flush") as pool:
+                futures = {pool.submit(self._save, session_name): session_name for session_name in names}
+                for future in as_completed(futures):
+                    finished(futures[future], future.result() if future.exception() is None else None)
+
+        # 저장한 세션을 한 번에 반영한 뒤에야 dirty 표시를 지움
+        try:
+            self.store.commit()
         except Exception as e:
-            logger.error(f"Failed to save session '{session_name}': {str(e)}")
+            # 다시 저장하도록 자동 저장을 예약
+            for session_name in names:
+                self.mark_dirty(session_name)
+            logger.error(f"Failed to commit saved sessions: {str(e)}")
             raise
+        self._mark_clean(changes)
+        with self._autosave_cond:
+            # 남은 세션은 이번 저장을 시작한 뒤에 바뀌었거나 저장에 실패한 세션
+            if self._dirty:
+                self._dirty_since = max(self._dirty_since, started)
+        logger.info(f"Saved {len(changes)}/{len(names)} changed session(s)")
+        # dirty여서 내리지 못했던 세션을 이제 내림
+        self._evict_idle_sessions()
+        return len(changes)
+
+    def close(self, progress: Optional[Callable[[int, int, str], None]] = None) -> int:
+        """
+        자동 저장을 멈추고 dirty 세션을 병렬로 저장한 뒤 저장소를 닫습니다.
+
+        Args:
+            progress: flush_dirty_sessions의 진행 상황 콜백
+
+        Returns:
+            int: 저장한 세션 수
+        """
+        with self._autosave_cond:
+            self._closed = True
+            self._autosave_cond.notify_all()
+        if self._autosave_thread is not None:
+            self._autosave_thread.join()
+            self._autosave_thread = None
+
+        try:
+            return self.flush_dirty_sessions(progress=progress)
+        finally:
+            self.store.close()
+
+    def compact_session(self, session_name: str) -> None:
+        """
+        세션 저장 공간을 즉시 정리합니다 (파일 저장소는 저널을 스냅샷으로 합침).
+
+        Args:
+            session_name: 압축할 세션의 이름
+
+        Raises:
+            ValueError: 존재하지 않는 세션인 경우
+        """
+        self.save_session(session_name)
+        with self._lock:
+            session = self.sessions.get(session_name)
+            if session is None:
+                return
+            last_active = self.last_active[session_name].isoformat()
+        with self._session_lock(session_name):
+            self.store.compact(session_name, session, last_active)
 
     def load_session(self, session_name: str) -> ChatSession:
         """
@@ -246,39 +621,38 @@ class ConversationManager:
             ChatSession: 로드된 세션 객체
             
         Raises:
-            FileNotFoundError: 세션 파일이 없는 경우
+            FileNotFoundError: 저장된 세션이 없는 경우
         """
-        file_path = os.path.join(self.storage_dir, f"{session_name}.enc")
-        
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Session file for '{session_name}' not found")
-        
         try:
-            with open(file_path, 'rb') as f:
-                encrypted_data = f.read()
-                
-            decrypted_data = decrypt_data(encrypted_data)
-            session_data = json.loads(decrypted_data)
+            session_data = self.store.load(session_name)
+            if session_data is None:
+                raise FileNotFoundError(f"Session file for '{session_name}' not found")
             
-            new_session = ChatSession(name=session_name)
+            new_session = self._create_session(session_name)
             
             # 메시지 복원
-            for message_data in session_data['messages']:
-                new_session.add_message(
-                    role=message_data['role'],
-                    content=message_data['content']
-                )
+            new_session.restore_messages(session_data['messages'])
                     
             # 컨텍스트 복원
-            if 'context' in session_data:
+            if session_data.get('context'):
                 new_session.context_manager.set_context(session_data['context'])
                 
+            # 압축 요약 복원 (재시작 후 다시 요약하지 않음)
+            new_session.summary = session_data.get('summary')
+            
+            # 토큰 사용량 장부 복원
+            new_session.usage_ledger = UsageLedger.from_dict(session_data.get('usage'))
+                
             # 마지막 활성 시간 복원
             self.last_active[session_name] = datetime.fromisoformat(
-                session_data.get('last_active', datetime.now().isoformat())
+                session_data.get('last_active') or datetime.now().isoformat()
             )
                 
-            self.sessions[session_name] = new_session
+            self.store.attach(session_name, new_session, session_data.get('last_active'))
+            with self._lock:
+                self.sessions[session_name] = new_session
+            self._track_changes(session_name, new_session)
+            self.store.update_entry(session_name, new_session, self.last_active[session_name].isoformat())
             logger.info(f"Loaded session: {session_name}")
             return new_session
             
@@ -287,23 +661,43 @@ class ConversationManager:
             raise
 
     def save_all_sessions(self) -> None:
-        """모든 세션을 저장합니다."""
-        for session_name in self.sessions:
-            try:
-                self.save_session(session_name)
-            except Exception as e:
-                logger.error(f"Failed to save session '{session_name}': {str(e)}")
+        """마지막 저장 이후 바뀐 세션을 모두 저장합니다."""
+        self.flush_dirty_sessions()
 
     def load_all_sessions(self) -> None:
-        """저장된 모든 세션을 로드합니다."""
-        if os.path.exists(self.storage_dir):
-            for filename in os.listdir(self.storage_dir):
-                if filename.endswith('.enc'):
-                    session_name = filename[:-4]  # .enc 제거
-                    try:
-                        self.load_session(session_name)
-                    except Exception as e:
-                        logger.error(f"Failed to load session '{session_name}': {str(e)}")
+        """
+        저장소에서 세션 목록과 요약을 읽습니다. 세션 내용은 처음 접근할 때 불러옵니다.
+        """
+        self.store.open()
+        for session_name, entry in list(self.store.entries.items()):
+            if session_name not in self.sessions:
+                self.last_active[session_name] = (
+                    datetime.fromisoformat(entry.last_active) if entry.last_active else datetime.now()
+                )
+        logger.info(f"Indexed {len(self.store.entries)} stored session(s); "
+                    f"{len(self.sessions)} in memory")
+
+    def get_messages(self, session_name: str, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        세션의 메시지 일부를 반환합니다. 메모리에 없는 세션은 불러오지 않고 저장소에서 읽습니다.
+
+        Args:
+            session_name: 세션 이름
+            start: 첫 메시지 위치
+            stop: 마지막 메시지 다음 위치 (None이면 끝까지)
+
+        Returns:
+            List[Dict[str, Any]]: {"role", "content", "metadata"} 목록
+
+        Raises:
+            ValueError: 존재하지 않는 세션인 경우
+        """
+        if not self.has_session(session_name):
+            raise ValueError(f"Session '{session_name}' not found")
+        session = self.sessions.get(session_name)
+        if session is not None:
+            return [dict(msg.__dict__) for msg in session.messages[start:stop]]
+        return self.store.get_messages(session_name, start, stop)
 
     def cleanup_old_sessions(self, days: int = 30) -> None:
         """
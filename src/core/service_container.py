@@ -2,8 +2,17 @@ from typing import Optional, Dict, Any
 from events import EventEmitter
 from ui.chat_ui import ChatUI
 from controllers.chat_controller import ChatController
+from controllers.request_scheduler import RequestScheduler
 from conversation_manager import ConversationManager
+from storage import create_store
+from encryption import set_compression_level
 from config_manager import ConfigManager
+from api_client import APIClientPool
+from rate_limiter import RateLimiter
+from concurrency_controller import ConcurrencyController
+from request_hedger import RequestHedger
+from response_cache import ResponseCache
+from retry_handler import CircuitBreaker
 import logging
 import asyncio
 from pathlib import Path
@@ -31,22 +40,24 @@ class ServiceContainer:
             raise RuntimeError("ServiceContainer is a singleton. Use get_instance() instead.")
             
         self._services: Dict[str, Any] = {}
+        self._config: Dict[str, Any] = {}
         self._initialized = False
         
         # 기본 이벤트 이미터 생성
         self._event_emitter = EventEmitter()
         logger.info("ServiceContainer created")
         
-    async def initialize(self, config_path: str = "config/config.json"):
+    async def initialize(self):
         """서비스 컨테이너 초기화"""
         if self._initialized:
             logger.warning("ServiceContainer already initialized")
             return
             
         try:
-            # 설정 관리자 초기화
-            self._services['config_manager'] = ConfigManager(config_path)
-            config = self._services['config_manager'].load_config()
+            # 설정 관리자 초기화 (ConfigManager는 chat_config.json을 읽고 쓰는 클래스 메서드만 제공)
+            self._services['config_manager'] = ConfigManager
+            config = ConfigManager.load_config()
+            self._config = config
             
             # 기본 디렉토리 생성
             self._create_directories(config)
@@ -76,17 +87,69 @@ class ServiceContainer:
     async def _initialize_components(self, config: Dict[str, Any]):
         """각 컴포넌트 초기화"""
         try:
+            # 공유 API 클라이언트 설정 및 연결 예열
+            client_pool = APIClientPool.get_instance()
+            client_pool.configure(**config.get('api_client', {}))
+            self._services['api_client_pool'] = client_pool
+            
+            # 모든 세션이 공유하는 속도 제한 설정 (지정하지 않으면 응답 헤더로 학습)
+            rate_limiter = RateLimiter.get_instance()
+            rate_limiter.configure(**config.get('rate_limits', {}))
+            self._services['rate_limiter'] = rate_limiter
+
+            # 과부하 신호에 따라 조절되는 동시 요청 한도
+            concurrency_controller = ConcurrencyController.get_instance()
+            concurrency_controller.configure(**config.get('concurrency', {}))
+            self._services['concurrency_controller'] = concurrency_controller
+
+            # 대화형 세션의 예비 요청 (session.hedge가 켜진 세션에만 적용)
+            hedger = RequestHedger.get_instance()
+            hedger.configure(**config.get('hedging', {}))
+            self._services['request_hedger'] = hedger
+
+            # API 장애 시 요청을 바로 실패시키고 상태 변경을 UI에 알리는 회로 차단기
+            circuit_breaker = CircuitBreaker.get_instance()
+            circuit_breaker.configure(**config.get('circuit_breaker', {}))
+            circuit_breaker.event_emitter = self._event_emitter
+            self._services['circuit_breaker'] = circuit_breaker
+
+            # 같은 요청의 응답을 재생하는 로컬 캐시 (session.response_cache가 켜진 세션에만 적용)
+            response_cache = ResponseCache.get_instance()
+            response_cache.configure(**config.get('response_cache', {}))
+            self._services['response_cache'] = response_cache
+            prewarm_connections = config.get('prewarm_connections', 2)
+            if prewarm_connections:
+                try:
+                    await client_pool.prewarm(prewarm_connections)
+                except Exception as e:
+                    logger.warning(f"API connection prewarm skipped: {str(e)}")
+            
+            # 세션 데이터는 암호화 전에 zlib으로 압축 (0이면 압축하지 않음)
+            if 'compression_level' in config:
+                set_compression_level(config['compression_level'])
+
+            storage_dir = config.get('storage_dir', 'storage')
+
             # ConversationManager 초기화
+            # 바뀐 세션은 autosave_delay초 뒤 작업 스레드에서 저장 (UI 스레드는 기다리지 않음)
+            # 세션 저장소: 'file' (세션별 스냅샷과 저널) 또는 'sqlite' (세션과 메시지를 행으로 저장)
             self._services['conversation_manager'] = ConversationManager(
-                storage_dir=config.get('storage_dir', 'storage')
+                storage_dir=storage_dir,
+                session_options=config.get('session', {}),
+                autosave_delay=config.get('autosave_delay', 2.0),
+                flush_workers=config.get('flush_workers', 4),
+                store=create_store(config.get('storage_backend', 'file'), storage_dir)
             )
             
             # ChatController 초기화
             self._services['chat_controller'] = ChatController(
                 self._event_emitter,
-                self._services['conversation_manager']
+                self._services['conversation_manager'],
+                scheduler=RequestScheduler(
+                    self._event_emitter,
+                    max_concurrent=config.get('max_concurrent_requests', 4)
+                )
             )
-            await self._services['chat_controller'].initialize()
             
             # ChatUI 초기화
             self._services['chat_ui'] = ChatUI(
@@ -94,6 +157,9 @@ class ServiceContainer:
                 config
             )
             
+            # UI가 구독한 뒤에 초기 상태(세션 목록)를 보내도록 마지막에 초기화
+            self._services['chat_controller'].initialize()
+            
         except Exception as e:
             logger.error(f"Component initialization failed: {str(e)}")
             raise
@@ -123,13 +189,19 @@ class ServiceContainer:
             if 'chat_controller' in self._services:
                 await self._services['chat_controller'].cleanup()
                 
-            # 대화 관리자 정리
+            # 대화 관리자 정리 (바뀐 세션만 병렬로 저장)
             if 'conversation_manager' in self._services:
-                self._services['conversation_manager'].save_all_sessions()
+                self._services['conversation_manager'].close(
+                    progress=lambda done, total, name: logger.info(f"Saving sessions: {done}/{total} ({name})")
+                )
                 
             # 설정 저장
             if 'config_manager' in self._services:
-                self._services['config_manager'].save_config()
+                self._services['config_manager'].save_config(self._config)
+                
+            # 공유 API 클라이언트 종료
+            if 'api_client_pool' in self._services:
+                await self._services['api_client_pool'].close()
                 
             self._services.clear()
             self._initialized = False
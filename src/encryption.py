@@ -1,11 +1,16 @@
 # src/encryption.py
 
 from cryptography.fernet import Fernet
+from typing import Optional
 import os
+import zlib
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()  # .env 파일에서 환경 변수 로드
 
+logger = logging.getLogger(__name__)
+
 # 환경 변수에서 암호화 키 가져오기
 ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY')
 
@@ -15,10 +20,73 @@ if not ENCRYPTION_KEY:
 # Fernet 인스턴스 생성
 fernet = Fernet(ENCRYPTION_KEY.encode())
 
+# 압축된 세션 데이터의 머리글 (b"z1:" + Fernet(zlib 압축 데이터)).
+# 머리글이 없는 데이터는 압축하지 않은 이전 형식입니다 (Fernet 토큰은 항상 "gAAAAA"로 시작).
+COMPRESSED_HEADER = b"z1:"
+
+# 세션 데이터 zlib 압축 수준 (0이면 압축하지 않음, PAYLOAD_COMPRESSION_LEVEL로 변경)
+DEFAULT_COMPRESSION_LEVEL = 6
+compression_level = DEFAULT_COMPRESSION_LEVEL
+
 def encrypt_data(data: str) -> bytes:
     """문자열 데이터를 암호화합니다."""
     return fernet.encrypt(data.encode())
 
 def decrypt_data(encrypted_data: bytes) -> str:
     """암호화된 바이트 데이터를 복호화하여 문자열로 반환합니다."""
-    return fernet.decrypt(encrypted_data).decode()
\ No newline at end of file
+    return fernet.decrypt(encrypted_data).decode()
+
+def set_compression_level(level: int) -> None:
+    """
+    encrypt_payload의 기본 압축 수준을 설정합니다.
+
+    Args:
+        level: zlib 압축 수준 0~9 (0이면 압축하지 않은 이전 형식으로 저장)
+
+    Raises:
+        ValueError: 범위를 벗어난 경우
+    """
+    global compression_level
+    if not 0 <= level <= 9:
+        raise ValueError(f"Compression level must be between 0 and 9: {level}")
+    compression_level = level
+
+try:
+    set_compression_level(int(os.getenv('PAYLOAD_COMPRESSION_LEVEL', str(DEFAULT_COMPRESSION_LEVEL))))
+except ValueError as e:
+    # 잘못된 값으로 모든 저장이 실패하지 않도록 기본값 사용
+    logger.warning(f"Invalid PAYLOAD_COMPRESSION_LEVEL ({str(e)}); using {DEFAULT_COMPRESSION_LEVEL}")
+
+def encrypt_payload(data: str, level: Optional[int] = None) -> bytes:
+    """
+    세션 데이터를 zlib으로 압축한 뒤 암호화합니다.
+    압축해도 작아지지 않으면 압축하지 않은 이전 형식으로 암호화합니다.
+
+    Args:
+        data: 암호화할 문자열 (보통 JSON)
+        level: zlib 압축 수준 (None이면 set_compression_level로 설정한 값)
+
+    Returns:
+        bytes: 머리글이 붙은 암호화 데이터 (줄바꿈 문자를 포함하지 않음)
+    """
+    raw = data.encode()
+    level = compression_level if level is None else level
+    if level > 0:
+        compressed = zlib.compress(raw, level)
+        if len(compressed) < len(raw):
+            return COMPRESSED_HEADER + fernet.encrypt(compressed)
+    return fernet.encrypt(raw)
+
+def decrypt_payload(encrypted_data: bytes) -> str:
+    """
+    encrypt_payload나 encrypt_data로 암호화한 데이터를 복호화합니다.
+
+    Args:
+        encrypted_data: 암호화된 데이터
+
+    Returns:
+        str: 복호화한 문자열
+    """
+    if encrypted_data.startswith(COMPRESSED_HEADER):
+        return zlib.decompress(fernet.decrypt(encrypted_data[len(COMPRESSED_HEADER):])).decode()
+    return fernet.decrypt(encrypted_data).decode()
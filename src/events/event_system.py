@@ -1,5 +1,6 @@
 from typing import Dict, List, Callable, Any, Optional
 from dataclasses import dataclass
+import asyncio
 import logging
 from datetime import datetime
 
@@ -73,12 +74,35 @@ class EventEmitter:
                 
             for subscriber in self._listeners[event.type]:
                 try:
-                    subscriber.callback(event.data)
+                    result = subscriber.callback(event.data)
+                    if asyncio.iscoroutine(result):
+                        self._schedule(event.type, result)
                 except Exception as e:
                     logger.error(f"Error in event handler for '{event.type}': {str(e)}")
                     
             logger.debug(f"Emitted event '{event.type}' with {len(self._listeners[event.type])} listeners")
         
+    def _schedule(self, event_type: str, coroutine) -> None:
+        """
+        비동기 핸들러가 반환한 코루틴을 실행 중인 이벤트 루프에 등록
+        
+        Args:
+            event_type: 이벤트 타입 (로그용)
+            coroutine: 실행할 코루틴
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            coroutine.close()
+            logger.error(f"No running event loop for async handler of '{event_type}'")
+            return
+        
+        def log_failure(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Error in async event handler for '{event_type}': {task.exception()}")
+                
+        loop.create_task(coroutine).add_done_callback(log_failure)
+        
     def remove_listener(self, event_type: str, callback: Callable) -> None:
         """
         특정 이벤트의 리스너 제거
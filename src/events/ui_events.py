@@ -6,13 +6,19 @@ class UIEventType(Enum):
     # 메시지 관련 이벤트
     SEND_MESSAGE = auto()
     RECEIVE_MESSAGE = auto()
+    STREAM_DELTA = auto()
     MESSAGE_SENDING = auto()
     MESSAGE_SENT = auto()
+    QUEUE_STATUS = auto()
+    STOP_GENERATION = auto()
+    RETRY_STATUS = auto()
+    CIRCUIT_STATE = auto()
     
     # 세션 관련 이벤트
     SESSION_SWITCH = auto()
     SESSION_CREATED = auto()
     SESSION_DELETED = auto()
+    SESSION_RENAMED = auto()
     
     # UI 상태 이벤트
     THEME_CHANGE = auto()
@@ -42,6 +48,38 @@ class UIEventData:
             **kwargs
         }
     
+    @staticmethod
+    def stream_delta(delta: str, session_id: str, **kwargs):
+        return {
+            "delta": delta,
+            "session_id": session_id,
+            **kwargs
+        }
+    
+    @staticmethod
+    def queue_status(session_id: str, queue_depth: int, **kwargs):
+        return {
+            "session_id": session_id,
+            "queue_depth": queue_depth,
+            **kwargs
+        }
+    
+    @staticmethod
+    def retry_status(session_id: str, attempt: int, outcome: str, **kwargs):
+        return {
+            "session_id": session_id,
+            "attempt": attempt,
+            "outcome": outcome,
+            **kwargs
+        }
+    
+    @staticmethod
+    def circuit_state(state: str, **kwargs):
+        return {
+            "state": state,
+            **kwargs
+        }
+    
     @staticmethod
     def session(session_id: str, **kwargs):
         return {
@@ -0,0 +1,400 @@
+from typing import Dict, Optional, Any, List
+from dataclasses import dataclass, field, asdict, fields
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import sys
+import time
+import uuid
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# 상태 코드 -> Messages API 오류 유형
+ERROR_TYPES = {
+    400: "invalid_request_error",
+    401: "authentication_error",
+    408: "timeout_error",
+    429: "rate_limit_error",
+    500: "api_error",
+    503: "api_error",
+    529: "overloaded_error"
+}
+
+@dataclass
+class MockScenario:
+    """모의 서버의 응답 방식
+
+    지연 시간은 모두 초 단위이며, jitter는 각 지연에 곱해지는 무작위 비율(0.2면 ±20%)입니다.
+    """
+    latency: float = 0.05                 # 응답 헤더를 보내기 전 지연
+    ttft: float = 0.2                     # 헤더 이후 첫 토큰까지의 지연
+    tokens_per_second: float = 50.0       # 첫 토큰 이후 출력 속도 (0이면 지연 없음)
+    jitter: float = 0.0
+    response_text: Optional[str] = None   # None이면 마지막 사용자 메시지를 되풀이
+    error_rates: Dict[int, float] = field(default_factory=dict)   # 상태 코드 -> 확률
+    error_script: List[Optional[int]] = field(default_factory=list)  # 요청 순서대로 적용 (None이면 정상)
+    stream_error_after: Optional[int] = None  # 이 수만큼 토큰을 보낸 뒤 스트림 중간에 overloaded_error
+    retry_after: Optional[float] = 1.0    # 429/529 응답의 retry-after 헤더
+    capacity: Optional[int] = None        # 동시 요청이 이 수를 넘으면 529
+    rate_limits: Dict[str, int] = field(default_factory=dict)
+    # 분당 한도 (예: {"requests": 50, "input-tokens": 40000, "output-tokens": 8000}).
+    # 설정한 한도는 anthropic-ratelimit-* 헤더로 알리고, 넘으면 429로 거부합니다.
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MockScenario':
+        """JSON 딕셔너리로 시나리오를 만듭니다. 상태 코드 키는 정수로 변환합니다."""
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown scenario fields: {', '.join(sorted(unknown))}")
+        data = dict(data)
+        if "error_rates" in data:
+            data["error_rates"] = {int(status): rate for status, rate in data["error_rates"].items()}
+        return cls(**data)
+
+class MockMessagesServer:
+    """Anthropic Messages API를 흉내 내는 로컬 aiohttp 서버 (부하/지연 측정용)
+
+    POST /v1/messages를 스트리밍(SSE)과 비스트리밍 모두 지원하며, 응답 텍스트를 토큰
+    단위로 나눠 시나리오의 지연 시간과 출력 속도에 맞춰 보냅니다. 토큰 수는 실제
+    토크나이저가 아닌 단어/문장 부호 단위 추정치입니다.
+
+    엔드포인트:
+        POST /v1/messages     Messages API (stream: true이면 SSE)
+        GET  /mock/scenario   현재 시나리오
+        PUT  /mock/scenario   시나리오 변경 (지정한 항목만, 오류 스크립트는 처음부터 다시 적용)
+        GET  /mock/stats      요청/오류/동시 요청 통계
+        POST /mock/reset      통계와 속도 제한 창 초기화
+    """
+
+    TOKEN_PATTERN = re.compile(r"\s*\S+")
+
+    def __init__(self, scenario: Optional[MockScenario] = None):
+        """
+        MockMessagesServer 인스턴스를 초기화합니다.
+
+        Args:
+            scenario: 응답 방식 (None이면 기본 시나리오)
+        """
+        self.scenario = scenario or MockScenario()
+        self._random = random.Random(self.scenario.seed)
+        self._script_position = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """통계와 속도 제한 창을 초기화합니다."""
+        self.in_flight = 0
+        self.stats: Dict[str, Any] = {
+            "requests": 0, "streamed": 0, "completed": 0, "cancelled": 0,
+            "peak_in_flight": 0, "output_tokens": 0, "errors": {}
+        }
+        self._window_start = time.monotonic()
+        self._window_usage = {name: 0 for name in ("requests", "input-tokens", "output-tokens")}
+
+    def create_app(self) -> web.Application:
+        """라우트가 등록된 aiohttp 애플리케이션을 만듭니다."""
+        app = web.Application()
+        app.add_routes([
+            web.post('/v1/messages', self.messages),
+            web.get('/mock/scenario', self.get_scenario),
+            web.put('/mock/scenario', self.put_scenario),
+            web.get('/mock/stats', self.get_stats),
+            web.post('/mock/reset', self.post_reset),
+        ])
+        return app
+
+    def _delay(self, seconds: float) -> float:
+        """지터를 적용한 지연 시간"""
+        if seconds <= 0 or not self.scenario.jitter:
+            return max(seconds, 0.0)
+        return max(0.0, seconds * (1 + self._random.uniform(-self.scenario.jitter, self.scenario.jitter)))
+
+    @classmethod
+    def _tokenize(cls, text: str) -> List[str]:
+        """텍스트를 앞 공백을 포함한 토큰 조각으로 나눕니다."""
+        return cls.TOKEN_PATTERN.findall(text) or [text]
+
+    @staticmethod
+    def _text_of(content: Any) -> str:
+        """메시지 내용의 텍스트 부분"""
+        if isinstance(content, str):
+            return content
+        return " ".join(block.get("text", "") for block in content if block.get("type") == "text")
+
+    def _input_tokens(self, body: Dict[str, Any]) -> int:
+        """요청의 입력 토큰 추정치 (4글자당 1토큰)"""
+        system = body.get("system") or ""
+        text = self._text_of(system) + "".join(self._text_of(m["content"]) for m in body.get("messages", []))
+        return max(1, len(text) // 4)
+
+    def _response_tokens(self, body: Dict[str, Any]) -> List[str]:
+        """응답으로 보낼 토큰 조각"""
+        text = self.scenario.response_text
+        if text is None:
+            users = [m for m in body.get("messages", []) if m.get("role") == "user"]
+            text = f"Echo: {self._text_of(users[-1]['content'])}" if users else "Hello!"
+        return self._tokenize(text)
+
+    def _roll_window(self) -> None:
+        """분당 속도 제한 창이 지났으면 사용량을 초기화합니다."""
+        now = time.monotonic()
+        if now - self._window_start >= 60:
+            self._window_start = now
+            self._window_usage = {name: 0 for name in self._window_usage}
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        """설정된 한도의 anthropic-ratelimit-* 헤더"""
+        reset_in = 60 - (time.monotonic() - self._window_start)
+        reset = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + reset_in))
+        headers = {}
+        for name, limit in self.scenario.rate_limits.items():
+            headers[f"anthropic-ratelimit-{name}-limit"] = str(limit)
+            headers[f"anthropic-ratelimit-{name}-remaining"] = str(max(0, limit - self._window_usage.get(name, 0)))
+            headers[f"anthropic-ratelimit-{name}-reset"] = reset
+        return headers
+
+    def _scripted_status(self) -> Optional[int]:
+        """이번 요청에 주입할 오류 상태 코드 (없으면 None)"""
+        script = self.scenario.error_script
+        if self._script_position < len(script):
+            status = script[self._script_position]
+            self._script_position += 1
+            if status and status != 200:
+                return status
+            return None
+        for status, rate in self.scenario.error_rates.items():
+            if self._random.random() < rate:
+                return status
+        return None
+
+    def _admit(self, input_tokens: int) -> Optional[int]:
+        """
+        요청을 받을지 결정합니다.
+
+        Args:
+            input_tokens: 요청의 입력 토큰 추정치
+
+        Returns:
+            Optional[int]: 거부할 상태 코드 (받으면 None)
+        """
+        status = self._scripted_status()
+        if status is not None:
+            return status
+        if self.scenario.capacity is not None and self.in_flight >= self.scenario.capacity:
+            return 529
+
+        self._roll_window()
+        limits = self.scenario.rate_limits
+        # 출력 토큰은 완료된 응답의 실제 사용량으로만 계산 (이미 한도를 넘었을 때만 거부)
+        wanted = {"requests": 1, "input-tokens": input_tokens, "output-tokens": 0}
+        for name, limit in limits.items():
+            used = self._window_usage.get(name, 0)
+            if used + wanted.get(name, 0) > limit or used >= limit:
+                return 429
+        self._window_usage["requests"] += 1
+        self._window_usage["input-tokens"] += input_tokens
+        return None
+
+    def _error_response(self, status: int) -> web.Response:
+        """Messages API 형식의 오류 응답"""
+        self.stats["errors"][str(status)] = self.stats["errors"].get(str(status), 0) + 1
+        headers = {"request-id": f"req_mock_{uuid.uuid4().hex[:12]}", **self._rate_limit_headers()}
+        if status in (429, 529) and self.scenario.retry_after is not None:
+            headers["retry-after"] = str(self.scenario.retry_after)
+        error_type = ERROR_TYPES.get(status, "api_error")
+        return web.json_response(
+            {"type": "error", "error": {"type": error_type, "message": f"Mock {error_type} ({status})"}},
+            status=status,
+            headers=headers
+        )
+
+    async def messages(self, request: web.Request) -> web.StreamResponse:
+        """POST /v1/messages"""
+        try:
+            body = await request.json()
+            model = body["model"]
+            max_tokens = int(body["max_tokens"])
+            if not isinstance(body["messages"], list):
+                raise TypeError("messages must be a list")
+        except (ValueError, KeyError, TypeError):
+            return self._error_response(400)
+
+        self.stats["requests"] += 1
+        input_tokens = self._input_tokens(body)
+        status = self._admit(input_tokens)
+        # 헤더를 보내기 전의 요청도 서버 용량을 차지
+        self.in_flight += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.in_flight)
+        try:
+            await asyncio.sleep(self._delay(self.scenario.latency))
+            if status is not None:
+                return self._error_response(status)
+
+            tokens = self._response_tokens(body)
+            stop_reason = "end_turn"
+            if len(tokens) > max_tokens:
+                tokens = tokens[:max_tokens]
+                stop_reason = "max_tokens"
+
+            message = {
+                "id": f"msg_mock_{uuid.uuid4().hex[:16]}",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [],
+                "stop_reason": None,
+                "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": 0}
+            }
+
+            if body.get("stream"):
+                return await self._stream(request, message, tokens, stop_reason)
+            await asyncio.sleep(self._delay(self.scenario.ttft) + self._generation_time(len(tokens) - 1))
+            self._finish(len(tokens))
+            return web.json_response({
+                **message,
+                "content": [{"type": "text", "text": "".join(tokens)}],
+                "stop_reason": stop_reason,
+                "usage": {"input_tokens": input_tokens, "output_tokens": len(tokens)}
+            }, headers=self._rate_limit_headers())
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def _generation_time(self, tokens: int) -> float:
+        """첫 토큰 이후 tokens개를 생성하는 데 걸리는 시간"""
+        if self.scenario.tokens_per_second <= 0 or tokens <= 0:
+            return 0.0
+        return self._delay(tokens / self.scenario.tokens_per_second)
+
+    def _finish(self, output_tokens: int) -> None:
+        """완료된 응답의 출력 토큰을 기록합니다."""
+        self.stats["completed"] += 1
+        self.stats["output_tokens"] += output_tokens
+        self._window_usage["output-tokens"] += output_tokens
+
+    @staticmethod
+    async def _send(response: web.StreamResponse, event: str, data: Dict[str, Any]) -> None:
+        """SSE 이벤트 하나를 전송합니다."""
+        await response.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8'))
+
+    async def _stream(self, request: web.Request, message: Dict[str, Any],
+                      tokens: List[str], stop_reason: str) -> web.StreamResponse:
+        """Messages API 스트리밍 이벤트 순서대로 응답을 보냅니다."""
+        self.stats["streamed"] += 1
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "request-id": f"req_mock_{uuid.uuid4().hex[:12]}",
+            **self._rate_limit_headers()
+        })
+        await response.prepare(request)
+
+        await self._send(response, "message_start", {"type": "message_start", "message": message})
+        await self._send(response, "content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}
+        })
+        await self._send(response, "ping", {"type": "ping"})
+        await asyncio.sleep(self._delay(self.scenario.ttft))
+
+        interval = 1 / self.scenario.tokens_per_second if self.scenario.tokens_per_second > 0 else 0.0
+        for index, token in enumerate(tokens):
+            if self.scenario.stream_error_after is not None and index >= self.scenario.stream_error_after:
+                self.stats["errors"]["stream"] = self.stats["errors"].get("stream", 0) + 1
+                await self._send(response, "error", {
+                    "type": "error", "error": {"type": "overloaded_error", "message": "Mock overloaded_error"}
+                })
+                await response.write_eof()
+                return response
+            if index and interval:
+                await asyncio.sleep(self._delay(interval))
+            await self._send(response, "content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}
+            })
+
+        await self._send(response, "content_block_stop", {"type": "content_block_stop", "index": 0})
+        await self._send(response, "message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+            "usage": {"output_tokens": len(tokens)}
+        })
+        await self._send(response, "message_stop", {"type": "message_stop"})
+        self._finish(len(tokens))
+        await response.write_eof()
+        return response
+
+    async def get_scenario(self, request: web.Request) -> web.Response:
+        """GET /mock/scenario"""
+        return web.json_response(asdict(self.scenario))
+
+    async def put_scenario(self, request: web.Request) -> web.Response:
+        """PUT /mock/scenario (지정한 항목만 변경)"""
+        try:
+            self.scenario = MockScenario.from_dict({**asdict(self.scenario), **(await request.json())})
+        except (ValueError, TypeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        self._random = random.Random(self.scenario.seed)
+        self._script_position = 0
+        logger.info(f"Mock scenario updated: {asdict(self.scenario)}")
+        return web.json_response(asdict(self.scenario))
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        """GET /mock/stats"""
+        return web.json_response({**self.stats, "in_flight": self.in_flight})
+
+    async def post_reset(self, request: web.Request) -> web.Response:
+        """POST /mock/reset"""
+        self.reset()
+        return web.json_response({**self.stats, "in_flight": self.in_flight})
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """명령줄 인자를 해석합니다."""
+    parser = argparse.ArgumentParser(description="Serve a local mock of the Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1", help="bind address")
+    parser.add_argument("--port", type=int, default=8787, help="bind port")
+    parser.add_argument("--scenario", help="JSON file with MockScenario fields")
+    parser.add_argument("--latency", type=float, help="delay before response headers (seconds)")
+    parser.add_argument("--ttft", type=float, help="delay before the first token (seconds)")
+    parser.add_argument("--tps", type=float, help="output tokens per second")
+    parser.add_argument("--capacity", type=int, help="return 529 above this many concurrent requests")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="STATUS=RATE",
+                        help="inject an error status with a probability, e.g. 529=0.05 (repeatable)")
+    parser.add_argument("--seed", type=int, help="random seed for jitter and injected errors")
+    return parser.parse_args(argv)
+
+def build_scenario(args: argparse.Namespace) -> MockScenario:
+    """시나리오 파일과 명령줄 인자로 시나리오를 만듭니다 (명령줄 인자가 우선)."""
+    data: Dict[str, Any] = {}
+    if args.scenario:
+        with open(args.scenario, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    options = {"latency": args.latency, "ttft": args.ttft, "tokens_per_second": args.tps,
+               "capacity": args.capacity, "seed": args.seed}
+    data.update({key: value for key, value in options.items() if value is not None})
+    if args.error_rate:
+        rates = dict(data.get("error_rates", {}))
+        for item in args.error_rate:
+            status, rate = item.split("=", 1)
+            rates[int(status)] = float(rate)
+        data["error_rates"] = rates
+    return MockScenario.from_dict(data)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """모의 서버 실행 진입점"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    args = parse_args(argv)
+    server = MockMessagesServer(build_scenario(args))
+    logger.info(f"Mock Messages API at http://{args.host}:{args.port} (set session base_url to this)")
+    web.run_app(server.create_app(), host=args.host, port=args.port)
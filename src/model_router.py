@@ -0,0 +1,108 @@
+from typing import Dict, Optional, Any, List
+from dataclasses import dataclass
+import logging
+
+from retry_handler import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# 모델 과부하로 보고 대체 모델로 넘기는 상태 코드
+FAILOVER_STATUS_CODES = frozenset({503, 529})
+
+@dataclass
+class RoutingRule:
+    """조건이 모두 맞으면 model을 사용하는 라우팅 규칙
+
+    값이 None인 조건은 검사하지 않습니다.
+    """
+    model: str
+    max_input_tokens: Optional[int] = None
+    min_input_tokens: Optional[int] = None
+    has_images: Optional[bool] = None
+    contexts: Optional[List[str]] = None
+
+    def matches(self, input_tokens: int, has_images: bool, context: Optional[str]) -> bool:
+        """요청이 이 규칙의 조건을 모두 만족하는지 확인합니다."""
+        if self.max_input_tokens is not None and input_tokens > self.max_input_tokens:
+            return False
+        if self.min_input_tokens is not None and input_tokens < self.min_input_tokens:
+            return False
+        if self.has_images is not None and has_images != self.has_images:
+            return False
+        if self.contexts is not None and context not in self.contexts:
+            return False
+        return True
+
+class ModelRouter:
+    """요청마다 사용할 모델을 고르고, 과부하 시 대체 모델을 알려주는 라우터
+
+    사용자가 지정한 모델이 있으면 그대로 사용하고, 없으면 규칙을 순서대로 검사하여
+    처음 맞는 규칙의 모델을, 맞는 규칙이 없으면 세션의 기본 모델을 사용합니다.
+
+    설정 예:
+        {
+            "rules": [
+                {"model": "claude-3-5-haiku-20241022", "max_input_tokens": 2000, "has_images": false},
+                {"model": "claude-3-5-sonnet-20241022", "contexts": ["code_reviewer"]}
+            ],
+            "fallbacks": {"claude-3-5-sonnet-20241022": "claude-3-5-haiku-20241022"}
+        }
+    """
+
+    def __init__(self,
+                 rules: Optional[List[Dict[str, Any]]] = None,
+                 fallbacks: Optional[Dict[str, str]] = None):
+        """
+        ModelRouter 인스턴스를 초기화합니다.
+
+        Args:
+            rules: RoutingRule 인자 딕셔너리 목록 (순서대로 검사)
+            fallbacks: 모델 -> 과부하 시 대신 사용할 모델
+        """
+        self.rules = [RoutingRule(**rule) for rule in (rules or [])]
+        self.fallbacks = fallbacks or {}
+
+    def select(self,
+               default_model: str,
+               input_tokens: int = 0,
+               has_images: bool = False,
+               context: Optional[str] = None,
+               override: Optional[str] = None) -> str:
+        """
+        요청에 사용할 모델을 고릅니다.
+
+        Args:
+            default_model: 맞는 규칙이 없을 때 사용할 모델
+            input_tokens: 예상 입력 토큰 수
+            has_images: 요청에 이미지가 포함되어 있는지 여부
+            context: 활성화된 ContextManager 컨텍스트
+            override: 사용자가 지정한 모델 (있으면 규칙보다 우선)
+
+        Returns:
+            str: 사용할 모델 이름
+        """
+        if override:
+            return override
+        for rule in self.rules:
+            if rule.matches(input_tokens, has_images, context):
+                return rule.model
+        return default_model
+
+    def fallback_for(self, model: str) -> Optional[str]:
+        """모델이 과부하일 때 대신 사용할 모델 (없으면 None)"""
+        return self.fallbacks.get(model)
+
+    @staticmethod
+    def should_fail_over(error: BaseException) -> bool:
+        """
+        대체 모델로 넘길 오류인지 확인합니다.
+
+        Args:
+            error: API 호출에서 발생한 예외
+
+        Returns:
+            bool: 모델 과부하(503/529)이거나 모델의 회로 차단기가 열려 있으면 True
+        """
+        if isinstance(error, CircuitOpenError):
+            return True
+        return getattr(error, 'status_code', None) in FAILOVER_STATUS_CODES
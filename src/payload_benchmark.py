@@ -0,0 +1,128 @@
+from typing import Dict, Optional, Any, List
+import argparse
+import base64
+import json
+import os
+import random
+import time
+
+from encryption import encrypt_data, decrypt_data, encrypt_payload, decrypt_payload
+
+def build_sample_session(turns: int = 50, image_kb: int = 0, seed: int = 0) -> str:
+    """
+    벤치마크용 세션 JSON을 만듭니다.
+
+    Args:
+        turns: 사용자/어시스턴트 대화 턴 수
+        image_kb: 첫 사용자 메시지에 넣을 base64 이미지 크기(KB, 0이면 이미지 없음)
+        seed: 무작위 텍스트와 이미지 바이트의 시드
+
+    Returns:
+        str: ConversationManager 스냅샷 형식의 JSON
+    """
+    rng = random.Random(seed)
+    words = ["session", "token", "model", "python", "cache", "request", "stream", "context",
+             "summary", "journal", "이미지", "대화", "응답", "설정", "파일", "저장"]
+    messages = []
+    for turn in range(turns):
+        question = " ".join(rng.choice(words) for _ in range(rng.randint(10, 40)))
+        answer = " ".join(rng.choice(words) for _ in range(rng.randint(80, 300)))
+        content: Any = question
+        if turn == 0 and image_kb:
+            image = base64.b64encode(rng.randbytes(image_kb * 1024)).decode()
+            content = [{"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": image}},
+                       {"type": "text", "text": question}]
+        messages.append({"role": "user", "content": content, "metadata": None})
+        messages.append({"role": "assistant", "content": answer, "metadata": {"model": "claude-test"}})
+    return json.dumps({"name": "benchmark", "messages": messages, "context": "general",
+                       "summary": None, "usage": None, "last_active": "2024-01-01T00:00:00"})
+
+def load_samples(directory: str) -> List[str]:
+    """
+    저장된 세션 스냅샷(.enc)을 복호화하여 벤치마크 입력으로 사용합니다.
+
+    Args:
+        directory: 세션 저장 디렉토리
+
+    Returns:
+        List[str]: 복호화한 세션 JSON 목록
+    """
+    samples = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.enc'):
+            with open(os.path.join(directory, filename), 'rb') as f:
+                samples.append(decrypt_payload(f.read()))
+    return samples
+
+def _measure(payloads: List[str], encrypt, decrypt, repeat: int) -> Dict[str, float]:
+    """payloads 전체를 repeat번 암호화/복호화한 최소 시간과 크기"""
+    encrypt_times, decrypt_times = [], []
+    encrypted: List[bytes] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encrypted = [encrypt(payload) for payload in payloads]
+        encrypt_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for data in encrypted:
+            decrypt(data)
+        decrypt_times.append(time.perf_counter() - start)
+    return {
+        "bytes": sum(len(data) for data in encrypted),
+        "encrypt_ms": min(encrypt_times) * 1000,
+        "decrypt_ms": min(decrypt_times) * 1000
+    }
+
+def benchmark(payloads: List[str], levels: List[int], repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    현재 방식(encrypt_data)과 압축 수준별 encrypt_payload를 비교합니다.
+
+    Args:
+        payloads: 세션 JSON 목록
+        levels: 비교할 zlib 압축 수준
+        repeat: 반복 횟수 (가장 빠른 시간을 사용)
+
+    Returns:
+        List[Dict[str, Any]]: 방식별 {"method", "bytes", "ratio", "encrypt_ms", "decrypt_ms"}
+            (ratio는 현재 방식 대비 크기 비율)
+    """
+    results = [{"method": "encrypt_data", **_measure(payloads, encrypt_data, decrypt_data, repeat)}]
+    for level in levels:
+        result = _measure(payloads, lambda payload: encrypt_payload(payload, level), decrypt_payload, repeat)
+        results.append({"method": f"zlib level {level}", **result})
+    baseline = results[0]["bytes"]
+    for result in results:
+        result["ratio"] = result["bytes"] / baseline if baseline else 0.0
+    return results
+
+def format_results(results: List[Dict[str, Any]], plain_bytes: int) -> str:
+    """벤치마크 결과 표"""
+    lines = [f"plain JSON: {plain_bytes:,} bytes",
+             f"{'method':<14} {'bytes':>14} {'ratio':>7} {'encrypt ms':>11} {'decrypt ms':>11}"]
+    for result in results:
+        lines.append(f"{result['method']:<14} {result['bytes']:>14,} {result['ratio']:>7.2f} "
+                     f"{result['encrypt_ms']:>11.1f} {result['decrypt_ms']:>11.1f}")
+    return "\n".join(lines)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """명령줄 인자를 해석합니다."""
+    parser = argparse.ArgumentParser(description="Compare session payload encryption with and without compression")
+    parser.add_argument("--storage-dir", help="benchmark the .enc snapshots in this directory instead of a sample")
+    parser.add_argument("--sessions", type=int, default=20, help="number of sample sessions")
+    parser.add_argument("--turns", type=int, default=50, help="turns per sample session")
+    parser.add_argument("--image-kb", type=int, default=256, help="inline base64 image size per sample session")
+    parser.add_argument("--levels", default="1,6,9", help="comma-separated zlib levels to compare")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions (the fastest run is reported)")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """벤치마크 실행 진입점"""
+    args = parse_args(argv)
+    if args.storage_dir:
+        payloads = load_samples(args.storage_dir)
+    else:
+        payloads = [build_sample_session(args.turns, args.image_kb, seed) for seed in range(args.sessions)]
+    if not payloads:
+        raise SystemExit("No session payloads to benchmark")
+    levels = [int(level) for level in args.levels.split(",") if level]
+    results = benchmark(payloads, levels, args.repeat)
+    print(format_results(results, sum(len(payload.encode()) for payload in payloads)))
@@ -0,0 +1,360 @@
+from typing import Dict, Optional, Any, List, Mapping
+from dataclasses import dataclass, field
+from contextvars import ContextVar
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# 현재 컨텍스트(태스크)에서 속도 제한 때문에 기다린 시간(초)의 합
+rate_limit_wait: ContextVar[float] = ContextVar('rate_limit_wait', default=0.0)
+
+class TokenBucket:
+    """분당 한도를 연속적으로 채우는 토큰 버킷
+
+    capacity가 None이면 한도를 모르는 상태로 보고 제한하지 않습니다.
+    """
+
+    def __init__(self, per_minute: Optional[float] = None):
+        """
+        TokenBucket 인스턴스를 초기화합니다.
+
+        Args:
+            per_minute: 분당 한도 (None이면 제한 없음)
+        """
+        self.capacity: Optional[float] = None
+        self.rate = 0.0
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        if per_minute:
+            self.set_limit(per_minute)
+
+    def set_limit(self, per_minute: float) -> None:
+        """분당 한도를 변경합니다. 처음 설정할 때는 버킷을 가득 채웁니다."""
+        self.refill()
+        if self.capacity is None:
+            self.tokens = float(per_minute)
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = min(self.tokens, self.capacity)
+
+    def refill(self, now: Optional[float] = None) -> None:
+        """경과 시간만큼 토큰을 채웁니다."""
+        now = time.monotonic() if now is None else now
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def clamp(self, amount: float) -> float:
+        """한 번에 가져갈 수 있는 양 (버킷 용량보다 큰 요청이 영원히 기다리지 않도록 제한)"""
+        return amount if self.capacity is None else min(amount, self.capacity)
+
+    def wait_time(self, amount: float) -> float:
+        """amount만큼 쓸 수 있을 때까지 남은 시간(초)"""
+        if self.capacity is None:
+            return 0.0
+        missing = self.clamp(amount) - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def take(self, amount: float) -> None:
+        """토큰을 사용합니다. 음수이면 되돌려 받습니다."""
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+    def sync(self, limit: Optional[float], remaining: Optional[float]) -> None:
+        """
+        서버가 알려준 한도와 남은 양으로 버킷을 맞춥니다.
+
+        Args:
+            limit: 분당 한도
+            remaining: 현재 남은 양
+        """
+        if limit:
+            self.set_limit(limit)
+        if remaining is not None and self.capacity is not None:
+            # 서버에 아직 반영되지 않은 진행 중 요청이 있을 수 있으므로 작은 쪽을 사용
+            self.tokens = min(self.tokens, float(remaining))
+
+@dataclass
+class Reservation:
+    """요청 하나가 예약한 사용량"""
+    input_tokens: int
+    output_tokens: int
+    granted_at: float = field(default_factory=time.monotonic)
+    settled: bool = False
+
+@dataclass
+class _Waiter:
+    """한도가 찰 때까지 대기 중인 요청"""
+    input_tokens: int
+    output_tokens: int
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.monotonic)
+    bypassed: int = 0
+
+class RateLimiter:
+    """모든 세션이 공유하는 클라이언트 측 속도 제한기
+
+    요청 수, 입력 토큰, 출력 토큰의 분당 한도를 토큰 버킷으로 추적하여, 한도를
+    넘을 요청은 429를 받기 전에 미리 기다리게 합니다. 한도는 설정값으로 시작하고
+    응답의 anthropic-ratelimit-* 헤더로 갱신됩니다. 출력 토큰은 서버와 마찬가지로
+    요청 시작 시 max_tokens로 예약한 뒤, 응답이 끝나면 실제 사용량으로 정산합니다.
+
+    대기 중인 요청은 도착 순서대로 처리하되, 맨 앞 요청이 들어갈 자리가 없으면 더 작은
+    요청이 먼저 나갈 수 있습니다. 맨 앞 요청이 max_bypass 번 추월당하면 추월을 막아
+    큰 요청이 굶지 않도록 합니다.
+    싱글톤 패턴을 사용하여 전역적인 접근을 제공합니다.
+    """
+
+    _instance: Optional['RateLimiter'] = None
+
+    HEADER_PREFIX = "anthropic-ratelimit-"
+    # 헤더 이름의 한도 종류 -> 버킷 이름
+    HEADER_BUCKETS = {
+        "requests": "requests",
+        "input-tokens": "input_tokens",
+        "output-tokens": "output_tokens"
+    }
+
+    @classmethod
+    def get_instance(cls) -> 'RateLimiter':
+        """싱글톤 인스턴스 반환"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self,
+                 requests_per_minute: Optional[float] = None,
+                 input_tokens_per_minute: Optional[float] = None,
+                 output_tokens_per_minute: Optional[float] = None,
+                 max_bypass: int = 8):
+        """
+        RateLimiter 인스턴스를 초기화합니다. 한도를 지정하지 않으면 첫 응답의
+        헤더를 받을 때까지 제한하지 않습니다.
+
+        Args:
+            requests_per_minute: 분당 요청 수 한도
+            input_tokens_per_minute: 분당 입력 토큰 한도
+            output_tokens_per_minute: 분당 출력 토큰 한도
+            max_bypass: 대기열 맨 앞 요청을 다른 요청이 추월할 수 있는 최대 횟수
+        """
+        self.buckets: Dict[str, TokenBucket] = {
+            "requests": TokenBucket(requests_per_minute),
+            "input_tokens": TokenBucket(input_tokens_per_minute),
+            "output_tokens": TokenBucket(output_tokens_per_minute)
+        }
+        self.max_bypass = max_bypass
+        self._waiters: List[_Waiter] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._paused_until = 0.0
+        self.stats = {"granted": 0, "delayed": 0, "total_wait": 0.0, "reordered": 0, "throttled": 0}
+
+    def configure(self,
+                  requests_per_minute: Optional[float] = None,
+                  input_tokens_per_minute: Optional[float] = None,
+                  output_tokens_per_minute: Optional[float] = None,
+                  max_bypass: Optional[int] = None) -> None:
+        """
+        한도를 변경합니다. 지정하지 않은 항목은 유지됩니다.
+
+        Args:
+            requests_per_minute: 분당 요청 수 한도
+            input_tokens_per_minute: 분당 입력 토큰 한도
+            output_tokens_per_minute: 분당 출력 토큰 한도
+            max_bypass: 대기열 맨 앞 요청을 추월할 수 있는 최대 횟수
+        """
+        limits = {
+            "requests": requests_per_minute,
+            "input_tokens": input_tokens_per_minute,
+            "output_tokens": output_tokens_per_minute
+        }
+        for name, limit in limits.items():
+            if limit:
+                self.buckets[name].set_limit(limit)
+        if max_bypass is not None:
+            self.max_bypass = max_bypass
+        logger.debug(f"Rate limits configured: {limits}")
+
+    def _needs(self, input_tokens: float, output_tokens: float) -> Dict[str, float]:
+        """요청 하나가 각 버킷에서 사용할 양"""
+        return {
+            "requests": 1,
+            "input_tokens": self.buckets["input_tokens"].clamp(input_tokens),
+            "output_tokens": self.buckets["output_tokens"].clamp(output_tokens)
+        }
+
+    def _wait_time(self, waiter: _Waiter, now: float) -> float:
+        """요청이 한도 안에 들어갈 때까지 남은 시간(초)"""
+        needs = self._needs(waiter.input_tokens, waiter.output_tokens)
+        wait = max(self.buckets[name].wait_time(amount) for name, amount in needs.items())
+        return max(wait, self._paused_until - now)
+
+    def _grant(self, waiter: _Waiter, now: float) -> None:
+        """요청에 사용량을 할당하고 대기를 끝냅니다."""
+        needs = self._needs(waiter.input_tokens, waiter.output_tokens)
+        for name, amount in needs.items():
+            self.buckets[name].take(amount)
+        waited = now - waiter.queued_at
+        self.stats["granted"] += 1
+        if waited > 0.001:
+            self.stats["delayed"] += 1
+            self.stats["total_wait"] += waited
+        waiter.future.set_result(Reservation(
+            int(needs["input_tokens"]), int(needs["output_tokens"]), granted_at=now
+        ))
+
+    def _dispatch(self) -> None:
+        """한도 안에 들어가는 대기 요청을 내보내고, 남은 요청을 위해 타이머를 겁니다."""
+        self._timer = None
+        now = time.monotonic()
+        for bucket in self.buckets.values():
+            bucket.refill(now)
+
+        next_wait: Optional[float] = None
+        head_blocked = False
+        for waiter in list(self._waiters):
+            if waiter.future.done():
+                self._waiters.remove(waiter)
+                continue
+
+            wait = self._wait_time(waiter, now)
+            if wait <= 0:
+                self._waiters.remove(waiter)
+                self._grant(waiter, now)
+                if head_blocked:
+                    self._waiters[0].bypassed += 1
+                    self.stats["reordered"] += 1
+                continue
+
+            next_wait = wait if next_wait is None else min(next_wait, wait)
+            if not head_blocked:
+                head_blocked = True
+                # 너무 오래 추월당한 요청 뒤로는 아무도 앞지르지 못함
+                if waiter.bypassed >= self.max_bypass:
+                    next_wait = wait
+                    break
+
+        if self._waiters and next_wait is not None:
+            self._timer = asyncio.get_running_loop().call_later(next_wait, self._dispatch)
+
+    async def acquire(self, input_tokens: int = 0, output_tokens: int = 0) -> Reservation:
+        """
+        요청을 보내도 될 때까지 기다린 뒤 사용량을 예약합니다.
+
+        Args:
+            input_tokens: 예상 입력 토큰 수
+            output_tokens: 예약할 출력 토큰 수 (보통 max_tokens)
+
+        Returns:
+            Reservation: 응답 후 settle()에 전달할 예약
+        """
+        waiter = _Waiter(input_tokens, output_tokens, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+        try:
+            reservation = await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        rate_limit_wait.set(rate_limit_wait.get() + reservation.granted_at - waiter.queued_at)
+        return reservation
+
+    def settle(self, reservation: Reservation, input_tokens: int, output_tokens: int) -> None:
+        """
+        실제 사용량으로 예약을 정산합니다. 남은 예약분은 되돌려 받습니다.
+
+        Args:
+            reservation: acquire()가 반환한 예약
+            input_tokens: 실제 입력 토큰 수
+            output_tokens: 실제 출력 토큰 수
+        """
+        if reservation.settled:
+            return
+        reservation.settled = True
+        self.buckets["input_tokens"].take(input_tokens - reservation.input_tokens)
+        self.buckets["output_tokens"].take(output_tokens - reservation.output_tokens)
+        if self._waiters and self._timer is not None:
+            self._timer.cancel()
+            self._dispatch()
+
+    def release(self, reservation: Reservation) -> None:
+        """
+        서버가 처리하지 않은 요청(연결 실패, 429 등)의 예약 토큰을 되돌립니다.
+        요청 수는 되돌리지 않습니다.
+
+        Args:
+            reservation: acquire()가 반환한 예약
+        """
+        self.settle(reservation, 0, 0)
+
+    def pause(self, seconds: float) -> None:
+        """
+        서버가 429와 함께 retry-after를 알려준 경우, 그 시간 동안 모든 요청을 멈춥니다.
+
+        Args:
+            seconds: 멈출 시간(초)
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.stats["throttled"] += 1
+        logger.warning(f"Rate limited by the API; pausing new requests for {seconds:.1f}s")
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        응답의 anthropic-ratelimit-* 헤더로 한도와 남은 양을 갱신합니다.
+
+        Args:
+            headers: HTTP 응답 헤더
+        """
+        # httpx.Headers 등 매핑만 처리
+        if not isinstance(headers, Mapping):
+            return
+        for header_name, bucket_name in self.HEADER_BUCKETS.items():
+            limit = _parse_number(headers.get(f"{self.HEADER_PREFIX}{header_name}-limit"))
+            remaining = _parse_number(headers.get(f"{self.HEADER_PREFIX}{header_name}-remaining"))
+            if limit is not None or remaining is not None:
+                bucket = self.buckets[bucket_name]
+                bucket.refill()
+                bucket.sync(limit, remaining)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 한도, 남은 양, 대기열 상태"""
+        now = time.monotonic()
+        for bucket in self.buckets.values():
+            bucket.refill(now)
+        return {
+            "limits": {name: bucket.capacity for name, bucket in self.buckets.items()},
+            "available": {name: bucket.tokens if bucket.capacity is not None else None
+                          for name, bucket in self.buckets.items()},
+            "waiting": len(self._waiters),
+            **self.stats
+        }
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    """헤더 값을 숫자로 변환 (없거나 잘못된 값이면 None)"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    API 오류 응답의 retry-after 헤더 값을 초 단위로 반환합니다.
+
+    Args:
+        error: API 호출에서 발생한 예외
+
+    Returns:
+        Optional[float]: 대기 시간(초). 헤더가 없으면 None
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    return _parse_number(headers.get('retry-after'))
@@ -0,0 +1,190 @@
+from typing import Dict, Optional, Any, Callable, Awaitable, Deque
+from collections import deque
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+class RequestHedger:
+    """첫 토큰이 늦는 요청에 예비 요청을 보내 꼬리 지연을 줄이는 헤저
+
+    최근 첫 토큰 지연 시간(TTFT)의 percentile 값이 지나도록 첫 토큰이 오지 않으면 같은
+    요청을 한 번 더 보내고, 먼저 첫 토큰을 받은 쪽을 쓰고 다른 쪽은 취소합니다.
+    예비 요청은 요청 하나당 budget_ratio만큼 쌓이는 예산 안에서만 보내므로, 전체 요청
+    수는 최대 (1 + budget_ratio)배로 늘어납니다.
+    싱글톤 패턴을 사용하여 전역적인 접근을 제공합니다.
+    """
+
+    _instance: Optional['RequestHedger'] = None
+
+    @classmethod
+    def get_instance(cls) -> 'RequestHedger':
+        """싱글톤 인스턴스 반환"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self,
+                 percentile: float = 0.95,
+                 budget_ratio: float = 0.05,
+                 budget_capacity: float = 2.0,
+                 min_samples: int = 20,
+                 window: int = 200,
+                 min_delay: float = 0.5):
+        """
+        RequestHedger 인스턴스를 초기화합니다.
+
+        Args:
+            percentile: 예비 요청을 보낼 기준 TTFT 백분위수 (0~1)
+            budget_ratio: 요청 하나당 쌓이는 예비 요청 예산
+            budget_capacity: 모아 둘 수 있는 최대 예비 요청 수
+            min_samples: 예비 요청을 보내기 전에 모을 TTFT 표본 수
+            window: 백분위수 계산에 사용할 최근 표본 수
+            min_delay: 예비 요청을 보내기 전 최소 대기 시간(초)
+        """
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.budget_capacity = budget_capacity
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.budget = budget_capacity
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "skipped_budget": 0}
+
+    def configure(self,
+                  percentile: Optional[float] = None,
+                  budget_ratio: Optional[float] = None,
+                  min_samples: Optional[int] = None,
+                  min_delay: Optional[float] = None) -> None:
+        """
+        설정을 변경합니다. 지정하지 않은 항목은 유지됩니다.
+
+        Args:
+            percentile: 예비 요청을 보낼 기준 TTFT 백분위수
+            budget_ratio: 요청 하나당 쌓이는 예비 요청 예산
+            min_samples: 예비 요청을 보내기 전에 모을 TTFT 표본 수
+            min_delay: 예비 요청을 보내기 전 최소 대기 시간(초)
+        """
+        if percentile is not None:
+            self.percentile = percentile
+        if budget_ratio is not None:
+            self.budget_ratio = budget_ratio
+        if min_samples is not None:
+            self.min_samples = min_samples
+        if min_delay is not None:
+            self.min_delay = min_delay
+
+    def record_ttft(self, seconds: float) -> None:
+        """첫 토큰 지연 시간 표본을 기록합니다."""
+        self._samples.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        예비 요청을 보내기까지 기다릴 시간(초)
+
+        Returns:
+            Optional[float]: 표본이 부족하면 None
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+        return max(self.min_delay, ordered[index])
+
+    def _try_spend(self) -> bool:
+        """예비 요청 하나를 위한 예산을 사용합니다. 부족하면 False"""
+        if self.budget < 1:
+            self.stats["skipped_budget"] += 1
+            return False
+        self.budget -= 1
+        return True
+
+    async def race(self,
+                   start: Callable[[], Awaitable[Any]],
+                   discard: Callable[[Any], Awaitable[None]]) -> Any:
+        """
+        start()로 요청을 시작하고, 첫 토큰이 늦으면 예비 요청을 보내 먼저 끝난 결과를 반환합니다.
+
+        start()는 첫 토큰을 받을 때까지 실행되는 코루틴 함수입니다. 한쪽이 실패하면 다른
+        쪽을 계속 기다리고, 둘 다 실패하면 원래 요청의 예외를 전파합니다.
+
+        Args:
+            start: 요청을 시작하고 첫 토큰까지 받은 결과를 반환하는 코루틴 함수
+            discard: 지거나 늦게 끝난 쪽의 결과를 정리하는 코루틴 함수
+
+        Returns:
+            Any: 먼저 끝난 요청의 start() 결과
+        """
+        self.stats["requests"] += 1
+        self.budget = min(self.budget_capacity, self.budget + self.budget_ratio)
+        loop = asyncio.get_running_loop()
+        # 예비 요청이 이겨도 사용자가 기다린 시간은 원래 요청을 보낸 시점부터
+        issued = time.monotonic()
+
+        async def timed_start():
+            result = await start()
+            return result, time.monotonic() - issued
+
+        primary = loop.create_task(timed_start())
+        tasks = {primary}
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if not primary.done() and self._try_spend():
+                    self.stats["hedged"] += 1
+                    logger.info(f"No first token after {delay:.2f}s; sending a hedge request")
+                    tasks.add(loop.create_task(timed_start()))
+
+            winner = None
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+        except BaseException:
+            # 호출자가 취소한 경우에도 열린 요청을 남기지 않음
+            for task in tasks:
+                task.cancel()
+            loop.create_task(self._discard_losers(tasks, None, discard))
+            raise
+
+        if winner is None:
+            # 모두 실패: 원래 요청의 오류를 전파
+            return primary.result()[0]
+
+        if len(tasks) > 1:
+            self.stats["primary_wins" if winner is primary else "hedge_wins"] += 1
+        for task in tasks:
+            if task is not winner:
+                task.cancel()
+        result, ttft = winner.result()
+        self.record_ttft(ttft)
+        await self._discard_losers(tasks, winner, discard)
+        return result
+
+    @staticmethod
+    async def _discard_losers(tasks, winner: Optional[asyncio.Task],
+                              discard: Callable[[Any], Awaitable[None]]) -> None:
+        """취소된 요청이 끝나기를 기다리고, 함께 성공한 요청의 결과를 정리합니다."""
+        for task in tasks:
+            if task is winner:
+                continue
+            try:
+                result, _ = await task
+            except BaseException:
+                continue
+            await discard(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """예비 요청 통계와 현재 기준 지연 시간"""
+        hedged = self.stats["hedged"]
+        return {
+            "hedge_delay": self.hedge_delay(),
+            "samples": len(self._samples),
+            "budget": round(self.budget, 3),
+            "hedge_rate": hedged / self.stats["requests"] if self.stats["requests"] else 0.0,
+            "hedge_win_rate": self.stats["hedge_wins"] / hedged if hedged else 0.0,
+            **self.stats
+        }
@@ -0,0 +1,236 @@
+from typing import Dict, Optional, Any, List, Union
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from encryption import encrypt_data, decrypt_data
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """같은 요청의 응답을 암호화하여 디스크에 보관하는 로컬 응답 캐시
+
+    키는 모델, 시스템 프롬프트, 정규화된 메시지, temperature, max_tokens의 해시이며,
+    항목마다 파일 하나(<키>.cache)에 응답 텍스트 조각을 암호화하여 저장합니다.
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제하고,
+    ttl이 지난 항목은 조회 시 삭제합니다. 파일 수정 시각을 마지막 사용 시각으로
+    사용하므로 재시작 후에도 사용 순서가 유지됩니다. get과 put은 이벤트 루프 밖의
+    여러 스레드에서 호출될 수 있으며, 색인과 파일 접근은 잠금으로 보호하고 암호화와
+    복호화는 잠금 밖에서 합니다.
+    싱글톤 패턴을 사용하여 전역적인 접근을 제공합니다.
+    """
+
+    _instance: Optional['ResponseCache'] = None
+
+    CACHE_DIR = "response_cache"
+    SUFFIX = ".cache"
+
+    @classmethod
+    def get_instance(cls) -> 'ResponseCache':
+        """싱글톤 인스턴스 반환"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 max_bytes: int = 50 * 1024 * 1024,
+                 ttl: float = 7 * 24 * 3600):
+        """
+        ResponseCache 인스턴스를 초기화합니다. 디렉토리는 처음 사용할 때 읽습니다.
+
+        Args:
+            directory: 캐시 파일을 저장할 디렉토리
+            max_bytes: 캐시 파일 전체 크기 한도(바이트)
+            ttl: 항목 유효 기간(초)
+        """
+        self.directory = directory or self.CACHE_DIR
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # 키 -> 파일 크기 (마지막 사용 순서, 가장 오래된 항목이 앞)
+        self._entries: Optional['OrderedDict[str, int]'] = None
+        self.total_bytes = 0
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    def configure(self,
+                  directory: Optional[str] = None,
+                  max_bytes: Optional[int] = None,
+                  ttl: Optional[float] = None) -> None:
+        """
+        설정을 변경합니다. 지정하지 않은 항목은 유지됩니다.
+
+        Args:
+            directory: 캐시 파일을 저장할 디렉토리 (변경하면 색인을 다시 읽음)
+            max_bytes: 캐시 파일 전체 크기 한도(바이트)
+            ttl: 항목 유효 기간(초)
+        """
+        with self._lock:
+            if directory is not None and directory != self.directory:
+                self.directory = directory
+                self._entries = None
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if ttl is not None:
+                self.ttl = ttl
+            if self._entries is not None:
+                self._evict()
+
+    @staticmethod
+    def _normalize_content(content: Union[str, List[Dict]]) -> List[Dict]:
+        """메시지 내용을 캐시 표시가 없는 블록 목록으로 바꿉니다."""
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        blocks = []
+        for block in content:
+            block = {key: value for key, value in block.items() if key != "cache_control"}
+            if block.get("type") == "text":
+                block["text"] = block["text"].strip()
+            blocks.append(block)
+        return blocks
+
+    @classmethod
+    def fingerprint(cls, request: Dict[str, Any]) -> str:
+        """
+        요청의 캐시 키를 계산합니다.
+
+        문자열 내용과 텍스트 블록, 프롬프트 캐시 브레이크포인트 유무, 앞뒤 공백의
+        차이는 같은 요청으로 봅니다.
+
+        Args:
+            request: messages API 요청 인자
+
+        Returns:
+            str: SHA-256 16진수 문자열
+        """
+        system = request.get("system") or ""
+        if isinstance(system, list):
+            system = "\n\n".join(block["text"] for block in system if block.get("type") == "text")
+        normalized = {
+            "model": request["model"],
+            "system": system.strip(),
+            "messages": [
+                {"role": message["role"], "content": cls._normalize_content(message["content"])}
+                for message in request["messages"]
+            ],
+            "temperature": request.get("temperature"),
+            "max_tokens": request.get("max_tokens")
+        }
+        encoded = json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.SUFFIX}")
+
+    @property
+    def entries(self) -> 'OrderedDict[str, int]':
+        """캐시 색인. 처음 접근할 때 디렉토리를 읽어 마지막 사용 순서대로 구성합니다."""
+        if self._entries is None:
+            os.makedirs(self.directory, exist_ok=True)
+            found = []
+            for filename in os.listdir(self.directory):
+                if not filename.endswith(self.SUFFIX):
+                    continue
+                stat = os.stat(os.path.join(self.directory, filename))
+                found.append((stat.st_mtime, filename[:-len(self.SUFFIX)], stat.st_size))
+            self._entries = OrderedDict((key, size) for _, key, size in sorted(found))
+            self.total_bytes = sum(self._entries.values())
+        return self._entries
+
+    def _remove(self, key: str) -> None:
+        """항목을 색인과 디스크에서 삭제합니다."""
+        self.total_bytes -= self.entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """전체 크기가 한도 안에 들어올 때까지 가장 오래 사용하지 않은 항목을 삭제합니다."""
+        while self.entries and self.total_bytes > self.max_bytes:
+            key = next(iter(self.entries))
+            self._remove(key)
+            self.stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 응답을 조회합니다.
+
+        Args:
+            key: fingerprint()로 계산한 키
+
+        Returns:
+            Optional[Dict[str, Any]]: {"chunks", "model", "created_at"} (없거나 만료되었으면 None)
+        """
+        try:
+            with self._lock:
+                if key not in self.entries:
+                    self.stats["misses"] += 1
+                    return None
+                with open(self._path(key), 'rb') as f:
+                    data = f.read()
+            entry = json.loads(decrypt_data(data))
+        except Exception as e:
+            logger.warning(f"Dropping unreadable response cache entry {key[:12]}: {str(e)}")
+            with self._lock:
+                self._remove(key)
+                self.stats["misses"] += 1
+            return None
+
+        with self._lock:
+            if time.time() - entry["created_at"] > self.ttl:
+                self._remove(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            # 읽는 동안 다른 스레드가 삭제했을 수 있음
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                os.utime(self._path(key))
+            self.stats["hits"] += 1
+        return entry
+
+    def put(self, key: str, chunks: List[str], model: str) -> None:
+        """
+        응답을 캐시에 저장합니다. 한도를 넘으면 오래된 항목을 삭제합니다.
+
+        Args:
+            key: fingerprint()로 계산한 키
+            chunks: 스트리밍으로 받은 텍스트 조각 (재생할 때 같은 단위로 전달)
+            model: 응답한 모델
+        """
+        data = encrypt_data(json.dumps({"chunks": chunks, "model": model, "created_at": time.time()}))
+        if len(data) > self.max_bytes:
+            logger.debug(f"Response of {len(data)} bytes exceeds the cache size budget; not cached")
+            return
+
+        with self._lock:
+            self._remove(key)
+            with open(self._path(key), 'wb') as f:
+                f.write(data)
+            self.entries[key] = len(data)
+            self.total_bytes += len(data)
+            self.stats["stores"] += 1
+            self._evict()
+
+    def clear(self) -> None:
+        """모든 항목을 삭제합니다."""
+        with self._lock:
+            for key in list(self.entries):
+                self._remove(key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """적중률과 크기 통계"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            **self.stats
+        }
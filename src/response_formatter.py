@@ -1,9 +1,20 @@
 # src/response_formatter.py
 
 import re
+from typing import List, Optional
 from pygments import highlight
 from pygments.lexers import get_lexer_by_name
+from pygments.lexer import Lexer
 from pygments.formatters import TerminalFormatter
+from pygments.util import ClassNotFound
+
+CODE_FENCE = re.compile(r"^\s*```([\w+#.-]+)?\s*$")
+
+def _format_inline(text: str) -> str:
+    """굵게/기울임 마크다운을 ANSI 이스케이프로 변환합니다."""
+    text = re.sub(r'\*\*(.*?)\*\*', '\033[1m\\1\033[0m', text)  # 볼드 처리
+    text = re.sub(r'\*(.*?)\*', '\033[3m\\1\033[0m', text)  # 이탤릭 처리
+    return text
 
 def format_response(response: str) -> str:
     """
@@ -22,7 +33,60 @@ def format_response(response: str) -> str:
     response = re.sub(r'```(\w+)?\n([\s\S]+?)\n```', replace_code_block, response)
 
     # 간단한 마크다운 처리
-    response = re.sub(r'\*\*(.*?)\*\*', '\033[1m\\1\033[0m', response)  # 볼드 처리
-    response = re.sub(r'\*(.*?)\*', '\033[3m\\1\033[0m', response)  # 이탤릭 처리
+    return _format_inline(response)
+
+class StreamingFormatter:
+    """
+    스트리밍 응답을 도착하는 대로 포맷팅합니다.
+    - 완성된 줄 단위로 출력하며, 코드 블록 안의 줄은 바로 구문 강조합니다.
+    - 코드 블록 구분선(```)은 출력하지 않습니다.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._lexer: Optional[Lexer] = None
+        self._formatter = TerminalFormatter()
+
+    @staticmethod
+    def _get_lexer(language: Optional[str]) -> Lexer:
+        """언어 이름에 맞는 lexer (알 수 없으면 일반 텍스트)"""
+        try:
+            return get_lexer_by_name(language or 'text')
+        except ClassNotFound:
+            return get_lexer_by_name('text')
+
+    def _format_line(self, line: str) -> str:
+        """완성된 한 줄을 포맷팅합니다."""
+        fence = CODE_FENCE.match(line)
+        if fence:
+            self._lexer = None if self._lexer is not None else self._get_lexer(fence.group(1))
+            return ""
+        if self._lexer is not None:
+            return highlight(line + "\n", self._lexer, self._formatter)
+        return _format_inline(line) + "\n"
+
+    def feed(self, delta: str) -> str:
+        """
+        응답 조각을 추가하고 출력할 수 있게 된 부분을 반환합니다.
+
+        Args:
+            delta: 새로 도착한 응답 조각
+
+        Returns:
+            str: 포맷팅된 완성 줄 (없으면 빈 문자열)
+        """
+        lines: List[str] = (self._buffer + delta).split("\n")
+        self._buffer = lines.pop()
+        return "".join(self._format_line(line) for line in lines)
+
+    def flush(self) -> str:
+        """
+        남아 있는 마지막 줄을 포맷팅하여 반환하고 상태를 초기화합니다.
 
-    return response
\ No newline at end of file
+        Returns:
+            str: 포맷팅된 나머지 텍스트
+        """
+        rest = self._format_line(self._buffer).rstrip("\n") if self._buffer else ""
+        self._buffer = ""
+        self._lexer = None
+        return rest
\ No newline at end of file
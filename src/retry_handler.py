@@ -1,72 +1,436 @@
 import asyncio
 import time
-from typing import Callable, Any, Dict, Type, Optional, Union
+from typing import Callable, Any, Dict, Type, Optional, Union, List, Tuple
+from dataclasses import dataclass, asdict, replace
 from functools import wraps
 import logging
 import random
-from anthropic import APIError
+from anthropic import APIError, APIConnectionError, APITimeoutError
+from rate_limiter import retry_after_seconds
+from concurrency_controller import ConcurrencyController, is_overload_error
+from events import EventEmitter, Event, UIEventType, UIEventData
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class RetryPolicy:
+    """오류 종류별 재시도 정책
+
+    값이 None인 항목은 RetryHandler의 기본값을 사용합니다.
+    """
+    retryable: bool = True
+    max_attempts: Optional[int] = None
+    base_delay: Optional[float] = None
+    max_delay: Optional[float] = None
+    honor_retry_after: bool = True
+
+# 재시도하지 않는 오류 (400, 401, 403, 404, 413 등 요청 자체의 문제)
+NO_RETRY = RetryPolicy(retryable=False)
+
+@dataclass
+class RetryAttempt:
+    """시도 하나의 결과 (리스너에 전달되는 구조화된 이벤트)
+
+    outcome은 "success", "retry", "gave_up" 중 하나이고, gave_up의 reason은
+    "non_retryable", "max_attempts", "deadline", "budget", "circuit_open", "fail_fast" 중 하나입니다.
+    """
+    attempt: int
+    outcome: str
+    elapsed: float
+    error_type: Optional[str] = None
+    status_code: Optional[int] = None
+    message: Optional[str] = None
+    delay: Optional[float] = None
+    reason: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON으로 변환 가능한 딕셔너리"""
+        return asdict(self)
+
+class RetryBudget:
+    """재시도가 장애 중에 부하를 몇 배로 늘리지 않도록 제한하는 예산
+
+    예산은 capacity만큼 채워진 상태로 시작하고, 새 요청마다 ratio만큼 채워지며,
+    재시도 한 번마다 1씩 줄어듭니다. 예산을 다 쓰면 재시도 비율은 ratio로 제한됩니다.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10.0):
+        """
+        RetryBudget 인스턴스를 초기화합니다.
+
+        Args:
+            ratio: 요청 하나당 채워지는 재시도 수
+            capacity: 모아 둘 수 있는 최대 재시도 수
+        """
+        self.ratio = ratio
+        self.capacity = capacity
+        self.balance = capacity
+
+    def deposit(self) -> None:
+        """새 요청 시작 시 예산을 채웁니다."""
+        self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """재시도 한 번을 위한 예산을 사용합니다. 부족하면 False"""
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+class CircuitOpenError(Exception):
+    """회로 차단기가 열려 있어 요청을 보내지 않고 바로 실패한 경우"""
+
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(
+            f"Anthropic API is unavailable after repeated failures; "
+            f"requests are paused for {retry_in:.0f}s"
+        )
+
+class CircuitBreaker:
+    """API 엔드포인트 장애 시 요청을 바로 실패시키는 회로 차단기
+
+    연속 실패(5xx, 529, 연결 오류, 타임아웃)가 failure_threshold 번 쌓이면 열리고(open),
+    cooldown 동안 새 요청을 CircuitOpenError로 바로 실패시킵니다. cooldown이 지나면
+    반열림(half_open) 상태에서 요청 하나만 탐색 요청으로 보내고, 성공하면 닫히고(closed)
+    실패하면 cooldown을 두 배로 늘려 다시 열립니다. 서버가 응답한 4xx는 엔드포인트가
+    동작 중이라는 뜻이므로 성공으로 봅니다.
+    싱글톤 인스턴스는 설정과 이벤트 발행자를 보관하며, for_model()이 반환하는 모델별
+    차단기는 상태만 따로 두고 설정과 이벤트 발행자는 매번 싱글톤에서 읽습니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _instance: Optional['CircuitBreaker'] = None
+    # 모델 이름 -> 모델별 차단기
+    _models: Dict[str, 'CircuitBreaker'] = {}
+
+    @classmethod
+    def get_instance(cls) -> 'CircuitBreaker':
+        """싱글톤 인스턴스 반환"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def for_model(cls, model: str) -> 'CircuitBreaker':
+        """
+        모델별 차단기를 반환합니다. 싱글톤의 configure()와 event_emitter 변경은
+        이미 만든 차단기에도 적용됩니다.
+
+        Args:
+            model: 모델 이름
+
+        Returns:
+            CircuitBreaker: 해당 모델의 차단기
+        """
+        breaker = cls._models.get(model)
+        if breaker is None:
+            breaker = cls(name=model, shared_settings=True)
+            cls._models[model] = breaker
+        return breaker
+
+    @classmethod
+    def snapshots(cls) -> Dict[str, Dict[str, Any]]:
+        """모델별 차단기 상태"""
+        return {model: breaker.snapshot() for model, breaker in cls._models.items()}
+
+    def __init__(self,
+                 failure_threshold: int = 5,
+                 cooldown: float = 30.0,
+                 max_cooldown: float = 300.0,
+                 event_emitter: Optional[EventEmitter] = None,
+                 name: Optional[str] = None,
+                 shared_settings: bool = False):
+        """
+        CircuitBreaker 인스턴스를 초기화합니다.
+
+        Args:
+            failure_threshold: 회로를 여는 연속 실패 횟수
+            cooldown: 열린 뒤 탐색 요청을 보내기까지 기다릴 시간(초)
+            max_cooldown: 탐색 요청이 계속 실패할 때 늘어나는 cooldown의 최대치(초)
+            event_emitter: 상태 변경을 CIRCUIT_STATE 이벤트로 알릴 이벤트 발행자
+            name: 이벤트와 로그에 표시할 이름 (모델별 차단기의 모델 이름)
+            shared_settings: True이면 위 설정 대신 싱글톤의 설정과 이벤트 발행자를 사용
+        """
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.event_emitter = event_emitter
+        self.name = name
+        self._shared_settings = shared_settings
+        self.state = self.CLOSED
+        self.failures = 0
+        self.cooldown = self.settings.base_cooldown
+        self.opened_until = 0.0
+        self._probe_in_flight = False
+        self.stats = {"opened": 0, "rejected": 0}
+
+    def configure(self,
+                  failure_threshold: Optional[int] = None,
+                  cooldown: Optional[float] = None,
+                  max_cooldown: Optional[float] = None) -> None:
+        """
+        설정을 변경합니다. 지정하지 않은 항목은 유지됩니다.
+
+        Args:
+            failure_threshold: 회로를 여는 연속 실패 횟수
+            cooldown: 열린 뒤 탐색 요청을 보내기까지 기다릴 시간(초)
+            max_cooldown: cooldown의 최대치(초)
+        """
+        if failure_threshold is not None:
+            self.failure_threshold = failure_threshold
+        if cooldown is not None:
+            self.base_cooldown = cooldown
+            self.cooldown = cooldown
+        if max_cooldown is not None:
+            self.max_cooldown = max_cooldown
+
+    @property
+    def settings(self) -> 'CircuitBreaker':
+        """설정과 이벤트 발행자를 읽을 차단기 (모델별 차단기는 싱글톤)"""
+        return type(self).get_instance() if self._shared_settings else self
+
+    @staticmethod
+    def is_failure(error: BaseException) -> bool:
+        """엔드포인트 장애로 볼 오류인지 확인 (429는 속도 제한이므로 제외)"""
+        return is_overload_error(error) and getattr(error, 'status_code', None) != 429
+
+    def _transition(self, state: str) -> None:
+        """상태를 바꾸고 이벤트를 발행합니다."""
+        previous, self.state = self.state, state
+        logger.warning(f"Circuit breaker{f' for {self.name}' if self.name else ''} {previous} -> {state}")
+        event_emitter = self.settings.event_emitter
+        if event_emitter is not None:
+            event_emitter.emit(Event(
+                UIEventType.CIRCUIT_STATE.value,
+                UIEventData.circuit_state(
+                    state,
+                    previous=previous,
+                    model=self.name,
+                    failures=self.failures,
+                    retry_in=max(0.0, self.opened_until - time.monotonic()) if state == self.OPEN else 0.0
+                )
+            ))
+
+    def _open(self) -> None:
+        """회로를 열고 cooldown 뒤에 탐색 요청을 허용합니다."""
+        self.opened_until = time.monotonic() + self.cooldown
+        self.stats["opened"] += 1
+        self._transition(self.OPEN)
+
+    def before_request(self) -> bool:
+        """
+        요청을 보내기 전에 호출합니다. 회로가 열려 있으면 바로 실패합니다.
+
+        Returns:
+            bool: 이 요청이 반열림 상태의 탐색 요청이면 True
+
+        Raises:
+            CircuitOpenError: 회로가 열려 있거나 다른 탐색 요청이 진행 중인 경우
+        """
+        if self.state == self.OPEN:
+            remaining = self.opened_until - time.monotonic()
+            if remaining > 0:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(remaining)
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.cooldown)
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record(self, error: Optional[BaseException], probe: bool) -> None:
+        """
+        요청 결과를 기록합니다.
+
+        Args:
+            error: 요청에서 발생한 예외 (성공했으면 None)
+            probe: before_request()의 반환값
+        """
+        if isinstance(error, asyncio.CancelledError):
+            # 취소는 엔드포인트 상태와 무관
+            self.abandon(probe)
+            return
+        if probe:
+            self._probe_in_flight = False
+
+        if error is None or not self.is_failure(error):
+            self.failures = 0
+            if self.state != self.CLOSED and (probe or self.state == self.HALF_OPEN):
+                self.cooldown = self.settings.base_cooldown
+                self._transition(self.CLOSED)
+            return
+
+        self.failures += 1
+        if probe:
+            self.cooldown = min(self.settings.max_cooldown, self.cooldown * 2)
+            self._open()
+        elif self.state == self.CLOSED and self.failures >= self.settings.failure_threshold:
+            # 닫힌 상태에서 처음 열 때는 현재 설정의 cooldown부터 시작
+            self.cooldown = self.settings.base_cooldown
+            self._open()
+
+    def abandon(self, probe: bool) -> None:
+        """
+        결과를 기록하지 않고 요청을 마칩니다. 엔드포인트 상태를 알 수 없는 경우
+        (취소, 로컬 대기 중 마감 시간 초과)에 사용하며, 탐색 요청이었으면 다음 요청이
+        다시 탐색할 수 있게 합니다.
+
+        Args:
+            probe: before_request()의 반환값
+        """
+        if probe:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 상태와 통계"""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": max(0.0, self.opened_until - time.monotonic()) if self.state == self.OPEN else 0.0,
+            **self.stats
+        }
+
 class RetryHandler:
-    """API 호출 재시도 및 에러 처리를 담당하는 클래스"""
-    
-    def __init__(self, 
-                 max_retries: int = 3, 
+    """API 호출 재시도 및 에러 처리를 담당하는 클래스
+
+    재시도 여부와 대기 시간은 오류 종류별 RetryPolicy로 결정합니다. 정책은 상태 코드
+    (예: 429), 상태 코드 계열(예: "5xx"), 오류 분류("connection", "timeout")를 키로
+    하는 딕셔너리에서 찾으며, 정책이 없는 오류는 재시도하지 않습니다.
+    """
+
+    def __init__(self,
+                 max_retries: int = 3,
                  base_delay: float = 1.0,
                  max_delay: float = 60.0,
-                 exponential_base: float = 2.0):
+                 exponential_base: float = 2.0,
+                 concurrency_controller: Optional[ConcurrencyController] = None,
+                 deadline: Optional[float] = None,
+                 budget_ratio: Optional[float] = None,
+                 budget_capacity: float = 10.0,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
         """
         RetryHandler 인스턴스를 초기화합니다.
 
         Args:
-            max_retries (int): 최대 재시도 횟수
+            max_retries (int): 최대 시도 횟수 (정책에 지정되지 않은 경우)
             base_delay (float): 기본 대기 시간(초)
             max_delay (float): 최대 대기 시간(초)
             exponential_base (float): 지수 백오프의 기본값
+            concurrency_controller (Optional[ConcurrencyController]): 설정하면 async_retry의
+                각 시도를 이 제어기의 동시 요청 한도 안에서 실행
+            deadline (Optional[float]): async_retry 호출 하나에 허용할 전체 시간(초).
+                백오프 대기 시간을 포함하며, None이면 제한하지 않음
+            budget_ratio (Optional[float]): 설정하면 요청 하나당 이 비율만큼만 재시도하도록
+                RetryBudget으로 제한
+            budget_capacity (float): 재시도 예산의 최대치
+            circuit_breaker (Optional[CircuitBreaker]): 설정하면 async_retry의 각 시도 전에
+                회로 상태를 확인하고 결과를 기록
         """
         self.max_retries = max_retries
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.exponential_base = exponential_base
+        self.concurrency_controller = concurrency_controller
+        self.circuit_breaker = circuit_breaker
+        self.deadline = deadline
+        self.budget = RetryBudget(budget_ratio, budget_capacity) if budget_ratio is not None else None
         self.error_handlers: Dict[Type[Exception], Callable] = {}
-        
-        # 기본 에러 핸들러 등록
-        self._register_default_handlers()
-        
+        self.policies: Dict[Union[int, str], RetryPolicy] = {}
+        self._listeners: List[Callable[[RetryAttempt], None]] = []
+
+        # 기본 재시도 정책 등록
+        self._register_default_policies()
+
         logger.info(f"RetryHandler initialized with max_retries={max_retries}, "
-                   f"base_delay={base_delay}, max_delay={max_delay}")
-
-    def _register_default_handlers(self):
-        """기본 에러 핸들러들을 등록합니다."""
-        def handle_api_rate_limit(error: APIError, attempt: int):
-            """API 속도 제한 에러 처리"""
-            logger.warning(f"Rate limit exceeded (attempt {attempt + 1}/{self.max_retries}). "
-                         f"Waiting before retry...")
-
-        def handle_api_server_error(error: APIError, attempt: int):
-            """API 서버 에러 처리"""
-            logger.error(f"Server error occurred (attempt {attempt + 1}/{self.max_retries}): "
-                        f"{str(error)}")
-
-        def handle_network_error(error: Exception, attempt: int):
-            """네트워크 관련 에러 처리"""
-            logger.warning(f"Network error occurred (attempt {attempt + 1}/{self.max_retries}): "
-                         f"{str(error)}")
-
-        self.register_error_handler(APIError, handle_api_rate_limit, 
-                                  error_codes=[429])
-        self.register_error_handler(APIError, handle_api_server_error, 
-                                  error_codes=[500, 502, 503, 504])
-        self.register_error_handler((ConnectionError, TimeoutError), 
-                                  handle_network_error)
-
-    def register_error_handler(self, 
+                   f"base_delay={base_delay}, max_delay={max_delay}, deadline={deadline}")
+
+    def _register_default_policies(self):
+        """기본 재시도 정책들을 등록합니다."""
+        # 속도 제한과 과부하는 서버가 알려준 retry-after를 따름
+        self.set_policy(429, RetryPolicy())
+        self.set_policy(529, RetryPolicy(base_delay=max(self.base_delay, 2.0)))
+        # 요청 시간 초과와 충돌은 바로 다시 보내도 되는 일시적인 오류
+        self.set_policy(408, RetryPolicy())
+        self.set_policy(409, RetryPolicy())
+        self.set_policy("5xx", RetryPolicy())
+        self.set_policy("connection", RetryPolicy())
+        self.set_policy("timeout", RetryPolicy())
+
+    def set_policy(self, key: Union[int, str], policy: RetryPolicy) -> None:
+        """
+        오류 종류에 재시도 정책을 지정합니다.
+
+        Args:
+            key: 상태 코드(예: 503), 상태 코드 계열(예: "5xx"), "connection" 또는 "timeout"
+            policy: 적용할 정책 (재시도하지 않으려면 NO_RETRY)
+        """
+        self.policies[key] = policy
+
+    @staticmethod
+    def _error_keys(error: Exception) -> Tuple[Union[int, str], ...]:
+        """정책 조회에 사용할 키 (구체적인 것부터)"""
+        if isinstance(error, (APITimeoutError, TimeoutError)):
+            return ("timeout",)
+        if isinstance(error, (APIConnectionError, ConnectionError)):
+            return ("connection",)
+        status_code = getattr(error, 'status_code', None) if isinstance(error, APIError) else None
+        if isinstance(status_code, int):
+            return (status_code, f"{status_code // 100}xx")
+        return ()
+
+    def policy_for(self, error: Exception) -> RetryPolicy:
+        """
+        오류에 적용할 재시도 정책을 찾습니다.
+
+        Args:
+            error: 발생한 예외 객체
+
+        Returns:
+            RetryPolicy: 적용할 정책 (등록된 정책이 없으면 NO_RETRY)
+        """
+        for key in self._error_keys(error):
+            policy = self.policies.get(key)
+            if policy is not None:
+                return policy
+        return NO_RETRY
+
+    def add_listener(self, listener: Callable[[RetryAttempt], None]) -> None:
+        """
+        시도 결과 이벤트를 받을 함수를 등록합니다.
+
+        Args:
+            listener: RetryAttempt를 인자로 받는 함수
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[RetryAttempt], None]) -> None:
+        """등록된 리스너를 제거합니다."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, attempt: RetryAttempt) -> None:
+        """시도 결과를 리스너들에게 전달합니다."""
+        for listener in list(self._listeners):
+            try:
+                listener(attempt)
+            except Exception as e:
+                logger.error(f"Retry listener failed: {str(e)}")
+
+    def register_error_handler(self,
                              error_type: Union[Type[Exception], tuple],
                              handler: Callable,
                              error_codes: Optional[list] = None) -> None:
         """
-        특정 에러 타입에 대한 핸들러를 등록합니다.
+        특정 에러 타입에 대한 핸들러를 등록합니다. 핸들러는 오류 알림용이며
+        재시도 여부에는 영향을 주지 않습니다 (set_policy 참고).
 
         Args:
             error_type: 처리할 예외 타입 또는 타입들의 튜플
@@ -79,14 +443,24 @@ class RetryHandler:
                 if hasattr(error, 'status_code') and error.status_code in error_codes:
                     return original_handler(error, attempt)
             handler = code_specific_handler
-            
-        self.error_handlers[error_type] = handler
+
+        for single_type in (error_type if isinstance(error_type, tuple) else (error_type,)):
+            self.error_handlers[single_type] = handler
         logger.debug(f"Registered error handler for {error_type}")
 
-    def calculate_delay(self, 
-                       attempt: int, 
+    def _run_error_handler(self, error: Exception, attempt: int) -> None:
+        """예외 타입에 가장 가까운 핸들러를 실행합니다."""
+        for error_type in type(error).__mro__:
+            handler = self.error_handlers.get(error_type)
+            if handler is not None:
+                handler(error, attempt)
+                return
+
+    def calculate_delay(self,
+                       attempt: int,
                        error: Optional[Exception] = None,
-                       jitter: bool = True) -> float:
+                       jitter: bool = True,
+                       policy: Optional[RetryPolicy] = None) -> float:
         """
         재시도 대기 시간을 계산합니다.
 
@@ -94,26 +468,29 @@ class RetryHandler:
             attempt: 현재 시도 횟수
             error: 발생한 예외 객체
             jitter: 무작위성 추가 여부
+            policy: 적용할 재시도 정책 (None이면 오류로 찾음)
 
         Returns:
             float: 계산된 대기 시간(초)
         """
+        if policy is None:
+            policy = self.policy_for(error) if error is not None else RetryPolicy()
+        base_delay = policy.base_delay if policy.base_delay is not None else self.base_delay
+        max_delay = policy.max_delay if policy.max_delay is not None else self.max_delay
+
         # 기본 지수 백오프 계산
-        delay = min(
-            self.base_delay * (self.exponential_base ** attempt),
-            self.max_delay
-        )
-        
-        # API 속도 제한의 경우 서버가 제공하는 대기 시간 사용
-        if isinstance(error, APIError) and error.status_code == 429:
-            retry_after = getattr(error, 'retry_after', None)
-            if retry_after:
-                delay = float(retry_after)
+        delay = min(base_delay * (self.exponential_base ** attempt), max_delay)
 
         # 지터 추가
         if jitter:
             delay *= (0.5 + random.random())
-            
+
+        # 서버가 응답 헤더로 대기 시간을 알려준 경우 그 시간 이상 기다림
+        if error is not None and policy.honor_retry_after:
+            retry_after = retry_after_seconds(error)
+            if retry_after:
+                delay = max(delay, retry_after)
+
         return delay
 
     def is_retryable_error(self, error: Exception) -> bool:
@@ -126,81 +503,155 @@ class RetryHandler:
         Returns:
             bool: 재시도 가능하면 True, 아니면 False
         """
-        # API 에러 처리
-        if isinstance(error, APIError):
-            return error.status_code in [429, 500, 502, 503, 504]
-            
-        # 네트워크 관련 에러 처리
-        if isinstance(error, (ConnectionError, TimeoutError)):
-            return True
-            
-        # 에러 핸들러가 등록된 에러 타입 처리
-        for error_type in self.error_handlers:
-            if isinstance(error, error_type):
-                return True
-                
-        return False
+        return self.policy_for(error).retryable
+
+    def _plan_retry(self,
+                    error: Exception,
+                    attempt: int,
+                    max_attempts: Optional[int],
+                    deadline: Optional[float],
+                    now: float,
+                    base_delay: Optional[float] = None,
+                    fail_fast: Optional[Callable[[Exception], bool]] = None) -> Tuple[Optional[float], Optional[str]]:
+        """
+        실패한 시도 다음에 재시도할지 결정합니다.
+
+        Args:
+            error: 발생한 예외 객체
+            attempt: 실패한 시도 번호 (0부터)
+            max_attempts: 호출자가 지정한 최대 시도 횟수
+            deadline: 전체 마감 시각 (time.monotonic 기준)
+            now: 현재 시각 (time.monotonic 기준)
+            base_delay: 정책 대신 사용할 기본 대기 시간(초)
+            fail_fast: 참을 반환하면 재시도하지 않을 오류 판별 함수
 
-    async def async_retry(self, 
-                         func: Callable, 
-                         *args, 
+        Returns:
+            Tuple[Optional[float], Optional[str]]: (대기 시간, None) 또는 (None, 포기 이유)
+        """
+        if isinstance(error, CircuitOpenError):
+            return None, "circuit_open"
+        if fail_fast is not None and fail_fast(error):
+            return None, "fail_fast"
+        policy = self.policy_for(error)
+        if not policy.retryable:
+            return None, "non_retryable"
+
+        attempts = max_attempts or policy.max_attempts or self.max_retries
+        if attempt + 1 >= attempts:
+            return None, "max_attempts"
+
+        if base_delay is not None:
+            policy = replace(policy, base_delay=base_delay)
+        delay = self.calculate_delay(attempt, error=error, policy=policy)
+        if deadline is not None and now + delay >= deadline:
+            return None, "deadline"
+        if self.budget is not None and not self.budget.try_withdraw():
+            return None, "budget"
+        return delay, None
+
+    @staticmethod
+    def _attempt_event(attempt: int, outcome: str, started: float,
+                       error: Optional[Exception] = None, **kwargs) -> RetryAttempt:
+        """시도 결과 이벤트 생성"""
+        return RetryAttempt(
+            attempt=attempt + 1,
+            outcome=outcome,
+            elapsed=time.monotonic() - started,
+            error_type=type(error).__name__ if error is not None else None,
+            status_code=getattr(error, 'status_code', None) if error is not None else None,
+            message=str(error) if error is not None else None,
+            **kwargs
+        )
+
+    async def async_retry(self,
+                         func: Callable,
+                         *args,
                          custom_max_retries: Optional[int] = None,
+                         deadline: Optional[float] = None,
+                         circuit_breaker: Optional[CircuitBreaker] = None,
+                         fail_fast: Optional[Callable[[Exception], bool]] = None,
                          **kwargs) -> Any:
         """
         비동기 함수에 대한 재시도 로직을 구현합니다.
+        동시 요청 제어기가 설정되어 있으면 각 시도는 그 한도 안에서 실행되고,
+        백오프 대기 중에는 자리를 차지하지 않습니다. 마감 시간이 있으면 시도와
+        백오프를 합친 전체 시간이 그 안에 끝나며, 남은 시간보다 긴 대기는 하지 않습니다.
 
         Args:
             func: 실행할 비동기 함수
             *args: 함수에 전달할 위치 인자
-            custom_max_retries: 이 호출에 대한 커스텀 최대 재시도 횟수
+            custom_max_retries: 이 호출에 대한 커스텀 최대 시도 횟수
+            deadline: 이 호출에 허용할 전체 시간(초). None이면 핸들러 기본값
+            circuit_breaker: 이 호출에 사용할 회로 차단기. None이면 핸들러 기본값
+            fail_fast: 참을 반환하는 오류는 재시도하지 않고 바로 전파 (예: 대체 모델로 넘길 오류)
             **kwargs: 함수에 전달할 키워드 인자
 
         Returns:
             Any: 함수의 실행 결과
 
         Raises:
-            Exception: 모든 재시도가 실패했을 때 마지막으로 발생한 예외
+            Exception: 재시도를 포기했을 때 마지막으로 발생한 예외
         """
-        max_retries = custom_max_retries or self.max_retries
-        last_error = None
-        
-        for attempt in range(max_retries):
+        started = time.monotonic()
+        breaker = circuit_breaker if circuit_breaker is not None else self.circuit_breaker
+        timeout = deadline if deadline is not None else self.deadline
+        deadline_at = started + timeout if timeout is not None else None
+        if self.budget is not None:
+            self.budget.deposit()
+
+        attempt = 0
+        while True:
             try:
-                return await func(*args, **kwargs)
-                
+                result = await self._attempt(func, args, kwargs, deadline_at, breaker)
+                self._emit(self._attempt_event(attempt, "success", started))
+                return result
+
             except Exception as e:
-                last_error = e
-                
-                # 에러 핸들러 실행
-                for error_type, handler in self.error_handlers.items():
-                    if isinstance(e, error_type):
-                        handler(e, attempt)
-                        break
-                
-                # 재시도 불가능한 에러면 즉시 종료
-                if not self.is_retryable_error(e):
-                    logger.error(f"Non-retryable error occurred: {str(e)}")
+                self._run_error_handler(e, attempt)
+                delay, reason = self._plan_retry(e, attempt, custom_max_retries, deadline_at,
+                                                 time.monotonic(), fail_fast=fail_fast)
+                if reason is not None:
+                    self._emit(self._attempt_event(attempt, "gave_up", started, e, reason=reason))
+                    logger.error(f"Giving up after attempt {attempt + 1} ({reason}): {str(e)}")
                     raise
 
-                if attempt == max_retries - 1:
-                    logger.error(f"All retry attempts failed: {str(e)}")
-                    raise last_error
-
-                # 대기 시간 계산 및 대기
-                delay = self.calculate_delay(attempt, error=e)
+                self._emit(self._attempt_event(attempt, "retry", started, e, delay=delay))
                 logger.info(f"Waiting {delay:.2f} seconds before retry...")
                 await asyncio.sleep(delay)
-        
-        raise last_error
+                attempt += 1
 
-    def retry(self, 
+    async def _attempt(self, func: Callable, args: tuple, kwargs: Dict[str, Any],
+                       deadline_at: Optional[float], breaker: Optional[CircuitBreaker]) -> Any:
+        """회로 차단기, 마감 시간, 동시 요청 한도 안에서 한 번 시도합니다."""
+        probe = breaker.before_request() if breaker is not None else False
+        timeout = asyncio.timeout(None if deadline_at is None else deadline_at - time.monotonic())
+        try:
+            async with timeout:
+                if self.concurrency_controller is not None:
+                    result = await self.concurrency_controller.run(func, *args, **kwargs)
+                else:
+                    result = await func(*args, **kwargs)
+        except BaseException as e:
+            if breaker is not None:
+                if timeout.expired():
+                    # 마감 시간은 동시 요청 슬롯과 속도 제한 대기에도 쓰이므로,
+                    # 클라이언트 측 대기만으로 회로가 열리지 않도록 장애로 세지 않음
+                    breaker.abandon(probe)
+                else:
+                    breaker.record(e, probe)
+            raise
+        if breaker is not None:
+            breaker.record(None, probe)
+        return result
+
+    def retry(self,
               custom_max_retries: Optional[int] = None,
               custom_base_delay: Optional[float] = None) -> Callable:
         """
         동기 함수에 대한 재시도 데코레이터를 제공합니다.
 
         Args:
-            custom_max_retries: 커스텀 최대 재시도 횟수
+            custom_max_retries: 커스텀 최대 시도 횟수
             custom_base_delay: 커스텀 기본 대기 시간
 
         Returns:
@@ -209,43 +660,32 @@ class RetryHandler:
         def decorator(func: Callable) -> Callable:
             @wraps(func)
             def wrapper(*args, **kwargs) -> Any:
-                max_retries = custom_max_retries or self.max_retries
-                base_delay = custom_base_delay or self.base_delay
-                last_error = None
-                
-                for attempt in range(max_retries):
+                started = time.monotonic()
+                deadline_at = started + self.deadline if self.deadline is not None else None
+                if self.budget is not None:
+                    self.budget.deposit()
+
+                attempt = 0
+                while True:
                     try:
-                        return func(*args, **kwargs)
-                        
+                        result = func(*args, **kwargs)
+                        self._emit(self._attempt_event(attempt, "success", started))
+                        return result
+
                     except Exception as e:
-                        last_error = e
-                        
-                        # 에러 핸들러 실행
-                        for error_type, handler in self.error_handlers.items():
-                            if isinstance(e, error_type):
-                                handler(e, attempt)
-                                break
-                        
-                        # 재시도 불가능한 에러면 즉시 종료
-                        if not self.is_retryable_error(e):
-                            logger.error(f"Non-retryable error occurred: {str(e)}")
+                        self._run_error_handler(e, attempt)
+                        delay, reason = self._plan_retry(e, attempt, custom_max_retries, deadline_at,
+                                                         time.monotonic(), base_delay=custom_base_delay)
+                        if reason is not None:
+                            self._emit(self._attempt_event(attempt, "gave_up", started, e, reason=reason))
+                            logger.error(f"Giving up after attempt {attempt + 1} ({reason}): {str(e)}")
                             raise
 
-                        if attempt == max_retries - 1:
-                            logger.error(f"All retry attempts failed: {str(e)}")
-                            raise last_error
-
-                        # 대기 시간 계산 및 대기
-                        delay = self.calculate_delay(
-                            attempt, 
-                            error=e, 
-                            jitter=True
-                        )
+                        self._emit(self._attempt_event(attempt, "retry", started, e, delay=delay))
                         logger.info(f"Waiting {delay:.2f} seconds before retry...")
                         time.sleep(delay)
-                
-                raise last_error
-                
+                        attempt += 1
+
             return wrapper
         return decorator
 
@@ -259,4 +699,4 @@ class RetryHandler:
         Returns:
             Callable: 재시도 로직이 추가된 래퍼 함수
         """
-        return self.retry()(func)
\ No newline at end of file
+        return self.retry()(func)
@@ -0,0 +1,346 @@
+from typing import Dict, Optional, Any, List
+from concurrent.futures import Executor, Future
+from dataclasses import asdict
+import json
+import logging
+import os
+import threading
+
+from encryption import encrypt_payload, decrypt_payload
+
+logger = logging.getLogger(__name__)
+
+class SessionJournal:
+    """세션 하나의 스냅샷 파일(<이름>.enc)과 추가 전용 저널 파일(<이름>.journal)
+
+    저장할 때는 마지막 저장 이후 바뀐 부분(새 메시지, 컨텍스트, 사용량 합계 등)만
+    레코드 하나로 암호화하여 저널 끝에 한 줄로 덧붙이므로, 저장 비용이 대화 길이와
+    무관합니다. 저널이 커지면 백그라운드에서 전체 상태를 새 스냅샷으로 쓰고 저널에서
+    스냅샷에 반영된 레코드를 잘라냅니다.
+
+    레코드마다 순번(seq)이 있고 스냅샷은 반영한 마지막 순번을 기록하므로, 압축 도중
+    중단되어도 불러올 때 스냅샷 이후의 레코드만 다시 적용합니다. 마지막 줄이 기록
+    도중 끊겼으면 그 줄부터 잘라내고 앞의 레코드까지 복구합니다.
+
+    레코드 형식:
+        {"seq", "op": "messages", "start", "messages"}   messages[start:]를 교체
+        {"seq", "op": "state", "context", "last_active", "usage_totals",
+         "usage_records", ["summary"]}                    세션 상태 갱신
+    """
+
+    # 저널이 이 크기와 스냅샷 크기 * COMPACT_RATIO를 모두 넘으면 압축
+    COMPACT_MIN_BYTES = 1024 * 1024
+    COMPACT_RATIO = 0.5
+
+    def __init__(self, snapshot_path: str):
+        """
+        SessionJournal 인스턴스를 초기화합니다.
+
+        Args:
+            snapshot_path: 스냅샷 파일 경로 (저널은 확장자를 .journal로 바꾼 경로)
+        """
+        self._set_paths(snapshot_path)
+        self._lock = threading.Lock()
+        # append 전체를 직렬화 (자동 저장 스레드와 호출자가 동시에 저장할 수 있음)
+        self._append_lock = threading.Lock()
+        self.seq = 0
+        self.journal_bytes = 0
+        self.snapshot_bytes = 0
+        self._compacting = False
+        self._deleted = False
+        # 마지막으로 기록한 세션 상태 (변경 여부를 비교하기 위한 참조)
+        self._messages: List[Any] = []
+        self._summary: Any = None
+        self._context: Optional[str] = None
+        self._last_active: Optional[str] = None
+        self._usage_totals: Optional[Dict[str, Any]] = None
+        self._usage_records: List[Any] = []
+        self._last_record: Any = None
+
+    def _set_paths(self, snapshot_path: str) -> None:
+        self.snapshot_path = snapshot_path
+        self.journal_path = f"{os.path.splitext(snapshot_path)[0]}.journal"
+
+    def exists(self) -> bool:
+        """스냅샷이나 저널이 디스크에 있는지 여부"""
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        스냅샷을 읽고 그 이후의 저널 레코드를 적용한 세션 데이터를 반환합니다.
+
+        Returns:
+            Optional[Dict[str, Any]]: 스냅샷 형식의 세션 데이터 (파일이 없으면 None)
+        """
+        if not self.exists():
+            return None
+
+        data: Dict[str, Any] = {"messages": [], "summary": None, "usage": None}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'rb') as f:
+                encrypted = f.read()
+            data = json.loads(decrypt_payload(encrypted))
+            self.snapshot_bytes = len(encrypted)
+        self.seq = data.get("journal_seq", 0)
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb') as f:
+                raw = f.read()
+            valid_end = 0
+            for line in raw.split(b"\n")[:-1]:
+                try:
+                    record = json.loads(decrypt_payload(line))
+                except Exception as e:
+                    logger.warning(f"Journal {self.journal_path} has an unreadable record at byte "
+                                   f"{valid_end}; dropping the tail: {str(e)}")
+                    break
+                valid_end += len(line) + 1
+                if record["seq"] <= self.seq:
+                    continue
+                self._apply(data, record)
+                self.seq = record["seq"]
+                replayed += 1
+
+            if valid_end < len(raw):
+                # 끊긴 마지막 레코드 뒤에 이어 쓰지 않도록 잘라냄
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(valid_end)
+            self.journal_bytes = valid_end
+
+        if replayed:
+            logger.info(f"Replayed {replayed} journal record(s) for {self.snapshot_path}")
+        return data
+
+    @staticmethod
+    def _apply(data: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """레코드 하나를 세션 데이터에 적용합니다."""
+        if record["op"] == "messages":
+            data["messages"] = data["messages"][:record["start"]] + record["messages"]
+        elif record["op"] == "state":
+            data["context"] = record["context"]
+            data["last_active"] = record["last_active"]
+            if "summary" in record:
+                data["summary"] = record["summary"]
+            usage = data.get("usage") or {"records": []}
+            usage["records"] = usage.get("records", []) + record["usage_records"]
+            usage.update(record["usage_totals"])
+            data["usage"] = usage
+
+    def attach(self, session, last_active: Optional[str] = None) -> None:
+        """
+        불러오거나 새로 만든 세션의 현재 상태를 이미 기록된 상태로 표시합니다.
+
+        Args:
+            session: 이 저널에 저장할 ChatSession
+            last_active: 기록된 마지막 활성 시간 (ISO 형식)
+        """
+        self._last_active = last_active
+        self._messages = list(session.messages)
+        self._summary = session.summary
+        self._context = session.context_manager.active_context
+        self._usage_records = list(session.usage_ledger.records)
+        self._last_record = self._usage_records[-1] if self._usage_records else None
+        self._usage_totals = self._totals_of(session.usage_ledger)
+
+    @staticmethod
+    def _totals_of(ledger) -> Dict[str, Any]:
+        return {
+            "totals": dict(ledger.totals),
+            "totals_by_model": {model: dict(totals) for model, totals in ledger.totals_by_model.items()}
+        }
+
+    def _changed_messages(self, messages: List[Any]) -> int:
+        """
+        마지막 기록 이후 바뀌기 시작한 메시지 위치를 찾습니다. 메시지는 끝에서만
+        추가/제거되므로 같은 객체가 남아 있는 위치까지 뒤에서부터 비교합니다.
+        """
+        start = min(len(messages), len(self._messages))
+        while start > 0 and messages[start - 1] is not self._messages[start - 1]:
+            start -= 1
+        return start
+
+    def _new_usage_records(self, records: List[Any]) -> List[Any]:
+        """마지막으로 기록한 사용량 기록 이후의 기록"""
+        if self._last_record is None:
+            return list(records)
+        for index in range(len(records) - 1, -1, -1):
+            if records[index] is self._last_record:
+                return records[index + 1:]
+        # 마지막 기록이 잘려 나갔으면 남은 기록은 모두 새 기록
+        return list(records)
+
+    def append(self, session, last_active: str) -> int:
+        """
+        마지막 저장 이후 바뀐 부분을 저널에 추가합니다.
+
+        Args:
+            session: 저장할 ChatSession
+            last_active: 마지막 활성 시간 (ISO 형식)
+
+        Returns:
+            int: 추가한 레코드 수 (바뀐 것이 없으면 0)
+        """
+        with self._append_lock:
+            if self._deleted:
+                return 0
+            return self._append(session, last_active)
+
+    def _append(self, session, last_active: str) -> int:
+        # 다른 스레드에서 세션이 바뀌어도 기록한 내용과 비교 기준이 어긋나지 않도록 복사본 사용
+        messages = list(session.messages)
+        usage_records = list(session.usage_ledger.records)
+        summary = session.summary
+        records = []
+        start = self._changed_messages(messages)
+        if start < len(messages) or len(messages) != len(self._messages):
+            records.append({"op": "messages", "start": start,
+                            "messages": [msg.__dict__ for msg in messages[start:]]})
+
+        ledger = session.usage_ledger
+        context = session.context_manager.active_context
+        usage_totals = self._totals_of(ledger)
+        summary_changed = summary is not self._summary
+        if (summary_changed or context != self._context or last_active != self._last_active
+                or usage_totals != self._usage_totals):
+            new_usage = self._new_usage_records(usage_records)
+            state = {"op": "state", "context": context, "last_active": last_active,
+                     "usage_totals": usage_totals, "usage_records": [asdict(entry) for entry in new_usage]}
+            if summary_changed:
+                state["summary"] = summary
+            records.append(state)
+
+        if not records:
+            return 0
+
+        with self._lock:
+            lines = []
+            for record in records:
+                self.seq += 1
+                lines.append(encrypt_payload(json.dumps({"seq": self.seq, **record})) + b"\n")
+            data = b"".join(lines)
+            with open(self.journal_path, 'ab') as f:
+                f.write(data)
+            self.journal_bytes += len(data)
+
+        del self._messages[start:]
+        self._messages.extend(messages[start:])
+        self._summary = summary
+        self._context = context
+        self._last_active = last_active
+        self._usage_totals = usage_totals
+        self._usage_records = usage_records
+        self._last_record = usage_records[-1] if usage_records else None
+        return len(records)
+
+    def needs_compaction(self) -> bool:
+        """저널이 스냅샷으로 합칠 만큼 커졌는지 여부"""
+        if self._compacting:
+            return False
+        return self.journal_bytes >= max(self.COMPACT_MIN_BYTES, self.snapshot_bytes * self.COMPACT_RATIO)
+
+    def compact(self, data: Dict[str, Any], seq: Optional[int] = None, offset: Optional[int] = None) -> None:
+        """
+        전체 세션 데이터를 새 스냅샷으로 쓰고 저널에서 반영된 레코드를 잘라냅니다.
+
+        스냅샷을 쓰는 동안 추가된 레코드는 새 저널에 그대로 남습니다.
+
+        Args:
+            data: seq번 레코드까지 반영된 스냅샷 형식의 세션 데이터
+            seq: data에 반영된 마지막 레코드 순번 (None이면 현재 순번)
+            offset: seq번 레코드가 끝나는 저널 위치 (None이면 현재 저널 크기)
+        """
+        if seq is None:
+            with self._lock:
+                seq, offset = self.seq, self.journal_bytes
+        self._compacting = True
+        try:
+            encrypted = encrypt_payload(json.dumps({**data, "journal_seq": seq}))
+            self._write_atomic(self.snapshot_path, encrypted)
+            self.snapshot_bytes = len(encrypted)
+
+            with self._lock:
+                tail = b""
+                if os.path.exists(self.journal_path):
+                    with open(self.journal_path, 'rb') as f:
+                        f.seek(offset)
+                        tail = f.read()
+                if tail:
+                    self._write_atomic(self.journal_path, tail)
+                elif os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
+                self.journal_bytes = len(tail)
+            logger.info(f"Compacted journal into {self.snapshot_path} at seq {seq}")
+        finally:
+            self._compacting = False
+
+    def _written_data(self, name: str) -> Dict[str, Any]:
+        """마지막으로 저널에 기록한 세션 상태 (스냅샷 형식, 메시지 목록은 복사본)"""
+        usage = None
+        if self._usage_totals is not None:
+            usage = {"records": [asdict(entry) for entry in self._usage_records], **self._usage_totals}
+        return {
+            "name": name,
+            "messages": [dict(msg.__dict__) for msg in self._messages],
+            "context": self._context,
+            "summary": self._summary,
+            "usage": usage,
+            "last_active": self._last_active
+        }
+
+    def compact_in_background(self, name: str, executor: Executor) -> Future:
+        """
+        저널에 기록된 상태를 캡처하고 암호화와 파일 쓰기는 executor에서 실행합니다.
+
+        세션의 현재 상태가 아니라 마지막으로 기록한 상태를 쓰므로, 아직 저널에 없는
+        변경이 스냅샷에 들어갔다가 다음 append에서 한 번 더 기록되는 일이 없습니다.
+
+        Args:
+            name: 세션 이름
+            executor: 압축을 실행할 executor
+
+        Returns:
+            Future: 압축 작업
+        """
+        # append가 레코드를 쓰고 기록 상태를 갱신하는 도중에 캡처하지 않도록 함
+        with self._append_lock, self._lock:
+            self._compacting = True
+            data, seq, offset = self._written_data(name), self.seq, self.journal_bytes
+        future = executor.submit(self.compact, data, seq, offset)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def _log_failure(self, future: Future) -> None:
+        error = future.exception()
+        if error is not None:
+            self._compacting = False
+            logger.error(f"Journal compaction failed for {self.snapshot_path}: {str(error)}")
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        """임시 파일에 쓴 뒤 교체하여 기존 파일이 반쯤 쓰인 상태로 남지 않도록 합니다."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def rename(self, snapshot_path: str) -> None:
+        """스냅샷과 저널 파일의 경로를 바꿉니다."""
+        with self._lock:
+            old_snapshot, old_journal = self.snapshot_path, self.journal_path
+            self._set_paths(snapshot_path)
+            for old, new in ((old_snapshot, self.snapshot_path), (old_journal, self.journal_path)):
+                if os.path.exists(old):
+                    os.rename(old, new)
+
+    def delete(self) -> None:
+        """스냅샷과 저널 파일을 삭제합니다. 이후의 append는 아무것도 쓰지 않습니다."""
+        with self._append_lock, self._lock:
+            self._deleted = True
+            for path in (self.snapshot_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.journal_bytes = 0
+            self.snapshot_bytes = 0
@@ -0,0 +1,109 @@
+from typing import Dict, Optional, Any
+from dataclasses import dataclass, asdict, field
+import json
+import logging
+import os
+import threading
+
+from encryption import encrypt_payload, decrypt_payload
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ManifestEntry:
+    """세션 파일을 열지 않고 목록과 정보를 보여주기 위한 세션 요약"""
+    name: str
+    message_count: int = 0
+    last_active: Optional[str] = None
+    context: Optional[str] = None
+    size: int = 0  # 스냅샷과 저널 파일 크기의 합 (파일이 바뀌었는지 확인하는 데 사용)
+    usage: Dict[str, Any] = field(default_factory=dict)  # {"totals", "totals_by_model"}
+
+class SessionManifest:
+    """저장 디렉토리의 모든 세션 요약을 담은 암호화된 색인 파일 (sessions.manifest)
+
+    세션을 저장할 때마다 해당 항목이 갱신되며, 시작할 때는 이 파일 하나만 복호화하여
+    세션 목록을 만듭니다. 파일 크기가 기록과 다른 세션(색인 갱신 전에 종료된 경우)은
+    호출자가 세션을 다시 읽어 항목을 고쳐야 합니다.
+    """
+
+    FILENAME = "sessions.manifest"
+
+    def __init__(self, storage_dir: str):
+        """
+        SessionManifest 인스턴스를 초기화합니다.
+
+        Args:
+            storage_dir: 세션 저장 디렉토리
+        """
+        self.path = os.path.join(storage_dir, self.FILENAME)
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """
+        색인 파일을 읽습니다.
+
+        Returns:
+            bool: 읽었으면 True (파일이 없거나 손상되었으면 False, 항목은 비워짐)
+        """
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'rb') as f:
+                data = json.loads(decrypt_payload(f.read()))
+            self.entries = {entry["name"]: ManifestEntry(**entry) for entry in data["sessions"]}
+            return True
+        except Exception as e:
+            logger.warning(f"Session manifest is unreadable and will be rebuilt: {str(e)}")
+            return False
+
+    def save(self) -> None:
+        """색인 파일을 원자적으로 다시 씁니다."""
+        with self._lock:
+            payload = json.dumps({"sessions": [asdict(entry) for entry in self.entries.values()]})
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(encrypt_payload(payload))
+            os.replace(temp_path, self.path)
+
+    def update(self, entry: ManifestEntry) -> bool:
+        """
+        항목을 추가하거나 바꿉니다.
+
+        Returns:
+            bool: 내용이 바뀌었으면 True
+        """
+        with self._lock:
+            if self.entries.get(entry.name) == entry:
+                return False
+            self.entries[entry.name] = entry
+            return True
+
+    def set_size(self, name: str, size: int) -> bool:
+        """
+        항목의 파일 크기를 갱신합니다 (백그라운드 압축 후).
+
+        Returns:
+            bool: 내용이 바뀌었으면 True
+        """
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None or entry.size == size:
+                return False
+            entry.size = size
+            return True
+
+    def remove(self, name: str) -> None:
+        """항목을 삭제합니다."""
+        with self._lock:
+            self.entries.pop(name, None)
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        """항목의 이름을 바꿉니다."""
+        with self._lock:
+            entry = self.entries.pop(old_name, None)
+            if entry is not None:
+                entry.name = new_name
+                self.entries[new_name] = entry
@@ -0,0 +1,34 @@
+from .base import SessionStore
+from .file_store import FileSessionStore
+from .sqlite_store import SQLiteSessionStore
+
+# 설정의 storage_backend 값 -> 저장소 클래스
+BACKENDS = {
+    'file': FileSessionStore,
+    'sqlite': SQLiteSessionStore
+}
+
+def create_store(backend: str, storage_dir: str) -> SessionStore:
+    """
+    설정 이름으로 세션 저장소를 만듭니다.
+
+    Args:
+        backend: 'file' 또는 'sqlite'
+        storage_dir: 세션 저장 디렉토리
+
+    Returns:
+        SessionStore: 저장소 인스턴스
+
+    Raises:
+        ValueError: 알 수 없는 저장소 이름인 경우
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[backend](storage_dir)
+
+__all__ = [
+    'SessionStore',
+    'FileSessionStore',
+    'SQLiteSessionStore',
+    'create_store'
+]
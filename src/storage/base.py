@@ -0,0 +1,136 @@
+from typing import Dict, Optional, Any, List
+from abc import ABC, abstractmethod
+
+from session_manifest import ManifestEntry
+
+class SessionStore(ABC):
+    """ConversationManager가 세션을 저장하는 저장소 인터페이스
+
+    구현은 세션마다 마지막으로 저장한 상태를 기억하고(attach/save) save에서 바뀐
+    부분만 씁니다. entries는 세션을 불러오지 않고 목록과 정보를 보여주기 위한 세션
+    요약이며, save 후 update_entry로 갱신하고 commit으로 저장소에 반영합니다.
+
+    자동 저장 스레드와 병렬 저장 때문에 서로 다른 세션에 대한 호출은 여러 스레드에서
+    동시에 들어올 수 있습니다. 같은 세션에 대한 호출은 ConversationManager가
+    직렬화합니다.
+    """
+
+    @property
+    @abstractmethod
+    def entries(self) -> Dict[str, ManifestEntry]:
+        """저장된 세션의 요약 (이름 -> 항목)"""
+
+    @abstractmethod
+    def open(self) -> None:
+        """저장된 세션 목록과 요약을 읽습니다. 세션 내용은 읽지 않습니다."""
+
+    @abstractmethod
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        세션 전체 데이터를 읽습니다.
+
+        Args:
+            name: 세션 이름
+
+        Returns:
+            Optional[Dict[str, Any]]: {"messages", "context", "summary", "usage", "last_active"}
+                (저장된 세션이 없으면 None)
+        """
+
+    @abstractmethod
+    def attach(self, name: str, session, last_active: Optional[str]) -> None:
+        """
+        불러오거나 새로 만든 세션의 현재 상태를 이미 저장된 상태로 표시합니다.
+
+        Args:
+            name: 세션 이름
+            session: ChatSession
+            last_active: 저장된 마지막 활성 시간 (ISO 형식)
+        """
+
+    @abstractmethod
+    def save(self, name: str, session, last_active: str) -> int:
+        """
+        마지막 저장 이후 바뀐 부분을 씁니다.
+
+        Args:
+            name: 세션 이름
+            session: 저장할 ChatSession
+            last_active: 마지막 활성 시간 (ISO 형식)
+
+        Returns:
+            int: 쓴 레코드(행) 수 (바뀐 것이 없으면 0)
+        """
+
+    @abstractmethod
+    def update_entry(self, name: str, session, last_active: str) -> bool:
+        """
+        메모리에 있는 세션으로 요약 항목을 갱신합니다 (commit 전까지 반영되지 않을 수 있음).
+
+        Returns:
+            bool: 내용이 바뀌었으면 True
+        """
+
+    def commit(self) -> None:
+        """save와 update_entry로 쌓인 변경 사항을 저장소에 반영합니다."""
+
+    def compact(self, name: str, session, last_active: str) -> None:
+        """세션 저장 공간을 정리합니다 (지원하지 않는 저장소는 아무것도 하지 않음)."""
+
+    def release(self, name: str) -> None:
+        """메모리에서 내린 세션의 저장 상태를 버립니다."""
+
+    @abstractmethod
+    def rename(self, old_name: str, new_name: str) -> None:
+        """저장된 세션의 이름을 바꿉니다."""
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        """저장된 세션을 삭제합니다."""
+
+    @abstractmethod
+    def get_messages(self, name: str, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        저장된 메시지 일부를 읽습니다.
+
+        Args:
+            name: 세션 이름
+            start: 첫 메시지 위치
+            stop: 마지막 메시지 다음 위치 (None이면 끝까지)
+
+        Returns:
+            List[Dict[str, Any]]: {"role", "content", "metadata"} 목록
+        """
+
+    @abstractmethod
+    def count_messages(self, name: str, role: Optional[str] = None) -> int:
+        """
+        저장된 메시지 수를 셉니다.
+
+        Args:
+            name: 세션 이름
+            role: 이 역할의 메시지만 셈 (None이면 전체)
+        """
+
+    def close(self) -> None:
+        """백그라운드 작업을 마치고 저장소를 닫습니다."""
+
+    @staticmethod
+    def usage_totals(ledger) -> Dict[str, Any]:
+        """사용량 장부의 누적 합계 (개별 기록 제외)"""
+        return {
+            "totals": dict(ledger.totals),
+            "totals_by_model": {model: dict(totals) for model, totals in ledger.totals_by_model.items()}
+        }
+
+    @classmethod
+    def summarize(cls, name: str, session, last_active: str, size: int = 0) -> ManifestEntry:
+        """메모리에 있는 세션의 요약 항목"""
+        return ManifestEntry(
+            name=name,
+            message_count=len(session.messages),
+            last_active=last_active,
+            context=session.context_manager.active_context,
+            size=size,
+            usage=cls.usage_totals(session.usage_ledger)
+        )
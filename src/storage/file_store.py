@@ -0,0 +1,182 @@
+from typing import Dict, Optional, Any, List
+from concurrent.futures import ThreadPoolExecutor, Future
+import logging
+import os
+import threading
+
+from session_journal import SessionJournal
+from session_manifest import SessionManifest, ManifestEntry
+from .base import SessionStore
+
+logger = logging.getLogger(__name__)
+
+class FileSessionStore(SessionStore):
+    """세션마다 스냅샷(<이름>.enc)과 추가 전용 저널(<이름>.journal)을 두는 파일 저장소
+
+    save는 바뀐 부분만 저널에 덧붙이고, 저널이 커지면 백그라운드 스레드에서
+    스냅샷으로 합칩니다. 세션 요약은 암호화된 색인 파일(sessions.manifest)에 두며,
+    open은 색인만 읽고 파일 크기가 색인과 다른 세션만 다시 읽어 항목을 고칩니다.
+    파일 형식에는 색인이 없으므로 get_messages와 역할별 count_messages는 세션 전체를
+    복호화합니다.
+    """
+
+    def __init__(self, storage_dir: str):
+        """
+        FileSessionStore 인스턴스를 초기화합니다.
+
+        Args:
+            storage_dir: 세션 파일을 저장할 디렉토리
+        """
+        self.storage_dir = storage_dir
+        self.journals: Dict[str, SessionJournal] = {}
+        self.manifest = SessionManifest(storage_dir)
+        self._lock = threading.Lock()
+        self._index_changed = False
+        self._compaction_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal-compaction")
+
+    @property
+    def entries(self) -> Dict[str, ManifestEntry]:
+        return self.manifest.entries
+
+    def _session_path(self, name: str) -> str:
+        """세션 스냅샷 파일 경로"""
+        return os.path.join(self.storage_dir, f"{name}.enc")
+
+    def _journal(self, name: str) -> SessionJournal:
+        """세션의 저널 (처음 사용할 때 생성)"""
+        with self._lock:
+            journal = self.journals.get(name)
+            if journal is None:
+                journal = SessionJournal(self._session_path(name))
+                self.journals[name] = journal
+            return journal
+
+    def _stored_size(self, name: str) -> int:
+        """디스크에 있는 세션 파일 크기의 합"""
+        journal = SessionJournal(self._session_path(name))
+        return sum(os.path.getsize(path) for path in (journal.snapshot_path, journal.journal_path)
+                   if os.path.exists(path))
+
+    def open(self) -> None:
+        if not os.path.exists(self.storage_dir):
+            os.makedirs(self.storage_dir)
+
+        self.manifest.load()
+        # 스냅샷 없이 저널만 있는 세션도 포함
+        stored = {
+            os.path.splitext(filename)[0] for filename in os.listdir(self.storage_dir)
+            if filename.endswith(('.enc', '.journal'))
+        }
+        changed = False
+        for name in list(self.manifest.entries):
+            if name not in stored:
+                self.manifest.remove(name)
+                changed = True
+
+        for name in sorted(stored):
+            entry = self.manifest.entries.get(name)
+            if entry is not None and entry.size == self._stored_size(name):
+                continue
+            # 색인 갱신 전에 종료되었거나 색인 도입 전의 세션
+            journal = SessionJournal(self._session_path(name))
+            try:
+                data = journal.load()
+            except Exception as e:
+                logger.error(f"Failed to index session '{name}': {str(e)}")
+                continue
+            usage = data.get("usage") or {}
+            self.manifest.update(ManifestEntry(
+                name=name,
+                message_count=len(data["messages"]),
+                last_active=data.get("last_active"),
+                context=data.get("context"),
+                size=journal.snapshot_bytes + journal.journal_bytes,
+                usage={"totals": usage.get("totals", {}), "totals_by_model": usage.get("totals_by_model", {})}
+            ))
+            changed = True
+
+        if changed:
+            self.manifest.save()
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        journal = SessionJournal(self._session_path(name))
+        data = journal.load()
+        if data is not None:
+            with self._lock:
+                self.journals[name] = journal
+        return data
+
+    def attach(self, name: str, session, last_active: Optional[str]) -> None:
+        self._journal(name).attach(session, last_active)
+
+    def save(self, name: str, session, last_active: str) -> int:
+        journal = self._journal(name)
+        records = journal.append(session, last_active)
+        if journal.needs_compaction():
+            self._compact_in_background(name)
+        return records
+
+    def update_entry(self, name: str, session, last_active: str) -> bool:
+        journal = self._journal(name)
+        changed = self.manifest.update(
+            self.summarize(name, session, last_active, journal.snapshot_bytes + journal.journal_bytes)
+        )
+        if changed:
+            self._index_changed = True
+        return changed
+
+    def commit(self) -> None:
+        if self._index_changed:
+            self._index_changed = False
+            self.manifest.save()
+
+    def compact(self, name: str, session, last_active: str) -> None:
+        """저널을 즉시 스냅샷으로 합칩니다."""
+        self._compact_in_background(name).result()
+
+    def _compact_in_background(self, name: str) -> Future:
+        """저널 압축을 예약하고, 끝나면 색인의 파일 크기를 갱신합니다."""
+        journal = self._journal(name)
+        future = journal.compact_in_background(name, self._compaction_executor)
+
+        def update_size(done: Future) -> None:
+            if done.exception() is None and self.manifest.set_size(
+                    name, journal.snapshot_bytes + journal.journal_bytes):
+                self.manifest.save()
+
+        future.add_done_callback(update_size)
+        return future
+
+    def release(self, name: str) -> None:
+        with self._lock:
+            self.journals.pop(name, None)
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        journal = self._journal(old_name)
+        journal.rename(self._session_path(new_name))
+        with self._lock:
+            self.journals[new_name] = self.journals.pop(old_name)
+        self.manifest.rename(old_name, new_name)
+        self.manifest.save()
+
+    def delete(self, name: str) -> None:
+        self._journal(name).delete()
+        self.release(name)
+        if name in self.manifest.entries:
+            self.manifest.remove(name)
+            self.manifest.save()
+
+    def get_messages(self, name: str, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        data = SessionJournal(self._session_path(name)).load()
+        if data is None:
+            raise FileNotFoundError(f"Session file for '{name}' not found")
+        return data["messages"][start:stop]
+
+    def count_messages(self, name: str, role: Optional[str] = None) -> int:
+        entry = self.manifest.entries.get(name)
+        if role is None and entry is not None:
+            return entry.message_count
+        return sum(1 for message in self.get_messages(name) if role is None or message["role"] == role)
+
+    def close(self) -> None:
+        self._compaction_executor.shutdown(wait=True)
@@ -0,0 +1,409 @@
+from typing import Dict, Optional, Any, List
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from encryption import encrypt_payload, decrypt_payload
+from session_manifest import ManifestEntry
+from .base import SessionStore
+from .file_store import FileSessionStore
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _SavedState:
+    """세션별로 마지막으로 쓴 상태 (변경 여부를 비교하기 위한 참조)"""
+    messages: List[Any] = field(default_factory=list)
+    summary: Any = None
+    context: Optional[str] = None
+    last_active: Optional[str] = None
+    usage_totals: Optional[Dict[str, Any]] = None
+    last_record: Any = None
+    record_count: int = 0
+
+class SQLiteSessionStore(SessionStore):
+    """세션과 메시지를 행으로 저장하는 SQLite 저장소 (<storage_dir>/sessions.db)
+
+    메시지는 행마다 내용과 메타데이터를 따로 암호화하고, 세션 이름, 위치, 역할,
+    작성 시각(메타데이터의 created_at)은 평문 열로 두어 색인으로 조회합니다. 따라서 세션 전체를 복호화하지
+    않고도 메시지 일부를 읽거나 역할별로 셀 수 있습니다. 세션 목록과 요약은
+    sessions 테이블에서 바로 읽습니다.
+
+    WAL 모드를 사용하며, save는 commit할 때까지 한 트랜잭션에 모아서 씁니다
+    (세션마다 SAVEPOINT를 두어 실패한 세션만 되돌림). 연결 하나를 잠금으로
+    공유하므로 쓰기는 직렬화됩니다.
+
+    데이터베이스를 처음 만들 때 같은 디렉토리에 파일 저장소 세션(*.enc, *.journal)이
+    있으면 가져옵니다. 원래 파일은 지우지 않습니다.
+    """
+
+    FILENAME = "sessions.db"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            name TEXT PRIMARY KEY,
+            last_active TEXT,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            context TEXT,
+            usage BLOB,
+            state BLOB
+        );
+        CREATE TABLE IF NOT EXISTS messages (
+            session TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            PRIMARY KEY (session, position)
+        );
+        CREATE TABLE IF NOT EXISTS usage_records (
+            session TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            PRIMARY KEY (session, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_messages_session_role ON messages (session, role);
+        CREATE INDEX IF NOT EXISTS idx_messages_session_timestamp ON messages (session, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_sessions_last_active ON sessions (last_active);
+    """
+
+    def __init__(self, storage_dir: str, filename: Optional[str] = None):
+        """
+        SQLiteSessionStore 인스턴스를 초기화합니다. 데이터베이스는 open에서 엽니다.
+
+        Args:
+            storage_dir: 데이터베이스 파일을 둘 디렉토리
+            filename: 데이터베이스 파일 이름 (기본 sessions.db)
+        """
+        self.storage_dir = storage_dir
+        self.path = os.path.join(storage_dir, filename or self.FILENAME)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._saved: Dict[str, _SavedState] = {}
+        # 현재 트랜잭션에서 저장한 세션 (commit 실패 시 다음 저장에서 전체를 다시 씀)
+        self._pending: set = set()
+
+    @property
+    def entries(self) -> Dict[str, ManifestEntry]:
+        return self._entries
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.storage_dir, exist_ok=True)
+            # 트랜잭션은 직접 관리 (isolation_level=None)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    @staticmethod
+    def _encrypt(value: Any) -> bytes:
+        return encrypt_payload(json.dumps(value))
+
+    @staticmethod
+    def _decrypt(value: bytes) -> Any:
+        return json.loads(decrypt_payload(value))
+
+    @classmethod
+    def _message_row(cls, name: str, position: int, message: Dict[str, Any],
+                     last_active: Optional[str]) -> tuple:
+        """
+        messages 테이블의 행. timestamp 열에는 메시지를 만든 시각을 쓰고, 이 값이 없는
+        이전 메시지는 세션의 마지막 활성 시간을 씁니다.
+        """
+        metadata = message.get("metadata")
+        timestamp = (metadata or {}).get("created_at") or last_active or datetime.now().isoformat()
+        return (name, position, message["role"], timestamp,
+                cls._encrypt({"content": message["content"], "metadata": metadata}))
+
+    def _import_file_sessions(self) -> int:
+        """
+        파일 저장소 세션을 새 데이터베이스로 가져옵니다. 읽지 못한 세션은 건너뜁니다.
+
+        Returns:
+            int: 가져온 세션 수
+        """
+        files = FileSessionStore(self.storage_dir)
+        names = sorted({
+            os.path.splitext(filename)[0] for filename in os.listdir(self.storage_dir)
+            if filename.endswith(('.enc', '.journal'))
+        })
+        imported = 0
+        conn = self.conn
+        conn.execute("BEGIN")
+        try:
+            for name in names:
+                try:
+                    data = files.load(name)
+                except Exception as e:
+                    logger.error(f"Failed to import session '{name}': {str(e)}")
+                    continue
+                if data is None:
+                    continue
+                last_active = data.get("last_active")
+                usage = data.get("usage") or {}
+                conn.execute(
+                    "INSERT INTO sessions (name, last_active, message_count, context, usage, state) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, last_active, len(data["messages"]), data.get("context"),
+                     self._encrypt({"totals": usage.get("totals", {}),
+                                    "totals_by_model": usage.get("totals_by_model", {})}),
+                     self._encrypt({"summary": data.get("summary")}))
+                )
+                conn.executemany("INSERT INTO messages VALUES (?, ?, ?, ?, ?)", [
+                    self._message_row(name, position, message, last_active)
+                    for position, message in enumerate(data["messages"])
+                ])
+                conn.executemany("INSERT INTO usage_records VALUES (?, ?, ?)", [
+                    (name, position, self._encrypt(record))
+                    for position, record in enumerate(usage.get("records", []))
+                ])
+                imported += 1
+            conn.execute("COMMIT")
+        except Exception:
+            # 다음 시작 때 다시 가져오도록 빈 데이터베이스를 남기지 않음
+            conn.execute("ROLLBACK")
+            conn.close()
+            self._conn = None
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+            raise
+        finally:
+            files.close()
+        if names:
+            logger.info(f"Imported {imported}/{len(names)} file session(s) into {self.path}")
+        return imported
+
+    def open(self) -> None:
+        with self._lock:
+            if not os.path.exists(self.path) and os.path.isdir(self.storage_dir):
+                self._import_file_sessions()
+            rows = self.conn.execute(
+                "SELECT name, last_active, message_count, context, usage FROM sessions"
+            ).fetchall()
+        self._entries = {
+            name: ManifestEntry(name=name, message_count=count, last_active=last_active, context=context,
+                                usage=self._decrypt(usage) if usage else {})
+            for name, last_active, count, context, usage in rows
+        }
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_active, context, usage, state FROM sessions WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return None
+            messages = self.conn.execute(
+                "SELECT role, payload FROM messages WHERE session = ? ORDER BY position", (name,)
+            ).fetchall()
+            records = self.conn.execute(
+                "SELECT payload FROM usage_records WHERE session = ? ORDER BY position", (name,)
+            ).fetchall()
+
+        last_active, context, usage, state = row
+        state = self._decrypt(state) if state else {}
+        usage = self._decrypt(usage) if usage else {}
+        usage["records"] = [self._decrypt(payload) for (payload,) in records]
+        return {
+            "name": name,
+            "messages": [{"role": role, **self._decrypt(payload)} for role, payload in messages],
+            "context": context,
+            "summary": state.get("summary"),
+            "usage": usage,
+            "last_active": last_active
+        }
+
+    def attach(self, name: str, session, last_active: Optional[str]) -> None:
+        records = session.usage_ledger.records
+        self._saved[name] = _SavedState(
+            messages=list(session.messages),
+            summary=session.summary,
+            context=session.context_manager.active_context,
+            last_active=last_active,
+            usage_totals=self.usage_totals(session.usage_ledger),
+            last_record=records[-1] if records else None,
+            record_count=len(records)
+        )
+
+    @staticmethod
+    def _changed_messages(messages: List[Any], saved: List[Any]) -> int:
+        """
+        마지막 저장 이후 바뀌기 시작한 메시지 위치. 메시지는 끝에서만 추가/제거되므로
+        같은 객체가 남아 있는 위치까지 뒤에서부터 비교합니다.
+        """
+        start = min(len(messages), len(saved))
+        while start > 0 and messages[start - 1] is not saved[start - 1]:
+            start -= 1
+        return start
+
+    def save(self, name: str, session, last_active: str) -> int:
+        # 다른 스레드에서 세션이 바뀌어도 기록한 내용과 비교 기준이 어긋나지 않도록 복사본 사용
+        messages = list(session.messages)
+        records = list(session.usage_ledger.records)
+        summary = session.summary
+        context = session.context_manager.active_context
+        usage_totals = self.usage_totals(session.usage_ledger)
+        saved = self._saved.get(name)
+
+        if saved is None:
+            # 처음 저장하거나 이전 트랜잭션이 실패한 세션은 전체를 다시 씀
+            start, record_start, new_records = 0, 0, records
+        else:
+            start = self._changed_messages(messages, saved.messages)
+            record_start = saved.record_count
+            new_records = records
+            if saved.last_record is not None:
+                for index in range(len(records) - 1, -1, -1):
+                    if records[index] is saved.last_record:
+                        new_records = records[index + 1:]
+                        break
+                else:
+                    # 마지막 기록이 잘려 나갔으면 남은 기록을 모두 다시 씀
+                    record_start = 0
+            messages_changed = start < len(messages) or len(messages) != len(saved.messages)
+            if not (messages_changed or summary is not saved.summary or context != saved.context
+                    or last_active != saved.last_active or usage_totals != saved.usage_totals):
+                return 0
+
+        message_rows = [
+            self._message_row(name, position, msg.__dict__, last_active)
+            for position, msg in enumerate(messages[start:], start)
+        ]
+        record_rows = [
+            (name, position, self._encrypt(asdict(record)))
+            for position, record in enumerate(new_records, record_start)
+        ]
+
+        with self._lock:
+            conn = self.conn
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            conn.execute("SAVEPOINT session_save")
+            try:
+                conn.execute(
+                    "INSERT INTO sessions (name, last_active, message_count, context, usage, state) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (name) DO UPDATE SET "
+                    "last_active = excluded.last_active, message_count = excluded.message_count, "
+                    "context = excluded.context, usage = excluded.usage, state = excluded.state",
+                    (name, last_active, len(messages), context,
+                     self._encrypt(usage_totals), self._encrypt({"summary": summary}))
+                )
+                conn.execute("DELETE FROM messages WHERE session = ? AND position >= ?", (name, start))
+                conn.executemany("INSERT INTO messages VALUES (?, ?, ?, ?, ?)", message_rows)
+                conn.execute("DELETE FROM usage_records WHERE session = ? AND position >= ?", (name, record_start))
+                conn.executemany("INSERT INTO usage_records VALUES (?, ?, ?)", record_rows)
+                conn.execute("RELEASE session_save")
+            except Exception:
+                conn.execute("ROLLBACK TO session_save")
+                conn.execute("RELEASE session_save")
+                raise
+            self._pending.add(name)
+
+        self._saved[name] = _SavedState(
+            messages=messages,
+            summary=summary,
+            context=context,
+            last_active=last_active,
+            usage_totals=usage_totals,
+            last_record=records[-1] if records else None,
+            record_count=record_start + len(new_records)
+        )
+        return len(message_rows) + len(record_rows) + 1
+
+    def update_entry(self, name: str, session, last_active: str) -> bool:
+        entry = self.summarize(name, session, last_active)
+        with self._lock:
+            if self._entries.get(name) == entry:
+                return False
+            self._entries[name] = entry
+            return True
+
+    def commit(self) -> None:
+        with self._lock:
+            if self._conn is None or not self._conn.in_transaction:
+                return
+            try:
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                for name in self._pending:
+                    self._saved.pop(name, None)
+                raise
+            finally:
+                self._pending.clear()
+
+    def compact(self, name: str, session, last_active: str) -> None:
+        """체크포인트로 WAL 파일 내용을 데이터베이스에 반영합니다."""
+        self.commit()
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def release(self, name: str) -> None:
+        self._saved.pop(name, None)
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        with self._lock:
+            conn = self.conn
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            for table, column in (("sessions", "name"), ("messages", "session"), ("usage_records", "session")):
+                conn.execute(f"UPDATE {table} SET {column} = ? WHERE {column} = ?", (new_name, old_name))
+            entry = self._entries.pop(old_name, None)
+            if entry is not None:
+                entry.name = new_name
+                self._entries[new_name] = entry
+            if old_name in self._saved:
+                self._saved[new_name] = self._saved.pop(old_name)
+            if old_name in self._pending:
+                self._pending.discard(old_name)
+                self._pending.add(new_name)
+        self.commit()
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            conn = self.conn
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            for table, column in (("sessions", "name"), ("messages", "session"), ("usage_records", "session")):
+                conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (name,))
+            self._entries.pop(name, None)
+            self._saved.pop(name, None)
+            self._pending.discard(name)
+        self.commit()
+
+    def get_messages(self, name: str, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        query = "SELECT role, payload FROM messages WHERE session = ? AND position >= ?"
+        params: List[Any] = [name, start]
+        if stop is not None:
+            query += " AND position < ?"
+            params.append(stop)
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY position", params).fetchall()
+        return [{"role": role, **self._decrypt(payload)} for role, payload in rows]
+
+    def count_messages(self, name: str, role: Optional[str] = None) -> int:
+        query = "SELECT COUNT(*) FROM messages WHERE session = ?"
+        params: List[Any] = [name]
+        if role is not None:
+            query += " AND role = ?"
+            params.append(role)
+        with self._lock:
+            return self.conn.execute(query, params).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            self.commit()
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,178 @@
+from typing import List, Dict, Optional, Callable, Union, Tuple, Any
+import logging
+from utils import image_tokens, image_block_dimensions, IMAGE_TOKEN_ESTIMATE
+
+logger = logging.getLogger(__name__)
+
+class TokenEstimator:
+    """오프라인 토큰 수 추정기
+
+    텍스트는 ASCII 문자와 비ASCII 문자(한글 등)를 나누어 추정하고, 이미지는
+    크기로 계산합니다. API가 돌려준 실제 입력 토큰 수로 보정 계수를 학습하며,
+    메시지별 추정값은 내용 객체 단위로 캐시되어 긴 대화도 증분으로 계산됩니다.
+    """
+
+    def __init__(self,
+                 chars_per_token: float = 4.0,
+                 non_ascii_tokens_per_char: float = 0.9,
+                 message_overhead: int = 4,
+                 smoothing: float = 0.2,
+                 min_factor: float = 0.5,
+                 max_factor: float = 2.0,
+                 dimension_lookup: Optional[Callable[[Dict], Optional[Tuple[int, int]]]] = None):
+        """
+        TokenEstimator 인스턴스를 초기화합니다.
+
+        Args:
+            chars_per_token: ASCII 텍스트의 토큰당 평균 문자 수
+            non_ascii_tokens_per_char: 비ASCII 문자 하나당 토큰 수
+            message_overhead: 메시지마다 추가되는 형식 토큰 수
+            smoothing: 보정 계수 지수 이동 평균의 가중치 (0 ~ 1)
+            min_factor: 보정 계수 하한
+            max_factor: 보정 계수 상한
+            dimension_lookup: 이미지 블록의 (width, height)를 반환하는 함수
+        """
+        self.chars_per_token = chars_per_token
+        self.non_ascii_tokens_per_char = non_ascii_tokens_per_char
+        self.message_overhead = message_overhead
+        self.smoothing = smoothing
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+        self.dimension_lookup = dimension_lookup or image_block_dimensions
+
+        self.factor = 1.0
+        self.calibration_samples = 0
+        # id(내용 객체) -> (내용 객체, 보정 전 추정값)
+        self._memo: Dict[int, Tuple[Any, float]] = {}
+        # 증분 계산 상태: (목록 id, 시작 위치, 첫 메시지, 마지막 메시지, 계산한 메시지 수, 보정 전 합계)
+        self._history: Optional[Tuple[int, int, Any, Any, int, float]] = None
+
+    def _text_tokens(self, text: str) -> float:
+        """텍스트의 보정 전 토큰 수"""
+        # UTF-8 추가 바이트 수로 비ASCII 문자 수를 근사 (한글/한자는 3바이트)
+        extra_bytes = len(text.encode('utf-8')) - len(text)
+        non_ascii = extra_bytes / 2
+        ascii_chars = len(text) - non_ascii
+        return ascii_chars / self.chars_per_token + non_ascii * self.non_ascii_tokens_per_char
+
+    def _image_tokens(self, block: Dict) -> float:
+        """이미지 블록의 토큰 수 (크기를 알 수 없으면 상한값)"""
+        dimensions = self.dimension_lookup(block)
+        return image_tokens(*dimensions) if dimensions else IMAGE_TOKEN_ESTIMATE
+
+    def estimate_raw(self, content: Union[str, List[Dict]]) -> float:
+        """
+        메시지 내용의 보정 전 토큰 수를 추정합니다. 결과는 내용 객체별로 캐시됩니다.
+
+        Args:
+            content: 문자열 또는 텍스트/이미지 블록 리스트
+
+        Returns:
+            float: 보정 전 토큰 수
+        """
+        cached = self._memo.get(id(content))
+        if cached is not None and cached[0] is content:
+            return cached[1]
+
+        if isinstance(content, str):
+            tokens = self._text_tokens(content)
+        else:
+            tokens = 0.0
+            for block in content:
+                if block.get('type') == 'image':
+                    tokens += self._image_tokens(block)
+                else:
+                    tokens += self._text_tokens(block.get('text', ''))
+        tokens += self.message_overhead
+
+        self._memo[id(content)] = (content, tokens)
+        return tokens
+
+    def estimate(self, content: Union[str, List[Dict]]) -> int:
+        """
+        메시지 내용의 보정된 토큰 수를 추정합니다.
+
+        Args:
+            content: 문자열 또는 텍스트/이미지 블록 리스트
+
+        Returns:
+            int: 추정 토큰 수
+        """
+        return int(round(self.estimate_raw(content) * self.factor))
+
+    def estimate_text(self, text: str) -> int:
+        """
+        캐시하지 않고 텍스트의 보정된 토큰 수를 추정합니다 (입력 중인 초안 등).
+
+        Args:
+            text: 추정할 텍스트
+
+        Returns:
+            int: 추정 토큰 수
+        """
+        return int(round(self._text_tokens(text) * self.factor))
+
+    def estimate_messages(self, messages: List[Any], start: int = 0) -> int:
+        """
+        messages[start:]의 토큰 수를 추정합니다.
+
+        같은 목록에 메시지가 추가되기만 했다면 새 메시지만 계산하므로, 입력할 때마다
+        호출해도 전체 기록을 다시 훑지 않습니다.
+
+        Args:
+            messages: content 속성을 가진 메시지 목록 (예: ChatSession.messages)
+            start: 계산을 시작할 위치
+
+        Returns:
+            int: 추정 토큰 수
+        """
+        first = messages[start] if start < len(messages) else None
+        counted, total = start, 0.0
+        if self._history is not None:
+            list_id, history_start, history_first, history_last, history_count, history_total = self._history
+            if (list_id == id(messages) and history_start == start and
+                    history_first is first and history_count <= len(messages) and
+                    (history_count == start or messages[history_count - 1] is history_last)):
+                counted, total = history_count, history_total
+
+        for message in messages[counted:]:
+            total += self.estimate_raw(message.content)
+
+        last = messages[-1] if len(messages) > start else None
+        self._history = (id(messages), start, first, last, len(messages), total)
+        return int(round(total * self.factor))
+
+    def calibrate(self, estimated_raw: float, actual_tokens: int) -> None:
+        """
+        실제 입력 토큰 수로 보정 계수를 갱신합니다.
+
+        Args:
+            estimated_raw: 요청 전체의 보정 전 추정 토큰 수
+            actual_tokens: API가 보고한 실제 입력 토큰 수 (캐시 토큰 포함)
+        """
+        if estimated_raw <= 0 or actual_tokens <= 0:
+            return
+
+        ratio = actual_tokens / estimated_raw
+        if self.calibration_samples == 0:
+            factor = ratio
+        else:
+            factor = (1 - self.smoothing) * self.factor + self.smoothing * ratio
+        self.factor = min(self.max_factor, max(self.min_factor, factor))
+        self.calibration_samples += 1
+        logger.debug(f"Token estimator calibrated: factor={self.factor:.3f} (ratio {ratio:.3f})")
+
+    def forget(self, content: Optional[Union[str, List[Dict]]] = None) -> None:
+        """
+        캐시된 추정값을 비웁니다. 보정 계수는 유지됩니다.
+
+        Args:
+            content: 이 내용 객체의 추정값만 지움 (None이면 전체)
+        """
+        if content is None:
+            self._memo.clear()
+            self._history = None
+            return
+        cached = self._memo.get(id(content))
+        if cached is not None and cached[0] is content:
+            del self._memo[id(content)]
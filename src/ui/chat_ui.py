@@ -1,5 +1,7 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext
+import asyncio
+import os
+from tkinter import ttk, scrolledtext, simpledialog, messagebox, filedialog
 import logging
 from typing import Optional, Dict, Any
 from events import EventEmitter, Event, UIEventType, UIEventData
@@ -29,6 +31,8 @@ class ChatUI:
         self.current_theme = self.config.get('theme', 'light')
         self.current_session = None
         self.is_sending = False
+        self.is_streaming = False
+        self._closed = False
         
         # UI 초기화
         self._setup_ui()
@@ -179,6 +183,15 @@ class ChatUI:
         )
         self.attach_btn.grid(row=1, column=0)
         
+        # 응답 생성 중지 버튼
+        self.stop_btn = ttk.Button(
+            self.button_frame,
+            text="Stop",
+            command=self._on_stop_generation,
+            state=tk.DISABLED
+        )
+        self.stop_btn.grid(row=2, column=0, pady=(2, 0))
+        
     def _create_status_bar(self):
         """상태 표시줄 생성"""
         self.status_bar = ttk.Label(
@@ -196,6 +209,22 @@ class ChatUI:
             UIEventType.RECEIVE_MESSAGE.value,
             self._handle_received_message
         )
+        self.event_emitter.on(
+            UIEventType.STREAM_DELTA.value,
+            self._handle_stream_delta
+        )
+        self.event_emitter.on(
+            UIEventType.QUEUE_STATUS.value,
+            self._handle_queue_status
+        )
+        self.event_emitter.on(
+            UIEventType.RETRY_STATUS.value,
+            self._handle_retry_status
+        )
+        self.event_emitter.on(
+            UIEventType.CIRCUIT_STATE.value,
+            self._handle_circuit_state
+        )
         self.event_emitter.on(
             UIEventType.MESSAGE_SENDING.value,
             self._handle_message_sending
@@ -253,17 +282,186 @@ class ChatUI:
         self.input_box.delete("1.0", tk.END)
         return "break"
         
+    def _on_session_change(self, event=None):
+        """세션 선택 변경"""
+        session_id = self.session_combo.get()
+        if session_id and session_id != self.current_session:
+            self.event_emitter.emit(Event(
+                UIEventType.SESSION_SWITCH.value,
+                UIEventData.session(session_id)
+            ))
+            
+    def _on_new_session(self):
+        """새 세션 생성"""
+        name = simpledialog.askstring("New Session", "Session name:", parent=self.root)
+        if name and name.strip():
+            self.event_emitter.emit(Event(
+                UIEventType.SESSION_CREATED.value,
+                {"name": name.strip()}
+            ))
+            
+    def _on_rename_session(self):
+        """현재 세션 이름 변경"""
+        if not self.current_session:
+            return
+        name = simpledialog.askstring(
+            "Rename Session", "New name:", initialvalue=self.current_session, parent=self.root
+        )
+        if name and name.strip() and name.strip() != self.current_session:
+            self.event_emitter.emit(Event(
+                UIEventType.SESSION_RENAMED.value,
+                UIEventData.session(self.current_session, new_name=name.strip())
+            ))
+            
+    def _on_delete_session(self):
+        """현재 세션 삭제"""
+        if not self.current_session:
+            return
+        if messagebox.askyesno("Delete Session", f"Delete '{self.current_session}'?", parent=self.root):
+            self.event_emitter.emit(Event(
+                UIEventType.SESSION_DELETED.value,
+                UIEventData.session(self.current_session)
+            ))
+            
+    def _on_attach_file(self):
+        """이미지 첨부 (입력창의 내용을 함께 전송)"""
+        file_path = filedialog.askopenfilename(
+            parent=self.root,
+            filetypes=[("Images", "*.png *.jpg *.jpeg *.gif *.webp"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        message = self.input_box.get("1.0", tk.END).strip()
+        self.input_box.delete("1.0", tk.END)
+        self.event_emitter.emit(Event(
+            UIEventType.FILE_ATTACH.value,
+            {"file_path": file_path, "filename": os.path.basename(file_path), "message": message}
+        ))
+        
+    def _on_stop_generation(self):
+        """현재 세션의 응답 생성 중지"""
+        self.event_emitter.emit(Event(
+            UIEventType.STOP_GENERATION.value,
+            UIEventData.session(self.current_session)
+        ))
+        
+    def _is_other_session(self, data: dict) -> bool:
+        """표시 중인 세션이 아닌 다른 세션의 이벤트인지 확인"""
+        session_id = data.get('session_id')
+        return bool(self.current_session and session_id and session_id != self.current_session)
+        
+    def _handle_stream_delta(self, data: dict):
+        """스트리밍 응답 조각 표시"""
+        if self._is_other_session(data):
+            return
+        self.stop_btn.config(state=tk.NORMAL)
+        self.chat_display.config(state=tk.NORMAL)
+        if not self.is_streaming:
+            self.chat_display.insert(tk.END, "\nClaude: ")
+            self.is_streaming = True
+            self.status_bar.config(text="Receiving...")
+        self.chat_display.insert(tk.END, data['delta'])
+        self.chat_display.see(tk.END)
+        self.chat_display.config(state=tk.DISABLED)
+        
+    def _handle_queue_status(self, data: dict):
+        """요청 큐 상태 표시"""
+        if self.is_streaming:
+            return
+        if data['queue_depth']:
+            self.status_bar.config(
+                text=f"Queued: {data['queue_depth']} ({data['session_id']}), "
+                     f"running: {data['active_requests']}"
+            )
+        elif data['status'] == 'started':
+            self.status_bar.config(text=f"Sending... (waited {data['wait_time']:.1f}s)")
+        
+    def _handle_retry_status(self, data: dict):
+        """API 재시도 상태 표시"""
+        if self._is_other_session(data):
+            return
+        if data['outcome'] == 'retry':
+            self.status_bar.config(
+                text=f"Retrying in {data['delay']:.1f}s "
+                     f"({data['status_code'] or data['error_type']}, attempt {data['attempt']})"
+            )
+        elif data['outcome'] == 'success':
+            self.status_bar.config(text=f"Succeeded after {data['attempt']} attempts")
+        
+    def _handle_circuit_state(self, data: dict):
+        """API 회로 차단기 상태 표시"""
+        if data['state'] == 'open':
+            self.status_bar.config(
+                text=f"API unavailable - new messages fail immediately for {data['retry_in']:.0f}s"
+            )
+        elif data['state'] == 'half_open':
+            self.status_bar.config(text="Checking whether the API has recovered...")
+        else:
+            self.status_bar.config(text="API connection restored")
+        
+    def _handle_message_sending(self, data: dict):
+        """전송 시작 표시"""
+        if self._is_other_session(data):
+            return
+        self.is_sending = True
+        self.send_btn.config(state=tk.DISABLED)
+        self.status_bar.config(text="Sending...")
+        
+    def _handle_message_sent(self, data: dict):
+        """전송 완료 처리 (응답이 없어도 입력을 다시 허용)"""
+        if self._is_other_session(data):
+            return
+        self.is_sending = False
+        self.send_btn.config(state=tk.NORMAL)
+        
+    def _handle_warning(self, data: dict):
+        """경고 표시"""
+        self.status_bar.config(text=f"Warning: {data['message']}")
+        
     def _handle_received_message(self, data: dict):
         """메시지 수신 처리"""
+        # 다른 세션의 응답은 해당 세션 기록에만 저장되고 화면에는 표시하지 않음
+        if self._is_other_session(data):
+            return
+            
         self.chat_display.config(state=tk.NORMAL)
-        self.chat_display.insert(tk.END, f"\nClaude: {data['content']}\n")
+        if data.get('cancelled'):
+            note = "[stopped]" if data.get('truncated') else "[stopped, response discarded]"
+            self.chat_display.insert(tk.END, f"\n{note}\n")
+        elif data.get('streamed'):
+            # 내용은 STREAM_DELTA로 이미 표시됨
+            if self.is_streaming:
+                self.chat_display.insert(tk.END, "\n")
+        else:
+            self.chat_display.insert(tk.END, f"\nClaude: {data['content']}\n")
         self.chat_display.see(tk.END)
         self.chat_display.config(state=tk.DISABLED)
+        self.is_streaming = False
         
         self.status_bar.config(text="Ready")
         self.send_btn.config(state=tk.NORMAL)
+        self.stop_btn.config(state=tk.DISABLED)
         self.is_sending = False
         
+    def _handle_state_change(self, data: dict):
+        """상태 변경 처리 (표시 중인 세션 추적)"""
+        if data['state'] == 'session_changed':
+            self.current_session = data['data'].get('session_id')
+            self.session_combo.set(self.current_session)
+            self.is_streaming = False
+            self.stop_btn.config(state=tk.DISABLED)
+        elif data['state'] == 'initialized':
+            self.current_session = data['data'].get('current_session')
+            self.update_sessions(data['data'].get('sessions', []))
+            if self.current_session:
+                self.session_combo.set(self.current_session)
+        elif data['state'] == 'sessions_updated':
+            if 'current_session' in data['data']:
+                self.current_session = data['data']['current_session']
+            self.update_sessions(data['data'].get('sessions', []))
+            if self.current_session:
+                self.session_combo.set(self.current_session)
+        
     def _on_theme_change(self, event=None):
         """테마 변경"""
         new_theme = self.theme_combo.get()
@@ -308,15 +506,38 @@ class ChatUI:
     def _handle_error(self, data: dict):
         """에러 처리"""
         self.status_bar.config(text=f"Error: {data['message']}")
+        self.is_streaming = False
         
         self.chat_display.config(state=tk.NORMAL)
         self.chat_display.insert(tk.END, f"\nError: {data['message']}\n", "error")
         self.chat_display.see(tk.END)
         self.chat_display.config(state=tk.DISABLED)
         
+    def _on_closing(self):
+        """창 닫기"""
+        self._closed = True
+        self.root.destroy()
+        
     def run(self):
-        """UI 실행"""
-        self.root.mainloop()
+        """UI 실행 (실행 중인 이벤트 루프가 없을 때)"""
+        asyncio.run(self.run_async())
+        
+    async def run_async(self, interval: float = 0.01):
+        """
+        실행 중인 이벤트 루프 안에서 UI 실행
+        
+        mainloop()는 루프의 스레드를 막아 이벤트 핸들러가 예약한 전송/스트리밍
+        코루틴이 실행되지 않으므로, Tk 이벤트를 처리한 뒤 매번 루프에 양보합니다.
+        
+        Args:
+            interval: Tk 이벤트 처리 간격 (초)
+        """
+        while not self._closed:
+            try:
+                self.root.update()
+            except tk.TclError:
+                break
+            await asyncio.sleep(interval)
         
     def update_sessions(self, sessions: list):
         """세션 목록 업데이트"""
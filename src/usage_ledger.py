@@ -0,0 +1,134 @@
+from typing import List, Dict, Optional, Any
+from dataclasses import dataclass, asdict, field
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens"
+)
+
+@dataclass
+class UsageRecord:
+    """API 응답 하나의 토큰 사용량"""
+    timestamp: str
+    model: str
+    purpose: str = "chat"
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+@dataclass
+class UsageLedger:
+    """세션별 API 토큰 사용량 장부
+
+    각 응답의 usage를 기록하고 합계를 누적합니다. 합계는 기록할 때마다 갱신되므로
+    조회 시 기록 전체를 다시 훑을 필요가 없습니다. 개별 기록은 최근 max_records개만
+    보관하지만 합계에는 모든 요청이 반영됩니다.
+    """
+    records: List[UsageRecord] = field(default_factory=list)
+    totals: Dict[str, int] = field(default_factory=lambda: {"requests": 0, **{key: 0 for key in USAGE_FIELDS}})
+    totals_by_model: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    max_records: int = 1000
+
+    def record(self, usage: Any, model: str, purpose: str = "chat") -> UsageRecord:
+        """
+        API 응답의 usage를 기록합니다.
+
+        Args:
+            usage: API 응답의 usage 객체
+            model: 요청에 사용된 모델
+            purpose: 요청 용도 (예: "chat", "compaction", "cancelled", "hedge")
+
+        Returns:
+            UsageRecord: 추가된 기록
+        """
+        entry = UsageRecord(
+            timestamp=datetime.now().isoformat(),
+            model=model,
+            purpose=purpose,
+            **{key: getattr(usage, key, None) or 0 for key in USAGE_FIELDS}
+        )
+
+        self.records.append(entry)
+        if len(self.records) > self.max_records:
+            del self.records[:len(self.records) - self.max_records]
+
+        model_totals = self.totals_by_model.setdefault(
+            model, {"requests": 0, **{key: 0 for key in USAGE_FIELDS}}
+        )
+        for totals in (self.totals, model_totals):
+            totals["requests"] += 1
+            for key in USAGE_FIELDS:
+                totals[key] += getattr(entry, key)
+
+        logger.debug(f"Recorded usage for {model}: in={entry.input_tokens}, out={entry.output_tokens}")
+        return entry
+
+    @property
+    def total_tokens(self) -> int:
+        """캐시 토큰을 포함한 전체 입력 토큰과 출력 토큰의 합"""
+        return sum(self.totals[key] for key in USAGE_FIELDS)
+
+    def summary(self) -> Dict[str, int]:
+        """합계 사본을 반환합니다."""
+        return {**self.totals, "total_tokens": self.total_tokens}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """저장용 딕셔너리로 변환합니다."""
+        return {
+            "records": [asdict(entry) for entry in self.records],
+            "totals": dict(self.totals),
+            "totals_by_model": {model: dict(totals) for model, totals in self.totals_by_model.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'UsageLedger':
+        """
+        저장된 딕셔너리에서 장부를 복원합니다.
+
+        Args:
+            data: to_dict()로 만든 딕셔너리 (없으면 빈 장부)
+
+        Returns:
+            UsageLedger: 복원된 장부
+        """
+        ledger = cls()
+        if not data:
+            return ledger
+
+        ledger.records = [UsageRecord(**entry) for entry in data.get("records", [])]
+        ledger.totals.update(data.get("totals", {}))
+        ledger.totals_by_model = {
+            model: dict(totals) for model, totals in data.get("totals_by_model", {}).items()
+        }
+        return ledger
+
+def merge_usage_totals(ledgers: List[UsageLedger]) -> Dict[str, Any]:
+    """
+    여러 장부의 합계를 합칩니다. 각 장부의 누적 합계만 사용하므로 세션 수에 비례합니다.
+
+    Args:
+        ledgers: 합칠 장부 목록
+
+    Returns:
+        Dict[str, Any]: 전체 합계와 모델별 합계
+    """
+    totals = {"requests": 0, **{key: 0 for key in USAGE_FIELDS}}
+    by_model: Dict[str, Dict[str, int]] = {}
+
+    for ledger in ledgers:
+        for key in totals:
+            totals[key] += ledger.totals.get(key, 0)
+        for model, model_totals in ledger.totals_by_model.items():
+            merged = by_model.setdefault(model, {"requests": 0, **{key: 0 for key in USAGE_FIELDS}})
+            for key in merged:
+                merged[key] += model_totals.get(key, 0)
+
+    totals["total_tokens"] = sum(totals[key] for key in USAGE_FIELDS)
+    return {"totals": totals, "by_model": by_model}
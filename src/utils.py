@@ -2,10 +2,12 @@
 
 import uuid
 import os
+import io
 import base64
-from typing import List, Dict
+from typing import List, Dict, Union, Optional, Tuple
 from dotenv import load_dotenv
 from cryptography.fernet import Fernet
+from PIL import Image
 
 load_dotenv()
 
@@ -33,16 +35,70 @@ def generate_message_id() -> str:
     """
     return str(uuid.uuid4())
 
+# 이미지 한 장의 대략적인 토큰 수 (1568px 이하로 조정된 이미지 기준 상한)
+IMAGE_TOKEN_ESTIMATE = 1600
+
+# 텍스트 토큰당 평균 문자 수 (근사값)
+CHARS_PER_TOKEN = 4
+
+# API가 이미지를 축소하는 기준이 되는 긴 변의 길이
+IMAGE_MAX_EDGE = 1568
+
+# 이미지 헤더를 읽기 위해 디코딩할 base64 접두사 길이
+IMAGE_HEADER_CHARS = 96 * 1024
+
+def image_tokens(width: int, height: int) -> int:
+    """
+    이미지 크기로 토큰 수를 계산합니다 (width * height / 750).
+    긴 변이 IMAGE_MAX_EDGE를 넘으면 API와 같이 비율을 유지하며 축소한 크기를 사용합니다.
+    """
+    scale = min(1.0, IMAGE_MAX_EDGE / max(width, height, 1))
+    return max(1, int((width * scale) * (height * scale) / 750))
+
+def image_block_dimensions(block: Dict) -> Optional[Tuple[int, int]]:
+    """
+    base64 이미지 블록의 헤더만 디코딩하여 (width, height)를 반환합니다.
+    읽을 수 없으면 None을 반환합니다.
+    """
+    source = block.get('source', {})
+    if source.get('type') != 'base64':
+        return None
+    try:
+        prefix = source['data'][:IMAGE_HEADER_CHARS]
+        prefix = prefix[:len(prefix) - len(prefix) % 4]
+        with Image.open(io.BytesIO(base64.b64decode(prefix))) as img:
+            return img.size
+    except Exception:
+        return None
+
+def estimate_tokens(content: Union[str, List[Dict]]) -> int:
+    """
+    메시지 내용의 토큰 수를 대략적으로 추정합니다.
+    문자열과 텍스트/이미지 블록 리스트를 모두 처리합니다.
+    """
+    if isinstance(content, str):
+        return -(-len(content) // CHARS_PER_TOKEN)
+        
+    tokens = 0
+    for block in content:
+        if block.get('type') == 'image':
+            dimensions = image_block_dimensions(block)
+            tokens += image_tokens(*dimensions) if dimensions else IMAGE_TOKEN_ESTIMATE
+        else:
+            tokens += -(-len(block.get('text', '')) // CHARS_PER_TOKEN)
+    return tokens
+
 def truncate_conversation(messages: List[Dict], max_tokens: int) -> List[Dict]:
     """
     대화 기록을 최대 토큰 수에 맞게 자릅니다.
+    잘라낸 결과는 항상 사용자 메시지로 시작합니다.
     """
-    truncated = []
+    start = len(messages)
     current_tokens = 0
-    for message in reversed(messages):
-        message_tokens = len(message['content'].split())
-        if current_tokens + message_tokens > max_tokens:
+    for index in range(len(messages) - 1, -1, -1):
+        current_tokens += estimate_tokens(messages[index]['content'])
+        if current_tokens > max_tokens:
             break
-        truncated.insert(0, message)
-        current_tokens += message_tokens
-    return truncated
\ No newline at end of file
+        if messages[index]['role'] == 'user':
+            start = index
+    return messages[start:]
\ No newline at end of file
@@ -36,6 +36,8 @@ class VisionHandler:
         self.cache_dir = cache_dir or self.CACHE_DIR
         self._ensure_cache_dir()
         self.cache_info: Dict[str, Dict] = {}
+        # base64 데이터 -> (width, height)
+        self.image_dimensions: Dict[str, Tuple[int, int]] = {}
         logger.info("VisionHandler initialized")
 
     def _ensure_cache_dir(self) -> None:
@@ -201,6 +203,8 @@ class VisionHandler:
 
             # Base64 인코딩
             base64_image = base64.b64encode(image_data).decode('utf-8')
+            with Image.open(io.BytesIO(image_data)) as img:
+                self.image_dimensions[base64_image] = img.size
 
             return {
                 "type": "image",
@@ -220,6 +224,76 @@ class VisionHandler:
             logger.error(error_msg)
             raise
 
+    def get_image_dimensions(self, image_content: Dict) -> Optional[Tuple[int, int]]:
+        """
+        API 형식 이미지 블록의 크기를 반환합니다.
+        이 핸들러가 준비했거나 이미 확인한 이미지는 다시 디코딩하지 않습니다.
+
+        Args:
+            image_content: base64 이미지 블록
+
+        Returns:
+            Optional[Tuple[int, int]]: (width, height) 또는 확인할 수 없으면 None
+        """
+        source = image_content.get("source", {})
+        if source.get("type") != "base64":
+            return None
+            
+        data = source["data"]
+        dimensions = self.image_dimensions.get(data)
+        if dimensions is None:
+            try:
+                with Image.open(io.BytesIO(base64.b64decode(data))) as img:
+                    dimensions = img.size
+            except Exception as e:
+                logger.warning(f"Could not read image dimensions: {str(e)}")
+                return None
+            self.image_dimensions[data] = dimensions
+        return dimensions
+
+    def shrink_image_content(self, 
+                             image_content: Dict, 
+                             max_dimension: int = 512,
+                             quality: int = 70) -> Dict:
+        """
+        API 형식의 이미지 블록을 더 작은 해상도로 다시 인코딩합니다.
+
+        Args:
+            image_content: base64 이미지 블록
+            max_dimension: 축소 후 가장 긴 변의 최대 길이
+            quality: JPEG 품질 설정 (1-100)
+
+        Returns:
+            Dict: 축소된 이미지 블록. 이미 충분히 작으면 원본 블록
+        """
+        source = image_content.get("source", {})
+        if source.get("type") != "base64":
+            return image_content
+            
+        image_data = base64.b64decode(source["data"])
+        with Image.open(io.BytesIO(image_data)) as img:
+            if max(img.size) <= max_dimension:
+                return image_content
+                
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=quality, optimize=True)
+            dimensions = img.size
+            
+        data = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        self.image_dimensions[data] = dimensions
+        return {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": "image/jpeg",
+                "data": data
+            }
+        }
+
     def cleanup_cache(self, max_age_days: int = 7) -> None:
         """
         오래된 캐시 파일들을 정리합니다.
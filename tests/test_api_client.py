@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from src.api_client import APIClientPool
+
+class TestAPIClientPool(unittest.TestCase):
+    def setUp(self):
+        """각 테스트마다 새 풀을 사용합니다."""
+        self.pool = APIClientPool(max_connections=5)
+
+    @patch('src.api_client.AsyncAnthropic')
+    @patch('src.api_client.decrypt_api_key', return_value="test-key")
+    def test_client_created_once(self, mock_decrypt, mock_anthropic):
+        """클라이언트와 API 키 복호화는 한 번만 수행됩니다."""
+        first = self.pool.get_client()
+        second = self.pool.get_client()
+
+        self.assertIs(first, second)
+        mock_decrypt.assert_called_once()
+        mock_anthropic.assert_called_once()
+        self.assertEqual(mock_anthropic.call_args.kwargs['api_key'], "test-key")
+
+    @patch('src.api_client.AsyncAnthropic')
+    @patch('src.api_client.decrypt_api_key', return_value="test-key")
+    def test_client_per_base_url(self, mock_decrypt, mock_anthropic):
+        """API 주소별 클라이언트는 따로 만들지만 연결 풀과 API 키는 공유합니다."""
+        mock_anthropic.side_effect = lambda **kwargs: MagicMock()
+        default = self.pool.get_client()
+        local = self.pool.get_client("http://127.0.0.1:8787")
+
+        self.assertIsNot(default, local)
+        self.assertIs(self.pool.get_client("http://127.0.0.1:8787"), local)
+        mock_decrypt.assert_called_once()
+        first, second = mock_anthropic.call_args_list
+        self.assertNotIn('base_url', first.kwargs)
+        self.assertEqual(second.kwargs['base_url'], "http://127.0.0.1:8787")
+        self.assertIs(first.kwargs['http_client'], second.kwargs['http_client'])
+
+    def test_configure_rejects_unknown_settings(self):
+        """알 수 없는 설정은 거부됩니다."""
+        with self.assertRaises(ValueError):
+            self.pool.configure(max_conections=10)
+
+    @patch('src.api_client.AsyncAnthropic')
+    @patch('src.api_client.decrypt_api_key', return_value="test-key")
+    def test_configure_after_creation_is_ignored(self, mock_decrypt, mock_anthropic):
+        """클라이언트 생성 후의 설정 변경은 무시됩니다."""
+        self.pool.get_client()
+        self.pool.configure(max_connections=50)
+        self.assertEqual(self.pool.settings['max_connections'], 5)
+
+    @patch('src.api_client.importlib.util.find_spec', return_value=None)
+    def test_http2_falls_back_without_h2(self, mock_find_spec):
+        """h2 패키지가 없으면 HTTP/1.1을 사용합니다."""
+        self.pool.configure(http2=True)
+        self.assertFalse(self.pool._http2_available())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+from src import chat_session
+from src.batch_runner import BatchRunner
+from src.response_cache import ResponseCache
+from tests.test_chat_session import FakeStream, FakeStreamManager
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.temp_dir.name, "batch.jsonl")
+        self.output_path = os.path.join(self.temp_dir.name, "batch.out.jsonl")
+        self.client = MagicMock()
+        self.requests = []
+
+        def stream(**request):
+            self.requests.append(request)
+            return FakeStreamManager(FakeStream([f"answer {len(self.requests)}"]))
+
+        self.client.messages.stream.side_effect = stream
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write_input(self, items):
+        with open(self.input_path, 'w', encoding='utf-8') as f:
+            for item in items:
+                f.write(json.dumps(item) + "\n")
+
+    def _read_output(self):
+        with open(self.output_path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def _run(self, **kwargs):
+        runner = BatchRunner(self.output_path, client=self.client, **kwargs)
+        return asyncio.run(runner.run(BatchRunner.load_items(self.input_path)))
+
+    def test_load_items(self):
+        """입력 파일 해석 테스트"""
+        self._write_input([{"prompt": "a"}, {"id": 7, "prompt": "b", "context": "translator", "lang": "ko"}])
+        items = BatchRunner.load_items(self.input_path)
+
+        self.assertEqual([item.id for item in items], ["line-1", "7"])
+        self.assertEqual(items[1].context, "translator")
+        self.assertEqual(items[1].metadata, {"lang": "ko"})
+
+    def test_run_writes_results_with_usage(self):
+        """결과와 사용량 기록 테스트"""
+        self._write_input([{"id": "a", "prompt": "one", "model": "claude-x"}, {"id": "b", "prompt": "two"}])
+        summary = self._run(concurrency=2)
+
+        results = {result["id"]: result for result in self._read_output()}
+        self.assertEqual(summary["succeeded"], 2)
+        self.assertEqual(results["a"]["status"], "ok")
+        self.assertEqual(results["a"]["usage"]["output_tokens"], 5)
+        self.assertEqual(summary["usage"]["totals"]["requests"], 2)
+        models = sorted(request["model"] for request in self.requests)
+        self.assertIn("claude-x", models)
+
+    def test_cache_hit_reports_no_usage(self):
+        """응답 캐시에서 재생한 항목은 이전 항목의 사용량을 보고하지 않는지 테스트"""
+        cache = ResponseCache(directory=os.path.join(self.temp_dir.name, "cache"))
+        self._write_input([{"id": "a", "prompt": "same", "session": "s1"},
+                           {"id": "b", "prompt": "same", "session": "s2"}])
+        with patch.object(chat_session.ResponseCache, '_instance', cache):
+            self._run(concurrency=1, session_options={"response_cache": True})
+
+        results = {result["id"]: result for result in self._read_output()}
+        self.assertEqual(len(self.requests), 1)
+        self.assertFalse(results["a"]["cached"])
+        self.assertEqual(results["a"]["usage"]["output_tokens"], 5)
+        self.assertTrue(results["b"]["cached"])
+        self.assertIsNone(results["b"]["usage"])
+        self.assertEqual(results["b"]["response"], "answer 1")
+
+    def test_session_items_share_history(self):
+        """같은 세션 항목이 순서대로 이어지는지 테스트"""
+        self._write_input([
+            {"id": "1", "prompt": "first", "session": "s"},
+            {"id": "2", "prompt": "second", "session": "s"}
+        ])
+        self._run(concurrency=4)
+
+        self.assertEqual(len(self.requests[1]["messages"]), 3)
+        self.assertEqual(self.requests[1]["messages"][0]["content"], "first")
+
+    def test_system_does_not_carry_over(self):
+        """항목별 system이 같은 세션의 다음 항목에 이어지지 않는지 테스트"""
+        self._write_input([
+            {"id": "1", "prompt": "first", "session": "s", "system": "Answer in French."},
+            {"id": "2", "prompt": "second", "session": "s"}
+        ])
+        self._run(concurrency=1)
+
+        self.assertIn("Answer in French.", json.dumps(self.requests[0]["system"]))
+        self.assertNotIn("Answer in French.", json.dumps(self.requests[1]["system"]))
+
+    def test_submissions_are_bounded_by_window(self):
+        """스케줄러에 넣어 둔 항목 수가 window를 넘지 않는지 테스트"""
+        self._write_input([{"id": str(index), "prompt": f"p{index}"} for index in range(20)])
+        runner = BatchRunner(self.output_path, client=self.client, concurrency=2, window=3)
+        submit = runner.scheduler.submit
+        outstanding = []
+        peak = []
+
+        def tracked_submit(session_id, job):
+            future = submit(session_id, job)
+            outstanding.append(future)
+            peak.append(sum(1 for f in outstanding if not f.done()))
+            return future
+
+        runner.scheduler.submit = tracked_submit
+        summary = asyncio.run(runner.run(BatchRunner.load_items(self.input_path)))
+
+        self.assertEqual(summary["succeeded"], 20)
+        self.assertLessEqual(max(peak), 3)
+
+    def test_resume_skips_completed_items(self):
+        """체크포인트에서 이어서 실행하는지 테스트"""
+        self._write_input([
+            {"id": "1", "prompt": "first", "session": "s"},
+            {"id": "2", "prompt": "second", "session": "s"}
+        ])
+        with open(self.output_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"id": "1", "status": "ok", "response": "done"}) + "\n")
+            f.write('{"id": "2", "sta')
+
+        summary = self._run()
+
+        self.assertEqual(summary["skipped"], 1)
+        self.assertEqual(len(self.requests), 1)
+        # 완료된 항목이 대화 기록으로 복원됨
+        self.assertEqual(self.requests[0]["messages"][1]["content"], "done")
+        self.assertEqual(self._read_output_ids(), ["1", "2"])
+
+    def _read_output_ids(self):
+        ids = []
+        with open(self.output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    ids.append(json.loads(line)["id"])
+                except json.JSONDecodeError:
+                    pass
+        return ids
+
+    def test_resume_keeps_input_order(self):
+        """다시 실행하는 항목이 뒤에 완료된 항목의 기록을 보지 않는지 테스트"""
+        self._write_input([
+            {"id": "1", "prompt": "first", "session": "s"},
+            {"id": "2", "prompt": "second", "session": "s"},
+            {"id": "3", "prompt": "third", "session": "s"},
+            {"id": "4", "prompt": "fourth", "session": "s"}
+        ])
+        with open(self.output_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"id": "1", "status": "ok", "response": "one"}) + "\n")
+            f.write(json.dumps({"id": "2", "status": "error", "error": "overloaded"}) + "\n")
+            f.write(json.dumps({"id": "3", "status": "ok", "response": "three"}) + "\n")
+        self._run(concurrency=1)
+
+        contents = [[message["content"] for message in request["messages"]] for request in self.requests]
+        self.assertEqual(contents[0], ["first", "one", "second"])
+        self.assertEqual(contents[1], ["first", "one", "second", "answer 1", "third", "three", "fourth"])
+
+if __name__ == '__main__':
+    unittest.main()
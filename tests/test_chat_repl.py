@@ -0,0 +1,51 @@
+import unittest
+import io
+import shutil
+import tempfile
+from unittest.mock import MagicMock
+from src.chat_repl import ChatRepl
+from src.conversation_manager import ConversationManager
+from tests.test_chat_session import FakeStream, FakeStreamManager
+
+class TestChatRepl(unittest.TestCase):
+    def setUp(self):
+        self.storage_dir = tempfile.mkdtemp()
+        self.client = MagicMock()
+        self.client.messages.stream.side_effect = \
+            lambda **request: FakeStreamManager(FakeStream(["Hello ", "**there**\n"]))
+        self.output = io.StringIO()
+        self.repl = ChatRepl(
+            manager_factory=lambda: ConversationManager(storage_dir=self.storage_dir, client=self.client),
+            output=self.output
+        )
+
+    def tearDown(self):
+        self.repl.loop.close()
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+
+    def test_message_streams_formatted_answer(self):
+        self.assertFalse(self.repl.handle_line("Hi"))
+        self.assertIn("Hello \033[1mthere\033[0m", self.output.getvalue())
+        session = self.repl.manager.get_current_session()
+        self.assertEqual([message.role for message in session.messages], ["user", "assistant"])
+
+    def test_session_and_context_commands(self):
+        self.repl.handle_line("/new review")
+        self.assertEqual(self.repl.manager.current_session, "review")
+
+        self.repl.handle_line("/context code_review")
+        self.assertEqual(self.repl.manager.get_current_session().context_manager.active_context, "code_review")
+
+        self.repl.handle_line("/switch Default Session")
+        self.assertEqual(self.repl.manager.current_session, "Default Session")
+
+        self.repl.handle_line("/switch missing")
+        self.assertIn("Error: Session 'missing' not found", self.output.getvalue())
+
+    def test_quit_and_unknown_commands(self):
+        self.assertFalse(self.repl.handle_line("/nope"))
+        self.assertIn("Unknown command", self.output.getvalue())
+        self.assertTrue(self.repl.handle_line("/quit"))
+
+if __name__ == '__main__':
+    unittest.main()
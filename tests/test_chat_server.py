@@ -0,0 +1,78 @@
+import unittest
+import json
+import shutil
+import tempfile
+from unittest.mock import MagicMock
+from aiohttp.test_utils import AioHTTPTestCase
+from src.chat_server import ChatServer
+from src.conversation_manager import ConversationManager
+from tests.test_chat_session import FakeStream, FakeStreamManager
+
+class TestChatServer(AioHTTPTestCase):
+    async def get_application(self):
+        self.storage_dir = tempfile.mkdtemp()
+        self.client_mock = MagicMock()
+        self.client_mock.messages.stream.side_effect = \
+            lambda **request: FakeStreamManager(FakeStream(["Hel", "lo"]))
+        self.manager = ConversationManager(storage_dir=self.storage_dir, client=self.client_mock)
+        self.server = ChatServer(self.manager, auth_token="secret")
+        return self.server.create_app()
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+
+    @property
+    def headers(self):
+        return {"Authorization": "Bearer secret"}
+
+    @staticmethod
+    def _parse_events(body):
+        events = []
+        for chunk in body.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in chunk.split("\n"))
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    async def test_requires_token(self):
+        response = await self.client.get("/sessions")
+        self.assertEqual(response.status, 401)
+
+    async def test_session_lifecycle(self):
+        response = await self.client.post("/sessions", json={"name": "review"}, headers=self.headers)
+        self.assertEqual(response.status, 201)
+
+        response = await self.client.post("/sessions", json={"name": "review"}, headers=self.headers)
+        self.assertEqual(response.status, 409)
+
+        response = await self.client.post("/sessions/review/switch", headers=self.headers)
+        self.assertEqual((await response.json())["is_current"], True)
+
+        response = await self.client.get("/sessions", headers=self.headers)
+        names = [session["name"] for session in (await response.json())["sessions"]]
+        self.assertIn("review", names)
+
+        response = await self.client.delete("/sessions/review", headers=self.headers)
+        self.assertEqual(response.status, 200)
+        response = await self.client.get("/sessions/review", headers=self.headers)
+        self.assertEqual(response.status, 404)
+
+    async def test_send_message_streams_events(self):
+        response = await self.client.post(
+            "/sessions/Default Session/messages", json={"content": "Hi"}, headers=self.headers
+        )
+        self.assertEqual(response.headers["Content-Type"], "text/event-stream")
+        events = self._parse_events(await response.text())
+
+        names = [event for event, _ in events]
+        self.assertEqual(names, ["queued", "start", "delta", "delta", "done"])
+        self.assertEqual("".join(data["text"] for event, data in events if event == "delta"), "Hello")
+        self.assertEqual(events[-1][1]["usage"]["output_tokens"], 5)
+        self.assertFalse(events[-1][1]["cached"])
+
+        response = await self.client.get("/sessions/Default Session", headers=self.headers)
+        messages = (await response.json())["messages"]
+        self.assertEqual([message["role"] for message in messages], ["user", "assistant"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,71 @@
 import unittest
-from unittest.mock import patch, MagicMock
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 from src.chat_session import ChatSession
+from src.rate_limiter import RateLimiter
+from src.concurrency_controller import ConcurrencyController
+
+class FakeStream:
+    """messages.stream이 반환하는 스트림 흉내"""
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    @property
+    async def text_stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def get_final_message(self):
+        message = MagicMock()
+        message.model = "claude-test"
+        message.usage.input_tokens = 15
+        message.usage.output_tokens = 5
+        message.usage.cache_creation_input_tokens = 120
+        message.usage.cache_read_input_tokens = 2048
+        return message
+
+class StalledStream(FakeStream):
+    """첫 조각 이후 응답이 멈춘 스트림 흉내"""
+    @property
+    async def text_stream(self):
+        for chunk in self.chunks:
+            yield chunk
+        await asyncio.sleep(60)
+
+class ReportingStalledStream(StalledStream):
+    """서버가 사용량을 보고한 뒤 멈춘 스트림 흉내"""
+    def __init__(self, chunks):
+        super().__init__(chunks)
+        self.current_message_snapshot = SimpleNamespace(usage=SimpleNamespace(
+            input_tokens=15, output_tokens=1, cache_creation_input_tokens=0, cache_read_input_tokens=0
+        ))
+
+class FailingStream(FakeStream):
+    """첫 조각을 보내기 전에 실패하는 스트림 흉내"""
+    @property
+    async def text_stream(self):
+        raise ConnectionError("stream dropped")
+        yield
+
+class FakeStreamManager:
+    """messages.stream 컨텍스트 매니저 흉내"""
+    def __init__(self, stream):
+        self.stream = stream
+
+    async def __aenter__(self):
+        return self.stream
+
+    async def __aexit__(self, *exc_info):
+        self.stream.closed = True
 
 class TestChatSession(unittest.TestCase):
-    @patch('src.chat_session.Anthropic')
-    def setUp(self, mock_anthropic):
+    def setUp(self):
         self.mock_client = MagicMock()
-        mock_anthropic.return_value = self.mock_client
-        self.chat_session = ChatSession()
+        self.chat_session = ChatSession(client=self.mock_client)
 
     def test_add_message(self):
         self.chat_session.add_message("user", "Hello")
@@ -16,15 +74,186 @@ class TestChatSession(unittest.TestCase):
         self.assertEqual(self.chat_session.full_conversation_history[0]["content"], "Hello")
 
     def test_get_response(self):
-        mock_response = MagicMock()
-        mock_response.content = [MagicMock(text="Hello, how can I help you?")]
-        mock_response.usage.input_tokens = 10
-        mock_response.usage.output_tokens = 20
-        self.mock_client.messages.create.return_value = mock_response
+        stream = FakeStream(["Hello, ", "how can I help you?"])
+        self.mock_client.messages.stream.return_value = FakeStreamManager(stream)
 
-        response = self.chat_session.get_response("Hi")
+        response = asyncio.run(self.chat_session.get_response("Hi"))
         self.assertEqual(response, "Hello, how can I help you?")
-        self.assertEqual(self.chat_session.total_tokens_used, 30)
+        # FakeStream의 usage: 입력 15 + 출력 5 + 캐시 생성 120 + 캐시 읽기 2048
+        self.assertEqual(self.chat_session.total_tokens_used, 2188)
+
+    def test_save_and_load_keep_base_url(self):
+        """저장한 세션을 불러와도 같은 API 주소를 쓰는지 테스트"""
+        session = ChatSession(client=self.mock_client, base_url="http://127.0.0.1:8089")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "session.enc")
+            session.save_session(path)
+            loaded = ChatSession.load_session(path, client=self.mock_client)
+        self.assertEqual(loaded.base_url, "http://127.0.0.1:8089")
+
+    def test_stream_response(self):
+        stream = FakeStream(["Hel", "lo", "!"])
+        self.mock_client.messages.stream.return_value = FakeStreamManager(stream)
+
+        async def collect():
+            return [delta async for delta in self.chat_session.stream_response("Hi")]
+
+        deltas = asyncio.run(collect())
+        self.assertEqual(deltas, ["Hel", "lo", "!"])
+        self.assertTrue(stream.closed)
+        self.assertEqual(self.chat_session.messages[-1].role, "assistant")
+        self.assertEqual(self.chat_session.messages[-1].content, "Hello!")
+        self.assertEqual(self.chat_session.get_token_usage()["input_tokens"], 15)
+        self.assertEqual(self.chat_session.total_tokens_used, 15 + 5 + 120 + 2048)
+
+    def test_stream_failure_removes_user_message(self):
+        self.mock_client.messages.stream.side_effect = ValueError("bad request")
+        self.chat_session.retry_handler.max_retries = 1
+
+        async def collect():
+            return [delta async for delta in self.chat_session.stream_response("Hi")]
+
+        with self.assertRaises(ValueError):
+            asyncio.run(collect())
+        self.assertEqual(self.chat_session.messages, [])
+        # 버린 메시지의 토큰 추정값도 남지 않음
+        memo = self.chat_session.token_estimator._memo.values()
+        self.assertFalse(any(content == "Hi" for content, _ in memo))
+
+    def test_prompt_caching_breakpoints(self):
+        self.chat_session.prompt_caching = True
+        self.chat_session.add_message("user", "First question")
+        self.chat_session.add_message("assistant", "First answer")
+        self.chat_session.add_message("user", "Second question")
+
+        request = self.chat_session._build_request()
+
+        self.assertEqual(request["system"][0]["cache_control"], {"type": "ephemeral"})
+        stable_turn = request["messages"][-2]["content"]
+        self.assertEqual(stable_turn[-1]["cache_control"], {"type": "ephemeral"})
+        self.assertNotIn("cache_control", request["messages"][-1]["content"][-1])
+        self.assertNotIn("cache_control", request["messages"][0]["content"][-1])
+        # 저장된 메시지는 변경되지 않음
+        self.assertEqual(self.chat_session.messages[1].content, "First answer")
+
+    def test_prompt_caching_records_cache_usage(self):
+        self.chat_session.prompt_caching = True
+        self.mock_client.messages.stream.return_value = FakeStreamManager(FakeStream(["ok"]))
+
+        async def collect():
+            return [delta async for delta in self.chat_session.stream_response("Hi")]
+
+        asyncio.run(collect())
+        metadata = self.chat_session.messages[-1].metadata
+        self.assertEqual(metadata["cache"], {"creation_input_tokens": 120, "read_input_tokens": 2048})
+
+    def test_compact_replaces_old_turns_with_summary(self):
+        session = ChatSession(client=self.mock_client,
+                              compaction={"threshold_messages": 4, "keep_recent_messages": 2})
+        for i in range(4):
+            session.add_message("user", f"question {i}")
+            session.add_message("assistant", f"answer {i}")
+        session.add_message("user", "latest")
+
+        summary_response = MagicMock()
+        summary_response.content = [MagicMock(type="text", text="they asked four questions")]
+
+        async def create(**kwargs):
+            return summary_response
+        self.mock_client.messages.create.side_effect = create
+
+        self.assertTrue(asyncio.run(session.compact()))
+        request = session._build_request()
+        covered_end = session.summary["covers"][1]
+        self.assertIn("they asked four questions", request["system"])
+        self.assertEqual(len(request["messages"]), len(session.messages) - covered_end)
+        self.assertEqual(request["messages"][0]["role"], "user")
+
+    def _cancel_mid_stream(self, stream=None):
+        stream = stream or StalledStream(["Partial ", "answer"])
+        self.mock_client.messages.stream.return_value = FakeStreamManager(stream)
+
+        async def consume():
+            async for _ in self.chat_session.stream_response("Hi"):
+                pass
+
+        async def main():
+            task = asyncio.get_running_loop().create_task(consume())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        return stream
+
+    def test_cancel_keeps_partial_response(self):
+        stream = self._cancel_mid_stream()
+        self.assertTrue(stream.closed)
+        last = self.chat_session.messages[-1]
+        self.assertEqual(last.role, "assistant")
+        self.assertEqual(last.content, "Partial answer")
+        created_at = last.metadata.pop("created_at")
+        self.assertEqual(last.metadata, {"model": self.chat_session.model, "truncated": True})
+        self.assertIsInstance(created_at, str)
+
+    def test_cancel_discards_partial_response(self):
+        self.chat_session.keep_partial_on_cancel = False
+        stream = self._cancel_mid_stream()
+        self.assertTrue(stream.closed)
+        self.assertEqual(self.chat_session.messages, [])
+
+    def test_cancel_returns_unused_output_reservation(self):
+        """취소된 스트림은 받은 만큼만 출력 토큰 한도에 남기는지 테스트"""
+        limiter = RateLimiter(output_tokens_per_minute=100000)
+        self.chat_session._rate_limiter = limiter
+        self._cancel_mid_stream()
+        bucket = limiter.buckets["output_tokens"]
+        self.assertGreater(bucket.tokens, bucket.capacity - 100)
+
+    def test_cancel_records_reported_usage(self):
+        """취소된 스트림도 서버가 보고한 사용량을 장부에 기록하는지 테스트"""
+        self._cancel_mid_stream(ReportingStalledStream(["Partial ", "answer"]))
+        record = self.chat_session.usage_ledger.records[-1]
+        self.assertEqual(record.purpose, "cancelled")
+        self.assertEqual(record.model, self.chat_session.model)
+        self.assertEqual(record.input_tokens, 15)
+        # 받은 텍스트는 보고된 출력 토큰보다 많으므로 추정값으로 기록
+        self.assertGreater(record.output_tokens, 1)
+        self.assertEqual(self.chat_session.get_token_usage()["requests"], 1)
+
+    def test_failure_before_first_chunk_releases_reservation(self):
+        """첫 조각 전에 실패한 스트림의 예약을 되돌리는지 테스트"""
+        limiter = RateLimiter(output_tokens_per_minute=100000)
+        self.chat_session._rate_limiter = limiter
+        self.chat_session.retry_handler.max_retries = 1
+        stream = FailingStream([])
+        self.mock_client.messages.stream.return_value = FakeStreamManager(stream)
+
+        async def collect():
+            return [delta async for delta in self.chat_session.stream_response("Hi")]
+
+        with self.assertRaises(ConnectionError):
+            asyncio.run(collect())
+        self.assertTrue(stream.closed)
+        bucket = limiter.buckets["output_tokens"]
+        self.assertGreater(bucket.tokens, bucket.capacity - 1)
+
+    def test_stream_holds_concurrency_slot(self):
+        """스트림을 모두 읽을 때까지 동시 요청 한도의 자리를 차지하는지 테스트"""
+        controller = ConcurrencyController(initial_limit=4)
+        self.chat_session.retry_handler.concurrency_controller = controller
+        self.mock_client.messages.stream.return_value = FakeStreamManager(FakeStream(["a", "b"]))
+        in_flight = []
+
+        async def collect():
+            async for _ in self.chat_session.stream_response("Hi"):
+                in_flight.append(controller.in_flight)
+
+        asyncio.run(collect())
+        self.assertEqual(in_flight, [1, 1])
+        self.assertEqual(controller.in_flight, 0)
+        self.assertEqual(controller.stats["completed"], 1)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,163 @@
+import unittest
+import asyncio
+import httpx
+import anthropic
+from src.concurrency_controller import ConcurrencyController, Slot, is_overload_error
+from src.retry_handler import RetryHandler
+
+def make_status_error(status_code):
+    """상태 코드가 있는 API 오류 생성"""
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status_code, request=request)
+    return anthropic.APIStatusError("error", response=response, body=None)
+
+def make_stream_error(error_type):
+    """스트림 중간의 error 이벤트로 생기는 API 오류 생성 (상태 코드 200)"""
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(200, request=request)
+    body = {"type": "error", "error": {"type": error_type, "message": "error"}}
+    return anthropic.APIStatusError("error", response=response, body=body)
+
+class TestConcurrencyController(unittest.TestCase):
+    def test_window_limits_in_flight_requests(self):
+        """동시 요청 수가 한도를 넘지 않는지 테스트"""
+        controller = ConcurrencyController(initial_limit=2, max_limit=2)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.01)
+
+        async def main():
+            await asyncio.gather(*(controller.run(request) for _ in range(6)))
+
+        asyncio.run(main())
+        self.assertEqual(peak, 2)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_additive_increase_when_saturated(self):
+        """한도를 모두 쓰는 동안 정상 응답이면 한도가 늘어나는지 테스트"""
+        controller = ConcurrencyController(initial_limit=2, max_limit=8)
+
+        async def main():
+            for _ in range(3):
+                await asyncio.gather(*(controller.run(asyncio.sleep, 0) for _ in range(controller.window)))
+
+        asyncio.run(main())
+        self.assertGreater(controller.window, 2)
+        self.assertGreater(controller.stats["increases"], 0)
+
+    def test_no_increase_when_underused(self):
+        """한도를 다 쓰지 않으면 한도를 늘리지 않는지 테스트"""
+        controller = ConcurrencyController(initial_limit=4)
+
+        async def main():
+            for _ in range(20):
+                await controller.run(asyncio.sleep, 0)
+
+        asyncio.run(main())
+        self.assertEqual(controller.window, 4)
+
+    def test_multiplicative_decrease_on_overload(self):
+        """과부하 오류에 한도가 줄고, 같은 창의 오류로는 한 번만 줄어드는지 테스트"""
+        controller = ConcurrencyController(initial_limit=8)
+        slots = [Slot() for _ in range(3)]
+        controller.in_flight = 3
+
+        for slot in slots:
+            controller.release(slot, error=make_status_error(529))
+
+        self.assertEqual(controller.window, 4)
+        self.assertEqual(controller.stats["decreases"], 1)
+        self.assertEqual(controller.stats["overloads"], 3)
+
+    def test_client_errors_do_not_change_window(self):
+        """요청 자체의 오류는 한도에 반영하지 않는지 테스트"""
+        controller = ConcurrencyController(initial_limit=4)
+
+        async def bad_request():
+            raise make_status_error(400)
+
+        async def main():
+            with self.assertRaises(anthropic.APIStatusError):
+                await controller.run(bad_request)
+
+        asyncio.run(main())
+        self.assertEqual(controller.window, 4)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_latency_spike_cuts_window(self):
+        """지연 시간이 기준선보다 크게 늘면 한도가 줄어드는지 테스트"""
+        controller = ConcurrencyController(initial_limit=8, warmup_samples=3)
+        for _ in range(5):
+            controller.in_flight += 1
+            controller.release(Slot(), latency=0.1)
+
+        controller.in_flight += 1
+        controller.release(Slot(), latency=1.0)
+
+        self.assertEqual(controller.window, 4)
+        self.assertEqual(controller.stats["latency_spikes"], 1)
+
+    def test_rate_limit_wait_is_not_latency(self):
+        """속도 제한 대기 시간을 지연 시간에서 빼는지 테스트"""
+        # 제어기가 읽는 컨텍스트 변수와 같은 모듈의 RateLimiter 사용
+        from rate_limiter import RateLimiter
+        controller = ConcurrencyController()
+        limiter = RateLimiter(requests_per_minute=600)
+        limiter.buckets["requests"].tokens = 0
+
+        async def request():
+            await limiter.acquire()
+
+        asyncio.run(controller.run(request))
+        self.assertLess(controller.baseline_latency, 0.05)
+
+    def test_held_slot_stays_in_flight(self):
+        """hold()로 붙잡은 슬롯은 함수가 반환된 뒤에도 반환되지 않는지 테스트"""
+        controller = ConcurrencyController(initial_limit=4)
+
+        async def open_stream():
+            await asyncio.sleep(0)
+            return controller.hold()
+
+        slot = asyncio.run(controller.run(open_stream))
+        self.assertEqual(controller.in_flight, 1)
+        self.assertIsNotNone(slot.latency)
+        self.assertIsNone(controller.hold())
+
+        controller.release(slot, error=make_stream_error("overloaded_error"))
+        self.assertEqual(controller.in_flight, 0)
+        self.assertEqual(controller.window, 2)
+
+    def test_overload_errors(self):
+        """과부하 오류 판단 테스트"""
+        self.assertTrue(is_overload_error(make_status_error(429)))
+        self.assertTrue(is_overload_error(make_status_error(503)))
+        self.assertTrue(is_overload_error(TimeoutError()))
+        self.assertFalse(is_overload_error(make_status_error(401)))
+        self.assertFalse(is_overload_error(ValueError("bad")))
+        self.assertTrue(is_overload_error(make_stream_error("overloaded_error")))
+        self.assertFalse(is_overload_error(make_stream_error("invalid_request_error")))
+
+    def test_retry_handler_runs_attempts_in_controller(self):
+        """재시도의 각 시도가 동시 요청 제어기를 거치는지 테스트"""
+        controller = ConcurrencyController(initial_limit=4)
+        handler = RetryHandler(max_retries=2, base_delay=0.01, concurrency_controller=controller)
+        attempts = []
+
+        async def request():
+            attempts.append(controller.in_flight)
+            if len(attempts) == 1:
+                raise make_status_error(503)
+            return "ok"
+
+        result = asyncio.run(handler.async_retry(request))
+        self.assertEqual(result, "ok")
+        self.assertEqual(attempts, [1, 1])
+        self.assertEqual(controller.window, 2)
+        self.assertEqual(controller.in_flight, 0)
+
+if __name__ == '__main__':
+    unittest.main()
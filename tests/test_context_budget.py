@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock
+from src.context_budget import ContextBudgeter
+
+def make_turns(count, text="x" * 400):
+    """count 개의 사용자/어시스턴트 턴으로 된 대화 기록을 만듭니다."""
+    messages = []
+    for i in range(count):
+        messages.append({"role": "user", "content": f"{i}:{text}"})
+        messages.append({"role": "assistant", "content": f"{i}:{text}"})
+    messages.append({"role": "user", "content": "latest question"})
+    return messages
+
+def image_message(text="look"):
+    return {"role": "user", "content": [
+        {"type": "text", "text": text},
+        {"type": "image", "source": {"type": "base64", "media_type": "image/jpeg", "data": "AAAA"}}
+    ]}
+
+class TestContextBudgeter(unittest.TestCase):
+    def setUp(self):
+        self.counter = lambda content: len(content) if isinstance(content, str) else sum(
+            1000 if block.get("type") == "image" else len(block.get("text", "")) for block in content)
+
+    def test_within_budget_keeps_everything(self):
+        """예산 안이면 기록을 그대로 보냅니다."""
+        budgeter = ContextBudgeter(max_input_tokens=100000, image_policy='keep', token_counter=self.counter)
+        messages = make_turns(5)
+        self.assertEqual(budgeter.select(messages), messages)
+
+    def test_drops_whole_epochs_and_starts_with_user(self):
+        """예산을 넘으면 에포크 단위로 잘라내고 사용자 메시지로 시작합니다."""
+        budgeter = ContextBudgeter(max_input_tokens=5000, epoch_turns=4,
+                                   image_policy='keep', token_counter=self.counter)
+        messages = make_turns(20)
+        selected = budgeter.select(messages)
+
+        self.assertEqual(selected[0]["role"], "user")
+        self.assertEqual(selected[-1]["content"], "latest question")
+        dropped_turns = (len(messages) - len(selected)) // 2
+        self.assertEqual(dropped_turns % 4, 0)
+        self.assertLessEqual(sum(self.counter(m["content"]) for m in selected), 5000)
+
+    def test_prefix_is_stable_across_turns(self):
+        """잘라내는 위치는 다음 턴에서도 같은 에포크 경계에 유지됩니다."""
+        budgeter = ContextBudgeter(max_input_tokens=5000, epoch_turns=4,
+                                   image_policy='keep', token_counter=self.counter)
+        messages = make_turns(20)
+        first = budgeter.select(messages)
+
+        messages[-1:] = [
+            {"role": "user", "content": "latest question"},
+            {"role": "assistant", "content": "short answer"},
+            {"role": "user", "content": "follow up"}
+        ]
+        second = budgeter.select(messages)
+        self.assertEqual(first[0], second[0])
+
+    def test_auto_policy_shrinks_then_drops_old_images(self):
+        """'auto' 정책은 오래된 이미지를 축소한 뒤, 그래도 넘치면 생략합니다."""
+        vision_handler = MagicMock()
+        vision_handler.shrink_image_content.return_value = {"type": "text", "text": "s" * 1000}
+        budgeter = ContextBudgeter(max_input_tokens=3000, epoch_turns=1, recent_image_turns=1,
+                                   token_counter=self.counter, vision_handler=vision_handler)
+        messages = []
+        for _ in range(3):
+            messages.append(image_message())
+            messages.append({"role": "assistant", "content": "ok"})
+        messages.append(image_message("latest"))
+
+        selected = budgeter.select(messages)
+        self.assertEqual(budgeter.last_stats['image_stage'], 'drop')
+        self.assertEqual(len(selected), len(messages))
+        self.assertEqual(selected[0]["content"][1]["text"], ContextBudgeter.OMITTED_IMAGE_TEXT)
+        self.assertEqual(selected[-1]["content"][1]["type"], "image")
+
+    def test_shrink_requires_vision_handler(self):
+        with self.assertRaises(ValueError):
+            ContextBudgeter(image_policy='shrink')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from src.chat_session import MessageContent
+from src.conversation_compactor import ConversationCompactor
+
+def make_history(turns):
+    messages = []
+    for i in range(turns):
+        messages.append(MessageContent(role="user", content=f"question {i}"))
+        messages.append(MessageContent(role="assistant", content=f"answer {i}"))
+    return messages
+
+class TestConversationCompactor(unittest.TestCase):
+    def setUp(self):
+        self.compactor = ConversationCompactor(threshold_messages=10, keep_recent_messages=4)
+
+    def test_needs_compaction_counts_only_uncovered_messages(self):
+        """이미 요약된 메시지는 임계값 계산에서 제외됩니다."""
+        self.assertTrue(self.compactor.needs_compaction(12, None))
+        summary = self.compactor.make_summary("summary", 8)
+        self.assertFalse(self.compactor.needs_compaction(12, summary))
+
+    def test_compaction_end_is_turn_boundary(self):
+        """압축 구간은 사용자 메시지 직전에서 끝나고 최근 메시지는 남깁니다."""
+        messages = make_history(8)
+        end = self.compactor.find_compaction_end(messages, 0)
+        self.assertEqual(messages[end].role, "user")
+        self.assertGreaterEqual(len(messages) - end, 4)
+
+    def test_no_compaction_end_for_short_history(self):
+        messages = make_history(2)
+        self.assertIsNone(self.compactor.find_compaction_end(messages, 0))
+
+    def test_compaction_end_without_recent_messages(self):
+        """최근 메시지를 남기지 않도록 설정해도 범위를 벗어나지 않습니다."""
+        compactor = ConversationCompactor(keep_recent_messages=0)
+        messages = make_history(3)
+        self.assertEqual(compactor.find_compaction_end(messages, 0), 4)
+        self.assertEqual(compactor.find_compaction_end(messages[:-1], 0), 4)
+
+    def test_build_request_includes_previous_summary_and_images(self):
+        """요약 요청에는 이전 요약과 이미지 자리 표시가 포함됩니다."""
+        messages = [MessageContent(role="user", content=[
+            {"type": "text", "text": "what is this"},
+            {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": "AAAA"}}
+        ])]
+        request = self.compactor.build_request("earlier summary", messages)
+        prompt = request["messages"][0]["content"]
+        self.assertEqual(request["model"], self.compactor.model)
+        self.assertIn("earlier summary", prompt)
+        self.assertIn("USER: what is this\n[image]", prompt)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,11 @@
 import unittest
-from src.encryption import encrypt_data, decrypt_data
+import importlib
+import json
+import os
+from unittest.mock import patch
+from src import encryption
+from src.encryption import (encrypt_data, decrypt_data, encrypt_payload, decrypt_payload,
+                            set_compression_level, COMPRESSED_HEADER)
 
 class TestEncryption(unittest.TestCase):
     def test_encrypt_decrypt(self):
@@ -14,5 +20,46 @@ class TestEncryption(unittest.TestCase):
         encryption2 = encrypt_data(data)
         self.assertNotEqual(encryption1, encryption2)
 
+    def test_compressed_payload(self):
+        """압축 후 암호화한 데이터가 머리글을 갖고 더 작으며 복원되는지 테스트"""
+        data = json.dumps({"messages": [{"role": "user", "content": "hello " * 200}] * 20})
+        encrypted = encrypt_payload(data)
+        self.assertTrue(encrypted.startswith(COMPRESSED_HEADER))
+        self.assertNotIn(b"\n", encrypted)
+        self.assertLess(len(encrypted), len(encrypt_data(data)) / 4)
+        self.assertEqual(decrypt_payload(encrypted), data)
+
+    def test_uncompressed_payloads_still_load(self):
+        """압축하지 않은 이전 형식과 압축 수준 0, 압축되지 않는 데이터가 복원되는지 테스트"""
+        data = json.dumps({"messages": ["hello " * 100]})
+        self.assertEqual(decrypt_payload(encrypt_data(data)), data)
+
+        uncompressed = encrypt_payload(data, level=0)
+        self.assertFalse(uncompressed.startswith(COMPRESSED_HEADER))
+        self.assertEqual(decrypt_data(uncompressed), data)
+
+        noise = os.urandom(64).hex()[:8]
+        self.assertFalse(encrypt_payload(noise).startswith(COMPRESSED_HEADER))
+        self.assertEqual(decrypt_payload(encrypt_payload(noise)), noise)
+
+    def test_compression_level_validation(self):
+        """범위를 벗어난 압축 수준을 거부하는지 테스트"""
+        with self.assertRaises(ValueError):
+            set_compression_level(10)
+
+    def test_invalid_env_compression_level_uses_default(self):
+        """환경 변수의 잘못된 압축 수준은 기본값으로 대체되는지 테스트"""
+        try:
+            for value in ("abc", "10"):
+                with patch.dict(os.environ, {"PAYLOAD_COMPRESSION_LEVEL": value}):
+                    with self.assertLogs('src.encryption', level='WARNING'):
+                        importlib.reload(encryption)
+                self.assertEqual(encryption.compression_level, encryption.DEFAULT_COMPRESSION_LEVEL)
+            with patch.dict(os.environ, {"PAYLOAD_COMPRESSION_LEVEL": "0"}):
+                importlib.reload(encryption)
+            self.assertEqual(encryption.compression_level, 0)
+        finally:
+            importlib.reload(encryption)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
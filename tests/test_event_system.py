@@ -0,0 +1,67 @@
+import unittest
+import asyncio
+from src.events import EventEmitter, Event, UIEventType
+from src.ui.chat_ui import ChatUI
+
+class FakeRoot:
+    """Tk 루트 대역: update() 때마다 위젯 콜백을 하나씩 실행"""
+    def __init__(self, callbacks):
+        self.callbacks = list(callbacks)
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+        if self.callbacks:
+            self.callbacks.pop(0)()
+
+class TestEventEmitter(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.emitter = EventEmitter()
+        self.calls = []
+
+    async def _async_handler(self, data):
+        await asyncio.sleep(0)
+        self.calls.append(data)
+
+    def test_async_handler_runs_on_running_loop(self):
+        """실행 중인 루프에서 발생한 이벤트의 비동기 핸들러가 실행되는지 테스트"""
+        self.emitter.on(UIEventType.SEND_MESSAGE.value, self._async_handler)
+
+        async def run():
+            self.emitter.emit(Event(UIEventType.SEND_MESSAGE.value, "hello"))
+            for _ in range(3):
+                await asyncio.sleep(0)
+
+        asyncio.run(run())
+        self.assertEqual(self.calls, ["hello"])
+
+    def test_async_handler_without_loop_is_dropped(self):
+        """루프 밖에서 발생한 이벤트는 코루틴을 남기지 않고 버려지는지 테스트"""
+        self.emitter.on(UIEventType.SEND_MESSAGE.value, self._async_handler)
+        with self.assertLogs('src.events.event_system', level='ERROR'):
+            self.emitter.emit(Event(UIEventType.SEND_MESSAGE.value, "hello"))
+        self.assertEqual(self.calls, [])
+
+    def test_ui_pump_runs_handler_coroutines(self):
+        """UI 펌프 중 위젯 콜백이 보낸 이벤트의 비동기 핸들러가 실행되는지 테스트"""
+        self.emitter.on(UIEventType.SEND_MESSAGE.value, self._async_handler)
+        ui = ChatUI.__new__(ChatUI)
+        ui._closed = False
+
+        def send():
+            self.emitter.emit(Event(UIEventType.SEND_MESSAGE.value, "hello"))
+
+        def close_when_handled():
+            if self.calls:
+                ui._closed = True
+            else:
+                ui.root.callbacks.append(close_when_handled)
+
+        ui.root = FakeRoot([send, close_when_handled])
+        asyncio.run(asyncio.wait_for(ui.run_async(interval=0), timeout=1))
+
+        self.assertEqual(self.calls, ["hello"])
+
+if __name__ == '__main__':
+    unittest.main()
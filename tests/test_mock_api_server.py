@@ -0,0 +1,96 @@
+import unittest
+import anthropic
+from anthropic import AsyncAnthropic
+from aiohttp.test_utils import AioHTTPTestCase
+from src.retry_handler import RetryHandler
+from src.mock_api_server import MockMessagesServer, MockScenario
+
+REQUEST = {
+    "model": "claude-test",
+    "max_tokens": 100,
+    "messages": [{"role": "user", "content": "hello there"}]
+}
+
+class TestMockMessagesServer(AioHTTPTestCase):
+    async def get_application(self):
+        self.mock = MockMessagesServer(MockScenario(latency=0, ttft=0, tokens_per_second=0,
+                                                    response_text="Hi, how are you?"))
+        return self.mock.create_app()
+
+    def _api_client(self):
+        """모의 서버를 가리키는 실제 SDK 클라이언트 (SDK 자체 재시도 없음)"""
+        return AsyncAnthropic(api_key="test-key", base_url=str(self.server.make_url("")), max_retries=0)
+
+    async def _configure(self, **scenario):
+        response = await self.client.put("/mock/scenario", json=scenario)
+        self.assertEqual(response.status, 200)
+
+    async def test_non_streaming_response(self):
+        response = await self.client.post("/v1/messages", json=REQUEST)
+        body = await response.json()
+        self.assertEqual(body["content"][0]["text"], "Hi, how are you?")
+        self.assertEqual(body["usage"]["output_tokens"], 4)
+        self.assertEqual(body["stop_reason"], "end_turn")
+
+    async def test_stream_matches_sdk(self):
+        """SDK 스트림으로 델타와 최종 메시지를 읽을 수 있는지 테스트"""
+        async with self._api_client().messages.stream(**REQUEST) as stream:
+            chunks = [text async for text in stream.text_stream]
+            message = await stream.get_final_message()
+        self.assertEqual(chunks, ["Hi,", " how", " are", " you?"])
+        self.assertEqual(message.usage.output_tokens, 4)
+        self.assertEqual(message.stop_reason, "end_turn")
+
+    async def test_max_tokens_truncates(self):
+        response = await self.client.post("/v1/messages", json={**REQUEST, "max_tokens": 2})
+        body = await response.json()
+        self.assertEqual(body["content"][0]["text"], "Hi, how")
+        self.assertEqual(body["stop_reason"], "max_tokens")
+
+    async def test_scripted_errors(self):
+        """스크립트한 오류가 Messages API 형식으로 순서대로 반환되는지 테스트"""
+        await self._configure(error_script=[529, None], retry_after=2)
+        response = await self.client.post("/v1/messages", json=REQUEST)
+        self.assertEqual(response.status, 529)
+        self.assertEqual(response.headers["retry-after"], "2")
+        self.assertEqual((await response.json())["error"]["type"], "overloaded_error")
+
+        response = await self.client.post("/v1/messages", json=REQUEST)
+        self.assertEqual(response.status, 200)
+        stats = await (await self.client.get("/mock/stats")).json()
+        self.assertEqual(stats["errors"], {"529": 1})
+
+    async def test_rate_limit_headers_and_enforcement(self):
+        await self._configure(rate_limits={"requests": 1})
+        response = await self.client.post("/v1/messages", json=REQUEST)
+        self.assertEqual(response.headers["anthropic-ratelimit-requests-limit"], "1")
+        self.assertEqual(response.headers["anthropic-ratelimit-requests-remaining"], "0")
+
+        response = await self.client.post("/v1/messages", json=REQUEST)
+        self.assertEqual(response.status, 429)
+
+    async def test_unknown_scenario_field_is_rejected(self):
+        response = await self.client.put("/mock/scenario", json={"ttfb": 1})
+        self.assertEqual(response.status, 400)
+
+    async def test_retry_handler_recovers_from_injected_error(self):
+        """RetryHandler가 모의 서버의 500 오류를 재시도하고 응답을 받는지 테스트"""
+        await self._configure(error_script=[500])
+        client = self._api_client()
+        handler = RetryHandler(max_retries=2, base_delay=0.01)
+        message = await handler.async_retry(client.messages.create, **REQUEST)
+
+        self.assertEqual(message.content[0].text, "Hi, how are you?")
+        stats = await (await self.client.get("/mock/stats")).json()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["completed"], 1)
+
+    async def test_mid_stream_error_propagates(self):
+        await self._configure(stream_error_after=1)
+        with self.assertRaises(anthropic.APIStatusError):
+            async with self._api_client().messages.stream(**REQUEST) as stream:
+                async for _ in stream.text_stream:
+                    pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import asyncio
+import httpx
+import anthropic
+from unittest.mock import MagicMock
+from src.model_router import ModelRouter
+from src.chat_session import ChatSession
+from tests.test_chat_session import FakeStream, FakeStreamManager
+
+def make_status_error(status_code):
+    """상태 코드가 있는 API 오류 생성"""
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status_code, request=request)
+    return anthropic.APIStatusError("error", response=response, body=None)
+
+ROUTING = {
+    "rules": [
+        {"model": "claude-small", "max_input_tokens": 500, "has_images": False},
+        {"model": "claude-code", "contexts": ["code_reviewer"]}
+    ],
+    "fallbacks": {"claude-large": "claude-small", "claude-small": "claude-large"}
+}
+
+class TestModelRouter(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.router = ModelRouter(**ROUTING)
+
+    def test_rules_in_order(self):
+        """규칙을 순서대로 검사하여 모델을 고르는지 테스트"""
+        self.assertEqual(self.router.select("claude-large", input_tokens=100), "claude-small")
+        self.assertEqual(self.router.select("claude-large", input_tokens=100, has_images=True), "claude-large")
+        self.assertEqual(self.router.select("claude-large", input_tokens=5000, context="code_reviewer"),
+                         "claude-code")
+        self.assertEqual(self.router.select("claude-large", input_tokens=5000), "claude-large")
+
+    def test_override_wins(self):
+        """사용자 지정 모델이 규칙보다 우선하는지 테스트"""
+        self.assertEqual(self.router.select("claude-large", input_tokens=100, override="claude-x"), "claude-x")
+
+    def test_should_fail_over(self):
+        """대체 모델로 넘길 오류 판단 테스트"""
+        self.assertTrue(ModelRouter.should_fail_over(make_status_error(529)))
+        self.assertFalse(ModelRouter.should_fail_over(make_status_error(400)))
+        self.assertFalse(ModelRouter.should_fail_over(make_status_error(429)))
+
+class TestSessionRouting(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.client = MagicMock()
+        self.requests = []
+        self.session = ChatSession(model="claude-large", client=self.client, routing=ROUTING)
+
+    def _stream(self, *results):
+        """요청 모델을 기록하고 결과를 차례로 반환하는 stream 흉내"""
+        results = list(results)
+
+        def stream(**request):
+            self.requests.append(request["model"])
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return FakeStreamManager(FakeStream([result]))
+
+        self.client.messages.stream.side_effect = stream
+
+    def _send(self, text):
+        async def collect():
+            return "".join([chunk async for chunk in self.session.stream_response(text)])
+        return asyncio.run(collect())
+
+    def test_short_question_uses_routed_model(self):
+        """짧은 질문이 규칙의 모델로 가고 메타데이터에 기록되는지 테스트"""
+        self._stream("hi")
+        self._send("hello?")
+        self.assertEqual(self.requests, ["claude-small"])
+        self.assertEqual(self.session.messages[-1].metadata["model"], "claude-small")
+
+    def test_overload_fails_over_without_retrying(self):
+        """과부하 오류에 재시도하지 않고 대체 모델로 넘기는지 테스트"""
+        self.session.model_override = "claude-large"
+        self._stream(make_status_error(529), "answer")
+        self.assertEqual(self._send("hello?"), "answer")
+        self.assertEqual(self.requests, ["claude-large", "claude-small"])
+        metadata = self.session.messages[-1].metadata
+        self.assertEqual(metadata["model"], "claude-small")
+        self.assertEqual(metadata["failover_from"], "claude-large")
+
+    def test_client_error_does_not_fail_over(self):
+        """요청 오류는 대체 모델로 넘기지 않는지 테스트"""
+        self._stream(make_status_error(400))
+        with self.assertRaises(anthropic.APIStatusError):
+            self._send("hello?")
+        self.assertEqual(self.requests, ["claude-small"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import json
+import os
+import tempfile
+import shutil
+from src.payload_benchmark import build_sample_session, benchmark, load_samples, format_results
+from src.encryption import encrypt_data
+
+class TestPayloadBenchmark(unittest.TestCase):
+    def test_benchmark_compares_methods(self):
+        """현재 방식과 압축 수준별 결과를 비교하는지 테스트"""
+        payloads = [build_sample_session(turns=5, image_kb=4, seed=seed) for seed in range(2)]
+        self.assertEqual(len(json.loads(payloads[0])["messages"]), 10)
+
+        results = benchmark(payloads, [1, 9], repeat=1)
+        self.assertEqual([r["method"] for r in results], ["encrypt_data", "zlib level 1", "zlib level 9"])
+        self.assertEqual(results[0]["ratio"], 1.0)
+        self.assertLess(results[2]["ratio"], 1.0)
+        self.assertIn("zlib level 9", format_results(results, 100))
+
+    def test_load_samples(self):
+        """저장된 스냅샷을 복호화하여 입력으로 사용하는지 테스트"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with open(os.path.join(directory, "legacy.enc"), 'wb') as f:
+            f.write(encrypt_data('{"messages": []}'))
+        with open(os.path.join(directory, "legacy.journal"), 'wb') as f:
+            f.write(b"ignored\n")
+        self.assertEqual(load_samples(directory), ['{"messages": []}'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock
+from src.rate_limiter import RateLimiter, TokenBucket, retry_after_seconds
+
+class TestRateLimiter(unittest.TestCase):
+    def test_unlimited_until_limits_known(self):
+        """한도를 모르면 바로 통과하는지 테스트"""
+        limiter = RateLimiter()
+
+        async def main():
+            return [await limiter.acquire(100000, 8000) for _ in range(5)]
+
+        reservations = asyncio.run(main())
+        self.assertEqual(len(reservations), 5)
+        self.assertEqual(limiter.stats["delayed"], 0)
+
+    def test_token_bucket_wait_time(self):
+        """토큰 버킷 대기 시간 계산 테스트"""
+        bucket = TokenBucket(60)
+        bucket.take(60)
+        self.assertAlmostEqual(bucket.wait_time(1), 1.0, places=1)
+        # 용량보다 큰 요청은 용량만큼만 기다림
+        self.assertAlmostEqual(bucket.wait_time(1000), 60.0, places=0)
+
+    def test_requests_are_delayed_over_limit(self):
+        """한도를 넘는 요청이 기다리는지 테스트"""
+        limiter = RateLimiter(requests_per_minute=600)  # 0.1초마다 1개
+        limiter.buckets["requests"].tokens = 1
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await limiter.acquire()
+            await limiter.acquire()
+            return loop.time() - start
+
+        elapsed = asyncio.run(main())
+        self.assertGreaterEqual(elapsed, 0.08)
+        self.assertEqual(limiter.stats["delayed"], 1)
+
+    def test_small_requests_can_pass_blocked_large_request(self):
+        """큰 요청이 막혀 있을 때 작은 요청이 먼저 나가고, 추월 횟수가 제한되는지 테스트"""
+        limiter = RateLimiter(input_tokens_per_minute=60000, max_bypass=1)
+        limiter.buckets["input_tokens"].tokens = 150
+
+        async def main():
+            order = []
+
+            async def request(name, tokens):
+                await limiter.acquire(tokens)
+                order.append(name)
+
+            await asyncio.gather(
+                request("large", 300),
+                request("small-1", 100),
+                request("small-2", 40),
+            )
+            return order
+
+        order = asyncio.run(main())
+        # small-1이 large를 추월한 뒤에는 small-2가 large를 앞지르지 못함
+        self.assertEqual(order, ["small-1", "large", "small-2"])
+        self.assertEqual(limiter.stats["reordered"], 1)
+
+    def test_settle_refunds_unused_output_tokens(self):
+        """실제 사용량 정산 테스트"""
+        limiter = RateLimiter(output_tokens_per_minute=10000)
+
+        async def main():
+            reservation = await limiter.acquire(0, 8000)
+            limiter.settle(reservation, 0, 500)
+
+        asyncio.run(main())
+        self.assertGreater(limiter.buckets["output_tokens"].tokens, 9400)
+
+    def test_update_from_headers(self):
+        """응답 헤더로 한도를 갱신하는지 테스트"""
+        limiter = RateLimiter()
+        limiter.update_from_headers({
+            "anthropic-ratelimit-requests-limit": "50",
+            "anthropic-ratelimit-requests-remaining": "10",
+            "anthropic-ratelimit-output-tokens-limit": "8000",
+        })
+
+        self.assertEqual(limiter.buckets["requests"].capacity, 50)
+        self.assertLessEqual(limiter.buckets["requests"].tokens, 10.1)
+        self.assertEqual(limiter.buckets["output_tokens"].capacity, 8000)
+        self.assertIsNone(limiter.buckets["input_tokens"].capacity)
+
+    def test_retry_after_seconds(self):
+        """retry-after 헤더 해석 테스트"""
+        error = MagicMock()
+        error.response.headers = {"retry-after": "12"}
+        self.assertEqual(retry_after_seconds(error), 12.0)
+        self.assertIsNone(retry_after_seconds(ValueError("no response")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, patch
+from src.request_hedger import RequestHedger
+from src import chat_session
+from src.chat_session import ChatSession
+from src.rate_limiter import RateLimiter
+from types import SimpleNamespace
+from tests.test_chat_session import FakeStream, FakeStreamManager
+
+class SlowStartStream(FakeStream):
+    """첫 조각이 늦게 오는 스트림 흉내"""
+    def __init__(self, chunks, delay):
+        super().__init__(chunks)
+        self.delay = delay
+
+    @property
+    async def text_stream(self):
+        await asyncio.sleep(self.delay)
+        for chunk in self.chunks:
+            yield chunk
+
+class TestRequestHedger(unittest.TestCase):
+    def _hedger(self, **kwargs):
+        options = {"min_samples": 3, "min_delay": 0.01, **kwargs}
+        hedger = RequestHedger(**options)
+        for _ in range(3):
+            hedger.record_ttft(0.02)
+        return hedger
+
+    def test_no_hedge_without_samples(self):
+        """TTFT 표본이 부족하면 예비 요청을 보내지 않는지 테스트"""
+        hedger = RequestHedger(min_samples=3)
+        calls = []
+
+        async def start():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "primary"
+
+        result = asyncio.run(hedger.race(start, MagicMock()))
+        self.assertEqual(result, "primary")
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(hedger.hedge_delay())
+
+    def test_hedge_wins_when_primary_is_slow(self):
+        """원래 요청이 늦으면 예비 요청의 결과를 쓰고 원래 요청은 취소하는지 테스트"""
+        hedger = self._hedger()
+        cancelled = []
+
+        async def start():
+            index = hedger.stats["hedged"]
+            try:
+                await asyncio.sleep(5 if index == 0 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(index)
+                raise
+            return index
+
+        result = asyncio.run(hedger.race(start, MagicMock()))
+        self.assertEqual(result, 1)
+        self.assertEqual(cancelled, [0])
+        self.assertEqual(hedger.stats["hedge_wins"], 1)
+        self.assertEqual(hedger.snapshot()["hedge_win_rate"], 1.0)
+
+    def test_hedge_ttft_measured_from_primary_start(self):
+        """예비 요청이 이기면 TTFT를 원래 요청을 보낸 시점부터 재는지 테스트"""
+        hedger = self._hedger()
+
+        async def start():
+            index = hedger.stats["hedged"]
+            await asyncio.sleep(5 if index == 0 else 0.01)
+            return index
+
+        self.assertEqual(asyncio.run(hedger.race(start, MagicMock())), 1)
+        # 예비 요청은 기준 지연(0.02초) 뒤에 시작했으므로 표본은 그보다 길어야 함
+        self.assertEqual(len(hedger._samples), 4)
+        self.assertGreaterEqual(hedger._samples[-1], 0.02)
+
+    def test_budget_limits_hedges(self):
+        """예산이 없으면 예비 요청을 보내지 않는지 테스트"""
+        hedger = self._hedger(budget_capacity=0, budget_ratio=0.05)
+
+        async def start():
+            await asyncio.sleep(0.05)
+            return "primary"
+
+        asyncio.run(hedger.race(start, MagicMock()))
+        self.assertEqual(hedger.stats["hedged"], 0)
+        self.assertEqual(hedger.stats["skipped_budget"], 1)
+
+    def test_failed_primary_falls_back_to_hedge(self):
+        """예비 요청을 보낸 뒤 원래 요청이 실패하면 예비 요청 결과를 쓰는지 테스트"""
+        hedger = self._hedger()
+
+        async def start():
+            if hedger.stats["hedged"] == 0:
+                await asyncio.sleep(0.05)
+                raise ConnectionError("reset")
+            await asyncio.sleep(0.1)
+            return "hedge"
+
+        self.assertEqual(asyncio.run(hedger.race(start, MagicMock())), "hedge")
+
+    def test_session_uses_first_stream_to_start(self):
+        """세션이 먼저 시작된 스트림을 쓰고 늦은 스트림을 닫는지 테스트"""
+        client = MagicMock()
+        slow = SlowStartStream(["slow"], delay=5)
+        fast = FakeStream(["fast", " answer"])
+        client.messages.stream.side_effect = [FakeStreamManager(slow), FakeStreamManager(fast)]
+        session = ChatSession(client=client, hedge=True)
+
+        async def collect():
+            return [chunk async for chunk in session.stream_response("hi")]
+
+        # 세션이 사용하는 공유 헤저를 표본이 채워진 헤저로 교체
+        with patch.object(chat_session.RequestHedger, '_instance', self._hedger()):
+            chunks = asyncio.run(collect())
+
+        self.assertEqual(chunks, ["fast", " answer"])
+        self.assertEqual(session.messages[-1].content, "fast answer")
+        self.assertTrue(fast.closed)
+        self.assertTrue(slow.closed)
+
+    def test_session_returns_loser_reservations(self):
+        """진 쪽 스트림과 취소된 스트림의 출력 토큰 예약을 되돌리는지 테스트"""
+        client = MagicMock()
+        slow = SlowStartStream(["slow"], delay=5)
+        fast = FakeStream(["fast"])
+        client.messages.stream.side_effect = [FakeStreamManager(slow), FakeStreamManager(fast)]
+        limiter = RateLimiter(output_tokens_per_minute=100000)
+        session = ChatSession(client=client, hedge=True, rate_limiter=limiter)
+
+        async def collect():
+            return [chunk async for chunk in session.stream_response("hi")]
+
+        with patch.object(chat_session.RequestHedger, '_instance', self._hedger()):
+            asyncio.run(collect())
+        bucket = limiter.buckets["output_tokens"]
+        # 이긴 스트림의 실제 출력(5)만 남음
+        self.assertGreater(bucket.tokens, bucket.capacity - 10)
+
+        class BothFinish:
+            """두 요청이 모두 첫 조각을 받은 경우"""
+            async def race(self, start, discard):
+                winner = await start()
+                await discard(await start())
+                return winner
+
+        client.messages.stream.side_effect = [FakeStreamManager(FakeStream(["a"])),
+                                              FakeStreamManager(FakeStream(["b"]))]
+        with patch.object(chat_session.RequestHedger, '_instance', BothFinish()):
+            self.assertEqual(asyncio.run(collect()), ["a"])
+        self.assertGreater(bucket.tokens, bucket.capacity - 20)
+
+    def test_session_records_loser_usage(self):
+        """첫 조각까지 받은 진 쪽 스트림의 사용량도 장부에 기록하는지 테스트"""
+        client = MagicMock()
+        loser = FakeStream(["b"])
+        loser.current_message_snapshot = SimpleNamespace(usage=SimpleNamespace(
+            input_tokens=15, output_tokens=1, cache_creation_input_tokens=0, cache_read_input_tokens=0
+        ))
+        client.messages.stream.side_effect = [FakeStreamManager(FakeStream(["a"])),
+                                              FakeStreamManager(loser)]
+        session = ChatSession(client=client, hedge=True)
+
+        class BothFinish:
+            """두 요청이 모두 첫 조각을 받은 경우"""
+            async def race(self, start, discard):
+                winner = await start()
+                await discard(await start())
+                return winner
+
+        async def collect():
+            return [chunk async for chunk in session.stream_response("hi")]
+
+        with patch.object(chat_session.RequestHedger, '_instance', BothFinish()):
+            self.assertEqual(asyncio.run(collect()), ["a"])
+        purposes = [record.purpose for record in session.usage_ledger.records]
+        self.assertEqual(sorted(purposes), ["chat", "hedge"])
+        hedge = next(record for record in session.usage_ledger.records if record.purpose == "hedge")
+        self.assertEqual(hedge.input_tokens, 15)
+        self.assertEqual(session.get_token_usage()["requests"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import asyncio
+from src.controllers.request_scheduler import RequestScheduler
+from src.events import EventEmitter, UIEventType
+
+class TestRequestScheduler(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.emitter = EventEmitter()
+        self.statuses = []
+        self.emitter.on(UIEventType.QUEUE_STATUS.value, self.statuses.append)
+
+    def test_same_session_runs_in_order(self):
+        """같은 세션의 요청은 순서대로 하나씩 실행되는지 테스트"""
+        scheduler = RequestScheduler(self.emitter, max_concurrent=4)
+        order = []
+        running = []
+
+        def job(name):
+            async def run():
+                running.append(name)
+                self.assertEqual(len(running), 1)
+                await asyncio.sleep(0.01)
+                running.remove(name)
+                order.append(name)
+                return name
+            return run
+
+        async def main():
+            futures = [scheduler.submit("a", job(name)) for name in ("first", "second", "third")]
+            return await asyncio.gather(*futures)
+
+        results = asyncio.run(main())
+        self.assertEqual(results, ["first", "second", "third"])
+        self.assertEqual(order, ["first", "second", "third"])
+
+    def test_sessions_run_concurrently_within_limit(self):
+        """다른 세션의 요청이 전역 제한 안에서 동시에 실행되는지 테스트"""
+        scheduler = RequestScheduler(self.emitter, max_concurrent=2)
+        peak = 0
+
+        async def job():
+            nonlocal peak
+            peak = max(peak, scheduler.active_requests)
+            await asyncio.sleep(0.02)
+
+        async def main():
+            await asyncio.gather(*(scheduler.submit(f"s{i}", job) for i in range(4)))
+
+        asyncio.run(main())
+        self.assertEqual(peak, 2)
+
+    def test_queue_status_events(self):
+        """큐 길이와 대기 시간 이벤트 테스트"""
+        scheduler = RequestScheduler(self.emitter, max_concurrent=1)
+
+        async def job():
+            await asyncio.sleep(0.01)
+
+        async def main():
+            await asyncio.gather(scheduler.submit("a", job), scheduler.submit("a", job))
+
+        asyncio.run(main())
+        queued = [s for s in self.statuses if s["status"] == "queued"]
+        started = [s for s in self.statuses if s["status"] == "started"]
+        self.assertEqual([s["queue_depth"] for s in queued], [1, 2])
+        self.assertEqual(len(started), 2)
+        self.assertGreater(started[1]["wait_time"], started[0]["wait_time"])
+
+    def test_errors_are_returned_to_caller(self):
+        """작업 예외가 호출자에게 전달되고 다음 요청은 계속 실행되는지 테스트"""
+        scheduler = RequestScheduler(self.emitter)
+
+        async def fail():
+            raise ValueError("boom")
+
+        async def succeed():
+            return "ok"
+
+        async def main():
+            failing = scheduler.submit("a", fail)
+            succeeding = scheduler.submit("a", succeed)
+            with self.assertRaises(ValueError):
+                await failing
+            return await succeeding
+
+        self.assertEqual(asyncio.run(main()), "ok")
+
+    def test_cancel_session(self):
+        """대기 중인 요청 취소 테스트"""
+        scheduler = RequestScheduler(self.emitter)
+        executed = []
+
+        async def job():
+            executed.append(True)
+            await asyncio.sleep(0.01)
+
+        async def main():
+            first = scheduler.submit("a", job)
+            second = scheduler.submit("a", job)
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.cancel_session("a"), 1)
+            await first
+            self.assertTrue(second.cancelled())
+
+        asyncio.run(main())
+        self.assertEqual(len(executed), 1)
+
+    def test_cancel_while_waiting_for_slot(self):
+        """자리를 기다리는 세션을 취소한 뒤 다시 보낸 요청이 실행되는지 테스트"""
+        scheduler = RequestScheduler(self.emitter, max_concurrent=1)
+
+        async def main():
+            gate = asyncio.Event()
+
+            async def blocker():
+                await gate.wait()
+                return "blocker"
+
+            async def job(value):
+                return value
+
+            blocking = scheduler.submit("a", blocker)
+            await asyncio.sleep(0)
+            dropped = scheduler.submit("b", lambda: job("dropped"))
+            await asyncio.sleep(0)
+            # b의 작업자는 자리를 기다리는 중
+            self.assertEqual(scheduler.cancel_session("b"), 1)
+            resent = scheduler.submit("b", lambda: job("resent"))
+            gate.set()
+            self.assertEqual(await blocking, "blocker")
+            self.assertEqual(await asyncio.wait_for(resent, timeout=1), "resent")
+            self.assertTrue(dropped.cancelled())
+
+            # 다시 보내지 않아도 작업자가 오류 없이 끝나야 함
+            gate.clear()
+            blocking = scheduler.submit("a", blocker)
+            await asyncio.sleep(0)
+            scheduler.submit("b", lambda: job("dropped"))
+            await asyncio.sleep(0)
+            worker = scheduler._workers["b"]
+            scheduler.cancel_session("b")
+            gate.set()
+            await blocking
+            await asyncio.wait_for(worker, timeout=1)
+            self.assertIsNone(worker.exception())
+            self.assertEqual(scheduler._queues, {})
+
+        asyncio.run(main())
+
+if __name__ == '__main__':
+    unittest.main()
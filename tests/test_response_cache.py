@@ -0,0 +1,126 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+from src import chat_session
+from src.chat_session import ChatSession
+from src.response_cache import ResponseCache
+from tests.test_chat_session import FakeStream, FakeStreamManager
+
+REQUEST = {
+    "model": "claude-test",
+    "max_tokens": 100,
+    "temperature": 0.0,
+    "system": "You are helpful.",
+    "messages": [{"role": "user", "content": "Translate: hello"}]
+}
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(directory=self.temp_dir.name)
+
+    def tearDown(self):
+        """각 테스트 후에 실행됩니다."""
+        self.temp_dir.cleanup()
+
+    def test_fingerprint_normalizes_request(self):
+        """형식만 다른 같은 요청은 같은 키를, 설정이 다른 요청은 다른 키를 갖는지 테스트"""
+        key = ResponseCache.fingerprint(REQUEST)
+        blocks = {
+            **REQUEST,
+            "system": [{"type": "text", "text": "You are helpful.", "cache_control": {"type": "ephemeral"}}],
+            "messages": [{"role": "user", "content": [{"type": "text", "text": "Translate: hello "}]}]
+        }
+        self.assertEqual(ResponseCache.fingerprint(blocks), key)
+        self.assertNotEqual(ResponseCache.fingerprint({**REQUEST, "temperature": 0.5}), key)
+        self.assertNotEqual(ResponseCache.fingerprint({**REQUEST, "model": "claude-other"}), key)
+
+    def test_round_trip_is_encrypted(self):
+        """저장한 응답을 다시 읽고, 디스크에는 암호화되어 있는지 테스트"""
+        key = ResponseCache.fingerprint(REQUEST)
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, ["Hel", "lo"], "claude-test")
+
+        self.assertEqual(self.cache.get(key)["chunks"], ["Hel", "lo"])
+        with open(os.path.join(self.temp_dir.name, f"{key}.cache"), 'rb') as f:
+            self.assertNotIn(b"Hel", f.read())
+        self.assertEqual(self.cache.stats["hits"], 1)
+        self.assertEqual(self.cache.stats["misses"], 1)
+
+        # 재시작 후에도 디스크에서 색인을 다시 구성
+        reloaded = ResponseCache(directory=self.temp_dir.name)
+        self.assertEqual(reloaded.get(key)["chunks"], ["Hel", "lo"])
+
+    def test_expired_entry_is_removed(self):
+        """유효 기간이 지난 항목은 삭제되는지 테스트"""
+        self.cache.put("old", ["stale"], "claude-test")
+        self.cache.configure(ttl=10)
+        with patch('time.time', return_value=time.time() + 60):
+            self.assertIsNone(self.cache.get("old"))
+        self.assertEqual(self.cache.stats["expired"], 1)
+        self.assertEqual(len(self.cache.entries), 0)
+
+    def test_lru_eviction(self):
+        """크기 한도를 넘으면 가장 오래 사용하지 않은 항목부터 삭제되는지 테스트"""
+        self.cache.put("a", ["x" * 100], "claude-test")
+        self.cache.put("b", ["y" * 100], "claude-test")
+        self.cache.configure(max_bytes=self.cache.total_bytes)
+        self.cache.get("a")
+        self.cache.put("c", ["z" * 100], "claude-test")
+
+        self.assertEqual(list(self.cache.entries), ["a", "c"])
+        self.assertEqual(self.cache.stats["evictions"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "b.cache")))
+
+class TestSessionResponseCache(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(directory=self.temp_dir.name)
+        patcher = patch.object(chat_session.ResponseCache, '_instance', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def _collect(self, session, text):
+        async def collect():
+            return [chunk async for chunk in session.stream_response(text)]
+        return asyncio.run(collect())
+
+    def test_repeated_prompt_is_replayed(self):
+        """같은 질문은 API 없이 같은 조각으로 재생되는지 테스트"""
+        client = MagicMock()
+        client.messages.stream.side_effect = lambda **request: FakeStreamManager(FakeStream(["Bon", "jour"]))
+
+        first = ChatSession(client=client, response_cache=True)
+        self.assertEqual(self._collect(first, "hello"), ["Bon", "jour"])
+        second = ChatSession(client=client, response_cache=True)
+        self.assertEqual(self._collect(second, "hello"), ["Bon", "jour"])
+
+        self.assertEqual(client.messages.stream.call_count, 1)
+        self.assertEqual(second.messages[-1].content, "Bonjour")
+        self.assertEqual(second.messages[-1].metadata["response_cache"], "hit")
+        self.assertEqual(second.get_token_usage()["requests"], 0)
+        # 캐시 적중은 이전 응답의 사용량을 이 응답의 것으로 보고하지 않음
+        self.assertIsNotNone(first.last_usage)
+        self.assertFalse(first.last_cache_hit)
+        self.assertIsNone(second.last_usage)
+        self.assertTrue(second.last_cache_hit)
+
+    def test_cache_is_opt_in(self):
+        """response_cache를 켜지 않은 세션은 캐시를 사용하지 않는지 테스트"""
+        client = MagicMock()
+        client.messages.stream.side_effect = lambda **request: FakeStreamManager(FakeStream(["hi"]))
+
+        for _ in range(2):
+            self._collect(ChatSession(client=client), "hello")
+
+        self.assertEqual(client.messages.stream.call_count, 2)
+        self.assertEqual(self.cache.stats["stores"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
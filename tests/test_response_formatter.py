@@ -1,5 +1,5 @@
 import unittest
-from src.response_formatter import format_response
+from src.response_formatter import format_response, StreamingFormatter
 
 class TestResponseFormatter(unittest.TestCase):
     def test_code_block_formatting(self):
@@ -20,5 +20,21 @@ class TestResponseFormatter(unittest.TestCase):
         self.assertIn("\033[3m", formatted)
         self.assertIn("\033[0m", formatted)
 
+    def test_streaming_formatter_emits_complete_lines(self):
+        formatter = StreamingFormatter()
+        self.assertEqual(formatter.feed("Hello **wor"), "")
+        self.assertEqual(formatter.feed("ld**\nNext"), "Hello \033[1mworld\033[0m\n")
+        self.assertEqual(formatter.flush(), "Next")
+
+    def test_streaming_formatter_highlights_code_blocks(self):
+        formatter = StreamingFormatter()
+        output = formatter.feed("```python\n    print('hi')\n")
+        output += formatter.feed("```\ndone\n")
+
+        self.assertNotIn("```", output)
+        self.assertIn("\033[", output)
+        self.assertIn("    ", output)
+        self.assertTrue(output.endswith("done\n"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
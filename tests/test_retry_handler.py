@@ -1,8 +1,17 @@
 import unittest
 import asyncio
-from unittest.mock import MagicMock, patch
-from src.retry_handler import RetryHandler
+from unittest.mock import MagicMock, AsyncMock, patch
+from src.retry_handler import RetryHandler, NO_RETRY, CircuitBreaker, CircuitOpenError
+from src.events import EventEmitter, UIEventType
 import time
+import httpx
+import anthropic
+
+def make_status_error(status_code, headers=None):
+    """상태 코드가 있는 API 오류 생성"""
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status_code, request=request, headers=headers)
+    return anthropic.APIStatusError("error", response=response, body=None)
 
 class TestRetryHandler(unittest.TestCase):
     def setUp(self):
@@ -33,34 +42,40 @@ class TestRetryHandler(unittest.TestCase):
 
     def test_retry_decorator(self):
         """재시도 데코레이터 테스트"""
-        mock_func = MagicMock(side_effect=[ValueError, ValueError, "success"])
-        
-        @self.retry_handler.retry
+        mock_func = MagicMock(side_effect=[make_status_error(503), make_status_error(529), "success"])
+
+        @self.retry_handler.retry(custom_base_delay=0.01)
         def test_function():
             return mock_func()
-            
+
         # 함수 실행
         result = test_function()
-        
+
         # 검증
         self.assertEqual(result, "success")
         self.assertEqual(mock_func.call_count, 3)
 
     def test_retry_decorator_failure(self):
-        """최대 재시도 횟수 초과 테스트"""
-        mock_func = MagicMock(side_effect=ValueError("Test error"))
-        
-        @self.retry_handler.retry
+        """최대 재시도 횟수 초과와 재시도하지 않는 오류 테스트"""
+        mock_func = MagicMock(side_effect=make_status_error(503))
+
+        @self.retry_handler.retry(custom_base_delay=0.01)
         def test_function():
             return mock_func()
-            
+
         # 예외 발생 확인
-        with self.assertRaises(ValueError):
+        with self.assertRaises(anthropic.APIStatusError):
             test_function()
-            
+
         # 정확한 재시도 횟수 확인
         self.assertEqual(mock_func.call_count, self.retry_handler.max_retries)
 
+        # 재시도 정책이 없는 오류는 한 번만 호출
+        mock_func = MagicMock(side_effect=ValueError("Test error"))
+        with self.assertRaises(ValueError):
+            self.retry_handler(mock_func)()
+        self.assertEqual(mock_func.call_count, 1)
+
     async def async_test_function(self, mock_func):
         """비동기 테스트를 위한 헬퍼 함수"""
         return await self.retry_handler.async_retry(mock_func)
@@ -69,14 +84,14 @@ class TestRetryHandler(unittest.TestCase):
         """비동기 재시도 로직 테스트"""
         async def run_async_test():
             # 성공 케이스 테스트
-            mock_success = MagicMock(side_effect=[ValueError, ValueError, "success"])
+            mock_success = AsyncMock(side_effect=[make_status_error(500), make_status_error(429), "success"])
             result = await self.async_test_function(mock_success)
             self.assertEqual(result, "success")
             self.assertEqual(mock_success.call_count, 3)
-            
+
             # 실패 케이스 테스트
-            mock_failure = MagicMock(side_effect=ValueError("Test error"))
-            with self.assertRaises(ValueError):
+            mock_failure = AsyncMock(side_effect=make_status_error(503))
+            with self.assertRaises(anthropic.APIStatusError):
                 await self.async_test_function(mock_failure)
             self.assertEqual(mock_failure.call_count, self.retry_handler.max_retries)
 
@@ -85,62 +100,218 @@ class TestRetryHandler(unittest.TestCase):
 
     def test_is_retryable_error(self):
         """재시도 가능한 에러 판단 테스트"""
-        # API 에러 모의 객체 생성
-        class MockAPIError(Exception):
-            def __init__(self, status_code):
-                self.status_code = status_code
-        
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+
         # 재시도 가능한 에러 테스트
         retryable_errors = [
-            MockAPIError(429),  # Rate limit
-            MockAPIError(500),  # Server error
-            MockAPIError(503)   # Service unavailable
+            make_status_error(429),  # Rate limit
+            make_status_error(500),  # Server error
+            make_status_error(503),  # Service unavailable
+            make_status_error(529),  # Overloaded
+            anthropic.APIConnectionError(request=request),
+            anthropic.APITimeoutError(request=request)
         ]
-        
         for error in retryable_errors:
-            with patch('anthropic.APIError', MockAPIError):
-                self.assertTrue(
-                    self.retry_handler.is_retryable_error(error),
-                    f"Status code {error.status_code} should be retryable"
-                )
-        
+            self.assertTrue(self.retry_handler.is_retryable_error(error),
+                            f"Error {error!r} should be retryable")
+
         # 재시도 불가능한 에러 테스트
         non_retryable_errors = [
-            MockAPIError(400),  # Bad request
-            MockAPIError(401),  # Unauthorized
-            MockAPIError(404),  # Not found
+            make_status_error(400),  # Bad request
+            make_status_error(401),  # Unauthorized
+            make_status_error(404),  # Not found
             ValueError("Test error")
         ]
-        
         for error in non_retryable_errors:
-            with patch('anthropic.APIError', MockAPIError):
-                self.assertFalse(
-                    self.retry_handler.is_retryable_error(error),
-                    f"Error {error} should not be retryable"
-                )
+            self.assertFalse(self.retry_handler.is_retryable_error(error),
+                             f"Error {error!r} should not be retryable")
 
     def test_error_handler_execution(self):
         """에러 핸들러 실행 테스트"""
         # 에러 핸들러 모의 객체
         mock_handler = MagicMock()
-        self.retry_handler.register_error_handler(ValueError, mock_handler)
-        
+        self.retry_handler.register_error_handler(anthropic.APIStatusError, mock_handler)
+
         # 테스트 함수
-        mock_func = MagicMock(side_effect=[ValueError("Test error"), "success"])
-        
-        @self.retry_handler.retry
+        mock_func = MagicMock(side_effect=[make_status_error(503), "success"])
+
+        @self.retry_handler.retry(custom_base_delay=0.01)
         def test_function():
             return mock_func()
-        
+
         # 함수 실행
         result = test_function()
-        
+
         # 검증
         self.assertEqual(result, "success")
         mock_handler.assert_called_once()
         args = mock_handler.call_args[0]
-        self.assertIsInstance(args[0], ValueError)
+        self.assertIsInstance(args[0], anthropic.APIStatusError)
         self.assertEqual(args[1], 0)  # 첫 번째 시도
 
+    def _run_failing(self, handler, errors, result="ok"):
+        """주어진 오류를 차례로 던진 뒤 성공하는 비동기 함수를 재시도"""
+        calls = []
+
+        async def request():
+            calls.append(time.monotonic())
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return result
+
+        return asyncio.run(handler.async_retry(request)), calls
+
+    def test_client_errors_are_not_retried(self):
+        """400/401 오류는 재시도하지 않는지 테스트"""
+        events = []
+        self.retry_handler.add_listener(events.append)
+        for status_code in (400, 401):
+            with self.assertRaises(anthropic.APIStatusError):
+                self._run_failing(self.retry_handler, [make_status_error(status_code)])
+        self.assertEqual([event.reason for event in events], ["non_retryable", "non_retryable"])
+        self.assertFalse(self.retry_handler.is_retryable_error(ValueError("bad")))
+
+    def test_status_policies(self):
+        """상태 코드와 계열별 정책 조회 테스트"""
+        self.retry_handler.set_policy(503, NO_RETRY)
+        self.assertTrue(self.retry_handler.is_retryable_error(make_status_error(502)))
+        self.assertFalse(self.retry_handler.is_retryable_error(make_status_error(503)))
+        self.assertTrue(self.retry_handler.is_retryable_error(make_status_error(529)))
+
+    def test_retry_after_is_honored(self):
+        """retry-after 헤더 시간 이상 기다리는지 테스트"""
+        error = make_status_error(429, headers={"retry-after": "0.3"})
+        result, calls = self._run_failing(self.retry_handler, [error])
+        self.assertEqual(result, "ok")
+        self.assertGreaterEqual(calls[1] - calls[0], 0.29)
+
+    def test_deadline_includes_backoff(self):
+        """백오프가 마감 시간을 넘으면 바로 포기하는지 테스트"""
+        handler = RetryHandler(max_retries=5, base_delay=1.0, deadline=0.5)
+        events = []
+        handler.add_listener(events.append)
+        started = time.monotonic()
+        with self.assertRaises(anthropic.APIStatusError):
+            self._run_failing(handler, [make_status_error(503)] * 5)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(events[-1].reason, "deadline")
+
+    def test_retry_budget_limits_retries(self):
+        """재시도 예산을 다 쓰면 재시도하지 않는지 테스트"""
+        handler = RetryHandler(max_retries=3, base_delay=0.001, budget_ratio=0.5, budget_capacity=1)
+        events = []
+        handler.add_listener(events.append)
+        result, calls = self._run_failing(handler, [make_status_error(500)])
+        self.assertEqual(len(calls), 2)
+        with self.assertRaises(anthropic.APIStatusError):
+            self._run_failing(handler, [make_status_error(500)])
+        self.assertEqual(events[-1].reason, "budget")
+
+    def test_attempt_events(self):
+        """시도 결과 이벤트 테스트"""
+        handler = RetryHandler(max_retries=3, base_delay=0.001)
+        events = []
+        handler.add_listener(events.append)
+        self._run_failing(handler, [make_status_error(529)])
+        self.assertEqual([(event.attempt, event.outcome) for event in events], [(1, "retry"), (2, "success")])
+        self.assertEqual(events[0].status_code, 529)
+        self.assertIsNotNone(events[0].to_dict()["delay"])
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.emitter = EventEmitter()
+        self.states = []
+        self.emitter.on(UIEventType.CIRCUIT_STATE.value, self.states.append)
+        self.breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05, event_emitter=self.emitter)
+        self.handler = RetryHandler(max_retries=1, circuit_breaker=self.breaker)
+
+    def _call(self, error=None):
+        calls = []
+
+        async def request():
+            calls.append(1)
+            if error is not None:
+                raise error
+            return "ok"
+
+        try:
+            return asyncio.run(self.handler.async_retry(request)), calls
+        except Exception as e:
+            return e, calls
+
+    def test_opens_after_consecutive_failures(self):
+        """연속 실패 후 회로가 열리고 요청을 보내지 않고 실패하는지 테스트"""
+        for _ in range(2):
+            self._call(make_status_error(503))
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        result, calls = self._call()
+        self.assertIsInstance(result, CircuitOpenError)
+        self.assertEqual(calls, [])
+        self.assertEqual(self.states[-1]["state"], "open")
+
+    def test_client_errors_do_not_open(self):
+        """4xx 응답은 장애로 보지 않는지 테스트"""
+        for _ in range(3):
+            self._call(make_status_error(400))
+        self._call(make_status_error(429))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_half_open_probe_closes(self):
+        """cooldown 뒤 탐색 요청이 성공하면 닫히는지 테스트"""
+        for _ in range(2):
+            self._call(make_status_error(503))
+        time.sleep(0.06)
+
+        result, calls = self._call()
+        self.assertEqual(result, "ok")
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual([state["state"] for state in self.states], ["open", "half_open", "closed"])
+
+    def test_failed_probe_reopens_with_longer_cooldown(self):
+        """탐색 요청이 실패하면 더 긴 cooldown으로 다시 열리는지 테스트"""
+        for _ in range(2):
+            self._call(make_status_error(503))
+        time.sleep(0.06)
+
+        self._call(ConnectionError("reset"))
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertAlmostEqual(self.breaker.cooldown, 0.1)
+
+    def test_deadline_timeout_does_not_open(self):
+        """마감 시간 초과는 장애로 세지 않아 회로가 열리지 않는지 테스트"""
+        handler = RetryHandler(max_retries=1, deadline=0.05, circuit_breaker=self.breaker)
+
+        async def request():
+            await asyncio.sleep(1)
+
+        for _ in range(2):
+            with self.assertRaises(TimeoutError):
+                asyncio.run(handler.async_retry(request))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_model_breakers_follow_shared_settings(self):
+        """모델별 차단기를 만든 뒤의 설정과 이벤트 발행자 변경이 적용되는지 테스트"""
+        with patch.object(CircuitBreaker, '_instance', None), patch.object(CircuitBreaker, '_models', {}):
+            breaker = CircuitBreaker.for_model("claude-test")
+            shared = CircuitBreaker.get_instance()
+            shared.configure(failure_threshold=1, cooldown=0.05)
+            shared.event_emitter = self.emitter
+
+            breaker.record(make_status_error(503), probe=False)
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            self.assertAlmostEqual(breaker.cooldown, 0.05)
+            self.assertEqual(self.states[-1]["model"], "claude-test")
+
+    def test_single_probe_in_half_open(self):
+        """반열림 상태에서는 탐색 요청 하나만 허용하는지 테스트"""
+        self.breaker.state = CircuitBreaker.HALF_OPEN
+        self.assertTrue(self.breaker.before_request())
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,104 @@
+import unittest
+import os
+import tempfile
+import shutil
+import time
+from unittest.mock import MagicMock, patch
+from src.conversation_manager import ConversationManager
+
+class TestSessionAutosave(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.storage_dir = tempfile.mkdtemp()
+        # 정리 함수는 등록의 역순으로 실행되므로 각 테스트의 manager.close 다음에 삭제됨
+        self.addCleanup(shutil.rmtree, self.storage_dir, ignore_errors=True)
+
+    def _manager(self, **kwargs):
+        manager = ConversationManager(storage_dir=self.storage_dir, client=MagicMock(), **kwargs)
+        self.addCleanup(manager.close)
+        return manager
+
+    def _stored_sizes(self):
+        return {filename: os.path.getsize(os.path.join(self.storage_dir, filename))
+                for filename in os.listdir(self.storage_dir) if filename.endswith('.journal')}
+
+    def test_dirty_flags(self):
+        """변경된 세션만 dirty로 표시되고 저장하면 지워지는지 테스트"""
+        manager = self._manager(autosave_delay=None)
+        session = manager.create_new_session("alpha")
+        self.assertTrue(manager.is_dirty("alpha"))
+
+        manager.save_session("alpha")
+        self.assertFalse(manager.is_dirty("alpha"))
+
+        session.add_message("user", "hello")
+        self.assertTrue(manager.is_dirty("alpha"))
+
+        manager.rename_session("alpha", "beta")
+        self.assertTrue(manager.is_dirty("beta"))
+        session.add_message("assistant", "hi")
+        # 새로 만든 Default Session도 아직 저장되지 않음
+        self.assertEqual(manager.flush_dirty_sessions(), 2)
+        self.assertFalse(manager.is_dirty("beta"))
+        self.assertEqual(manager.flush_dirty_sessions(), 0)
+
+    def test_change_during_save_stays_dirty(self):
+        """저장하는 동안 바뀐 세션은 저장 후에도 dirty로 남는지 테스트"""
+        manager = self._manager(autosave_delay=None)
+        session = manager.create_new_session("alpha")
+        save = manager.store.save
+
+        def save_and_change(name, saving, last_active):
+            records = save(name, saving, last_active)
+            if name == "alpha" and len(saving.messages) == 0:
+                saving.add_message("user", "typed while saving")
+            return records
+
+        with patch.object(manager.store, 'save', side_effect=save_and_change):
+            manager.save_session("alpha")
+            self.assertTrue(manager.is_dirty("alpha"))
+            self.assertEqual(manager.flush_dirty_sessions(), 2)
+        self.assertFalse(manager.is_dirty("alpha"))
+
+        loaded = ConversationManager(storage_dir=self.storage_dir, client=MagicMock(),
+                                     autosave_delay=None).get_session("alpha")
+        self.assertEqual([m.content for m in loaded.messages], ["typed while saving"])
+
+    def test_autosave_in_background(self):
+        """변경이 멈추면 자동 저장 스레드가 세션을 저장하는지 테스트"""
+        manager = self._manager(autosave_delay=0.05)
+        manager.get_current_session().add_message("user", "hello")
+
+        deadline = time.monotonic() + 5
+        while manager.is_dirty("Default Session") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(manager.is_dirty("Default Session"))
+
+        loaded = ConversationManager(storage_dir=self.storage_dir, client=MagicMock(),
+                                     autosave_delay=None).get_session("Default Session")
+        self.assertEqual([m.content for m in loaded.messages], ["hello"])
+
+    def test_close_flushes_only_dirty_sessions(self):
+        """종료할 때 바뀐 세션만 병렬로 저장하고 진행 상황을 알리는지 테스트"""
+        manager = self._manager(autosave_delay=None, flush_workers=3)
+        names = [f"session {index}" for index in range(5)]
+        for name in names:
+            manager.create_new_session(name).add_message("user", name)
+
+        progress = []
+        self.assertEqual(manager.close(progress=lambda done, total, name: progress.append((done, total))), 6)
+        self.assertEqual(len(progress), 6)
+        self.assertEqual(progress[-1], (6, 6))
+
+        manager = self._manager(autosave_delay=None)
+        for name in names:
+            self.assertEqual([m.content for m in manager.get_session(name).messages], [name])
+        sizes = self._stored_sizes()
+
+        manager.get_session("session 2").add_message("assistant", "changed")
+        self.assertEqual(manager.close(), 1)
+        changed = {filename for filename, size in self._stored_sizes().items() if sizes.get(filename) != size}
+        self.assertEqual(changed, {"session 2.journal"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import json
+import os
+import tempfile
+import shutil
+from unittest.mock import MagicMock, patch
+from src.conversation_manager import ConversationManager
+from src.encryption import encrypt_data
+
+def make_usage(input_tokens, output_tokens):
+    usage = MagicMock()
+    usage.input_tokens = input_tokens
+    usage.output_tokens = output_tokens
+    usage.cache_creation_input_tokens = 0
+    usage.cache_read_input_tokens = 0
+    return usage
+
+class TestSessionJournal(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.storage_dir = tempfile.mkdtemp()
+        self.manager = self._manager()
+        self.session = self.manager.get_current_session()
+        self.name = self.session.name
+
+    def tearDown(self):
+        """각 테스트 후에 실행됩니다."""
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+
+    def _manager(self):
+        return ConversationManager(storage_dir=self.storage_dir, client=MagicMock())
+
+    def _path(self, suffix):
+        return os.path.join(self.storage_dir, f"{self.name}{suffix}")
+
+    def _turn(self, question, answer):
+        self.session.add_message("user", question)
+        self.session.add_message("assistant", answer)
+        self.session.usage_ledger.record(make_usage(10, 5), "claude-test")
+
+    def test_save_appends_only_changes(self):
+        """저장할 때 새 메시지만 저널에 덧붙이는지 테스트"""
+        self._turn("hello", "hi")
+        self.manager.save_session(self.name)
+        size = os.path.getsize(self._path(".journal"))
+
+        self._turn("how are you?", "fine")
+        self.manager.save_session(self.name)
+        with open(self._path(".journal"), 'rb') as f:
+            added = f.read()[size:]
+        self.assertEqual(len(added.splitlines()), 2)
+        self.assertFalse(os.path.exists(self._path(".enc")))
+
+        # 바뀐 것이 없으면 아무것도 쓰지 않음
+        self.assertEqual(self.manager.store._journal(self.name).append(
+            self.session, self.manager.last_active[self.name].isoformat()), 0)
+
+        loaded = self._manager().get_session(self.name)
+        self.assertEqual([m.content for m in loaded.messages], ["hello", "hi", "how are you?", "fine"])
+        self.assertEqual(loaded.get_token_usage()["requests"], 2)
+        self.assertEqual(len(loaded.usage_ledger.records), 2)
+
+    def test_replaced_tail_is_recorded(self):
+        """실패한 턴이 제거되고 다른 메시지로 바뀐 경우를 복원하는지 테스트"""
+        self.session.add_message("user", "first try")
+        self.manager.save_session(self.name)
+        self.session.messages.pop()
+        self.session.add_message("user", "second try")
+        self.session.add_message("assistant", "ok")
+        self.manager.save_session(self.name)
+
+        loaded = self._manager().get_session(self.name)
+        self.assertEqual([m.content for m in loaded.messages], ["second try", "ok"])
+
+    def test_background_compaction(self):
+        """저널이 커지면 스냅샷으로 합치고 저널을 비우는지 테스트"""
+        journal = self.manager.store._journal(self.name)
+        with patch.object(journal, 'COMPACT_MIN_BYTES', 1):
+            self._turn("hello", "hi")
+            self.manager.save_session(self.name)
+            # 압축 스레드는 하나이므로 뒤에 넣은 작업이 끝나면 압축도 끝난 것
+            self.manager.store._compaction_executor.submit(lambda: None).result()
+
+        self.assertTrue(os.path.exists(self._path(".enc")))
+        self.assertFalse(os.path.exists(self._path(".journal")))
+
+        self._turn("again", "sure")
+        self.manager.save_session(self.name)
+        loaded = self._manager().get_session(self.name)
+        self.assertEqual([m.content for m in loaded.messages], ["hello", "hi", "again", "sure"])
+        self.assertEqual(loaded.get_token_usage()["requests"], 2)
+
+    def test_interrupted_compaction_does_not_duplicate(self):
+        """스냅샷을 쓴 뒤 저널을 자르기 전에 중단되어도 레코드를 두 번 적용하지 않는지 테스트"""
+        self._turn("hello", "hi")
+        self.manager.save_session(self.name)
+        with open(self._path(".journal"), 'rb') as f:
+            journal = f.read()
+        self.manager.compact_session(self.name)
+        # 잘라내기 전의 저널이 남아 있는 상태를 재현
+        with open(self._path(".journal"), 'wb') as f:
+            f.write(journal)
+
+        loaded = self._manager().get_session(self.name)
+        self.assertEqual(len(loaded.messages), 2)
+        self.assertEqual(len(loaded.usage_ledger.records), 1)
+
+    def test_compaction_uses_journaled_state(self):
+        """압축 직전에 추가된 사용량 기록이 스냅샷과 저널에 두 번 들어가지 않는지 테스트"""
+        self._turn("hello", "hi")
+        self.manager.save_session(self.name)
+        # 저널에 기록되기 전의 변경
+        self.session.usage_ledger.record(make_usage(10, 5), "claude-test")
+        last_active = self.manager.last_active[self.name].isoformat()
+        self.manager.store.compact(self.name, self.session, last_active)
+        self.manager.save_session(self.name)
+
+        loaded = self._manager().get_session(self.name)
+        self.assertEqual(len(loaded.usage_ledger.records), 2)
+        self.assertEqual(loaded.get_token_usage()["requests"], 2)
+        self.assertEqual([m.content for m in loaded.messages], ["hello", "hi"])
+
+    def test_torn_tail_is_dropped(self):
+        """기록 도중 끊긴 마지막 레코드를 버리고 앞의 레코드를 복구하는지 테스트"""
+        self._turn("hello", "hi")
+        self.manager.save_session(self.name)
+        size = os.path.getsize(self._path(".journal"))
+        with open(self._path(".journal"), 'ab') as f:
+            f.write(encrypt_data(json.dumps({"seq": 99}))[:20])
+
+        loaded = self._manager().get_session(self.name)
+        self.assertEqual([m.content for m in loaded.messages], ["hello", "hi"])
+        self.assertEqual(os.path.getsize(self._path(".journal")), size)
+
+    def test_loads_legacy_snapshot(self):
+        """저널 이전 형식의 세션 파일을 불러오는지 테스트"""
+        legacy = {
+            "name": "legacy",
+            "messages": [{"role": "user", "content": "old", "metadata": None}],
+            "context": "general",
+            "last_active": "2024-01-01T00:00:00"
+        }
+        with open(os.path.join(self.storage_dir, "legacy.enc"), 'wb') as f:
+            f.write(encrypt_data(json.dumps(legacy)))
+
+        loaded = self._manager().get_session("legacy")
+        self.assertEqual(loaded.messages[0].content, "old")
+
+if __name__ == '__main__':
+    unittest.main()
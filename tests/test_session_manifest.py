@@ -0,0 +1,158 @@
+import unittest
+import os
+import tempfile
+import shutil
+from unittest.mock import MagicMock, patch
+from src.conversation_manager import ConversationManager
+
+def make_usage(input_tokens, output_tokens):
+    usage = MagicMock()
+    usage.input_tokens = input_tokens
+    usage.output_tokens = output_tokens
+    usage.cache_creation_input_tokens = 0
+    usage.cache_read_input_tokens = 0
+    return usage
+
+class TestSessionManifest(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.storage_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """각 테스트 후에 실행됩니다."""
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+
+    def _manager(self, **kwargs):
+        return ConversationManager(storage_dir=self.storage_dir, client=MagicMock(), **kwargs)
+
+    def _populate(self, names):
+        """세션마다 대화 한 번과 사용량을 기록하여 저장합니다."""
+        manager = self._manager()
+        for index, name in enumerate(names):
+            session = manager.create_new_session(name)
+            session.context_manager.set_context("teacher")
+            session.add_message("user", f"question {index}")
+            session.add_message("assistant", f"answer {index}")
+            session.usage_ledger.record(make_usage(10, 5), "claude-test")
+            manager.save_session(name)
+        manager.save_session("Default Session")
+        return manager
+
+    def test_startup_reads_only_manifest(self):
+        """시작할 때 세션을 불러오지 않고 색인으로 목록과 정보를 제공하는지 테스트"""
+        self._populate(["alpha", "beta"])
+
+        with patch('src.conversation_manager.ConversationManager.load_session') as load:
+            manager = self._manager()
+            load.assert_not_called()
+        self.assertEqual(len(manager.sessions), 0)
+        self.assertEqual(manager.list_sessions(), ["Default Session", "alpha", "beta"])
+
+        info = manager.get_session_info("beta")
+        self.assertEqual(info["message_count"], 2)
+        self.assertEqual(info["context"], "teacher")
+        self.assertEqual(info["usage"]["requests"], 1)
+        self.assertEqual(info["usage"]["input_tokens"], 10)
+
+        session = manager.get_session("beta")
+        self.assertEqual([m.content for m in session.messages], ["question 1", "answer 1"])
+        self.assertEqual(list(manager.sessions), ["beta"])
+
+    def test_lru_eviction_preserves_sessions(self):
+        """메모리 한도를 넘으면 오래 사용하지 않은 세션을 저장 후 내리는지 테스트"""
+        manager = self._manager(max_resident=2)
+        for name in ["one", "two", "three"]:
+            manager.create_new_session(name).add_message("user", f"hello {name}")
+        # dirty 세션은 저장(commit)한 뒤에 내려감
+        self.assertEqual(len(manager.sessions), 4)
+        manager.flush_dirty_sessions()
+
+        # 현재 세션(Default Session)은 남고 가장 오래된 one이 내려감
+        self.assertEqual(list(manager.sessions), ["Default Session", "three"])
+        self.assertEqual(manager.list_sessions(), ["Default Session", "one", "three", "two"])
+
+        # 응답 생성 중인 세션은 내리지 않음
+        manager.sessions["three"]._active_requests = 1
+        one = manager.get_session("one")
+        self.assertEqual([m.content for m in one.messages], ["hello one"])
+        self.assertIn("three", manager.sessions)
+        self.assertEqual(len(manager.sessions), 3)
+
+        manager.sessions["three"]._active_requests = 0
+        manager.get_session("two")
+        self.assertEqual(len(manager.sessions), 2)
+        self.assertEqual([m.content for m in manager.get_session("three").messages], ["hello three"])
+
+    def test_pinned_session_is_not_evicted(self):
+        """큐에서 기다리는 작업이 잡고 있는 세션은 내리지 않는지 테스트"""
+        manager = self._manager(max_resident=2)
+        queued = manager.create_new_session("queued")
+        with manager.pinned(queued):
+            for name in ["one", "two"]:
+                manager.create_new_session(name)
+            self.assertIs(manager.sessions.get("queued"), queued)
+            queued.add_message("user", "reply after waiting")
+
+        manager.flush_dirty_sessions()
+        self.assertNotIn("queued", manager.sessions)
+        self.assertEqual([m.content for m in manager.get_session("queued").messages], ["reply after waiting"])
+
+    def test_eviction_does_not_save_on_caller_thread(self):
+        """세션을 내릴 때 호출한 스레드에서 저장하지 않는지 테스트"""
+        manager = self._manager(max_resident=1, autosave_delay=None)
+        manager.save_session("Default Session")
+        manager.create_new_session("one").add_message("user", "hello one")
+
+        with patch.object(manager.store, 'save', wraps=manager.store.save) as save:
+            manager.create_new_session("two")
+            save.assert_not_called()
+            self.assertIn("one", manager.sessions)
+
+            manager.flush_dirty_sessions()
+        self.assertEqual(list(manager.sessions), ["Default Session"])
+        self.assertEqual([m.content for m in manager.get_session("one").messages], ["hello one"])
+
+    def test_stale_entry_is_rebuilt(self):
+        """색인 갱신 전에 바뀐 세션 파일은 다시 읽어 색인을 고치는지 테스트"""
+        manager = self._populate(["alpha"])
+        session = manager.sessions["alpha"]
+        session.add_message("user", "more")
+        # 색인 저장 없이 저널에만 기록 (색인을 쓰기 전에 종료된 경우)
+        manager.store._journal("alpha").append(session, manager.last_active["alpha"].isoformat())
+
+        manager = self._manager()
+        self.assertEqual(manager.get_session_info("alpha")["message_count"], 3)
+        self.assertEqual(manager.list_sessions(), ["Default Session", "alpha"])
+
+        # 색인에만 남은 세션은 삭제됨
+        for suffix in (".enc", ".journal"):
+            path = os.path.join(self.storage_dir, f"alpha{suffix}")
+            if os.path.exists(path):
+                os.remove(path)
+        self.assertEqual(self._manager().list_sessions(), ["Default Session"])
+
+    def test_usage_totals_include_unloaded_sessions(self):
+        """메모리에 없는 세션의 사용량도 전체 합계에 포함되는지 테스트"""
+        self._populate(["alpha", "beta"])
+        manager = self._manager()
+        manager.get_session("alpha")
+
+        totals = manager.get_usage_totals()
+        self.assertEqual(totals["totals"]["input_tokens"], 20)
+        self.assertEqual(totals["by_model"]["claude-test"]["output_tokens"], 10)
+
+    def test_rename_and_delete_without_loading(self):
+        """메모리에 없는 세션의 이름 변경과 삭제가 색인에 반영되는지 테스트"""
+        self._populate(["alpha", "beta"])
+        manager = self._manager()
+        manager.rename_session("alpha", "gamma")
+        manager.delete_session("beta")
+        self.assertEqual(len(manager.sessions), 0)
+
+        manager = self._manager()
+        self.assertEqual(manager.list_sessions(), ["Default Session", "gamma"])
+        self.assertEqual([m.content for m in manager.get_session("gamma").messages],
+                         ["question 0", "answer 0"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+import shutil
+from unittest.mock import MagicMock
+from src.conversation_manager import ConversationManager
+from src.storage import SQLiteSessionStore, FileSessionStore, create_store
+
+def make_usage(input_tokens, output_tokens):
+    usage = MagicMock()
+    usage.input_tokens = input_tokens
+    usage.output_tokens = output_tokens
+    usage.cache_creation_input_tokens = 0
+    usage.cache_read_input_tokens = 0
+    return usage
+
+class TestSQLiteSessionStore(unittest.TestCase):
+    def setUp(self):
+        """각 테스트 전에 실행됩니다."""
+        self.storage_dir = tempfile.mkdtemp()
+        # 정리 함수는 등록의 역순으로 실행되므로 각 테스트의 manager.close 다음에 삭제됨
+        self.addCleanup(shutil.rmtree, self.storage_dir, ignore_errors=True)
+
+    def _manager(self):
+        manager = ConversationManager(storage_dir=self.storage_dir, client=MagicMock(), autosave_delay=None,
+                                      store=SQLiteSessionStore(self.storage_dir))
+        self.addCleanup(manager.close)
+        return manager
+
+    def _turn(self, session, question, answer):
+        session.add_message("user", question)
+        session.add_message("assistant", answer)
+        session.usage_ledger.record(make_usage(10, 5), "claude-test")
+
+    def _rows(self, table):
+        with sqlite3.connect(os.path.join(self.storage_dir, "sessions.db")) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_round_trip(self):
+        """세션 내용, 요약, 컨텍스트, 사용량이 저장 후 그대로 복원되는지 테스트"""
+        manager = self._manager()
+        session = manager.create_new_session("alpha")
+        session.context_manager.set_context("teacher")
+        self._turn(session, "hello", [{"type": "text", "text": "hi"}])
+        session.summary = {"text": "greeting", "covers": [0, 2]}
+        manager.close()
+
+        manager = self._manager()
+        self.assertEqual(len(manager.sessions), 0)
+        self.assertEqual(manager.get_session_info("alpha")["message_count"], 2)
+
+        loaded = manager.get_session("alpha")
+        self.assertEqual([m.content for m in loaded.messages], ["hello", [{"type": "text", "text": "hi"}]])
+        self.assertEqual(loaded.context_manager.active_context, "teacher")
+        self.assertEqual(loaded.summary["text"], "greeting")
+        self.assertEqual(loaded.get_token_usage()["input_tokens"], 10)
+        self.assertEqual(len(loaded.usage_ledger.records), 1)
+
+    def test_saves_only_new_rows(self):
+        """저장할 때 바뀐 메시지와 새 사용량 기록만 쓰는지 테스트"""
+        manager = self._manager()
+        session = manager.create_new_session("alpha")
+        self._turn(session, "one", "1")
+        manager.save_session("alpha")
+        self.assertEqual(self._rows("messages"), 2)
+
+        self._turn(session, "two", "2")
+        # 세션 행 1 + 메시지 2 + 사용량 기록 1
+        self.assertEqual(manager.store.save("alpha", session, manager.last_active["alpha"].isoformat()), 4)
+        manager.store.commit()
+        self.assertEqual(manager.store.save("alpha", session, manager.last_active["alpha"].isoformat()), 0)
+
+        # 마지막 메시지 교체
+        session.messages.pop()
+        session.add_message("assistant", "two!")
+        manager.save_session("alpha")
+        self.assertEqual(self._rows("messages"), 4)
+        self.assertEqual(self._rows("usage_records"), 2)
+
+        manager = self._manager()
+        self.assertEqual([m.content for m in manager.get_session("alpha").messages], ["one", "1", "two", "two!"])
+
+    def test_random_access_without_loading(self):
+        """세션을 불러오지 않고 메시지 일부를 읽고 역할별로 세는지 테스트"""
+        manager = self._manager()
+        session = manager.create_new_session("alpha")
+        for index in range(5):
+            self._turn(session, f"q{index}", f"a{index}")
+        manager.close()
+
+        manager = self._manager()
+        messages = manager.get_messages("alpha", 4, 6)
+        self.assertEqual([(m["role"], m["content"]) for m in messages], [("user", "q2"), ("assistant", "a2")])
+        self.assertEqual(manager.store.count_messages("alpha", role="user"), 5)
+        self.assertEqual(manager.store.count_messages("alpha"), 10)
+        self.assertNotIn("alpha", manager.sessions)
+
+    def test_rename_delete_and_wal(self):
+        """이름 변경과 삭제가 모든 테이블에 반영되고 WAL 모드를 사용하는지 테스트"""
+        manager = self._manager()
+        self._turn(manager.create_new_session("alpha"), "hello", "hi")
+        self._turn(manager.create_new_session("beta"), "bye", "ciao")
+        manager.save_all_sessions()
+        manager.rename_session("alpha", "gamma")
+        manager.delete_session("beta")
+        manager.close()
+
+        manager = self._manager()
+        self.assertEqual(manager.list_sessions(), ["Default Session", "gamma"])
+        self.assertEqual(manager.get_messages("gamma")[1]["content"], "hi")
+        self.assertEqual(self._rows("messages"), 2)
+        self.assertEqual(manager.store.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_message_timestamp_is_creation_time(self):
+        """다시 저장한 메시지 행도 timestamp 열에 작성 시각을 유지하는지 테스트"""
+        manager = self._manager()
+        session = manager.create_new_session("alpha")
+        self._turn(session, "one", "1")
+        created = [m.metadata["created_at"] for m in session.messages]
+        manager.save_session("alpha")
+
+        # 처음 저장하는 것처럼 세션 전체를 다시 씀
+        manager.store.release("alpha")
+        manager.save_session("alpha")
+        with sqlite3.connect(os.path.join(self.storage_dir, "sessions.db")) as conn:
+            rows = conn.execute(
+                "SELECT timestamp FROM messages WHERE session = 'alpha' ORDER BY position"
+            ).fetchall()
+        self.assertEqual([timestamp for (timestamp,) in rows], created)
+
+    def test_imports_file_sessions(self):
+        """데이터베이스를 처음 만들 때 파일 저장소 세션을 가져오는지 테스트"""
+        manager = ConversationManager(storage_dir=self.storage_dir, client=MagicMock(), autosave_delay=None)
+        session = manager.create_new_session("alpha")
+        session.context_manager.set_context("teacher")
+        self._turn(session, "hello", "hi")
+        manager.close()
+
+        manager = self._manager()
+        self.assertEqual(manager.list_sessions(), ["Default Session", "alpha"])
+        self.assertEqual(manager.get_session_info("alpha")["usage"]["input_tokens"], 10)
+        loaded = manager.get_session("alpha")
+        self.assertEqual([m.content for m in loaded.messages], ["hello", "hi"])
+        self.assertEqual(loaded.context_manager.active_context, "teacher")
+        self.assertEqual(len(loaded.usage_ledger.records), 1)
+        # 원래 세션 파일은 남김
+        self.assertTrue(any(filename.startswith("alpha.") for filename in os.listdir(self.storage_dir)))
+
+    def test_create_store(self):
+        """설정 이름으로 저장소를 만드는지 테스트"""
+        self.assertEqual(type(create_store("file", self.storage_dir)).__name__, FileSessionStore.__name__)
+        self.assertEqual(type(create_store("sqlite", self.storage_dir)).__name__, SQLiteSessionStore.__name__)
+        with self.assertRaises(ValueError):
+            create_store("redis", self.storage_dir)
+
+if __name__ == '__main__':
+    unittest.main()
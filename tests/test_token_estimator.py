@@ -0,0 +1,62 @@
+import unittest
+from src.chat_session import MessageContent
+from src.token_estimator import TokenEstimator
+
+class TestTokenEstimator(unittest.TestCase):
+    def setUp(self):
+        self.estimator = TokenEstimator(message_overhead=0,
+                                        dimension_lookup=lambda block: (750, 100))
+
+    def test_text_and_image_blocks(self):
+        """텍스트는 문자 수로, 이미지는 크기로 추정합니다."""
+        content = [
+            {"type": "text", "text": "a" * 40},
+            {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": "AAAA"}}
+        ]
+        self.assertEqual(self.estimator.estimate(content), 10 + 100)
+
+    def test_non_ascii_text_counts_more_per_char(self):
+        """한글은 같은 문자 수의 ASCII보다 토큰이 많습니다."""
+        self.assertGreater(self.estimator.estimate("안녕하세요" * 10), self.estimator.estimate("hello" * 10))
+
+    def test_estimate_is_memoized_per_content(self):
+        content = [{"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": "AAAA"}}]
+        calls = []
+        estimator = TokenEstimator(dimension_lookup=lambda block: calls.append(block) or (100, 100))
+        estimator.estimate(content)
+        estimator.estimate(content)
+        self.assertEqual(len(calls), 1)
+
+    def test_forget_single_content(self):
+        """지정한 내용의 추정값만 캐시에서 지웁니다."""
+        kept, dropped = "a" * 40, "b" * 40
+        self.estimator.estimate(kept)
+        self.estimator.estimate(dropped)
+        self.estimator.forget(dropped)
+        self.assertEqual([entry[0] for entry in self.estimator._memo.values()], [kept])
+        self.estimator.forget()
+        self.assertEqual(self.estimator._memo, {})
+
+    def test_estimate_messages_is_incremental(self):
+        """메시지가 추가되면 새 메시지만 계산합니다."""
+        messages = [MessageContent(role="user", content="a" * 400) for _ in range(3)]
+        self.assertEqual(self.estimator.estimate_messages(messages), 300)
+
+        messages.append(MessageContent(role="assistant", content="b" * 40))
+        self.estimator._memo.clear()  # 이전 메시지를 다시 계산하면 캐시가 다시 채워짐
+        self.assertEqual(self.estimator.estimate_messages(messages), 310)
+        self.assertEqual(len(self.estimator._memo), 1)
+
+    def test_calibration_moves_factor_towards_actual(self):
+        self.estimator.calibrate(100, 150)
+        self.assertAlmostEqual(self.estimator.factor, 1.5)
+        self.estimator.calibrate(100, 100)
+        self.assertAlmostEqual(self.estimator.factor, 1.4)
+        self.assertEqual(self.estimator.estimate("a" * 400), 140)
+
+    def test_calibration_is_clamped(self):
+        self.estimator.calibrate(100, 10000)
+        self.assertEqual(self.estimator.factor, self.estimator.max_factor)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from types import SimpleNamespace
+from src.usage_ledger import UsageLedger, merge_usage_totals
+
+def make_usage(input_tokens=0, output_tokens=0, cache_creation=None, cache_read=None):
+    return SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_creation_input_tokens=cache_creation,
+        cache_read_input_tokens=cache_read
+    )
+
+class TestUsageLedger(unittest.TestCase):
+    def test_record_updates_totals(self):
+        """기록할 때마다 전체 합계와 모델별 합계가 갱신됩니다."""
+        ledger = UsageLedger()
+        ledger.record(make_usage(100, 20, cache_read=1000), "model-a")
+        ledger.record(make_usage(50, 10, cache_creation=300), "model-b", purpose="compaction")
+
+        self.assertEqual(ledger.totals["requests"], 2)
+        self.assertEqual(ledger.totals["input_tokens"], 150)
+        self.assertEqual(ledger.totals["cache_read_input_tokens"], 1000)
+        self.assertEqual(ledger.totals_by_model["model-b"]["cache_creation_input_tokens"], 300)
+        self.assertEqual(ledger.total_tokens, 1480)
+        self.assertEqual(ledger.records[1].purpose, "compaction")
+
+    def test_records_are_capped_but_totals_are_not(self):
+        ledger = UsageLedger(max_records=3)
+        for _ in range(5):
+            ledger.record(make_usage(10, 1), "model-a")
+        self.assertEqual(len(ledger.records), 3)
+        self.assertEqual(ledger.totals["input_tokens"], 50)
+
+    def test_round_trip(self):
+        """저장 후 복원해도 기록과 합계가 유지됩니다."""
+        ledger = UsageLedger()
+        ledger.record(make_usage(7, 3), "model-a")
+        restored = UsageLedger.from_dict(ledger.to_dict())
+        self.assertEqual(restored.totals, ledger.totals)
+        self.assertEqual(restored.records, ledger.records)
+        self.assertEqual(UsageLedger.from_dict(None).total_tokens, 0)
+
+    def test_merge_usage_totals(self):
+        first, second = UsageLedger(), UsageLedger()
+        first.record(make_usage(10, 5), "model-a")
+        second.record(make_usage(20, 5), "model-a")
+        second.record(make_usage(1, 1), "model-b")
+
+        merged = merge_usage_totals([first, second])
+        self.assertEqual(merged["totals"]["requests"], 3)
+        self.assertEqual(merged["totals"]["total_tokens"], 42)
+        self.assertEqual(merged["by_model"]["model-a"]["input_tokens"], 30)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from src.utils import count_tokens, generate_message_id, truncate_conversation
+from src.utils import count_tokens, generate_message_id, truncate_conversation, estimate_tokens, IMAGE_TOKEN_ESTIMATE
 
 class TestUtils(unittest.TestCase):
     def test_count_tokens(self):
@@ -26,5 +26,22 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(len(truncated), 2)
         self.assertEqual(truncated[-1]["content"], "How are you?")
 
+    def test_estimate_tokens_multimodal(self):
+        content = [
+            {"type": "text", "text": "x" * 40},
+            {"type": "image", "source": {"type": "url", "url": "https://example.com/a.png"}}
+        ]
+        self.assertEqual(estimate_tokens(content), 10 + IMAGE_TOKEN_ESTIMATE)
+
+    def test_truncate_conversation_multimodal(self):
+        messages = [
+            {"role": "user", "content": [{"type": "text", "text": "x" * 4000}]},
+            {"role": "assistant", "content": "y" * 40},
+            {"role": "user", "content": [{"type": "text", "text": "z" * 40}]}
+        ]
+        truncated = truncate_conversation(messages, 100)
+        self.assertEqual(len(truncated), 1)
+        self.assertEqual(truncated[0]["role"], "user")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file